@@ -1,21 +1,26 @@
 import logging
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
+from itertools import islice
 from pathlib import Path
 from typing import TYPE_CHECKING, Optional
 
 import gevent
 
+from rotkehlchen.accounting.checkpoints import PnlCheckpointer, accounting_settings_hash
 from rotkehlchen.accounting.constants import FREE_PNL_EVENTS_LIMIT
 from rotkehlchen.accounting.export.csv import CSVExporter
 from rotkehlchen.accounting.mixins.event import AccountingEventMixin
 from rotkehlchen.accounting.pot import AccountingPot
 from rotkehlchen.accounting.structures.types import ActionType
 from rotkehlchen.accounting.types import MissingPrice
+from rotkehlchen.assets.asset import Asset
 from rotkehlchen.db.reports import DBAccountingReports
 from rotkehlchen.db.settings import DBSettings
 from rotkehlchen.errors.asset import UnknownAsset, UnprocessableTradePair, UnsupportedAsset
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.errors.price import NoPriceForGivenTimestamp, PriceQueryUnsupportedAsset
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.history.price import PriceHistorian
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.premium.premium import Premium
 from rotkehlchen.types import Timestamp
@@ -29,6 +34,9 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Number of events read ahead during processing to resolve the prices they need in bulk
+PRICES_PREFETCH_CHUNK_SIZE = 5000
+
 
 class Accountant():
 
@@ -72,11 +80,10 @@ class Accountant():
     def _process_skipping_exception(
             self,
             exception: Exception,
-            events: list[AccountingEventMixin],
+            event: AccountingEventMixin,
             count: int,
             reason: str,
     ) -> int:
-        event = events[count]
         ts = event.get_timestamp()
         identifier = event.get_identifier()
         self.msg_aggregator.add_error(
@@ -91,21 +98,53 @@ class Accountant():
         )
         return count + 1
 
+    @staticmethod
+    def _collect_price_queries(
+            events: Iterable[AccountingEventMixin],
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+            db_settings: DBSettings,
+    ) -> Iterator[tuple[Asset, Asset, Timestamp]]:
+        """Yields the (asset, profit currency, timestamp) price queries that processing
+        the given events is expected to need. Used to resolve prices in bulk beforehand."""
+        profit_currency = db_settings.main_currency
+        for event in events:
+            timestamp = event.get_timestamp()
+            if timestamp > end_ts:
+                break
+            if not db_settings.calculate_past_cost_basis and timestamp < start_ts:
+                continue
+
+            try:
+                event_assets = event.get_assets()
+            except (UnknownAsset, UnsupportedAsset, UnprocessableTradePair):
+                continue  # will be reported when processing the event
+
+            for asset in event_assets:
+                if asset != profit_currency:
+                    yield asset, profit_currency, timestamp
+
     def process_history(
             self,
             start_ts: Timestamp,
             end_ts: Timestamp,
-            events: list[AccountingEventMixin],
+            events: Iterable[AccountingEventMixin],
     ) -> int:
         """Processes the entire history of cryptoworld actions in order to determine
         the price and time at which every asset was obtained and also
         the general and taxable profit/loss.
 
         The events history is already expected to be sorted when passed to this function.
+        It is only iterated sequentially, but more than once, so it can be a stream
+        that reads the events lazily such as the one returned by the EventsHistorian.
+        All the processed events come from a single pass over it.
 
         start_ts here is the timestamp at which to start taking trades and other
         taxable events into account. Not where processing starts from. Processing
-        always starts from the very first event we find in the history.
+        always starts from the very first event we find in the history. With premium
+        the state of the accounting after a prefix of the history is saved in checkpoints
+        and a later report can restore it instead of processing that prefix again.
+        The events of the restored prefix are then not part of the report.
 
         Returns the id of the generated report
         """
@@ -116,14 +155,14 @@ class Accountant():
             end_ts=end_ts,
             active_premium=active_premium,
         )
-        events_limit = -1 if active_premium else FREE_PNL_EVENTS_LIMIT
         # Ask the DB for the settings once at the start of processing so we got the
         # same settings through the entire task
         with self.db.conn.read_ctx() as cursor:
             db_settings = self.db.get_settings(cursor)
             # Create a new pnl report in the DB to be used to save each event generated
             dbpnl = DBAccountingReports(self.db)
-            first_ts = Timestamp(0) if len(events) == 0 else events[0].get_timestamp()
+            first_event = next(iter(events), None)
+            first_ts = Timestamp(0) if first_event is None else first_event.get_timestamp()
             report_id = dbpnl.add_report(
                 first_processed_timestamp=first_ts,
                 start_ts=start_ts,
@@ -138,13 +177,119 @@ class Accountant():
             self.currently_processing_timestamp = first_ts
             self.first_processed_timestamp = first_ts
 
-            count = 0
-            actions_length = len(events)
-            prev_time = last_event_ts = Timestamp(0)
             ignored_ids_mapping = self.db.get_ignored_action_ids(cursor=cursor, action_type=None)
+            checkpointer = None
+            if active_premium and db_settings.calculate_past_cost_basis:
+                # checkpoints skip events so they are not used under the free events limit
+                checkpointer = PnlCheckpointer(
+                    dbpnl=dbpnl,
+                    events=events,
+                    settings_hash=accounting_settings_hash(
+                        settings=db_settings,
+                        ignored_asset_ids=self.db.get_ignored_asset_ids(cursor),
+                        ignored_ids_mapping=ignored_ids_mapping,
+                    ),
+                    start_ts=start_ts,
+                    end_ts=end_ts,
+                )
+
+        start_position = 0 if checkpointer is None else checkpointer.resume(self.pots[0])
+        # Processing reads the events in a new pass over them, which may differ from the
+        # one the checkpoint was picked from if the history changed in the meantime
+        events_iterator = iter(events)
+        if checkpointer is not None and checkpointer.verify_resumed(events_iterator) is False:
+            self.pots[0].reset(settings=db_settings, start_ts=start_ts, end_ts=end_ts, report_id=report_id)  # noqa: E501
+            events_iterator, start_position = iter(events), 0
+
+        # Prices of the same pairs are going to be queried over and over during processing
+        GlobalDBHandler().enable_price_history_index()
+        try:
+            count, last_event_ts, actions_length = self._process_events(
+                events=events_iterator,
+                start_ts=start_ts,
+                end_ts=end_ts,
+                db_settings=db_settings,
+                ignored_ids_mapping=ignored_ids_mapping,
+                active_premium=bool(active_premium),
+                start_position=start_position,
+                checkpointer=checkpointer,
+            )
+        finally:
+            PriceHistorian().clear_prefetched_prices()
+            GlobalDBHandler().disable_price_history_index()
+
+        dbpnl.add_report_overview(
+            report_id=report_id,
+            last_processed_timestamp=last_event_ts,
+            processed_actions=count,
+            total_actions=actions_length,
+            pnls=self.pots[0].pnls,
+        )
+        return report_id
 
-        events_iter = iter(events)
+    def _prefetching_prices(
+            self,
+            events: Iterator[AccountingEventMixin],
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+            db_settings: DBSettings,
+    ) -> Iterator[AccountingEventMixin]:
+        """Yields the events, reading them ahead in chunks so that the prices that
+        processing each chunk needs are resolved in bulk before it is processed"""
+        while len(chunk := list(islice(events, PRICES_PREFETCH_CHUNK_SIZE))) != 0:
+            PriceHistorian().prefetch_historical_prices(self._collect_price_queries(
+                events=chunk,
+                start_ts=start_ts,
+                end_ts=end_ts,
+                db_settings=db_settings,
+            ))
+            yield from chunk
+
+    def _process_events(
+            self,
+            events: Iterator[AccountingEventMixin],
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+            db_settings: DBSettings,
+            ignored_ids_mapping: dict[ActionType, set[str]],
+            active_premium: bool,
+            start_position: int = 0,
+            checkpointer: Optional[PnlCheckpointer] = None,
+    ) -> tuple[int, Timestamp, int]:
+        """Runs the main processing loop over the sorted events, which should already be
+        advanced past the first start_position ones. These should already be accounted for
+        in the pot's state, restored from a checkpoint.
+
+        Returns the number of processed events, the timestamp of the last one and the
+        total number of events."""
+        events_limit = -1 if active_premium else FREE_PNL_EVENTS_LIMIT
+        count = position = start_position
+        prev_time = last_event_ts = Timestamp(0)
+        remaining_events = self._prefetching_prices(
+            events=events,
+            start_ts=start_ts,
+            end_ts=end_ts,
+            db_settings=db_settings,
+        )
+        # The event after the consumed ones is read ahead to know when to save checkpoints
+        next_event = next(remaining_events, None)
+        current_event: Optional[AccountingEventMixin] = None
+
+        def counting_iterator() -> Iterator[AccountingEventMixin]:
+            """Keeps track of the position in the events, also for events consumed
+            by other events during their processing"""
+            nonlocal position, next_event, current_event
+            while next_event is not None:
+                current_event, next_event = next_event, next(remaining_events, None)
+                position += 1
+                if checkpointer is not None:
+                    checkpointer.add_event(current_event)
+                yield current_event
+
+        events_iter = counting_iterator()
         while True:
+            if checkpointer is not None:
+                checkpointer.maybe_save(pot=self.pots[0], position=position, next_event=next_event)  # noqa: E501
             try:
                 (
                     processed_events_num,
@@ -158,12 +303,15 @@ class Accountant():
                     ignored_ids_mapping=ignored_ids_mapping,
                 )
             except PriceQueryUnsupportedAsset as e:
+                assert current_event is not None, 'an event was consumed before the exception'
                 count = self._process_skipping_exception(
                     exception=e,
-                    events=events,
+                    event=current_event,
                     count=count,
                     reason='not being able to find price for an unsupported asset',
                 )
+                if checkpointer is not None:
+                    checkpointer.stop()
                 continue
             except NoPriceForGivenTimestamp as e:
                 self.pots[0].cost_basis.missing_prices.add(
@@ -176,12 +324,15 @@ class Accountant():
                 )
                 continue
             except RemoteError as e:
+                assert current_event is not None, 'an event was consumed before the exception'
                 count = self._process_skipping_exception(
                     exception=e,
-                    events=events,
+                    event=current_event,
                     count=count,
                     reason='inability to reach an external service at that point in time',
                 )
+                if checkpointer is not None:
+                    checkpointer.stop()
                 continue
 
             if processed_events_num == 0:
@@ -198,18 +349,13 @@ class Accountant():
                 log.debug(
                     f'PnL reports event processing has hit the event limit of {events_limit}. '
                     f'Processing stopped and the results will not '
-                    f'take into account subsequent events. Total events were {len(events)}',
+                    'take into account subsequent events',
                 )
                 break
 
-        dbpnl.add_report_overview(
-            report_id=report_id,
-            last_processed_timestamp=last_event_ts,
-            processed_actions=count,
-            total_actions=actions_length,
-            pnls=self.pots[0].pnls,
-        )
-        return report_id
+        # the events that were not consumed are only counted
+        total_events = position if next_event is None else position + 1 + sum(1 for _ in remaining_events)  # noqa: E501
+        return count, last_event_ts, total_events
 
     def _process_event(
             self,
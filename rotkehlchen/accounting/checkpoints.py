@@ -0,0 +1,237 @@
+"""Checkpoints of the accounting state used to resume PnL report processing
+
+Processing a PnL report with past cost basis replays the entire history from the very
+first event. A checkpoint stores the state of the accounting pot after processing a
+prefix of the sorted history so that a later report whose range starts after that
+prefix can restore the state and only process the events that follow it.
+
+A checkpoint is only valid for the same accounting settings and the exact same
+prefix of events. Both are identified by a hash that is saved along with it.
+"""
+import hashlib
+import logging
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from rotkehlchen.constants.timing import DAY_IN_SECONDS
+from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.types import Timestamp
+from rotkehlchen.utils.serialization import rlk_jsondumps
+
+if TYPE_CHECKING:
+    from rotkehlchen.accounting.mixins.event import AccountingEventMixin
+    from rotkehlchen.accounting.pot import AccountingPot
+    from rotkehlchen.accounting.structures.types import ActionType
+    from rotkehlchen.db.reports import DBAccountingReports
+    from rotkehlchen.db.settings import DBSettings
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# Bump if the serialization format of the accounting state changes
+CHECKPOINT_FORMAT_VERSION = 1
+# Checkpoints are saved at each multiple of this interval inside a report's range
+PNL_CHECKPOINT_INTERVAL = 30 * DAY_IN_SECONDS
+# Maximum number of checkpoints kept per accounting settings
+PNL_CHECKPOINTS_LIMIT = 10
+
+
+class PnlCheckpoint(NamedTuple):
+    settings_hash: str
+    events_hash: str
+    processed_events: int  # number of leading events of the sorted history covered
+    timestamp: Timestamp  # timestamp of the last covered event
+
+
+def accounting_settings_hash(
+        settings: 'DBSettings',
+        ignored_asset_ids: set[str],
+        ignored_ids_mapping: dict['ActionType', set[str]],
+) -> str:
+    """Returns a hash of everything apart from the events that affects the accounting state"""
+    data = {
+        'version': CHECKPOINT_FORMAT_VERSION,
+        'main_currency': settings.main_currency.identifier,
+        'taxfree_after_period': settings.taxfree_after_period,
+        'include_crypto2crypto': settings.include_crypto2crypto,
+        'include_gas_costs': settings.include_gas_costs,
+        'account_for_assets_movements': settings.account_for_assets_movements,
+        'calculate_past_cost_basis': settings.calculate_past_cost_basis,
+        'cost_basis_method': settings.cost_basis_method.serialize(),
+        'eth_staking_taxable_after_withdrawal_enabled': settings.eth_staking_taxable_after_withdrawal_enabled,  # noqa: E501
+        'include_fees_in_cost_basis': settings.include_fees_in_cost_basis,
+        'treat_eth2_as_eth': settings.treat_eth2_as_eth,
+        'taxable_ledger_actions': sorted(x.serialize() for x in settings.taxable_ledger_actions),
+        'historical_price_oracles': [x.serialize() for x in settings.historical_price_oracles],
+        'ignored_assets': sorted(ignored_asset_ids),
+        'ignored_actions': sorted(
+            (action_type.serialize(), sorted(identifiers))
+            for action_type, identifiers in ignored_ids_mapping.items()
+        ),
+    }
+    return hashlib.sha256(rlk_jsondumps(data).encode()).hexdigest()
+
+
+class PnlCheckpointer:
+    """Resumes the processing of a report from a saved checkpoint and saves new
+    checkpoints while the events of the report are processed
+
+    The events are only iterated sequentially so that they can be a stream. The hash
+    of the processed prefix of the events is updated by `add_event` as each event
+    is consumed."""
+
+    def __init__(
+            self,
+            dbpnl: 'DBAccountingReports',
+            events: Iterable['AccountingEventMixin'],
+            settings_hash: str,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+    ) -> None:
+        self.dbpnl = dbpnl
+        self.events = events
+        self.settings_hash = settings_hash
+        self.start_ts = start_ts
+        self.end_ts = end_ts
+        self.hasher = hashlib.sha256()
+        self.last_event_ts = Timestamp(0)
+        # checkpoints are saved at the interval boundaries inside the report's range
+        self.next_boundary = -(-start_ts // PNL_CHECKPOINT_INTERVAL) * PNL_CHECKPOINT_INTERVAL
+        self.last_position = 0
+        self.resumed_events_hash = ''
+        self.saving = True
+
+    @staticmethod
+    def _hash_event(hasher: 'hashlib._Hash', event: 'AccountingEventMixin') -> None:
+        hasher.update(event.get_accounting_event_type().serialize().encode())
+        hasher.update(rlk_jsondumps(event.serialize()).encode())
+
+    def add_event(self, event: 'AccountingEventMixin') -> None:
+        """Adds the event that follows the already added ones to the prefix hash"""
+        self._hash_event(self.hasher, event)
+        self.last_event_ts = event.get_timestamp()
+
+    def _valid_checkpoints(self) -> list[PnlCheckpoint]:
+        """Returns the checkpoints that cover only events before the report's start and
+        whose prefix hash matches the events. Ordered by ascending number of covered events."""
+        checkpoints = sorted(
+            self.dbpnl.get_checkpoints(self.settings_hash, before_ts=self.start_ts),
+            key=lambda x: x.processed_events,
+        )
+        valid: list[PnlCheckpoint] = []
+        if len(checkpoints) == 0:
+            return valid
+
+        hasher, idx = hashlib.sha256(), 0
+        for position, event in enumerate(self.events, start=1):
+            self._hash_event(hasher, event)
+            while idx < len(checkpoints) and checkpoints[idx].processed_events <= position:
+                if checkpoints[idx].processed_events == position and hasher.hexdigest() == checkpoints[idx].events_hash:  # noqa: E501
+                    valid.append(checkpoints[idx])
+                idx += 1
+
+            if idx == len(checkpoints):
+                break
+
+        return valid
+
+    def resume(self, pot: 'AccountingPot') -> int:
+        """Restores into the reset pot the state of the latest checkpoint that is valid for
+        the events and covers only events before the report's start.
+
+        The events are read in a pass of their own, so the pass that gets processed
+        should be checked with `verify_resumed` before the restored state is used.
+
+        Returns the number of leading events covered by the restored checkpoint."""
+        for checkpoint in reversed(self._valid_checkpoints()):
+            if (data := self.dbpnl.get_checkpoint_data(checkpoint)) is None:
+                continue
+
+            try:
+                pot.restore_state(data)
+            except DeserializationError as e:
+                log.error(f'Could not restore PnL checkpoint due to {e!s}. Skipping it')
+                pot.reset(
+                    settings=pot.settings,
+                    start_ts=pot.query_start_ts,
+                    end_ts=pot.query_end_ts,
+                    report_id=pot.report_id,  # type: ignore[arg-type]  # pot is reset
+                )
+                continue
+
+            log.debug(
+                f'Resuming PnL report processing after {checkpoint.processed_events} '
+                f'events up to {checkpoint.timestamp}',
+            )
+            self.resumed_events_hash = checkpoint.events_hash
+            self.last_position = checkpoint.processed_events
+            return checkpoint.processed_events
+
+        return 0
+
+    def verify_resumed(self, events: Iterator['AccountingEventMixin']) -> bool:
+        """Consumes from the events the ones covered by the restored checkpoint, adding them
+        to the prefix hash, and checks that they are still the ones the checkpoint covers.
+
+        If they are not, the history changed after `resume` read it. Then the checkpointer
+        starts over from the first event and False is returned, in which case the pot
+        should be reset and all the events processed from a new pass."""
+        if self.last_position == 0:
+            return True
+
+        covered_events = 0
+        for event in islice(events, self.last_position):
+            self.add_event(event)
+            covered_events += 1
+
+        if covered_events == self.last_position and self.hasher.hexdigest() == self.resumed_events_hash:  # noqa: E501
+            return True
+
+        log.warning(
+            'The history changed after the PnL checkpoint to resume from was picked. '
+            'Processing all the events instead',
+        )
+        self.hasher = hashlib.sha256()
+        self.last_event_ts = Timestamp(0)
+        self.last_position = 0
+        return False
+
+    def stop(self) -> None:
+        """No more checkpoints are saved. Used when events had to be skipped"""
+        self.saving = False
+
+    def maybe_save(
+            self,
+            pot: 'AccountingPot',
+            position: int,
+            next_event: Optional['AccountingEventMixin'],
+    ) -> None:
+        """Called before the event at the given position, `next_event`, is processed.
+        All the events before it should have been added. Saves a checkpoint of the
+        pot's state if an interval boundary was crossed or the end of the report's
+        events was reached."""
+        if self.saving is False or position <= self.last_position:
+            return
+
+        if next_event is not None and (timestamp := next_event.get_timestamp()) <= self.end_ts:
+            if timestamp < self.next_boundary:
+                return
+            self.next_boundary = (timestamp // PNL_CHECKPOINT_INTERVAL + 1) * PNL_CHECKPOINT_INTERVAL  # noqa: E501
+
+        if len(pot.cost_basis.missing_prices) != 0:
+            # the user may add the missing prices so don't keep a state computed without them
+            self.stop()
+            return
+
+        self.last_position = position
+        self.dbpnl.add_checkpoint(
+            checkpoint=PnlCheckpoint(
+                settings_hash=self.settings_hash,
+                events_hash=self.hasher.hexdigest(),
+                processed_events=position,
+                timestamp=self.last_event_ts,
+            ),
+            data=pot.serialize_state(),
+        )
@@ -14,7 +14,7 @@ from rotkehlchen.db.settings import DBSettings
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.fval import FVal
 from rotkehlchen.logging import RotkehlchenLogsAdapter
-from rotkehlchen.serialization.deserialize import deserialize_fval
+from rotkehlchen.serialization.deserialize import deserialize_fval, deserialize_optional_to_fval
 from rotkehlchen.types import CostBasisMethod, Location, Price, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.mixins.customizable_date import CustomizableDateMixin
@@ -285,6 +285,44 @@ class BaseCostBasisMethod(metaclass=ABCMeta):
     def __len__(self) -> int:
         return len(self._acquisitions_heap)
 
+    def serialize_state(self) -> dict[str, Any]:
+        """Serializes the acquisitions so that they can be restored by restore_state.
+
+        The heap list is kept in its order so the restored heap is identical."""
+        return {'acquisitions': [
+            [str(entry.priority), entry.acquisition_event.serialize() | {
+                'remaining_amount': str(entry.acquisition_event.remaining_amount),
+            }] for entry in self._acquisitions_heap
+        ]}
+
+    def restore_state(self, data: dict[str, Any]) -> None:
+        """Restores the state saved by serialize_state.
+
+        The restored acquisitions do not belong to the report being processed so their
+        index is set to -1.
+
+        May raise:
+        - DeserializationError if the data are not in the expected format
+        """
+        heap = []
+        try:
+            for priority, entry in data['acquisitions']:
+                acquisition = AssetAcquisitionEvent(
+                    amount=deserialize_fval(entry['full_amount'], name='full_amount', location='cost basis checkpoint'),  # noqa: E501
+                    timestamp=Timestamp(entry['timestamp']),
+                    rate=Price(deserialize_fval(entry['rate'], name='rate', location='cost basis checkpoint')),  # noqa: E501
+                    index=-1,
+                )
+                acquisition.remaining_amount = deserialize_fval(entry['remaining_amount'], name='remaining_amount', location='cost basis checkpoint')  # noqa: E501
+                heap.append(AssetAcquisitionHeapElement(
+                    priority=deserialize_fval(priority, name='priority', location='cost basis checkpoint'),  # noqa: E501
+                    acquisition_event=acquisition,
+                ))
+        except (KeyError, TypeError, ValueError) as e:
+            raise DeserializationError(f'Invalid cost basis checkpoint data: {e!s}') from e
+
+        self._acquisitions_heap = heap
+
 
 class FIFOCostBasisMethod(BaseCostBasisMethod):
     """
@@ -300,6 +338,13 @@ class FIFOCostBasisMethod(BaseCostBasisMethod):
         heapq.heappush(self._acquisitions_heap, AssetAcquisitionHeapElement(self._count, acquisition))  # noqa: E501
         self._count += 1
 
+    def serialize_state(self) -> dict[str, Any]:
+        return super().serialize_state() | {'count': str(self._count)}
+
+    def restore_state(self, data: dict[str, Any]) -> None:
+        super().restore_state(data)
+        self._count = deserialize_optional_to_fval(data.get('count'), name='count', location='cost basis checkpoint')  # noqa: E501
+
 
 class LIFOCostBasisMethod(BaseCostBasisMethod):
     """
@@ -315,6 +360,13 @@ class LIFOCostBasisMethod(BaseCostBasisMethod):
         heapq.heappush(self._acquisitions_heap, AssetAcquisitionHeapElement(-self._count, acquisition))  # noqa: E501
         self._count += 1
 
+    def serialize_state(self) -> dict[str, Any]:
+        return super().serialize_state() | {'count': str(self._count)}
+
+    def restore_state(self, data: dict[str, Any]) -> None:
+        super().restore_state(data)
+        self._count = deserialize_optional_to_fval(data.get('count'), name='count', location='cost basis checkpoint')  # noqa: E501
+
 
 class HIFOCostBasisMethod(BaseCostBasisMethod):
     """
@@ -379,6 +431,20 @@ class AverageCostBasisMethod(BaseCostBasisMethod):
         self.current_amount -= used_amount
         super().consume_result(used_amount)
 
+    def serialize_state(self) -> dict[str, Any]:
+        return super().serialize_state() | {
+            'count': str(self._count),
+            'current_amount': str(self.current_amount),
+            'current_total_acb': str(self.current_total_acb),
+        }
+
+    def restore_state(self, data: dict[str, Any]) -> None:
+        super().restore_state(data)
+        location = 'cost basis checkpoint'
+        self._count = deserialize_optional_to_fval(data.get('count'), name='count', location=location)  # noqa: E501
+        self.current_amount = deserialize_optional_to_fval(data.get('current_amount'), name='current_amount', location=location)  # noqa: E501
+        self.current_total_acb = deserialize_optional_to_fval(data.get('current_total_acb'), name='current_total_acb', location=location)  # noqa: E501
+
     def calculate_spend_cost_basis(
             self,
             spending_amount: FVal,
@@ -571,6 +637,42 @@ class CostBasisCalculator(CustomizableDateMixin):
         self.missing_acquisitions: list[MissingAcquisition] = []
         self.missing_prices: set[MissingPrice] = set()
 
+    def serialize_state(self) -> dict[str, Any]:
+        """Serializes the state needed to continue processing from this point on.
+
+        Spends and used acquisitions are not kept since they are only recorded and never
+        read during processing. Missing prices are not kept either since no checkpoint
+        should be created when prices are missing."""
+        return {
+            'assets': {
+                asset.identifier: events.acquisitions_manager.serialize_state()
+                for asset, events in self._events.items()
+            },
+            'missing_acquisitions': [x.serialize() for x in self.missing_acquisitions],
+        }
+
+    def restore_state(self, data: dict[str, Any]) -> None:
+        """Restores the state saved by serialize_state on top of a reset calculator.
+
+        May raise:
+        - DeserializationError if the data are not in the expected format
+        """
+        location = 'cost basis checkpoint'
+        try:
+            for identifier, asset_data in data['assets'].items():
+                self._events[Asset(identifier)].acquisitions_manager.restore_state(asset_data)
+
+            self.missing_acquisitions = [
+                MissingAcquisition(
+                    asset=Asset(entry['asset']),
+                    time=Timestamp(entry['time']),
+                    found_amount=deserialize_fval(entry['found_amount'], name='found_amount', location=location),  # noqa: E501
+                    missing_amount=deserialize_fval(entry['missing_amount'], name='missing_amount', location=location),  # noqa: E501
+                ) for entry in data['missing_acquisitions']
+            ]
+        except (KeyError, TypeError, AttributeError) as e:
+            raise DeserializationError(f'Invalid cost basis checkpoint data: {e!s}') from e
+
     def get_events(self, asset: Asset) -> CostBasisEvents:
         """Custom getter for events so that we have common cost basis for some assets"""
         if asset == A_WETH:
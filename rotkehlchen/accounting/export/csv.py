@@ -150,12 +150,17 @@ class CSVExporter(CustomizableDateMixin):
                     if name == 'free' and acquisition.taxable is True:
                         continue
 
-                    index = acquisition.event.index + CSV_INDEX_OFFSET
                     if cost_basis == '':
                         cost_basis = '='
                     else:
                         cost_basis += '+'
 
+                    if acquisition.event.index < 0:
+                        # acquisition restored from a checkpoint that is not in this report
+                        cost_basis += f'{acquisition.amount!s}*{acquisition.event.rate!s}'
+                        continue
+
+                    index = acquisition.event.index + CSV_INDEX_OFFSET
                     cost_basis += f'{acquisition.amount!s}*H{index}'
 
         dict_event[f'cost_basis_{name}'] = cost_basis
@@ -117,6 +117,30 @@ class AccountingPot(CustomizableDateMixin):
         self.transactions.reset()
         self.processed_events = []
 
+    def serialize_state(self) -> dict[str, Any]:
+        """Serializes the state that processing further events depends on.
+
+        Processed events and pnl totals are not included since they only concern
+        the report in which they were created."""
+        return {
+            'cost_basis': self.cost_basis.serialize_state(),
+            'evm_accountants': self.transactions.evm_accounting_aggregators.serialize_state(),
+        }
+
+    def restore_state(self, data: dict[str, Any]) -> None:
+        """Restores the state saved by serialize_state. The pot should be reset before.
+
+        May raise:
+        - DeserializationError if the data are not in the expected format
+        """
+        try:
+            cost_basis_data, accountants_data = data['cost_basis'], data['evm_accountants']
+        except KeyError as e:
+            raise DeserializationError(f'Missing key {e!s} in accounting checkpoint') from e
+
+        self.cost_basis.restore_state(cost_basis_data)
+        self.transactions.evm_accounting_aggregators.restore_state(accountants_data)
+
     def add_acquisition(
             self,  # pylint: disable=unused-argument
             event_type: AccountingEventType,
@@ -3212,6 +3212,11 @@ class RestAPI():
             status_code=HTTPStatus.OK,
         )
 
+    def _purge_pnl_checkpoints(self) -> None:
+        """Accounting checkpoints may have been computed with the old prices"""
+        if self.rotkehlchen.user_is_logged_in:
+            DBAccountingReports(self.rotkehlchen.data.db).purge_checkpoints()
+
     def add_manual_price(
             self,
             from_asset: Asset,
@@ -3232,6 +3237,7 @@ class RestAPI():
         )
         added = GlobalDBHandler().add_single_historical_price(historical_price)
         if added:
+            self._purge_pnl_checkpoints()
             return api_response(OK_RESULT, status_code=HTTPStatus.OK)
         return api_response(
             result={'result': False, 'message': 'Failed to store manual price'},
@@ -3254,6 +3260,7 @@ class RestAPI():
         )
         edited = GlobalDBHandler().edit_manual_price(historical_price)
         if edited:
+            self._purge_pnl_checkpoints()
             return api_response(OK_RESULT, status_code=HTTPStatus.OK)
         return api_response(
             result={'result': False, 'message': 'Failed to edit manual price'},
@@ -3278,6 +3285,7 @@ class RestAPI():
     ) -> Response:
         deleted = GlobalDBHandler().delete_manual_price(from_asset, to_asset, timestamp)
         if deleted:
+            self._purge_pnl_checkpoints()
             return api_response(OK_RESULT, status_code=HTTPStatus.OK)
         return api_response(
             result={'result': False, 'message': 'Failed to delete manual price'},
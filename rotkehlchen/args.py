@@ -4,8 +4,10 @@ from collections.abc import Sequence
 from typing import Any, Optional, Union
 
 from rotkehlchen.constants.misc import (
+    DEFAULT_EXCHANGES_QUERY_CONCURRENCY,
     DEFAULT_MAX_LOG_BACKUP_FILES,
     DEFAULT_MAX_LOG_SIZE_IN_MB,
+    DEFAULT_SQL_READ_CONNECTIONS,
     DEFAULT_SQL_VM_INSTRUCTIONS_CB,
 )
 from rotkehlchen.utils.misc import get_system_spec
@@ -47,6 +49,15 @@ def _positive_int_or_zero(value: str) -> int:
     return int_val
 
 
+def _positive_int(value: str) -> int:
+    """Force positive int https://docs.python.org/3/library/argparse.html#type"""
+    int_val = int(value)  # ValueError is caught and shown to user
+    if int_val <= 0:
+        raise ValueError('Int value should be positive')
+
+    return int_val
+
+
 def app_args(prog: str, description: str) -> argparse.ArgumentParser:
     """Add the rotki arguments to the argument parser and return it"""
     p = argparse.ArgumentParser(
@@ -131,6 +142,21 @@ def app_args(prog: str, description: str) -> argparse.ArgumentParser:
         default=DEFAULT_SQL_VM_INSTRUCTIONS_CB,
         type=_positive_int_or_zero,
     )
+    p.add_argument(
+        '--sqlite-read-connections',
+        help=(
+            'Number of read-only connections per database. If not zero the databases run '
+            'in WAL mode and reads no longer wait for writes. Zero to disable.'
+        ),
+        default=DEFAULT_SQL_READ_CONNECTIONS,
+        type=_positive_int_or_zero,
+    )
+    p.add_argument(
+        '--exchanges-query-concurrency',
+        help='Maximum number of exchanges whose history is queried at the same time',
+        default=DEFAULT_EXCHANGES_QUERY_CONCURRENCY,
+        type=_positive_int,
+    )
     p.add_argument(
         'version',
         help='Shows the rotki version',
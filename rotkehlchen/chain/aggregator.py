@@ -466,11 +466,10 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
         return self.get_balances_update(blockchain)
 
     @protect_with_lock()
-    @cache_response_timewise()
+    @cache_response_timewise(forward_ignore_cache=True)
     def query_btc_balances(
-            self,  # pylint: disable=unused-argument
-            # Kwargs here is so linters don't complain when the "magic" ignore_cache kwarg is given
-            **kwargs: Any,
+            self,
+            ignore_cache: bool = False,
     ) -> None:
         """Queries blockchain.info/blockstream for the balance of all BTC accounts
 
@@ -482,7 +481,10 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
 
         self.balances.btc = {}
         btc_usd_price = Inquirer().find_usd_price(A_BTC)
-        balances = get_bitcoin_addresses_balances(self.accounts.btc)
+        balances = get_bitcoin_addresses_balances(
+            accounts=self.accounts.btc,
+            ignore_cache=ignore_cache,
+        )
         for account, balance in balances.items():
             self.balances.btc[account] = Balance(
                 amount=balance,
@@ -490,11 +492,10 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
             )
 
     @protect_with_lock()
-    @cache_response_timewise()
+    @cache_response_timewise(forward_ignore_cache=True)
     def query_bch_balances(
-            self,  # pylint: disable=unused-argument
-            # Kwargs here is so linters don't complain when the "magic" ignore_cache kwarg is given
-            **kwargs: Any,
+            self,
+            ignore_cache: bool = False,
     ) -> None:
         """Queries api.haskoin.com for the balance of all BCH accounts
 
@@ -506,7 +507,10 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
 
         self.balances.bch = {}
         bch_usd_price = Inquirer().find_usd_price(A_BCH)
-        balances = get_bitcoin_cash_addresses_balances(self.accounts.bch)
+        balances = get_bitcoin_cash_addresses_balances(
+            accounts=self.accounts.bch,
+            ignore_cache=ignore_cache,
+        )
         for account, balance in balances.items():
             self.balances.bch[account] = Balance(
                 amount=balance,
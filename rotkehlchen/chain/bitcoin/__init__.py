@@ -1,15 +1,65 @@
 from collections.abc import Sequence
 
 import requests
+from gevent.pool import Pool
 
 from rotkehlchen.errors.misc import RemoteError, UnableToDecryptRemoteData
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.fval import FVal
 from rotkehlchen.serialization.deserialize import ensure_type
-from rotkehlchen.types import BTCAddress
-from rotkehlchen.utils.misc import satoshis_to_btc
+from rotkehlchen.types import BTCAddress, Timestamp
+from rotkehlchen.utils.misc import satoshis_to_btc, ts_now
 from rotkehlchen.utils.network import request_get_dict
 
+BLOCKSTREAM_BASE_URL = 'https://blockstream.info/api/address/'
+MEMPOOL_SPACE_BASE_URL = 'https://mempool.space/api/address/'
+# Both implement the esplora api so the per address queries are split between them
+ESPLORA_BASE_URLS = (BLOCKSTREAM_BASE_URL, MEMPOOL_SPACE_BASE_URL)
+# Per api limit of the concurrent queries. Above it the apis start returning 429
+ESPLORA_CONCURRENT_REQUESTS = 5
+# Errors of an esplora api after which its accounts are queried from the other one
+ESPLORA_FALLBACK_ERRORS = (
+    requests.exceptions.RequestException,
+    UnableToDecryptRemoteData,
+    RemoteError,
+    KeyError,
+    DeserializationError,
+)
+BLOCKCHAIN_INFO_ACCOUNTS_CHUNK = 80
+# For how long the activity of the queried addresses is reused. Short since it's only
+# there so that the xpub derivation and the balances query that follows it don't
+# query the same addresses again
+ADDRESS_ACTIVITY_CACHE_TTL = 120
+
+
+class AddressActivityCache:
+    """Caches whether addresses have had transactions and their balance with a TTL"""
+
+    def __init__(self, ttl: int) -> None:
+        self.ttl = ttl
+        self.entries: dict[BTCAddress, tuple[bool, FVal, Timestamp]] = {}
+
+    def get(self, accounts: Sequence[BTCAddress]) -> dict[BTCAddress, tuple[bool, FVal]]:
+        """Returns the activity of the given accounts that was checked within the TTL"""
+        now = ts_now()
+        activity = {}
+        for account in accounts:
+            entry = self.entries.get(account)
+            if entry is not None and now - entry[2] < self.ttl:
+                activity[account] = (entry[0], entry[1])
+        return activity
+
+    def update(self, activity: dict[BTCAddress, tuple[bool, FVal]]) -> None:
+        now = ts_now()
+        for account, (have_txs, balance) in activity.items():
+            self.entries[account] = (have_txs, balance, now)
+
+    def clear(self) -> None:
+        self.entries = {}
+
+
+btc_activity_cache = AddressActivityCache(ttl=ADDRESS_ACTIVITY_CACHE_TTL)
+
 
 def _have_bc1_accounts(accounts: Sequence[BTCAddress]) -> bool:
     return any(account.lower()[0:3] == 'bc1' for account in accounts)
@@ -18,17 +68,21 @@ def _have_bc1_accounts(accounts: Sequence[BTCAddress]) -> bool:
 def _query_blockstream_or_mempool(
         accounts: Sequence[BTCAddress],
         base_url: str,
-) -> dict[BTCAddress, FVal]:
-    """Queries balances from blockstream.info
+) -> dict[BTCAddress, tuple[bool, FVal]]:
+    """Queries concurrently from blockstream.info or mempool.space whether the accounts
+    have had transactions and their balance
+
     May raise:
     - RemoteError if got problems with querying the API
     - KeyError if got unexpected json structure
     - DeserializationError if got unexpected json values
     """
-    balances = {}
-    for account in accounts:
-        url = base_url + account
-        response_data = request_get_dict(url=url, handle_429=True, backoff_in_seconds=4)
+    def query_account(account: BTCAddress) -> tuple[BTCAddress, tuple[bool, FVal]]:
+        response_data = request_get_dict(
+            url=base_url + account,
+            handle_429=True,
+            backoff_in_seconds=4,
+        )
         stats = response_data['chain_stats']
         funded_txo_sum = satoshis_to_btc(
             ensure_type(
@@ -44,23 +98,23 @@ def _query_blockstream_or_mempool(
                 location='blockstream spent_txo_sum',
             ),
         )
-        balance = funded_txo_sum - spent_txo_sum
-        balances[account] = balance
-    return balances
+        return account, (stats['tx_count'] != 0, funded_txo_sum - spent_txo_sum)
+
+    pool = Pool(ESPLORA_CONCURRENT_REQUESTS)
+    try:
+        return dict(pool.imap_unordered(query_account, accounts))
+    finally:
+        pool.kill()  # stop the remaining queries if one of them failed
 
 
 def _query_blockstream_info(accounts: Sequence[BTCAddress]) -> dict[BTCAddress, FVal]:
-    return _query_blockstream_or_mempool(
-        accounts=accounts,
-        base_url='https://blockstream.info/api/address/',
-    )
+    activity = _query_blockstream_or_mempool(accounts=accounts, base_url=BLOCKSTREAM_BASE_URL)
+    return {account: balance for account, (_, balance) in activity.items()}
 
 
 def _query_mempool_space(accounts: Sequence[BTCAddress]) -> dict[BTCAddress, FVal]:
-    return _query_blockstream_or_mempool(
-        accounts=accounts,
-        base_url='https://mempool.space/api/address/',
-    )
+    activity = _query_blockstream_or_mempool(accounts=accounts, base_url=MEMPOOL_SPACE_BASE_URL)  # noqa: E501
+    return {account: balance for account, (_, balance) in activity.items()}
 
 
 def _query_blockchain_info(accounts: Sequence[BTCAddress]) -> dict[BTCAddress, FVal]:
@@ -71,7 +125,10 @@ def _query_blockchain_info(accounts: Sequence[BTCAddress]) -> dict[BTCAddress, F
     - DeserializationError if got unexpected json values
     """
     balances: dict[BTCAddress, FVal] = {}
-    accounts_chunks = [accounts[x:x + 80] for x in range(0, len(accounts), 80)]
+    accounts_chunks = [
+        accounts[x:x + BLOCKCHAIN_INFO_ACCOUNTS_CHUNK]
+        for x in range(0, len(accounts), BLOCKCHAIN_INFO_ACCOUNTS_CHUNK)
+    ]
     for accounts_chunk in accounts_chunks:
         params = '|'.join(accounts_chunk)
         btc_resp = request_get_dict(
@@ -94,12 +151,22 @@ def _query_blockchain_info(accounts: Sequence[BTCAddress]) -> dict[BTCAddress, F
 
 def get_bitcoin_addresses_balances(
         accounts: Sequence[BTCAddress],
+        ignore_cache: bool = False,
 ) -> dict[BTCAddress, FVal]:
-    """Queries bitcoin balance APIs for the balances of accounts
+    """Queries bitcoin balance APIs for the balances of accounts. Unless ignore_cache is
+    True the balances of the accounts whose activity was just checked are taken from
+    the activity cache.
 
     May raise:
     - RemoteError couldn't query any of the bitcoin balance APIs
     """
+    cached_balances = {} if ignore_cache is True else {
+        account: balance for account, (_, balance) in btc_activity_cache.get(accounts).items()
+    }
+    accounts = [x for x in accounts if x not in cached_balances]
+    if len(accounts) == 0:
+        return cached_balances
+
     if _have_bc1_accounts(accounts) is True:
         api_callbacks = {
             'blockstream.info': _query_blockstream_info,
@@ -127,7 +194,7 @@ def get_bitcoin_addresses_balances(
         except KeyError as e:
             errors[api_name] = f"Got unexpected response from {api_name}. Couldn't find key {e!s}"  # noqa: E501
         else:
-            return balances
+            return cached_balances | balances
 
     serialized_errors = ', '.join(f'{source} error is: "{error}"' for (source, error) in errors.items())  # noqa: E501
     raise RemoteError(f'Bitcoin external API request for balances failed. {serialized_errors}')  # noqa: E501
@@ -136,33 +203,48 @@ def get_bitcoin_addresses_balances(
 def _check_blockstream_for_transactions(
         accounts: list[BTCAddress],
 ) -> dict[BTCAddress, tuple[bool, FVal]]:
-    """May raise:
+    """Splits the accounts between blockstream.info and mempool.space and queries
+    both concurrently. The accounts of an api that fails are queried from the other one.
+
+    May raise:
     - RemoteError if couldn't query
     - KeyError if response structure differs from the expected one
     - DeserializationError if response values differ from the expected
     """
-    have_transactions = {}
-    for account in accounts:
-        url = f'https://blockstream.info/api/address/{account}'
-        response_data = request_get_dict(url=url, handle_429=True, backoff_in_seconds=4)
-        stats = response_data['chain_stats']
-        funded_txo_sum = satoshis_to_btc(
-            ensure_type(
-                symbol=stats['funded_txo_sum'],
-                expected_type=int,
-                location='blockstream funded_txo_sum',
-            ),
-        )
-        spent_txo_sum = satoshis_to_btc(
-            ensure_type(
-                symbol=stats['spent_txo_sum'],
-                expected_type=int,
-                location='blockstream spent_txo_sum',
-            ),
-        )
-        balance = funded_txo_sum - spent_txo_sum
-        have_txs = stats['tx_count'] != 0
-        have_transactions[account] = (have_txs, balance)
+    accounts_per_api = {
+        base_url: accounts[idx::len(ESPLORA_BASE_URLS)]
+        for idx, base_url in enumerate(ESPLORA_BASE_URLS)
+    }
+    pool = Pool(len(ESPLORA_BASE_URLS))
+    greenlets = {
+        base_url: pool.spawn(_query_blockstream_or_mempool, api_accounts, base_url)
+        for base_url, api_accounts in accounts_per_api.items() if len(api_accounts) != 0
+    }
+    pool.join()
+    have_transactions: dict[BTCAddress, tuple[bool, FVal]] = {}
+    for base_url, greenlet in greenlets.items():
+        if greenlet.successful():
+            have_transactions.update(greenlet.value)
+            continue
+
+        error: BaseException = greenlet.exception
+        if not isinstance(error, ESPLORA_FALLBACK_ERRORS):
+            raise error
+
+        for other_base_url in ESPLORA_BASE_URLS:
+            if other_base_url == base_url:
+                continue
+            try:
+                have_transactions.update(_query_blockstream_or_mempool(
+                    accounts=accounts_per_api[base_url],
+                    base_url=other_base_url,
+                ))
+            except ESPLORA_FALLBACK_ERRORS as e:
+                error = e
+            else:
+                break
+        else:
+            raise error
 
     return have_transactions
 
@@ -172,17 +254,18 @@ def _check_blockchaininfo_for_transactions(
 ) -> dict[BTCAddress, tuple[bool, FVal]]:
     """May raise RemoteError or KeyError"""
     have_transactions = {}
-    params = '|'.join(accounts)
-    btc_resp = request_get_dict(
-        url=f'https://blockchain.info/multiaddr?active={params}',
-        handle_429=True,
-        # If we get a 429 then their docs suggest 10 seconds
-        # https://blockchain.infoq/
-        backoff_in_seconds=15,
-    )
-    for entry in btc_resp['addresses']:
-        balance = satoshis_to_btc(entry['final_balance'])
-        have_transactions[entry['address']] = (entry['n_tx'] != 0, balance)
+    for idx in range(0, len(accounts), BLOCKCHAIN_INFO_ACCOUNTS_CHUNK):
+        params = '|'.join(accounts[idx:idx + BLOCKCHAIN_INFO_ACCOUNTS_CHUNK])
+        btc_resp = request_get_dict(
+            url=f'https://blockchain.info/multiaddr?active={params}',
+            handle_429=True,
+            # If we get a 429 then their docs suggest 10 seconds
+            # https://blockchain.infoq/
+            backoff_in_seconds=15,
+        )
+        for entry in btc_resp['addresses']:
+            balance = satoshis_to_btc(entry['final_balance'])
+            have_transactions[entry['address']] = (entry['n_tx'] != 0, balance)
 
     return have_transactions
 
@@ -190,11 +273,17 @@ def _check_blockchaininfo_for_transactions(
 def have_bitcoin_transactions(accounts: list[BTCAddress]) -> dict[BTCAddress, tuple[bool, FVal]]:
     """
     Takes a list of addresses and returns a mapping of which addresses have had transactions
-    and also their current balance
+    and also their current balance. Addresses checked within the TTL of the activity
+    cache are not queried again.
 
     May raise:
     - RemoteError if any of the queried websites fail to be queried
     """
+    cached_transactions = btc_activity_cache.get(accounts)
+    accounts = [x for x in accounts if x not in cached_transactions]
+    if len(accounts) == 0:
+        return cached_transactions
+
     try:
         if _have_bc1_accounts(accounts):
             source = 'blockstream'
@@ -216,4 +305,5 @@ def have_bitcoin_transactions(accounts: list[BTCAddress]) -> dict[BTCAddress, tu
     except DeserializationError as e:
         raise RemoteError(f"Couldn't read data from the response due to {e!s}") from e
 
-    return have_transactions
+    btc_activity_cache.update(have_transactions)
+    return cached_transactions | have_transactions
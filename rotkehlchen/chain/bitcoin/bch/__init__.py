@@ -1,7 +1,10 @@
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
+from typing import TypeVar
 
 import requests
+from gevent.pool import Pool
 
+from rotkehlchen.chain.bitcoin import ADDRESS_ACTIVITY_CACHE_TTL, AddressActivityCache
 from rotkehlchen.chain.bitcoin.bch.utils import cash_to_legacy_address
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.errors.serialization import DeserializationError
@@ -11,45 +14,83 @@ from rotkehlchen.types import BTCAddress
 from rotkehlchen.utils.misc import satoshis_to_btc
 from rotkehlchen.utils.network import request_get, request_get_dict
 
+T = TypeVar('T')
+
 HASKOIN_BASE_URL = 'https://api.haskoin.com'
+HASKOIN_ACCOUNTS_CHUNK = 80
+HASKOIN_CONCURRENT_REQUESTS = 3
+
+bch_activity_cache = AddressActivityCache(ttl=ADDRESS_ACTIVITY_CACHE_TTL)
+
+
+def _query_chunks_concurrently(
+        accounts: Sequence[BTCAddress],
+        query_chunk: Callable[[Sequence[BTCAddress]], dict[BTCAddress, T]],
+) -> dict[BTCAddress, T]:
+    """Queries haskoin for the chunks of the accounts concurrently and merges the results"""
+    accounts_chunks = [
+        accounts[x:x + HASKOIN_ACCOUNTS_CHUNK]
+        for x in range(0, len(accounts), HASKOIN_ACCOUNTS_CHUNK)
+    ]
+    pool = Pool(HASKOIN_CONCURRENT_REQUESTS)
+    result: dict[BTCAddress, T] = {}
+    try:
+        for chunk_result in pool.imap_unordered(query_chunk, accounts_chunks):
+            result.update(chunk_result)
+    finally:
+        pool.kill()  # stop the remaining queries if one of them failed
+    return result
+
+
+def _query_haskoin_balances(accounts_chunk: Sequence[BTCAddress]) -> dict[BTCAddress, FVal]:
+    """May raise RemoteError, KeyError, DeserializationError or RequestException"""
+    balances: dict[BTCAddress, FVal] = {}
+    params = ','.join(accounts_chunk)
+    bch_resp = request_get(url=f'{HASKOIN_BASE_URL}/bch/address/balances?addresses={params}')  # noqa: 501
+    for entry in bch_resp:
+        # Try and get the initial address passed to the request.
+        # This is because the API only returns CashAddr format as response.
+        if entry['address'] in accounts_chunk:
+            balances[entry['address']] = satoshis_to_btc(deserialize_fval(
+                value=entry['confirmed'],
+                name='balance',
+                location='bitcoin cash balance querying',
+            ))
+        # if the address was initially provided in CashAddr format without the prefix
+        elif entry['address'].split(':')[1] in accounts_chunk:
+            balances[entry['address'].split(':')[1]] = satoshis_to_btc(deserialize_fval(
+                value=entry['confirmed'],
+                name='balance',
+                location='bitcoin cash balance querying',
+            ))
+        else:
+            address = cash_to_legacy_address(entry['address'])
+            if address is not None:
+                balances[address] = satoshis_to_btc(deserialize_fval(
+                    value=entry['confirmed'],
+                    name='balance',
+                    location='bitcoin cash balance querying',
+                ))
+    return balances
 
 
-def get_bitcoin_cash_addresses_balances(accounts: Sequence[BTCAddress]) -> dict[BTCAddress, FVal]:
-    """Queries api.haskoin.com for the balances of BCH accounts.
+def get_bitcoin_cash_addresses_balances(
+        accounts: Sequence[BTCAddress],
+        ignore_cache: bool = False,
+) -> dict[BTCAddress, FVal]:
+    """Queries api.haskoin.com for the balances of BCH accounts. Unless ignore_cache is
+    True the balances of the accounts whose activity was just checked are taken from
+    the activity cache.
 
     May raise:
     - RemoteError if there is a problem querying api.haskoin.com
     """
-    balances: dict[BTCAddress, FVal] = {}
+    cached_balances = {} if ignore_cache is True else {
+        account: balance for account, (_, balance) in bch_activity_cache.get(accounts).items()
+    }
+    accounts = [x for x in accounts if x not in cached_balances]
     try:
-        accounts_chunks = [accounts[x:x + 80] for x in range(0, len(accounts), 80)]
-        for accounts_chunk in accounts_chunks:
-            params = ','.join(accounts_chunk)
-            bch_resp = request_get(url=f'{HASKOIN_BASE_URL}/bch/address/balances?addresses={params}')  # noqa: 501
-            for entry in bch_resp:
-                # Try and get the initial address passed to the request.
-                # This is because the API only returns CashAddr format as response.
-                if entry['address'] in accounts_chunk:
-                    balances[entry['address']] = satoshis_to_btc(deserialize_fval(
-                        value=entry['confirmed'],
-                        name='balance',
-                        location='bitcoin cash balance querying',
-                    ))
-                # if the address was initially provided in CashAddr format without the prefix
-                elif entry['address'].split(':')[1] in accounts_chunk:
-                    balances[entry['address'].split(':')[1]] = satoshis_to_btc(deserialize_fval(
-                        value=entry['confirmed'],
-                        name='balance',
-                        location='bitcoin cash balance querying',
-                    ))
-                else:
-                    address = cash_to_legacy_address(entry['address'])
-                    if address is not None:
-                        balances[address] = satoshis_to_btc(deserialize_fval(
-                            value=entry['confirmed'],
-                            name='balance',
-                            location='bitcoin cash balance querying',
-                        ))
+        balances = _query_chunks_concurrently(accounts, _query_haskoin_balances)
     except requests.exceptions.RequestException as e:
         raise RemoteError(f'Bitcoin Cash external API request for balances failed due to {e!s}') from e  # noqa: E501
     except KeyError as e:
@@ -63,7 +104,7 @@ def get_bitcoin_cash_addresses_balances(accounts: Sequence[BTCAddress]) -> dict[
             'Unable to parse balance.',
         ) from e
 
-    return balances
+    return cached_balances | balances
 
 
 def _check_haskoin_for_transactions(
@@ -97,13 +138,16 @@ def _check_haskoin_for_transactions(
 def have_bch_transactions(accounts: Sequence[BTCAddress]) -> dict[BTCAddress, tuple[bool, FVal]]:
     """
     Takes a list of BCH addresses and returns a mapping of which addresses have had transactions
-    and also their current balance
+    and also their current balance. Addresses checked within the TTL of the activity
+    cache are not queried again.
 
     May raise:
     - RemoteError if any of the queried websites fail to be queried
     """
+    cached_transactions = bch_activity_cache.get(accounts)
+    accounts = [x for x in accounts if x not in cached_transactions]
     try:
-        have_transactions = _check_haskoin_for_transactions(accounts)
+        have_transactions = _query_chunks_concurrently(accounts, _check_haskoin_for_transactions)  # noqa: E501
     except requests.exceptions.RequestException as e:
         raise RemoteError(f'bitcoin cash external API request for transactions failed due to {e!s}') from e  # noqa: E501
     except KeyError as e:
@@ -116,4 +160,6 @@ def have_bch_transactions(accounts: Sequence[BTCAddress]) -> dict[BTCAddress, tu
             f'Malformed response when querying BCH blockchain via {HASKOIN_BASE_URL}. '
             'Unable to parse balance.',
         ) from e
-    return have_transactions
+
+    bch_activity_cache.update(have_transactions)
+    return cached_transactions | have_transactions
@@ -5,6 +5,7 @@ import hashlib
 import hmac
 from dataclasses import dataclass
 from enum import auto
+from functools import cached_property
 from typing import NamedTuple, Optional, Union, cast
 
 from base58check import b58decode, b58encode
@@ -139,13 +140,16 @@ class HDKey():
     index: Optional[int]
     parent: Optional['HDKey']  # forward type reference
     chain_code: Optional[bytes]
-    fingerprint: bytes
-    xpub: Optional[str]
+    xpub: Optional[str]  # only set for keys created from an xpub. Not for derived children
     xpub_type: Optional[XpubType]
     pubkey: PublicKey
     privkey: Optional[PrivateKey]
     hint: str
 
+    @cached_property
+    def fingerprint(self) -> bytes:
+        return hash160(self.pubkey.format(COMPRESSED_PUBKEY))[:4]
+
     @staticmethod
     def from_xpub(
             xpub: str,
@@ -201,7 +205,6 @@ class HDKey():
             index=int.from_bytes(xpub_bytes[9:13], byteorder='big'),
             parent=None,
             chain_code=xpub_bytes[13:45],
-            fingerprint=hash160(pubkey.format(COMPRESSED_PUBKEY))[:4],
             xpub=xpub,
             xpub_type=xpub_type,
             privkey=None,
@@ -226,68 +229,6 @@ class HDKey():
             return int(idx[:-1]) + BIP32_HARDEN
         return int(idx)
 
-    def _child_from_xpub(self, index: int, child_xpub: str) -> 'HDKey':
-        """
-        Returns a new HDKey object based on the current object and the new
-            child xpub. Don't call this directly, it's for child derivation.
-        Args:
-            index      (int): the index of the child
-            child_xpub (str): the child's xpub
-        Returns
-            HDKey: the new child object
-        """
-        path: Optional[str]
-        if self.path is not None:
-            path = f'{self.path}/{index!s}'
-        else:
-            path = None
-        xpub_bytes = b58decode(child_xpub)
-        pubkey = xpub_bytes[45:78]
-
-        result = _parse_prefix(xpub_bytes[0:4])
-        if not result.is_public:
-            raise XPUBError('Given xpub is an extended private key')
-
-        return HDKey(
-            path=path,
-            network=result.network,
-            depth=xpub_bytes[4],
-            parent_fingerprint=xpub_bytes[5:9],
-            index=int.from_bytes(xpub_bytes[9:13], byteorder='big'),
-            parent=self,
-            chain_code=xpub_bytes[13:45],
-            fingerprint=hash160(pubkey)[:4],
-            xpub=child_xpub,
-            xpub_type=self.xpub_type,
-            privkey=None,
-            pubkey=PublicKey(pubkey),
-            hint=result.hint,
-        )
-
-    def _make_child_xpub(
-            self,
-            child_pubkey: PublicKey,
-            index: int,
-            chain_code: bytes) -> str:
-        """
-        Makes a child xpub based on the current key and the child key info.
-        Args:
-            child_pubkey (bytes): the child pubkey
-            index          (int): the child index
-            chain_code   (bytes): the child chain code
-        Returns
-            (str): the child xpub
-        """
-        xpub = bytearray()
-
-        xpub.extend(b58decode(cast(str, self.xpub))[0:4])  # prefix
-        xpub.extend([cast(int, self.depth) + 1])               # depth
-        xpub.extend(self.fingerprint)                          # fingerprint
-        xpub.extend(index.to_bytes(4, byteorder='big'))        # index
-        xpub.extend(chain_code)                                # chain_code
-        xpub.extend(child_pubkey.format(COMPRESSED_PUBKEY))    # pubkey (comp)
-        return b58encode(bytes(xpub)).decode('ascii')
-
     @staticmethod
     def _parse_derivation(derivation_path: str) -> list[int]:
         """
@@ -351,58 +292,71 @@ class HDKey():
             idx (int or str): the index of the child
         Returns:
             (HDKey): the child
+        May raise:
+            XPUBError: if the index is hardened
         """
-        # TODO: Break up this function
-
         # normalize the index, error if we can't derive the child
         index: int = self._normalize_index(idx)
-        if index >= BIP32_HARDEN and not self.privkey:
-            raise XPUBError('Need private key to derive XPUB hardened children')
-
-        # error if we can't derive a child
-        if not self.chain_code:
-            raise XPUBError('Cannot derive XPUB child without chain_code')
-
-        own_chain_code = self.chain_code
-        # start key derivation process
-        data = bytearray()
-        index_as_bytes = index.to_bytes(4, byteorder='big')
         if index >= BIP32_HARDEN:
-            if not self.privkey:
-                raise XPUBError('Cannot derive XPUB for hardened index without privkey')
-            # Data = 0x00 || ser256(kpar) || ser32(i)
-            # (Note: The 0x00 pads the private key to make it 33 bytes long.)
-            data.extend(b'\x00')
-            data.extend(self.privkey.secret)
-            data.extend(index_as_bytes)
-        else:
-            # Data = serP(point(kpar)) || ser32(i)).
-            data.extend(self.pubkey.format(COMPRESSED_PUBKEY))
-            data.extend(index_as_bytes)
-
-        mac = hmac.new(own_chain_code, digestmod=hashlib.sha512)
-        mac.update(data)
-        digest = mac.digest()
-        tweak, chain_code = digest[:32], digest[32:]
-        # end key derivation process
-
-        try:
-            if self.privkey:
-                raise NotImplementedError('Privkeys xpub derivation not implemented in rotki')
+            raise XPUBError('Hardened XPUB children derivation is not supported')
 
-            # otherwise, just derive a pubkey
-            child_pubkey = self.pubkey.add(tweak)
-        except ValueError:
+        children = self.derive_children(start=index, end=index + 1)
+        if len(children) == 0:
             # NB: it is possible to derive an "impossible" key.
             #     e.g. the privkey is too high, or is 0
             #     if that happens, the spec says to derive at the next index
             return self.derive_child(index + 1)
+        return children[0]
 
-        # no privkey here so make a new public child
-        child_xpub = self._make_child_xpub(
-            child_pubkey, index=index, chain_code=chain_code,
-        )
-        return self._child_from_xpub(index=index, child_xpub=child_xpub)
+    def derive_children(self, start: int, end: int) -> list['HDKey']:
+        """
+        Derives the non-hardened bip32 children with indices in [start, end).
+        The children are built directly from the raw pubkey and chain code bytes,
+        so the parent pubkey serialization and the hmac key setup happen once per batch.
+        Indices that give an invalid key are skipped as the spec says.
+        Args:
+            start (int): the index of the first child
+            end   (int): the index after the last child
+        Returns:
+            (list(HDKey)): the children in index order
+        """
+        if end > BIP32_HARDEN:
+            raise XPUBError('Hardened XPUB children derivation is not supported')
+
+        # error if we can't derive a child
+        if not self.chain_code:
+            raise XPUBError('Cannot derive XPUB child without chain_code')
+
+        # Data = serP(point(kpar)) || ser32(i)).
+        parent_pubkey = self.pubkey.format(COMPRESSED_PUBKEY)
+        base_mac = hmac.new(self.chain_code, msg=parent_pubkey, digestmod=hashlib.sha512)
+        depth = cast(int, self.depth) + 1
+        children = []
+        for index in range(start, end):
+            mac = base_mac.copy()
+            mac.update(index.to_bytes(4, byteorder='big'))
+            digest = mac.digest()
+            try:
+                child_pubkey = self.pubkey.add(digest[:32])
+            except ValueError:
+                continue  # an "impossible" key. Skip this index.
+
+            children.append(HDKey(
+                path=f'{self.path}/{index}' if self.path is not None else None,
+                network=self.network,
+                depth=depth,
+                parent_fingerprint=self.fingerprint,
+                index=index,
+                parent=self,
+                chain_code=digest[32:],
+                xpub=None,
+                xpub_type=self.xpub_type,
+                privkey=None,
+                pubkey=child_pubkey,
+                hint=self.hint,
+            ))
+
+        return children
 
     def address(self) -> BTCAddress:
         if self.hint == 'xpub' and self.xpub_type == XpubType.P2TR:
@@ -1,5 +1,6 @@
 import logging
-from typing import TYPE_CHECKING, Any, Literal, NamedTuple, Optional
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple, Optional, cast
 
 from gevent.lock import Semaphore
 
@@ -78,23 +79,37 @@ def _derive_addresses_loop(
         root: HDKey,
         gap_limit: int,
         blockchain: Literal[SupportedBlockchain.BITCOIN, SupportedBlockchain.BITCOIN_CASH],
+        derived_addresses: dict[tuple[int, int], BTCAddress],
 ) -> list[XpubDerivedAddressData]:
-    """May raise:
+    """Only derives the addresses missing from `derived_addresses` and adds them to it.
+
+    May raise:
     - RemoteError: if blockstream/blockchain.info can't be reached
     """
+    def derive_batch(first_index: int) -> list[tuple[int, BTCAddress]]:
+        batch_range = range(first_index, first_index + gap_limit)
+        missing = [idx for idx in batch_range if (account_index, idx) not in derived_addresses]
+        if len(missing) != 0:
+            for child in root.derive_children(start=missing[0], end=missing[-1] + 1):
+                if (key := (account_index, cast(int, child.index))) not in derived_addresses:
+                    derived_addresses[key] = child.address()
+
+        return [
+            (idx, address) for idx in batch_range
+            if (address := derived_addresses.get((account_index, idx))) is not None
+        ]
+
+    if blockchain == SupportedBlockchain.BITCOIN:
+        have_transactions = have_bitcoin_transactions
+    else:
+        have_transactions = have_bch_transactions
     step_index = start_index
     addresses: list[XpubDerivedAddressData] = []
     should_continue = True
     while should_continue:
-        batch_addresses: list[tuple[int, BTCAddress]] = []
-        for idx in range(step_index, step_index + gap_limit):
-            child = root.derive_child(idx)
-            batch_addresses.append((idx, child.address()))
-
-        if blockchain == SupportedBlockchain.BITCOIN:
-            have_tx_mapping = have_bitcoin_transactions([x[1] for x in batch_addresses])
-        else:
-            have_tx_mapping = have_bch_transactions([x[1] for x in batch_addresses])
+        # the next batch is only derived and checked if this one has transactions
+        batch_addresses = derive_batch(step_index)
+        have_tx_mapping = have_transactions([x[1] for x in batch_addresses])
         should_continue = False
         for idx, address in batch_addresses:
             have_tx, balance = have_tx_mapping[address]
@@ -131,11 +146,15 @@ def _derive_addresses_from_xpub_data(
         start_receiving_index: int,
         start_change_index: int,
         gap_limit: int,
+        derived_addresses: dict[tuple[int, int], BTCAddress],
 ) -> list[XpubDerivedAddressData]:
     """Derive all addresses from the xpub that have had transactions. Also includes
     any addresses until the biggest index derived addresses that have had no transactions.
     This is to make it easier to later derive and check more addresses
 
+    `derived_addresses` is the cache of the already derived addresses per
+    (account_index, derived_index). Any newly derived address is added to it.
+
     May raise:
     - RemoteError: if blockstream/blockchain.info/haskoin and others can't be reached
     """
@@ -153,6 +172,7 @@ def _derive_addresses_from_xpub_data(
             root=receiving_xpub,
             gap_limit=gap_limit,
             blockchain=xpub_data.blockchain,
+            derived_addresses=derived_addresses,
         ),
     )
     change_xpub = account_xpub.derive_child(1)
@@ -163,6 +183,7 @@ def _derive_addresses_from_xpub_data(
             root=change_xpub,
             gap_limit=gap_limit,
             blockchain=xpub_data.blockchain,
+            derived_addresses=derived_addresses,
         ),
     )
     return addresses
@@ -190,11 +211,14 @@ class XpubManager():
         """
         with self.db.conn.read_ctx() as cursor:
             last_receiving_idx, last_change_idx = self.db.get_last_consecutive_xpub_derived_indices(cursor, xpub_data)  # noqa: E501
+            derived_addresses = self.db.get_xpub_derived_addresses(cursor, xpub_data)
+            cached_addresses_num = len(derived_addresses)
             derived_addresses_data = _derive_addresses_from_xpub_data(
                 xpub_data=xpub_data,
                 start_receiving_index=last_receiving_idx,
                 start_change_index=last_change_idx,
                 gap_limit=self.chains_aggregator.btc_derivation_gap_limit,
+                derived_addresses=derived_addresses,
             )
             known_addresses = getattr(self.db.get_blockchain_accounts(cursor), xpub_data.blockchain.value.lower())  # noqa: E501
 
@@ -248,6 +272,15 @@ class XpubManager():
                 xpub_data=xpub_data,
                 derived_addresses_data=derived_addresses_data,
             )
+            # dicts keep the insertion order so the newly derived addresses come last
+            self.db.add_xpub_derived_addresses(
+                write_cursor=write_cursor,
+                xpub_data=xpub_data,
+                derived_addresses=[
+                    (account_index, derived_index, address) for (account_index, derived_index), address  # noqa: E501
+                    in islice(derived_addresses.items(), cached_addresses_num, None)
+                ],
+            )
 
         # also add queried balances
         if xpub_data.blockchain == SupportedBlockchain.BITCOIN:
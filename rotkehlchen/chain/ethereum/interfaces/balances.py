@@ -10,6 +10,8 @@ from rotkehlchen.chain.evm.types import WeightedNode, string_to_evm_address
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.db.filtering import EvmEventFilterQuery
 from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.errors.asset import UnknownAsset
+from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.fval import FVal
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import ChecksumEvmAddress, Location
@@ -62,20 +64,20 @@ class ProtocolWithBalance(metaclass=abc.ABCMeta):
             products=[product],
             location=Location.ETHEREUM,
         )
+        address_with_deposits: defaultdict[ChecksumEvmAddress, list['EvmEvent']] = defaultdict(list)  # noqa: E501
         with self.event_db.db.conn.read_ctx() as cursor:
-            events = self.event_db.get_history_events(
-                cursor=cursor,
-                filter_query=db_filter,
-                has_premium=True,
-            )
-
-        address_with_deposits = defaultdict(list)
-        for event in events:
-            if (event.event_type, event.event_subtype) not in deposit_events:
-                continue
-            if event.location_label is None:
-                continue
-            address_with_deposits[string_to_evm_address(event.location_label)].append(event)  # noqa: E501
+            # only the events that are deposits are fully deserialized
+            for row in self.event_db.iterate_history_event_rows(cursor=cursor, filter_query=db_filter):  # noqa: E501
+                if (row.event_type, row.event_subtype) not in deposit_events:
+                    continue
+                if row.location_label is None:
+                    continue
+                try:
+                    event = row.event
+                except (DeserializationError, UnknownAsset) as e:
+                    log.debug(f'Failed to deserialize evm event {row} due to {e!s}')
+                    continue
+                address_with_deposits[string_to_evm_address(row.location_label)].append(event)  # type: ignore[arg-type]  # filter only has evm events  # noqa: E501
 
         return address_with_deposits
 
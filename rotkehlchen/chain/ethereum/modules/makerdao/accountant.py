@@ -1,6 +1,6 @@
 from collections import defaultdict
 from collections.abc import Iterator
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, Any, cast
 
 from rotkehlchen.accounting.mixins.event import AccountingEventType
 from rotkehlchen.accounting.structures.evm_event import get_tx_event_type_identifier
@@ -9,7 +9,9 @@ from rotkehlchen.chain.evm.accounting.interfaces import ModuleAccountantInterfac
 from rotkehlchen.chain.evm.accounting.structures import TxAccountingTreatment, TxEventSettings
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_DAI
+from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.fval import FVal
+from rotkehlchen.serialization.deserialize import deserialize_evm_address, deserialize_fval
 from rotkehlchen.types import ChecksumEvmAddress
 
 from .constants import CPT_DSR, CPT_MIGRATION, CPT_VAULT
@@ -25,6 +27,23 @@ class MakerdaoAccountant(ModuleAccountantInterface):
         self.vault_balances: dict[str, FVal] = defaultdict(FVal)
         self.dsr_balances: dict[ChecksumEvmAddress, FVal] = defaultdict(FVal)
 
+    def serialize_state(self) -> dict[str, Any]:
+        # vault ids are kept as pairs since they would be turned to strings as json keys
+        return {
+            'vault_balances': [[cdp_id, str(amount)] for cdp_id, amount in self.vault_balances.items()],  # noqa: E501
+            'dsr_balances': {address: str(amount) for address, amount in self.dsr_balances.items()},  # noqa: E501
+        }
+
+    def restore_state(self, state: dict[str, Any]) -> None:
+        location = 'makerdao accounting checkpoint'
+        try:
+            for cdp_id, amount in state['vault_balances']:
+                self.vault_balances[cdp_id] = deserialize_fval(amount, name='vault balance', location=location)  # noqa: E501
+            for address, amount in state['dsr_balances'].items():
+                self.dsr_balances[deserialize_evm_address(address)] = deserialize_fval(amount, name='dsr balance', location=location)  # noqa: E501
+        except (KeyError, TypeError, ValueError) as e:
+            raise DeserializationError(f'Invalid makerdao accounting state: {e!s}') from e
+
     def _process_vault_dai_generation(
             self,
             pot: 'AccountingPot',  # pylint: disable=unused-argument
@@ -23,6 +23,7 @@ from rotkehlchen.chain.evm.decoding.structures import (
     TransferEnrichmentOutput,
 )
 from rotkehlchen.chain.evm.decoding.types import CounterpartyDetails, EventCategory
+from rotkehlchen.chain.evm.decoding.utils import decodes_topics
 from rotkehlchen.chain.evm.structures import EvmTxReceiptLog
 from rotkehlchen.chain.evm.types import string_to_evm_address
 from rotkehlchen.constants.misc import ZERO
@@ -72,6 +73,7 @@ class Uniswapv2Decoder(DecoderInterface):
             notify_user=self.notify_user,
         )
 
+    @decodes_topics(SWAP_SIGNATURE)
     def _maybe_decode_v2_swap(
             self,
             token: Optional[EvmToken],  # pylint: disable=unused-argument
@@ -102,6 +104,7 @@ class Uniswapv2Decoder(DecoderInterface):
 
         return DEFAULT_DECODING_OUTPUT
 
+    @decodes_topics(MINT_SIGNATURE, BURN_SIGNATURE)
     def _maybe_decode_v2_liquidity_addition_and_removal(
             self,
             token: Optional[EvmToken],  # pylint: disable=unused-argument
@@ -85,6 +85,5 @@ class EthereumTokens(EvmTokens):
         proxies_mapping = self.evm_inquirer.proxies_inquirer.get_accounts_having_proxy()
         proxies_to_use = {k: v for k, v in proxies_mapping.items() if k in addresses}
         self._detect_tokens(
-            addresses=list(proxies_to_use.values()),
-            tokens_to_check=tokens_for_proxies,
+            addresses_to_tokens={x: tokens_for_proxies for x in proxies_to_use.values()},
         )
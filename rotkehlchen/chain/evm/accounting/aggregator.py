@@ -2,13 +2,14 @@ import importlib
 import logging
 import pkgutil
 from types import ModuleType
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Any, Union
 
 from rotkehlchen.accounting.ledger_actions import LedgerActionType
 from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
 from rotkehlchen.chain.ethereum.constants import MODULES_PACKAGE, MODULES_PREFIX_LENGTH
 from rotkehlchen.chain.evm.decoding.constants import CPT_GAS
 from rotkehlchen.errors.misc import ModuleLoadingError
+from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.user_messages import MessagesAggregator
 
@@ -96,6 +97,26 @@ class EVMAccountingAggregator():
         for accountant in self.accountants.values():
             accountant.reset()
 
+    def serialize_state(self) -> dict[str, Any]:
+        """Serialize the state of all submodule accountants that keep state"""
+        result = {}
+        for name, accountant in self.accountants.items():
+            if (state := accountant.serialize_state()) is not None:
+                result[name] = state
+
+        return result
+
+    def restore_state(self, state: dict[str, Any]) -> None:
+        """Restore the state of submodule accountants as returned by serialize_state
+
+        May raise:
+        - DeserializationError if an accountant is not loaded or its state is invalid
+        """
+        for name, accountant_state in state.items():
+            if (accountant := self.accountants.get(name)) is None:
+                raise DeserializationError(f'Accountant {name} is not loaded')
+            accountant.restore_state(accountant_state)
+
 
 class EVMAccountingAggregators():
     """
@@ -217,3 +238,22 @@ class EVMAccountingAggregators():
         """Reset the state of all initialized submodule accountants"""
         for aggregator in self.aggregators:
             aggregator.reset()
+
+    def serialize_state(self) -> dict[str, Any]:
+        """Serialize the state of the accountants of each chain"""
+        return {
+            aggregator.node_inquirer.chain_name: aggregator.serialize_state()
+            for aggregator in self.aggregators
+        }
+
+    def restore_state(self, state: dict[str, Any]) -> None:
+        """Restore the state of the accountants of each chain
+
+        May raise:
+        - DeserializationError if the state does not match the loaded aggregators
+        """
+        aggregators = {x.node_inquirer.chain_name: x for x in self.aggregators}
+        for chain_name, aggregator_state in state.items():
+            if (aggregator := aggregators.get(chain_name)) is None:
+                raise DeserializationError(f'No accounting aggregator for {chain_name}')
+            aggregator.restore_state(aggregator_state)
@@ -1,7 +1,7 @@
 import logging
 from abc import ABCMeta, abstractmethod
 from collections.abc import Iterator
-from typing import TYPE_CHECKING, Literal
+from typing import TYPE_CHECKING, Any, Literal, Optional
 
 from rotkehlchen.accounting.mixins.event import AccountingEventType
 from rotkehlchen.accounting.structures.types import HistoryEventType
@@ -47,6 +47,19 @@ class ModuleAccountantInterface(metaclass=ABCMeta):
         """Subclasses may implement this to reset state between accounting runs"""
         return None
 
+    def serialize_state(self) -> Optional[dict[str, Any]]:
+        """Subclasses that keep state between events (see reset) need to implement this
+        and restore_state so that accounting can be resumed from a checkpoint"""
+        return None
+
+    def restore_state(self, state: dict[str, Any]) -> None:
+        """Restores the state returned by serialize_state on top of a reset accountant
+
+        May raise:
+        - DeserializationError if the state is not in the expected format
+        """
+        return None
+
 
 class DepositableAccountantInterface(ModuleAccountantInterface):
     """
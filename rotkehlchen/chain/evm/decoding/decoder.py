@@ -19,6 +19,7 @@ from rotkehlchen.api.websockets.typedefs import WSMessageType
 from rotkehlchen.assets.asset import AssetWithOracles, EvmToken
 from rotkehlchen.assets.utils import TokenSeenAt, get_or_create_evm_token
 from rotkehlchen.chain.ethereum.utils import token_normalized_value
+from rotkehlchen.chain.evm.constants import GENESIS_HASH
 from rotkehlchen.chain.evm.decoding.interfaces import ReloadableDecoderMixin
 from rotkehlchen.chain.evm.decoding.types import CounterpartyDetails
 from rotkehlchen.chain.evm.structures import EvmTxReceipt, EvmTxReceiptLog
@@ -43,6 +44,7 @@ from rotkehlchen.types import (
 from rotkehlchen.utils.misc import (
     combine_dicts,
     from_wei,
+    get_chunks,
     hex_or_bytes_to_address,
     hex_or_bytes_to_int,
 )
@@ -58,7 +60,7 @@ from .structures import (
     EnricherContext,
     TransferEnrichmentOutput,
 )
-from .utils import maybe_reshuffle_events
+from .utils import RULE_TOPICS_ATTRIBUTE, decodes_topics, maybe_reshuffle_events
 
 if TYPE_CHECKING:
     from rotkehlchen.accounting.structures.evm_event import EvmEvent
@@ -72,6 +74,9 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# How many transactions are read from the DB, decoded and saved together
+DECODING_CHUNK_SIZE = 100
+
 
 class EventDecoderFunction(Protocol):
 
@@ -170,7 +175,32 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
         # Recursively check all submodules to get all decoder address mappings and rules
         rules = self._recursively_initialize_decoders(self.chain_modules_root)
         self.rules += rules
+        self._index_event_rules()
         self.undecoded_tx_query_lock = Semaphore()
+        # evm token of each log address looked up during a decoding session, None for
+        # addresses that are not tokens. Set to a dict only while a session is running.
+        self.tokens_cache: Optional[dict[ChecksumEvmAddress, Optional[EvmToken]]] = None
+        self.tokens_cache_modifications = 0
+
+    def _index_event_rules(self) -> None:
+        """Group the event rules by the log topic they can decode, keeping their order.
+
+        Rules that don't declare their topics can decode any log and are tried for all.
+        """
+        self.event_rules_any_topic: list[EventDecoderFunction] = []
+        self.event_rules_by_topic: dict[bytes, list[EventDecoderFunction]] = {}
+        for rule in self.rules.event_rules:
+            topics = getattr(rule, RULE_TOPICS_ATTRIBUTE, None)
+            if topics is None:
+                self.event_rules_any_topic.append(rule)
+                for topic_rules in self.event_rules_by_topic.values():
+                    topic_rules.append(rule)
+                continue
+
+            for topic in topics:
+                if topic not in self.event_rules_by_topic:  # include the previous catch-all rules
+                    self.event_rules_by_topic[topic] = self.event_rules_any_topic.copy()
+                self.event_rules_by_topic[topic].append(rule)
 
     def _recursively_initialize_decoders(
             self,
@@ -267,7 +297,11 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
         Execute event rules for the current tx log. Returns None when no
         new event or actions need to be propagated.
         """
-        for rule in self.rules.event_rules:
+        if len(tx_log.topics) == 0:
+            rules = self.event_rules_any_topic
+        else:
+            rules = self.event_rules_by_topic.get(tx_log.topics[0], self.event_rules_any_topic)
+        for rule in rules:
             decoding_output = rule(token=token, tx_log=tx_log, transaction=transaction, decoded_events=decoded_events, action_items=action_items, all_logs=all_logs)  # noqa: E501
             if decoding_output.event is not None or len(decoding_output.action_items) > 0:
                 return decoding_output
@@ -359,6 +393,22 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
         Decodes an evm transaction and its receipt and saves result in the DB.
         Returns the list of decoded events and a flag which is True if balances refresh is needed.
         """
+        events, refresh_balances = self._decode_transaction_events(transaction, tx_receipt)
+        with self.database.user_write() as write_cursor:
+            self._save_decoded_events(write_cursor, transaction, events)
+
+        events = sorted(events, key=lambda x: x.sequence_index, reverse=False)
+        return events, refresh_balances  # Propagate for post processing in the caller
+
+    def _decode_transaction_events(
+            self,
+            transaction: EvmTransaction,
+            tx_receipt: EvmTxReceipt,
+    ) -> tuple[list['EvmEvent'], bool]:
+        """
+        Decodes an evm transaction and its receipt without saving anything in the DB.
+        Returns the list of decoded events and a flag which is True if balances refresh is needed.
+        """
         self.base.reset_sequence_counter()
         # check if any eth transfer happened in the transaction, including in internal transactions
         events = self._maybe_decode_simple_transactions(transaction, tx_receipt)
@@ -378,10 +428,7 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
                 events.append(decoding_output.event)
                 continue
 
-            token = GlobalDBHandler.get_evm_token(
-                address=tx_log.address,
-                chain_id=self.evm_inquirer.chain_id,
-            )
+            token = self._get_evm_token(tx_log.address)
             rules_decoding_output = self.try_all_rules(
                 token=token,
                 tx_log=tx_log,
@@ -409,28 +456,53 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
         if len(events) == 0 and (eth_event := self._get_eth_transfer_event(transaction)) is not None:  # noqa: E501
             events = [eth_event]
 
-        with self.database.user_write() as write_cursor:
-            if len(events) > 0:
-                self.dbevents.add_history_events(
+        return events, refresh_balances
+
+    def _get_evm_token(self, address: ChecksumEvmAddress) -> Optional[EvmToken]:
+        """Get the token at the given address of this chain, if it is a known token.
+
+        During a decoding session lookups are cached, including the addresses that are not
+        tokens. The cache is dropped if tokens are modified in the global DB meanwhile.
+        """
+        if self.tokens_cache is None:
+            return GlobalDBHandler.get_evm_token(address=address, chain_id=self.evm_inquirer.chain_id)  # noqa: E501
+
+        if self.tokens_cache_modifications != GlobalDBHandler.evm_tokens_modifications:
+            self.tokens_cache.clear()
+            self.tokens_cache_modifications = GlobalDBHandler.evm_tokens_modifications
+
+        if address in self.tokens_cache:
+            return self.tokens_cache[address]
+
+        token = GlobalDBHandler.get_evm_token(address=address, chain_id=self.evm_inquirer.chain_id)
+        self.tokens_cache[address] = token
+        return token
+
+    def _save_decoded_events(
+            self,
+            write_cursor: 'DBCursor',
+            transaction: EvmTransaction,
+            events: list['EvmEvent'],
+    ) -> None:
+        """Saves the decoded events of a transaction and marks it as decoded"""
+        if len(events) > 0:
+            self.dbevents.add_history_events(
+                write_cursor=write_cursor,
+                history=events,
+            )
+        else:
+            # This is probably a phishing zero value token transfer tx.
+            # Details here: https://github.com/rotki/rotki/issues/5749
+            with suppress(InputError):  # We don't care if it's already in the DB
+                self.database.add_to_ignored_action_ids(
                     write_cursor=write_cursor,
-                    history=events,
+                    action_type=ActionType.EVM_TRANSACTION,
+                    identifiers=[transaction.identifier],
                 )
-            else:
-                # This is probably a phishing zero value token transfer tx.
-                # Details here: https://github.com/rotki/rotki/issues/5749
-                with suppress(InputError):  # We don't care if it's already in the DB
-                    self.database.add_to_ignored_action_ids(
-                        write_cursor=write_cursor,
-                        action_type=ActionType.EVM_TRANSACTION,
-                        identifiers=[transaction.identifier],
-                    )
-            write_cursor.execute(
-                'INSERT OR IGNORE INTO evm_tx_mappings(tx_hash, chain_id, value) VALUES(?, ?, ?)',
-                (transaction.tx_hash, self.evm_inquirer.chain_id.serialize_for_db(), HISTORY_MAPPING_STATE_DECODED),  # noqa: E501
-            )
-
-        events = sorted(events, key=lambda x: x.sequence_index, reverse=False)
-        return events, refresh_balances  # Propagate for post processing in the caller
+        write_cursor.execute(
+            'INSERT OR IGNORE INTO evm_tx_mappings(tx_hash, chain_id, value) VALUES(?, ?, ?)',
+            (transaction.tx_hash, self.evm_inquirer.chain_id.serialize_for_db(), HISTORY_MAPPING_STATE_DECODED),  # noqa: E501
+        )
 
     def get_and_decode_undecoded_transactions(
             self,
@@ -457,7 +529,8 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
     ) -> list['EvmEvent']:
         """Make sure that receipts are pulled + events decoded for the given transaction hashes.
 
-        The transaction hashes must exist in the DB at the time of the call
+        The transaction hashes must exist in the DB at the time of the call. Each hash is
+        decoded once and its events are returned once even if it's given multiple times.
 
         May raise:
         - DeserializationError if there is a problem with conacting a remote to get receipts
@@ -478,30 +551,119 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
                 for entry in cursor:
                     tx_hashes.append(EVMTxHash(entry[0]))
 
-        for tx_hash in tx_hashes:
-            try:
-                receipt = self.transactions.get_or_query_transaction_receipt(tx_hash)
-            except RemoteError as e:
-                raise InputError(f'{self.evm_inquirer.chain_name} hash {tx_hash.hex()} does not correspond to a transaction') from e  # noqa: E501
+        # a hash repeated in the same or in another chunk would be decoded again
+        tx_hashes = list(dict.fromkeys(tx_hashes))
+        self.tokens_cache = {}
+        try:
+            for chunk in get_chunks(tx_hashes, n=DECODING_CHUNK_SIZE):
+                new_events, new_refresh_balances = self._get_or_decode_transactions_chunk(
+                    tx_hashes=chunk,
+                    ignore_cache=ignore_cache,
+                )
+                events.extend(new_events)
+                if new_refresh_balances is True:
+                    refresh_balances = True
+        finally:
+            self.tokens_cache = None
 
-            # TODO: Change this if transaction filter query can accept multiple hashes
-            with self.database.conn.read_ctx() as cursor:
-                txs = self.dbevmtx.get_evm_transactions(
+        self._post_process(refresh_balances=refresh_balances)
+        return events
+
+    def _get_or_decode_transactions_chunk(
+            self,
+            tx_hashes: list[EVMTxHash],
+            ignore_cache: bool,
+    ) -> tuple[list['EvmEvent'], bool]:
+        """Same as _get_or_decode_transaction_events but for multiple transactions.
+
+        Their transactions, receipts and decoded state are read from the DB in bulk and the
+        events of all the transactions that get decoded are saved in a single DB transaction.
+        Returns the events in the order of the given hashes and a flag which is True if
+        balances refresh is needed.
+
+        May raise:
+        - DeserializationError if there is a problem with conacting a remote to get receipts
+        - RemoteError if there is a problem with contacting a remote to get receipts
+        - InputError if a transaction hash is not found in the DB
+        """
+        chain_id = self.evm_inquirer.chain_id
+        serialized_chain_id = chain_id.serialize_for_db()
+        with self.database.conn.read_ctx() as cursor:
+            receipts = self.dbevmtx.get_receipts(cursor=cursor, tx_hashes=tx_hashes, chain_id=chain_id)  # noqa: E501
+
+        for tx_hash in tx_hashes:
+            # the genesis hash always goes through the transactions since it also checks
+            # for genesis transactions of all tracked accounts
+            if tx_hash not in receipts or tx_hash == GENESIS_HASH:
+                try:
+                    receipts[tx_hash] = self.transactions.get_or_query_transaction_receipt(tx_hash)  # noqa: E501
+                except RemoteError as e:
+                    raise InputError(f'{self.evm_inquirer.chain_name} hash {tx_hash.hex()} does not correspond to a transaction') from e  # noqa: E501
+
+        decoded_events: dict[EVMTxHash, list['EvmEvent']] = {}
+        with self.database.conn.read_ctx() as cursor:
+            transactions = {
+                tx.tx_hash: tx for tx in self.dbevmtx.get_evm_transactions(
                     cursor=cursor,
-                    filter_=EvmTransactionsFilterQuery.make(tx_hash=tx_hash, chain_id=self.evm_inquirer.chain_id),  # noqa: E501
+                    filter_=EvmTransactionsFilterQuery.make(tx_hashes=tx_hashes, chain_id=chain_id),  # noqa: E501
                     has_premium=True,  # ignore limiting here
                 )
-            new_events, new_refresh_balances = self._get_or_decode_transaction_events(
-                transaction=txs[0],
-                tx_receipt=receipt,
-                ignore_cache=ignore_cache,
+            }
+            if ignore_cache is False:  # see which transactions are already decoded
+                placeholders = ','.join(['?'] * len(tx_hashes))
+                cursor.execute(
+                    f'SELECT tx_hash FROM evm_tx_mappings WHERE chain_id=? AND value=? '
+                    f'AND tx_hash IN ({placeholders})',
+                    (serialized_chain_id, HISTORY_MAPPING_STATE_DECODED, *tx_hashes),
+                )
+                decoded_events = {EVMTxHash(entry[0]): [] for entry in cursor}
+                if len(decoded_events) != 0:
+                    for event in self.dbevents.get_history_events(
+                        cursor=cursor,
+                        filter_query=EvmEventFilterQuery.make(tx_hashes=list(decoded_events)),
+                        has_premium=True,  # for this function we don't limit anything
+                    ):
+                        decoded_events[event.tx_hash].append(event)
+
+        if ignore_cache is True:  # delete all decoded events
+            with self.database.user_write() as write_cursor:
+                self.dbevents.delete_events_by_tx_hash(
+                    write_cursor=write_cursor,
+                    tx_hashes=tx_hashes,
+                    chain_id=chain_id,
+                )
+                write_cursor.executemany(
+                    'DELETE from evm_tx_mappings WHERE tx_hash=? AND chain_id=? AND value=?',
+                    [(tx_hash, serialized_chain_id, HISTORY_MAPPING_STATE_DECODED) for tx_hash in tx_hashes],  # noqa: E501
+                )
+
+        refresh_balances = False
+        new_decoded: list[tuple[EvmTransaction, list['EvmEvent']]] = []
+        for tx_hash in tx_hashes:
+            if tx_hash in decoded_events:
+                continue
+
+            if (transaction := transactions.get(tx_hash)) is None:
+                raise InputError(f'{self.evm_inquirer.chain_name} hash {tx_hash.hex()} does not correspond to a transaction')  # noqa: E501
+
+            events, new_refresh_balances = self._decode_transaction_events(
+                transaction=transaction,
+                tx_receipt=receipts[tx_hash],
             )
-            events.extend(new_events)
+            new_decoded.append((transaction, events))
+            decoded_events[tx_hash] = sorted(events, key=lambda x: x.sequence_index, reverse=False)  # noqa: E501
             if new_refresh_balances is True:
                 refresh_balances = True
 
-        self._post_process(refresh_balances=refresh_balances)
-        return events
+        if len(new_decoded) != 0:
+            with self.database.user_write() as write_cursor:
+                for transaction, events in new_decoded:
+                    self._save_decoded_events(write_cursor, transaction, events)
+
+        all_events = []
+        for tx_hash in tx_hashes:
+            all_events.extend(decoded_events[tx_hash])
+        return all_events, refresh_balances
 
     def _get_or_decode_transaction_events(
             self,
@@ -615,6 +777,7 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
             counterparty=counterparty,
         )
 
+    @decodes_topics(ERC20_APPROVE)
     def _maybe_decode_erc20_approve(
             self,
             token: Optional[EvmToken],
@@ -726,6 +889,7 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
             events.append(eth_event)
         return events
 
+    @decodes_topics(ERC20_OR_ERC721_TRANSFER)
     def _maybe_decode_erc20_721_transfer(
             self,
             token: Optional[EvmToken],
@@ -1,8 +1,25 @@
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Callable, Optional, TypeVar
 
 if TYPE_CHECKING:
     from rotkehlchen.accounting.structures.evm_event import EvmEvent
 
+T = TypeVar('T', bound=Callable)
+
+# attribute of event decoding rules holding the topic0 values of the logs they can decode
+RULE_TOPICS_ATTRIBUTE = 'decoding_rule_topics'
+
+
+def decodes_topics(*topics: bytes) -> Callable[[T], T]:
+    """Decorator for event decoding rules that can only decode logs whose first topic is
+    one of the given ones. The decoder then offers a rule only the logs with those topics.
+
+    Rules that are not decorated are offered all logs.
+    """
+    def decorator(rule: T) -> T:
+        setattr(rule, RULE_TOPICS_ATTRIBUTE, frozenset(topics))
+        return rule
+    return decorator
+
 
 def _swap_event_indices(event1: 'EvmEvent', event2: 'EvmEvent') -> None:
     old_event1_index = event1.sequence_index
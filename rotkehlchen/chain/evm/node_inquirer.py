@@ -2,16 +2,19 @@ import json
 import logging
 import random
 from abc import ABCMeta, abstractmethod
+from collections import defaultdict
 from collections.abc import Callable, Sequence
 from contextlib import suppress
 from itertools import zip_longest
-from typing import TYPE_CHECKING, Any, Literal, Optional, Union
+from typing import TYPE_CHECKING, Any, Literal, Optional, Union, cast
 from urllib.parse import urlparse
 
 import requests
 from ens import ENS
 from eth_abi.exceptions import InsufficientDataBytes
 from eth_typing import BlockNumber
+from gevent.lock import BoundedSemaphore
+from gevent.pool import Pool
 from web3 import HTTPProvider, Web3
 from web3._utils.abi import get_abi_output_types
 from web3._utils.contracts import find_matching_event_abi
@@ -61,7 +64,7 @@ from rotkehlchen.types import (
     EVMTxHash,
     Timestamp,
 )
-from rotkehlchen.utils.misc import from_wei, get_chunks, hex_or_bytes_to_str
+from rotkehlchen.utils.misc import from_wei, get_chunks, hex_or_bytes_to_str, set_user_agent
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
@@ -90,7 +93,68 @@ def _is_synchronized(current_block: int, latest_block: int) -> tuple[bool, str]:
     return True, message
 
 
+def _deserialize_raw_receipt(tx_receipt: dict[str, Any], source: str) -> dict[str, Any]:
+    """Turns the hex numbers of a receipt as returned by the JSON-RPC api into ints,
+    in place, like web3 does for its receipts.
+
+    May raise:
+    - RemoteError if the receipt can't be deserialized
+    """
+    try:
+        block_number = int(tx_receipt['blockNumber'], 16)
+        tx_receipt['blockNumber'] = block_number
+        tx_receipt['cumulativeGasUsed'] = int(tx_receipt['cumulativeGasUsed'], 16)
+        tx_receipt['gasUsed'] = int(tx_receipt['gasUsed'], 16)
+        tx_receipt['status'] = int(tx_receipt.get('status', '0x1'), 16)
+        tx_index = int(tx_receipt['transactionIndex'], 16)
+        tx_receipt['transactionIndex'] = tx_index
+        for receipt_log in tx_receipt['logs']:
+            receipt_log['blockNumber'] = block_number
+            receipt_log['logIndex'] = deserialize_int_from_hex(
+                symbol=receipt_log['logIndex'],
+                location=f'{source} tx receipt',
+            )
+            receipt_log['transactionIndex'] = tx_index
+    except (DeserializationError, ValueError, KeyError, TypeError) as e:
+        msg = str(e)
+        if isinstance(e, KeyError):
+            msg = f'missing key {msg}'
+        log.error(
+            f'Couldnt deserialize transaction receipt {tx_receipt} data from '
+            f'{source} due to {msg}',
+        )
+        raise RemoteError(
+            f'Couldnt deserialize transaction receipt data from {source} '
+            f'due to {msg}. Check logs for details',
+        ) from e
+
+    return tx_receipt
+
+
 WEB3_LOGQUERY_BLOCK_RANGE = 250000
+# Log queries that return fewer logs than this double their block range for the next query
+WEB3_LOGQUERY_SPARSE_RESULTS = 1000
+WEB3_LOGQUERY_MAX_RANGE_MULTIPLIER = 8
+WEB3_LOGQUERY_MIN_BLOCK_RANGE = 50
+# Node errors meaning that the block range of a log query should get smaller. From
+# https://infura.io/docs/ethereum/json-rpc/eth-getLogs and other providers' docs
+WEB3_LOGQUERY_RANGE_TOO_BIG_ERRORS = (
+    'query returned more than 10000 results',
+    'query timeout exceeded',
+    'Log response size exceeded',
+)
+# Number of transaction receipts queried with a single JSON-RPC batch request
+RECEIPTS_BATCH_SIZE = 50
+# Number of requests that can be in flight to each node when querying receipts concurrently
+MAX_IN_FLIGHT_REQUESTS_PER_NODE = 2
+# Lowercase parts of the JSON-RPC errors of nodes that don't support batch requests
+BATCH_REQUESTS_UNSUPPORTED_ERRORS = (
+    'batch requests are not supported',
+    'batch requests not supported',
+    'batch request not supported',
+    'batch is not supported',
+    'batch requests are disabled',
+)
 
 
 def _query_web3_get_logs(
@@ -103,10 +167,16 @@ def _query_web3_get_logs(
         argument_filters: dict[str, Any],
         initial_block_range: int,
 ) -> list[dict[str, Any]]:
+    """Queries the logs in block ranges that adapt to the node's responses. The range
+    grows up to WEB3_LOGQUERY_MAX_RANGE_MULTIPLIER times the initial one while the
+    results are sparse and is halved when the node can't answer for a range that big.
+    After that it never grows beyond the halved range.
+    """
     until_block = web3.eth.block_number if to_block == 'latest' else to_block
     events: list[dict[str, Any]] = []
     start_block = from_block
     block_range = initial_block_range
+    max_block_range = initial_block_range * WEB3_LOGQUERY_MAX_RANGE_MULTIPLIER
 
     while start_block <= until_block:
         filter_args['fromBlock'] = start_block
@@ -124,7 +194,7 @@ def _query_web3_get_logs(
         # is infura can throw an error here which we can only parse by catching the  exception
         try:
             new_events_web3: list[dict[str, Any]] = [dict(x) for x in web3.eth.get_logs(filter_args)]  # noqa: E501
-        except (ValueError, KeyError) as e:
+        except (ValueError, KeyError, requests.exceptions.Timeout) as e:
             if isinstance(e, ValueError):
                 try:
                     decoded_error = json.loads(str(e).replace("'", '"'))
@@ -133,13 +203,14 @@ def _query_web3_get_logs(
                     raise e from None
 
                 msg = decoded_error.get('message', '')
-            else:  # temporary hack for key error seen from pokt
+            elif isinstance(e, KeyError):  # temporary hack for key error seen from pokt
                 msg = 'query returned more than 10000 results'
+            else:
+                msg = 'query timeout exceeded'
 
-            # errors from: https://infura.io/docs/ethereum/json-rpc/eth-getLogs
-            if msg in ('query returned more than 10000 results', 'query timeout exceeded'):
-                block_range = block_range // 2
-                if block_range < 50:
+            if any(x in msg for x in WEB3_LOGQUERY_RANGE_TOO_BIG_ERRORS):
+                block_range = max_block_range = block_range // 2  # don't grow back to failing
+                if block_range < WEB3_LOGQUERY_MIN_BLOCK_RANGE:
                     raise  # stop retrying if block range gets too small
                 # repeat the query with smaller block range
                 continue
@@ -157,12 +228,28 @@ def _query_web3_get_logs(
 
         start_block = end_block + 1
         events.extend(new_events_web3)
-        # end of the loop, end of 1 query. Reset the block range to max
-        block_range = initial_block_range
+        if len(new_events_web3) < WEB3_LOGQUERY_SPARSE_RESULTS:
+            block_range = min(block_range * 2, max_block_range)
 
     return events
 
 
+def _split_block_range(
+        from_block: int,
+        to_block: int,
+        parts: int,
+        min_blocks: int,
+) -> list[tuple[int, int]]:
+    """Splits the inclusive block range into up to `parts` disjoint consecutive ranges
+    of at least `min_blocks` blocks each"""
+    parts = max(1, min(parts, (to_block - from_block + 1) // min_blocks))
+    step = -(-(to_block - from_block + 1) // parts)  # ceil division
+    return [
+        (start, min(start + step - 1, to_block))
+        for start in range(from_block, to_block + 1, step)
+    ]
+
+
 class EvmNodeInquirer(metaclass=ABCMeta):
     """Class containing generic functionality for querying evm nodes
 
@@ -221,6 +308,14 @@ class EvmNodeInquirer(metaclass=ABCMeta):
         # A cache for erc20 and erc721 contract info to not requery the info
         self.contract_info_erc20_cache: dict[ChecksumEvmAddress, dict[str, Any]] = {}
         self.contract_info_erc721_cache: dict[ChecksumEvmAddress, dict[str, Any]] = {}
+        # Nodes that don't support JSON-RPC batch requests. They are queried one by one
+        self.nodes_without_batch_requests: set[NodeName] = set()
+        # web3 can't send batch requests so they are posted to the nodes through this
+        self.session = requests.session()
+        set_user_agent(self.session)
+        self.node_request_semaphores: defaultdict[NodeName, BoundedSemaphore] = defaultdict(
+            lambda: BoundedSemaphore(MAX_IN_FLIGHT_REQUESTS_PER_NODE),
+        )
         self.connect_to_multiple_nodes(connect_at_start)
 
     def connected_to_any_web3(self) -> bool:
@@ -686,35 +781,7 @@ class EvmNodeInquirer(metaclass=ABCMeta):
             if tx_receipt is None:
                 return None
 
-            try:
-                # Turn hex numbers to int
-                block_number = int(tx_receipt['blockNumber'], 16)
-                tx_receipt['blockNumber'] = block_number
-                tx_receipt['cumulativeGasUsed'] = int(tx_receipt['cumulativeGasUsed'], 16)
-                tx_receipt['gasUsed'] = int(tx_receipt['gasUsed'], 16)
-                tx_receipt['status'] = int(tx_receipt.get('status', '0x1'), 16)
-                tx_index = int(tx_receipt['transactionIndex'], 16)
-                tx_receipt['transactionIndex'] = tx_index
-                for receipt_log in tx_receipt['logs']:
-                    receipt_log['blockNumber'] = block_number
-                    receipt_log['logIndex'] = deserialize_int_from_hex(
-                        symbol=receipt_log['logIndex'],
-                        location='etherscan tx receipt',
-                    )
-                    receipt_log['transactionIndex'] = tx_index
-            except (DeserializationError, ValueError, KeyError) as e:
-                msg = str(e)
-                if isinstance(e, KeyError):
-                    msg = f'missing key {msg}'
-                log.error(
-                    f'Couldnt deserialize transaction receipt {tx_receipt} data from '
-                    f'etherscan due to {msg}',
-                )
-                raise RemoteError(
-                    f'Couldnt deserialize transaction receipt data from etherscan '
-                    f'due to {msg}. Check logs for details',
-                ) from e
-            return tx_receipt
+            return _deserialize_raw_receipt(tx_receipt, source='etherscan')
 
         # Can raise TransactionNotFound if the user's node is pruned and transaction is old
         tx_receipt = web3.eth.get_transaction_receipt(tx_hash)  # type: ignore
@@ -748,6 +815,144 @@ class EvmNodeInquirer(metaclass=ABCMeta):
         assert tx_receipt, f'tx receipt should exist for tx hash {tx_hash.hex()}'
         return tx_receipt
 
+    def _get_transaction_receipts(
+            self,
+            node: NodeName,
+            web3: Optional[Web3],
+            tx_hashes: Sequence[EVMTxHash],
+    ) -> list[Optional[dict[str, Any]]]:
+        """Queries the receipts of the given transactions from a node with a single
+        JSON-RPC batch request. Etherscan and the nodes that don't support batch requests
+        are queried one transaction at a time.
+
+        Returns the receipts in the order of the hashes, with None for the transactions
+        the node does not know of.
+
+        May raise:
+        - RemoteError if the node returns an error or an invalid receipt
+        - requests.exceptions.RequestException if the request fails or the response
+        is not json
+        """
+        if web3 is None or node in self.nodes_without_batch_requests:
+            receipts = []
+            for tx_hash in tx_hashes:
+                try:
+                    receipts.append(self._get_transaction_receipt(web3, tx_hash))
+                except TransactionNotFound:
+                    receipts.append(None)
+            return receipts
+
+        provider = cast(HTTPProvider, web3.provider)
+        request = [{
+            'jsonrpc': '2.0',
+            'id': idx,
+            'method': 'eth_getTransactionReceipt',
+            'params': [tx_hash.hex()],
+        } for idx, tx_hash in enumerate(tx_hashes) if tx_hash != GENESIS_HASH]
+        http_response = self.session.post(
+            provider.endpoint_uri,  # type: ignore[arg-type]  # always set for our providers
+            json=request,
+            timeout=self.rpc_timeout,
+        )
+        if http_response.status_code != 200:
+            raise RemoteError(f'{node} returned status code {http_response.status_code} to a receipts batch request')  # noqa: E501
+
+        response = http_response.json()
+        if not isinstance(response, list):
+            error = response.get('error') if isinstance(response, dict) else None
+            if isinstance(error, dict) and any(
+                    x in str(error.get('message', '')).lower()
+                    for x in BATCH_REQUESTS_UNSUPPORTED_ERRORS
+            ):
+                log.debug(f'{node} does not support JSON-RPC batch requests. Response: {response}')  # noqa: E501
+                self.nodes_without_batch_requests.add(node)
+                return self._get_transaction_receipts(node=node, web3=web3, tx_hashes=tx_hashes)
+
+            raise RemoteError(f'{node} returned an unexpected response to a receipts batch request: {response}')  # noqa: E501
+
+        receipts = [FAKE_GENESIS_TX_RECEIPT if x == GENESIS_HASH else None for x in tx_hashes]
+        for entry in response:
+            if (
+                    not isinstance(entry, dict) or 'error' in entry or
+                    entry.get('id') not in range(len(tx_hashes))
+            ):
+                raise RemoteError(f'{node} returned an error to a receipts batch request: {entry}')  # noqa: E501
+            if entry.get('result') is not None:
+                receipts[entry['id']] = _deserialize_raw_receipt(entry['result'], source=str(node))  # noqa: E501
+
+        return receipts
+
+    def get_transaction_receipts(
+            self,
+            tx_hashes: Sequence[EVMTxHash],
+            call_order: Optional[Sequence[WeightedNode]] = None,
+    ) -> list[Optional[dict[str, Any]]]:
+        """Queries the receipts of the given transactions, up to RECEIPTS_BATCH_SIZE of
+        them at a time since each query is a single batch request to a node.
+
+        Since this is called concurrently each node gets at most
+        MAX_IN_FLIGHT_REQUESTS_PER_NODE requests at a time. A query goes to the first node
+        of the call order that is free and only waits for a busy node if all nodes are busy.
+
+        The receipts that a node does not know of are queried from the next nodes.
+        Returns the receipts in the order of the hashes, with None for the transactions
+        none of the queried nodes knows of.
+
+        May raise:
+        - RemoteError if none of the nodes could be queried
+        """
+        call_order = call_order if call_order is not None else self.default_call_order()
+        receipts: list[Optional[dict[str, Any]]] = [None] * len(tx_hashes)
+        missing = list(range(len(tx_hashes)))  # indices of the receipts not found yet
+        queried_nodes, failed_nodes = set(), set()
+        for wait_for_node in (False, True):
+            for weighted_node in call_order:
+                node_info = weighted_node.node_info
+                web3node = self.web3_mapping.get(node_info, None)
+                if node_info in failed_nodes or node_info in queried_nodes or (web3node is None and node_info.name != self.etherscan_node_name):  # noqa: E501
+                    continue
+                if web3node is not None and web3node.is_pruned is True:
+                    continue
+
+                semaphore = self.node_request_semaphores[node_info]
+                if semaphore.acquire(blocking=wait_for_node) is False:
+                    continue  # the node is busy. Try the next one
+
+                try:
+                    node_receipts = self._get_transaction_receipts(
+                        node=node_info,
+                        web3=web3node.web3_instance if web3node is not None else None,
+                        tx_hashes=[tx_hashes[x] for x in missing],
+                    )
+                except (
+                    RemoteError,
+                    requests.exceptions.RequestException,
+                    BlockchainQueryError,
+                    BadResponseFormat,
+                    ValueError,
+                ) as e:
+                    log.warning(f'Failed to query {node_info} for {len(missing)} transaction receipts due to {e!s}')  # noqa: E501
+                    failed_nodes.add(node_info)
+                    continue
+                finally:
+                    semaphore.release()
+
+                # the receipts the node does not know of are queried from the next nodes
+                queried_nodes.add(node_info)
+                for idx, receipt in zip(missing, node_receipts):
+                    receipts[idx] = receipt
+                missing = [x for x in missing if receipts[x] is None]
+                if len(missing) == 0:
+                    return receipts
+
+        if len(queried_nodes) != 0:
+            return receipts  # the missing receipts are not known to any of the nodes
+
+        raise RemoteError(
+            f'Failed to query {len(tx_hashes)} transaction receipts after trying the '
+            f'following nodes: {[str(x) for x in call_order]}. Check logs for details.',
+        )
+
     def _get_transaction_by_hash(
             self,
             web3: Optional[Web3],
@@ -814,6 +1019,15 @@ class EvmNodeInquirer(metaclass=ABCMeta):
             to_block: Union[int, Literal['latest']] = 'latest',
             call_order: Optional[Sequence[WeightedNode]] = None,
     ) -> list[dict[str, Any]]:
+        """Queries the logs of the given contract event in the block range
+
+        If more than one node of the call order can query past data the block range is
+        split between them and the parts are queried concurrently.
+
+        May raise:
+        - RemoteError if none of the nodes could be queried
+        - EventNotInABI if the given event is not in the ABI
+        """
         if call_order is None:  # Default call order for logs
             call_order = [self.etherscan_node]
             if (node_info := self.get_own_node_info()) is not None:
@@ -824,16 +1038,61 @@ class EvmNodeInquirer(metaclass=ABCMeta):
                         weight=ONE,
                     ),
                 )
-        return self._query(
-            method=self._get_logs,
-            call_order=call_order,
-            contract_address=contract_address,
-            abi=abi,
-            event_name=event_name,
-            argument_filters=argument_filters,
-            from_block=from_block,
-            to_block=to_block,
+
+        # nodes that can be given a part of the block range to query concurrently
+        log_nodes = [
+            x for x in call_order
+            if x.node_info.name == self.etherscan_node_name or (
+                (web3node := self.web3_mapping.get(x.node_info)) is not None and
+                web3node.is_pruned is False
+            )
+        ]
+        block_ranges: list[tuple[int, Union[int, Literal['latest']]]] = [(from_block, to_block)]
+        if len(log_nodes) > 1:
+            until_block = self.get_latest_block_number(call_order=call_order) if to_block == 'latest' else to_block  # noqa: E501
+            block_ranges = _split_block_range(  # type: ignore[assignment]  # list is invariant
+                from_block=from_block,
+                to_block=until_block,
+                parts=len(log_nodes),
+                min_blocks=WEB3_LOGQUERY_BLOCK_RANGE,
+            )
+
+        def query_range(
+                block_range: tuple[int, Union[int, Literal['latest']]],
+                range_call_order: Sequence[WeightedNode],
+        ) -> list[dict[str, Any]]:
+            return self._query(
+                method=self._get_logs,
+                call_order=range_call_order,
+                contract_address=contract_address,
+                abi=abi,
+                event_name=event_name,
+                argument_filters=argument_filters,
+                from_block=block_range[0],
+                to_block=block_range[1],
+            )
+
+        if len(block_ranges) == 1:
+            return query_range(block_ranges[0], call_order)
+
+        log.debug(
+            f'Querying {event_name} logs of {contract_address} concurrently in '
+            f'{len(block_ranges)} block ranges',
         )
+        # Each part starts from a different node and falls back to the rest of the call
+        # order. The parts are disjoint and in order so the results are just concatenated
+        pool = Pool(len(block_ranges))
+        try:
+            greenlets = [
+                pool.spawn(
+                    query_range,
+                    block_range,
+                    [log_nodes[idx], *(x for x in call_order if x != log_nodes[idx])],
+                ) for idx, block_range in enumerate(block_ranges)
+            ]
+            return [event for greenlet in greenlets for event in greenlet.get()]
+        finally:  # don't leave the other parts querying if one of them failed
+            pool.kill()
 
     def _get_logs(
             self,
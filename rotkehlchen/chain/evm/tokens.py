@@ -2,17 +2,22 @@ import logging
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict
 from collections.abc import Sequence
+from contextlib import suppress
 from typing import TYPE_CHECKING, Optional
 
+from gevent.pool import Pool
+
 from rotkehlchen.assets.asset import EvmToken
 from rotkehlchen.chain.ethereum.utils import token_normalized_value
 from rotkehlchen.chain.evm.types import WeightedNode
+from rotkehlchen.constants.timing import EVM_FULL_TOKENS_DETECTION_PERIOD
+from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
 from rotkehlchen.fval import FVal
 from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import ChecksumEvmAddress, Price, Timestamp
-from rotkehlchen.utils.misc import combine_dicts, get_chunks
+from rotkehlchen.utils.misc import ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
@@ -123,44 +128,6 @@ class EvmTokens(metaclass=ABCMeta):
         self.db = database
         self.evm_inquirer = evm_inquirer
 
-    def get_token_balances(
-            self,
-            address: ChecksumEvmAddress,
-            tokens: list[EvmToken],
-            call_order: Optional[Sequence[WeightedNode]],
-    ) -> dict[EvmToken, FVal]:
-        """Queries the balances of multiple tokens for an address
-
-        May raise:
-        - RemoteError if an external service such as Etherscan is queried and
-          there is a problem with its query.
-        - BadFunctionCallOutput if a local node is used and the contract for the
-          token has no code. That means the chain is not synced
-        """
-        log.debug(
-            f'Querying {self.evm_inquirer.chain_name} for multi token address balances',
-            address=address,
-            tokens_num=len(tokens),
-        )
-        result = self.evm_inquirer.contract_scan.call(
-            node_inquirer=self.evm_inquirer,
-            method_name='tokensBalance',
-            arguments=[address, [x.evm_address for x in tokens]],
-            call_order=call_order,
-        )
-        balances: dict[EvmToken, FVal] = defaultdict(FVal)
-        for token_balance, token in zip(result, tokens):
-            if token_balance == 0:
-                continue
-
-            normalized_balance = token_normalized_value(token_balance, token)
-            log.debug(
-                f'Found {self.evm_inquirer.chain_name} {token.symbol}({token.evm_address}) '
-                f'token balance for {address} and balance {normalized_balance}',
-            )
-            balances[token] += normalized_balance
-        return balances
-
     def _get_multicall_token_balances(
             self,
             chunk: list[tuple[ChecksumEvmAddress, list[EvmToken]]],
@@ -206,23 +173,52 @@ class EvmTokens(metaclass=ABCMeta):
                 balances[address][token] += normalized_balance
         return balances
 
-    def _query_chunks(
+    def _query_token_balances(
             self,
-            address: ChecksumEvmAddress,
-            tokens: list[EvmToken],
-            chunk_size: int,
-            call_order: list[WeightedNode],
-    ) -> dict[EvmToken, FVal]:
-        total_token_balances: dict[EvmToken, FVal] = defaultdict(FVal)
-        chunks = get_chunks(tokens, n=chunk_size)
-        for chunk in chunks:
-            new_token_balances = self.get_token_balances(
-                address=address,
-                tokens=chunk,
-                call_order=call_order,
+            addresses_to_tokens: dict[ChecksumEvmAddress, list[EvmToken]],
+    ) -> dict[ChecksumEvmAddress, dict[EvmToken, FVal]]:
+        """Queries the balances of the given tokens of each address
+
+        The (address, tokens) pairs of all the addresses are packed in as few multicalls as
+        the nodes allow. The multicalls are queried concurrently, each starting from a
+        different node of the call order and falling back to the rest.
+
+        May raise:
+        - RemoteError if an external service such as Etherscan is queried and
+          there is a problem with its query.
+        - BadFunctionCallOutput if a local node is used and the contract for the
+          token has no code. That means the chain is not synced
+        """
+        chunk_size, call_order = get_chunk_size_call_order(self.evm_inquirer)
+        multicall_chunks = generate_multicall_chunks(
+            addresses_to_tokens=addresses_to_tokens,
+            chunk_length=chunk_size,
+        )
+        log.debug(
+            f'Querying {self.evm_inquirer.chain_name} token balances of '
+            f'{len(addresses_to_tokens)} addresses in {len(multicall_chunks)} multicalls',
+        )
+
+        def query_chunk(
+                idx_and_chunk: tuple[int, list[tuple[ChecksumEvmAddress, list[EvmToken]]]],
+        ) -> dict[ChecksumEvmAddress, dict[EvmToken, FVal]]:
+            idx, chunk = idx_and_chunk
+            first_node = idx % len(call_order)
+            return self._get_multicall_token_balances(
+                chunk=chunk,
+                call_order=[*call_order[first_node:], *call_order[:first_node]],
             )
-            total_token_balances = combine_dicts(total_token_balances, new_token_balances)
-        return total_token_balances
+
+        addresses_to_balances: dict[ChecksumEvmAddress, dict[EvmToken, FVal]] = defaultdict(dict)
+        pool = Pool(len(call_order))
+        try:
+            for new_balances in pool.imap_unordered(query_chunk, enumerate(multicall_chunks)):
+                for address, balances in new_balances.items():
+                    addresses_to_balances[address].update(balances)
+        finally:  # stop the remaining queries if one of them failed
+            pool.kill()
+
+        return addresses_to_balances
 
     def _compute_detected_tokens_info(self, addresses: Sequence[ChecksumEvmAddress]) -> DetectedTokensType:  # noqa: E501
         """
@@ -280,25 +276,103 @@ class EvmTokens(metaclass=ABCMeta):
           token has no code. That means the chain is not synced
         """
         if only_cache is False:
+            self._detect_tokens_incrementally(addresses)
+            self.maybe_detect_proxies_tokens(addresses)
+
+        return self._compute_detected_tokens_info(addresses)
+
+    def _detect_tokens_incrementally(self, addresses: Sequence[ChecksumEvmAddress]) -> None:
+        """Detect tokens for the given addresses checking as few tokens as possible.
+
+        Addresses without a full detection in the last EVM_FULL_TOKENS_DETECTION_PERIOD
+        are checked for all the tokens of the chain. The rest are only checked for the
+        tokens they already had, the tokens in their history events and the tokens added
+        to the global DB since their last detection.
+
+        May raise:
+        - RemoteError if an external service such as Etherscan is queried and
+          there is a problem with its query.
+        - BadFunctionCallOutput if a local node is used and the contract for the
+          token has no code. That means the chain is not synced
+        """
+        now = ts_now()
+        exceptions = self._get_token_exceptions()
+        # taken before querying the tokens so that tokens added meanwhile get checked next time
+        last_token = GlobalDBHandler().get_last_evm_token_rowid()
+        full_detection_addresses = []
+        incremental_addresses: dict[ChecksumEvmAddress, tuple[set[EvmToken], int]] = {}
+        with self.db.conn.read_ctx() as cursor:
+            transferred_tokens = self.db.get_transferred_tokens(
+                cursor=cursor,
+                addresses=addresses,
+                chain_id=self.evm_inquirer.chain_id,
+            )
+            for address in addresses:
+                last_full_detection_ts, last_checked_token = self.db.get_token_detection_marks(
+                    cursor=cursor,
+                    address=address,
+                    blockchain=self.evm_inquirer.blockchain,
+                )
+                if (
+                        last_full_detection_ts is None or last_checked_token is None or
+                        now - last_full_detection_ts >= EVM_FULL_TOKENS_DETECTION_PERIOD
+                ):
+                    full_detection_addresses.append(address)
+                    continue
+
+                saved_tokens, _ = self.db.get_tokens_for_address(
+                    cursor=cursor,
+                    address=address,
+                    blockchain=self.evm_inquirer.blockchain,
+                )
+                tokens = set(saved_tokens) if saved_tokens is not None else set()
+                for identifier in transferred_tokens[address]:
+                    with suppress(UnknownAsset, WrongAssetType):
+                        tokens.add(EvmToken(identifier))
+                incremental_addresses[address] = (tokens, last_checked_token)
+
+        if len(full_detection_addresses) != 0:
             all_tokens = GlobalDBHandler().get_evm_tokens(
                 chain_id=self.evm_inquirer.chain_id,
-                exceptions=self._get_token_exceptions(),
+                exceptions=exceptions,
             )
             self._detect_tokens(
-                addresses=addresses,
-                tokens_to_check=all_tokens,
+                addresses_to_tokens={x: all_tokens for x in full_detection_addresses},
+                full_detection=True,
+                last_checked_token=last_token,
             )
-            self.maybe_detect_proxies_tokens(addresses)
 
-        return self._compute_detected_tokens_info(addresses)
+        if len(incremental_addresses) == 0:
+            return
+
+        new_tokens: dict[int, list[EvmToken]] = {}  # most addresses share the last checked token
+        for tokens, last_checked_token in incremental_addresses.values():
+            if last_checked_token not in new_tokens:
+                new_tokens[last_checked_token] = GlobalDBHandler().get_evm_tokens(
+                    chain_id=self.evm_inquirer.chain_id,
+                    exceptions=exceptions,
+                    added_after=last_checked_token,
+                )
+            tokens.update(new_tokens[last_checked_token])
+        self._detect_tokens(
+            addresses_to_tokens={
+                address: [x for x in tokens if x.evm_address not in exceptions]
+                for address, (tokens, _) in incremental_addresses.items()
+            },
+            last_checked_token=last_token,
+        )
 
     def _detect_tokens(
             self,
-            addresses: Sequence[ChecksumEvmAddress],
-            tokens_to_check: list[EvmToken],
+            addresses_to_tokens: dict[ChecksumEvmAddress, list[EvmToken]],
+            full_detection: bool = False,
+            last_checked_token: Optional[int] = None,
     ) -> None:
         """
-        Detect tokens for the given addresses.
+        Detect which of the given tokens each address has.
+
+        full_detection and last_checked_token are saved along the detected tokens.
+        See DBHandler.save_tokens_for_address.
 
         May raise:
         - RemoteError if an external service such as Etherscan is queried and
@@ -306,21 +380,16 @@ class EvmTokens(metaclass=ABCMeta):
         - BadFunctionCallOutput if a local node is used and the contract for the
           token has no code. That means the chain is not synced
         """
-        chunk_size, call_order = get_chunk_size_call_order(self.evm_inquirer)
-        for address in addresses:
-            token_balances = self._query_chunks(
-                address=address,
-                tokens=tokens_to_check,
-                chunk_size=chunk_size,
-                call_order=call_order,
-            )
-            detected_tokens = list(token_balances.keys())
-            with self.db.user_write() as write_cursor:
+        addresses_to_balances = self._query_token_balances(addresses_to_tokens)
+        with self.db.user_write() as write_cursor:
+            for address in addresses_to_tokens:
                 self.db.save_tokens_for_address(
                     write_cursor=write_cursor,
                     address=address,
                     blockchain=self.evm_inquirer.blockchain,
-                    tokens=detected_tokens,
+                    tokens=list(addresses_to_balances.get(address, {})),
+                    full_detection=full_detection,
+                    last_checked_token=last_checked_token,
                 )
 
     def query_tokens_for_addresses(
@@ -336,11 +405,8 @@ class EvmTokens(metaclass=ABCMeta):
         - BadFunctionCallOutput if a local node is used and the contract for the
           token has no code. That means the chain is not synced
         """
-        addresses_to_balances: dict[ChecksumEvmAddress, dict[EvmToken, FVal]] = defaultdict(dict)
         all_tokens = set()
         addresses_to_tokens: dict[ChecksumEvmAddress, list[EvmToken]] = {}
-        chunk_size, call_order = get_chunk_size_call_order(self.evm_inquirer)
-
         with self.db.conn.read_ctx() as cursor:
             for address in addresses:
                 saved_list, _ = self.db.get_tokens_for_address(
@@ -353,18 +419,7 @@ class EvmTokens(metaclass=ABCMeta):
                 all_tokens.update(saved_list)
                 addresses_to_tokens[address] = saved_list
 
-        multicall_chunks = generate_multicall_chunks(
-            addresses_to_tokens=addresses_to_tokens,
-            chunk_length=chunk_size,
-        )
-        for chunk in multicall_chunks:
-            new_balances = self._get_multicall_token_balances(
-                chunk=chunk,
-                call_order=call_order,
-            )
-            for address, balances in new_balances.items():
-                addresses_to_balances[address].update(balances)
-
+        addresses_to_balances = self._query_token_balances(addresses_to_tokens)
         token_usd_price: dict[EvmToken, Price] = {}
         for token in all_tokens:
             token_usd_price[token] = Inquirer.find_usd_price(asset=token)
@@ -3,13 +3,18 @@ from abc import ABCMeta
 from collections import defaultdict
 from collections.abc import Iterator
 from contextlib import contextmanager
-from typing import TYPE_CHECKING, Optional, Union
+from typing import TYPE_CHECKING, Any, Optional, Union
 
 from gevent.lock import Semaphore
+from gevent.pool import Pool
 from pysqlcipher3 import dbapi2 as sqlcipher
 
 from rotkehlchen.api.websockets.typedefs import TransactionStatusStep, WSMessageType
 from rotkehlchen.chain.evm.constants import GENESIS_HASH
+from rotkehlchen.chain.evm.node_inquirer import (
+    MAX_IN_FLIGHT_REQUESTS_PER_NODE,
+    RECEIPTS_BATCH_SIZE,
+)
 from rotkehlchen.chain.evm.types import EvmAccount
 from rotkehlchen.chain.structures import TimestampOrBlockRange
 from rotkehlchen.db.evmtx import DBEvmTx
@@ -18,7 +23,7 @@ from rotkehlchen.db.ranges import DBQueryRanges
 from rotkehlchen.errors.misc import InputError, RemoteError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import ChecksumEvmAddress, EVMTxHash, Timestamp, deserialize_evm_tx_hash
-from rotkehlchen.utils.misc import ts_now
+from rotkehlchen.utils.misc import get_chunks, ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.evm.structures import EvmTxReceipt
@@ -583,24 +588,39 @@ class EvmTransactions(metaclass=ABCMeta):  # noqa: B024
             if len(hash_results) == 0:
                 return  # nothing to do
 
-            for entry in hash_results:
+            def query_receipts(
+                    tx_hashes: list[EVMTxHash],
+            ) -> tuple[list[EVMTxHash], Optional[list[Optional[dict[str, Any]]]]]:
                 try:
-                    tx_receipt_data = self.evm_inquirer.get_transaction_receipt(tx_hash=entry)
+                    return tx_hashes, self.evm_inquirer.get_transaction_receipts(tx_hashes)
                 except RemoteError as e:
-                    self.msg_aggregator.add_warning(f'Failed to query information for {self.evm_inquirer.chain_name} transaction {entry.hex()} due to {e!s}. Skipping...')  # noqa: E501
-                    continue
+                    self.msg_aggregator.add_warning(f'Failed to query the receipts of {len(tx_hashes)} {self.evm_inquirer.chain_name} transactions due to {e!s}. Skipping...')  # noqa: E501
+                    return tx_hashes, None
+
+            # Each node gets at most MAX_IN_FLIGHT_REQUESTS_PER_NODE of the concurrent
+            # queries. The receipts are written as each batch arrives.
+            pool = Pool((len(self.evm_inquirer.web3_mapping) + 1) * MAX_IN_FLIGHT_REQUESTS_PER_NODE)  # noqa: E501
+            batches = get_chunks(hash_results, n=RECEIPTS_BATCH_SIZE)
+            try:
+                for tx_hashes, receipts in pool.imap_unordered(query_receipts, batches):
+                    if receipts is None:
+                        continue
+
+                    found_receipts = []
+                    for tx_hash, receipt in zip(tx_hashes, receipts):
+                        if receipt is None:
+                            self.msg_aggregator.add_warning(f'Could not find the receipt of {self.evm_inquirer.chain_name} transaction {tx_hash.hex()} in any of the nodes. Skipping...')  # noqa: E501
+                        else:
+                            found_receipts.append(receipt)
 
-                try:
                     with self.database.user_write() as write_cursor:
-                        dbevmtx.add_receipt_data(
+                        dbevmtx.add_receipts_data(
                             write_cursor=write_cursor,
                             chain_id=self.evm_inquirer.chain_id,
-                            data=tx_receipt_data,
+                            data=found_receipts,
                         )
-                except sqlcipher.IntegrityError as e:  # pylint: disable=no-member
-                    if 'UNIQUE constraint failed: evmtx_receipts.tx_hash' not in str(e):
-                        log.error(f'Failed to store transaction {entry.hex()} receipt due to {e!s}')  # noqa: E501
-                        raise  # if receipt is already added by other greenlet it's fine
+            finally:  # stop the remaining queries if writing fails or the query is killed
+                pool.kill()
 
     def add_transaction_by_hash(
             self,
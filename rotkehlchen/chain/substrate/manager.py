@@ -1,4 +1,5 @@
 import logging
+from collections import defaultdict
 from collections.abc import Iterable, Sequence
 from functools import wraps
 from http import HTTPStatus
@@ -8,6 +9,8 @@ from urllib.parse import urlparse
 
 import gevent
 import requests
+from gevent.lock import Semaphore
+from gevent.pool import Pool
 from substrateinterface import SubstrateInterface
 from substrateinterface.exceptions import BlockNotFound, SubstrateRequestException
 from websocket import WebSocketException
@@ -44,6 +47,8 @@ log = RotkehlchenLogsAdapter(logger)
 
 # Number of blocks after which to consider not synced
 SUBSTRATE_BLOCKS_THRESHOLD = 10
+# Number of System.Account storage entries requested in a single state_queryStorageAt
+SUBSTRATE_ACCOUNTS_BATCH_SIZE = 250
 
 
 class SubstrateChainProperties(NamedTuple):
@@ -70,6 +75,10 @@ def request_available_nodes(func: Callable) -> Callable:
     chain via `node_interface` (<SubstrateInterface>). Make sure `node_interface`
     is a keyword argument of the decorated instance method.
 
+    A `call_order` keyword argument can be given to the decorated method to
+    try the nodes in a different order than `available_nodes_call_order`. This
+    is how requests are split between the nodes.
+
     NB: every time a new method is decorated with this function or an existing
     one is modified, make sure its exceptions are handled as expected. It may
     require to extend the exceptions tuple of the try...except block that wraps
@@ -84,13 +93,16 @@ def request_available_nodes(func: Callable) -> Callable:
             )
 
         manager = args[0]
-        if len(manager.available_nodes_call_order) == 0:
-            raise RemoteError(f'{manager.chain} has no nodes available')
-
         args_ = args[1:]
         kwargs_ = kwargs.copy()
+        call_order = kwargs_.pop('call_order', None)
+        if call_order is None:
+            call_order = manager.available_nodes_call_order
+        if len(call_order) == 0:
+            raise RemoteError(f'{manager.chain} has no nodes available')
+
         requested_nodes = []
-        for node, node_attributes in manager.available_nodes_call_order:
+        for node, node_attributes in call_order:
             kwargs_.update({'node_interface': node_attributes.node_interface})
             try:
                 result = func(manager, *args_, **kwargs_)
@@ -155,6 +167,9 @@ class SubstrateManager():
         self.own_rpc_endpoint = own_rpc_endpoint
         self.available_node_attributes_map: DictNodeNameNodeAttributes = {}
         self.available_nodes_call_order: NodesCallOrder = []
+        # SubstrateInterface is not safe to be used concurrently. Requests that run
+        # concurrently hold the lock of the node they use, by endpoint.
+        self.node_locks: defaultdict[str, Semaphore] = defaultdict(Semaphore)
         self.chain_properties: SubstrateChainProperties
         if connect_on_startup and len(connect_at_start) != 0:
             self.attempt_connections()
@@ -332,6 +347,67 @@ class SubstrateManager():
 
         return balance
 
+    def _get_accounts_balance(
+            self,
+            accounts: Sequence[SubstrateAddress],
+            node_interface: SubstrateInterface,
+    ) -> dict[SubstrateAddress, FVal]:
+        """Given accounts get their amount of chain native token. The System.Account
+        storage entries of all the accounts are queried in a single
+        `state_queryStorageAt` request.
+        """
+        log.debug(
+            f'{self.chain} querying {self.chain_properties.token.identifier} balances',
+            url=node_interface.url,
+            accounts_num=len(accounts),
+        )
+        try:
+            with gevent.Timeout(SUBSTRATE_NODE_CONNECTION_TIMEOUT):
+                storage_keys = [
+                    node_interface.create_storage_key(
+                        pallet='System',
+                        storage_function='Account',
+                        params=[account],
+                    ) for account in accounts
+                ]
+                result = node_interface.query_multi(storage_keys)
+        except (
+                requests.exceptions.RequestException,
+                SubstrateRequestException,
+                ValueError,
+                WebSocketException,
+                gevent.Timeout,
+                BlockNotFound,
+                AttributeError,  # happens in substrate library when timeout occurs some times
+        ) as e:
+            msg = str(e)
+            if isinstance(e, gevent.Timeout):
+                msg = f'a timeout of {msg}'
+            message = (
+                f'{self.chain} failed to request {self.chain_properties.token.identifier} '
+                f'accounts balance at endpoint {node_interface.url} due to: {msg}'
+            )
+            log.error(message, accounts=accounts)
+            raise RemoteError(message) from e
+
+        storage_key_to_account = {
+            storage_key.to_hex(): account
+            for storage_key, account in zip(storage_keys, accounts)
+        }
+        balances = {account: ZERO for account in accounts}
+        for storage_key, account_info in result:
+            if account_info is None or account_info.value is None:
+                continue
+
+            account_data = account_info.value['data']
+            balances[storage_key_to_account[storage_key.to_hex()]] = (
+                FVal(account_data['free'] + account_data['reserved']) /
+                FVal('10') ** self.chain_properties.token_decimals
+            )
+
+        log.debug(f'{self.chain} accounts balance', balances=balances)
+        return balances
+
     def _get_chain_id(self, node_interface: SubstrateInterface) -> SubstrateChainId:
         """Return the chain identifier (name for substrate chains)"""
         log.debug(f'{self.chain} querying chain ID', url=node_interface.url)
@@ -555,22 +631,66 @@ class SubstrateManager():
         """
         return self._get_account_balance(account=account, node_interface=node_interface)
 
+    @request_available_nodes
+    def _request_accounts_balance(
+            self,
+            accounts: Sequence[SubstrateAddress],
+            node_interface: Optional[SubstrateInterface] = None,
+            call_order: Optional[NodesCallOrder] = None,  # pylint: disable=unused-argument  # consumed by request_available_nodes  # noqa: E501
+    ) -> dict[SubstrateAddress, FVal]:
+        """The batches are requested concurrently, and a batch may fall back to a node
+        that another batch is using. So the node is locked during the request.
+
+        May raise:
+        - RemoteError: `request_available_nodes()` fails to request after
+        trying with all the available nodes.
+        """
+        with self.node_locks[node_interface.url]:  # type: ignore[union-attr]  # node is given
+            return self._get_accounts_balance(accounts=accounts, node_interface=node_interface)
+
     def get_accounts_balance(
             self,
             accounts: Sequence[SubstrateAddress],
     ) -> dict[SubstrateAddress, FVal]:
         """Given a list of accounts get their amount of chain native token.
 
-        This method is not decorated with `request_available_nodes` on purpose,
-        so each request can use all available nodes.
+        The accounts are queried in batches of `SUBSTRATE_ACCOUNTS_BATCH_SIZE` with
+        one request each. The batches are requested concurrently and each one
+        starts from a different available node, falling back to the rest of them.
 
         May raise:
         - RemoteError: `request_available_nodes()` fails to request after
         trying with all the available nodes.
         """
-        balances: dict[SubstrateAddress, FVal] = {}
-        for account in accounts:
-            balances[account] = self.get_account_balance(account)
+        batches = [
+            accounts[x:x + SUBSTRATE_ACCOUNTS_BATCH_SIZE]
+            for x in range(0, len(accounts), SUBSTRATE_ACCOUNTS_BATCH_SIZE)
+        ]
+        if len(batches) <= 1 or len(self.available_nodes_call_order) <= 1:
+            balances: dict[SubstrateAddress, FVal] = {}
+            for batch in batches:
+                balances.update(self._request_accounts_balance(batch))
+            return balances
+
+        call_order = self.available_nodes_call_order
+
+        def request_batch(
+                idx_and_batch: tuple[int, Sequence[SubstrateAddress]],
+        ) -> dict[SubstrateAddress, FVal]:
+            idx, batch = idx_and_batch
+            first_node_idx = idx % len(call_order)
+            return self._request_accounts_balance(
+                batch,
+                call_order=call_order[first_node_idx:] + call_order[:first_node_idx],
+            )
+
+        balances = {}
+        pool = Pool(len(call_order))
+        try:
+            for batch_balances in pool.imap_unordered(request_batch, enumerate(batches)):
+                balances.update(batch_balances)
+        finally:
+            pool.kill()  # stop the remaining requests if one of them failed
 
         return balances
 
@@ -25,3 +25,5 @@ ASSET_TYPES_EXCLUDED_FOR_USERS = {AssetType.NFT}
 DEFAULT_MAX_LOG_SIZE_IN_MB = 300
 DEFAULT_MAX_LOG_BACKUP_FILES = 3
 DEFAULT_SQL_VM_INSTRUCTIONS_CB = 5000
+DEFAULT_SQL_READ_CONNECTIONS = 0  # read pool disabled
+DEFAULT_EXCHANGES_QUERY_CONCURRENCY = 4
@@ -23,4 +23,5 @@ ENS_UPDATE_INTERVAL = DAY_IN_SECONDS
 ETH_PROTOCOLS_CACHE_REFRESH = DAY_IN_SECONDS * 3
 DATA_UPDATES_REFRESH = DAY_IN_SECONDS
 EVM_ACCOUNTS_DETECTION_REFRESH = DAY_IN_SECONDS
+EVM_FULL_TOKENS_DETECTION_PERIOD = WEEK_IN_SECONDS
 ENS_AVATARS_REFRESH = DAY_IN_SECONDS
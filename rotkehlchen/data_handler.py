@@ -31,12 +31,14 @@ class DataHandler():
             data_directory: Path,
             msg_aggregator: MessagesAggregator,
             sql_vm_instructions_cb: int,
+            read_connections: int = 0,
     ):
         self.logged_in = False
         self.data_directory = data_directory
         self.username = 'no_user'
         self.msg_aggregator = msg_aggregator
         self.sql_vm_instructions_cb = sql_vm_instructions_cb
+        self.read_connections = read_connections
 
     def logout(self) -> None:
         if self.logged_in:
@@ -114,6 +116,7 @@ class DataHandler():
             msg_aggregator=self.msg_aggregator,
             initial_settings=initial_settings,
             sql_vm_instructions_cb=self.sql_vm_instructions_cb,
+            read_connections=self.read_connections,
         )
         self.user_data_dir = user_data_dir
         self.logged_in = True
@@ -224,6 +227,7 @@ class DataHandler():
         log.info('Decompress and decrypt DB')
         # First make a backup of the DB we are about to replace
         date = timestamp_to_date(ts=ts_now(), formatstr='%Y_%m_%d_%H_%M_%S', treat_as_local=True)
+        self.db.conn.checkpoint()
         shutil.copyfile(
             self.data_directory / self.username / 'rotkehlchen.db',
             self.data_directory / self.username / f'rotkehlchen_db_{date}.backup',
@@ -2,14 +2,16 @@ import abc
 import csv
 import logging
 from collections import Counter, defaultdict
+from collections.abc import Iterator
 from pathlib import Path
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 from rotkehlchen.accounting.ledger_actions import LedgerAction, LedgerActionType
 from rotkehlchen.assets.asset import AssetWithOracles
 from rotkehlchen.assets.converters import asset_from_binance
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_USD
+from rotkehlchen.constants.timing import HOUR_IN_SECONDS
 from rotkehlchen.data_import.utils import BaseExchangeImporter
 from rotkehlchen.db.drivers.gevent import DBCursor
 from rotkehlchen.errors.asset import UnknownAsset
@@ -33,11 +35,17 @@ from rotkehlchen.types import (
     TradeType,
 )
 
+if TYPE_CHECKING:
+    from rotkehlchen.db.dbhandler import DBHandler
+
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 BinanceCsvRow = dict[str, Any]
 BINANCE_TRADE_OPERATIONS = {'Buy', 'Sell', 'Fee'}
+# Binance exports the rows ordered by time but the rows of an entry are not always
+# consecutive. The rows of a timestamp are grouped until a row this far from it is read.
+BINANCE_GROUPING_WINDOW = HOUR_IN_SECONDS
 
 
 class BinanceEntry(metaclass=abc.ABCMeta):  # noqa: B024
@@ -386,34 +394,51 @@ MULTIPLE_BINANCE_ENTRIES = [
 ]
 
 
-def _group_binance_rows(
-        rows: list[BinanceCsvRow],
-        timestamp_format: str = '%Y-%m-%d %H:%M:%S',
-) -> tuple[int, dict[Timestamp, list[BinanceCsvRow]]]:
-    """Groups Binance rows by timestamp and deletes unused columns"""
-    multirows: dict[Timestamp, list[BinanceCsvRow]] = defaultdict(list)
-    skipped_count = 0
-    for csv_row in rows:
-        try:
-            timestamp = deserialize_timestamp_from_date(
-                date=csv_row['UTC_Time'],
-                formatstr=timestamp_format,
-                location='binance',
-            )
-            csv_row['Coin'] = asset_from_binance(csv_row['Coin'])
-            csv_row['Change'] = deserialize_asset_amount(csv_row['Change'])
-            multirows[timestamp].append(csv_row)
-        except (DeserializationError, UnknownAsset) as e:
-            log.warning(f'Skipped binance csv row {csv_row} because of {e!s}')
-            skipped_count += 1
-        except KeyError as e:
-            log.error(f'Malformed binance csv columns! Broke on row {csv_row}. {e!s}')
-            return len(rows), {}
+class BinanceImporter(BaseExchangeImporter):
+
+    def __init__(self, db: 'DBHandler', name: str) -> None:
+        super().__init__(db=db, name=name)
+        self.bad_format_rows = 0
 
-    return skipped_count, multirows
+    def _group_binance_rows(
+            self,
+            rows: Iterator[BinanceCsvRow],
+            timestamp_format: str = '%Y-%m-%d %H:%M:%S',
+    ) -> Iterator[tuple[Timestamp, list[BinanceCsvRow]]]:
+        """Groups Binance rows by timestamp and deletes unused columns. The rows of an entry
+        are not necessarily consecutive in the file, so a group is yielded only once a row
+        more than BINANCE_GROUPING_WINDOW seconds away from its timestamp is read. Only the
+        rows of that window are kept in memory. Rows of an entry that are further apart
+        in the file than the window end up in separate groups.
+
+        The rows with bad format are skipped and counted in self.bad_format_rows. If the
+        columns are malformed, which is found at the first row, nothing is grouped and
+        all the rows are counted.
+        """
+        pending: dict[Timestamp, list[BinanceCsvRow]] = defaultdict(list)
+        for idx, csv_row in enumerate(rows):
+            try:
+                timestamp = deserialize_timestamp_from_date(
+                    date=csv_row['UTC_Time'],
+                    formatstr=timestamp_format,
+                    location='binance',
+                )
+                csv_row['Coin'] = asset_from_binance(csv_row['Coin'])
+                csv_row['Change'] = deserialize_asset_amount(csv_row['Change'])
+            except (DeserializationError, UnknownAsset) as e:
+                log.warning(f'Skipped binance csv row {csv_row} because of {e!s}')
+                self.bad_format_rows += 1
+                continue
+            except KeyError as e:
+                log.error(f'Malformed binance csv columns! Broke on row {csv_row}. {e!s}')
+                self.bad_format_rows = idx + 1 + sum(1 for _ in rows)
+                return
 
+            pending[timestamp].append(csv_row)
+            for group_timestamp in [x for x in pending if abs(x - timestamp) > BINANCE_GROUPING_WINDOW]:  # noqa: E501
+                yield group_timestamp, pending.pop(group_timestamp)
 
-class BinanceImporter(BaseExchangeImporter):
+        yield from pending.items()
 
     def _process_single_binance_entries(
             self,
@@ -462,11 +487,11 @@ class BinanceImporter(BaseExchangeImporter):
     def _process_binance_rows(
             self,
             cursor: DBCursor,
-            multi: dict[Timestamp, list[BinanceCsvRow]],
+            multi: Iterator[tuple[Timestamp, list[BinanceCsvRow]]],
     ) -> None:
         stats: dict[BinanceEntry, int] = defaultdict(int)
         skipped_rows: list[Any] = []
-        for timestamp, rows in multi.items():
+        for timestamp, rows in multi:
             single_processed, rows_without_single = self._process_single_binance_entries(
                 cursor=cursor,
                 timestamp=timestamp,
@@ -506,6 +531,10 @@ class BinanceImporter(BaseExchangeImporter):
         log.debug(f'Total found Binance entries: {total_found}')
         log.debug(f'Total skipped Binance csv rows: {skipped_count}')
         log.debug(f'Binance import stats: {[{type(entry_class).__name__: amount} for entry_class, amount in stats.items()]}')  # noqa: E501
+        if self.bad_format_rows > 0:
+            self.db.msg_aggregator.add_warning(
+                f'{self.bad_format_rows} Binance rows have bad format. Check logs for details.',
+            )
         if skipped_count > 0:
             self.db.msg_aggregator.add_warning(
                 f'Skipped {skipped_count} rows during processing binance csv file. '
@@ -513,11 +542,9 @@ class BinanceImporter(BaseExchangeImporter):
             )
 
     def _import_csv(self, cursor: DBCursor, filepath: Path, **kwargs: Any) -> None:
-        with open(filepath, encoding='utf-8-sig') as csvfile:
-            input_rows = list(csv.DictReader(csvfile))
-            skipped_count, multirows = _group_binance_rows(rows=input_rows, **kwargs)
-            if skipped_count > 0:
-                self.db.msg_aggregator.add_warning(
-                    f'{skipped_count} Binance rows have bad format. Check logs for details.',
-                )
-            self._process_binance_rows(cursor, multirows)
+        self.bad_format_rows = 0
+        with self._open_csv(filepath) as csvfile:
+            self._process_binance_rows(
+                cursor=cursor,
+                multi=self._group_binance_rows(rows=csv.DictReader(csvfile), **kwargs),
+            )
@@ -93,7 +93,7 @@ class BisqTradesImporter(BaseExchangeImporter):
         May raise:
         - InputError if one of the rows is malformed
         """
-        with open(filepath, encoding='utf-8-sig') as csvfile:
+        with self._open_csv(filepath) as csvfile:
             data = csv.DictReader(csvfile)
             for row in data:
                 try:
@@ -18,7 +18,6 @@ from rotkehlchen.serialization.deserialize import (
 )
 from rotkehlchen.types import Location, Price, TradeType
 
-
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
@@ -72,7 +71,7 @@ class BlockfiTradesImporter(BaseExchangeImporter):
         May raise:
         - InputError if one of the rows is malformed
         """
-        with open(filepath, encoding='utf-8-sig') as csvfile:
+        with self._open_csv(filepath) as csvfile:
             data = csv.DictReader(csvfile)
             for row in data:
                 try:
@@ -76,8 +76,8 @@ def exchange_row_to_location(entry: str) -> Location:
 
 class CointrackingImporter(BaseExchangeImporter):
 
-    def __init__(self, db: 'DBHandler') -> None:
-        super().__init__(db=db)
+    def __init__(self, db: 'DBHandler', name: str) -> None:
+        super().__init__(db=db, name=name)
         self.usd = A_USD.resolve_to_asset_with_oracles()
 
     def _consume_cointracking_entry(
@@ -183,7 +183,7 @@ class CointrackingImporter(BaseExchangeImporter):
         """May raise:
         - InputError if one of the rows is malformed
         """
-        with open(filepath, encoding='utf-8-sig') as csvfile:
+        with self._open_csv(filepath) as csvfile:
             data = csv.reader(csvfile, delimiter=',', quotechar='"')
             header = remap_header(next(data))
             for row in data:
@@ -504,7 +504,7 @@ class CryptocomImporter(BaseExchangeImporter):
         """May raise:
         - InputError if one of the rows is malformed
         """
-        with open(filepath, encoding='utf-8-sig') as csvfile:
+        with self._open_csv(filepath) as csvfile:
             data = csv.DictReader(csvfile)
             try:
                 #  Notice: Crypto.com csv export gathers all swapping entries (`lockup_swap_*`,
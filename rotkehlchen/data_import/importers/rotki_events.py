@@ -89,7 +89,7 @@ class RotkiGenericEventsImporter(BaseExchangeImporter):
         """May raise:
         - InputError if one of the rows is malformed
         """
-        with open(filepath, encoding='utf-8-sig') as csvfile:
+        with self._open_csv(filepath) as csvfile:
             data = csv.DictReader(csvfile)
             for idx, row in enumerate(data):
                 try:
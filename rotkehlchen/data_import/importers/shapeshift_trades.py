@@ -31,8 +31,8 @@ SAI_TIMESTAMP = 1574035200
 
 class ShapeshiftTradesImporter(BaseExchangeImporter):
 
-    def __init__(self, db: 'DBHandler'):
-        super().__init__(db=db)
+    def __init__(self, db: 'DBHandler', name: str):
+        super().__init__(db=db, name=name)
         self.sai = A_SAI.resolve_to_evm_token()
 
     def _consume_shapeshift_trade(
@@ -110,7 +110,7 @@ Trade from ShapeShift with ShapeShift Deposit Address:
         May raise:
         - InputError if one of the rows is malformed
         """
-        with open(filepath, encoding='utf-8-sig') as csvfile:
+        with self._open_csv(filepath) as csvfile:
             data = csv.DictReader(csvfile)
             for row in data:
                 try:
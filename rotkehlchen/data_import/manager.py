@@ -70,6 +70,6 @@ class CSVDataImporter:
         """Imports csv data from `filepath`.`source` determines the format of the file.
         Returns (True, '') if imported successfully and (False, message) otherwise."""
         importer_type = source.get_importer_type()
-        importer = importer_type(db=self.db)
+        importer = importer_type(db=self.db, name=str(source))
         success, msg = importer.import_csv(filepath=filepath, **kwargs)
         return success, msg
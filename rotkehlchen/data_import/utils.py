@@ -1,9 +1,13 @@
+import os
 from abc import ABCMeta, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional, TextIO
 
 from rotkehlchen.accounting.ledger_actions import LedgerAction
 from rotkehlchen.accounting.structures.base import HistoryBaseEntry
+from rotkehlchen.api.websockets.typedefs import WSMessageType
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.db.drivers.gevent import DBCursor
 from rotkehlchen.db.history_events import DBHistoryEvents
@@ -15,14 +19,23 @@ ITEMS_PER_DB_WRITE = 400
 
 
 class BaseExchangeImporter(metaclass=ABCMeta):
-    def __init__(self, db: DBHandler) -> None:
+    """Imports the entries of a csv file. The rows of the file are read one by one
+    and the entries created from them are written to the DB in chunks of
+    ITEMS_PER_DB_WRITE, so the memory used does not depend on the size of the file.
+    The progress is reported to the frontend after each written chunk."""
+
+    def __init__(self, db: DBHandler, name: str) -> None:
         self.db = db
+        self.name = name
         self.db_ledger = DBLedgerActions(self.db, self.db.msg_aggregator)
         self.history_db = DBHistoryEvents(self.db)
         self._trades: list[Trade] = []
         self._asset_movements: list[AssetMovement] = []
         self._ledger_actions: list[LedgerAction] = []
         self._history_events: list[HistoryBaseEntry] = []
+        self.imported_entries = 0
+        self._csvfile: Optional[TextIO] = None
+        self._csvfile_size = 0
 
     def import_csv(self, filepath: Path, **kwargs: Any) -> tuple[bool, str]:
         try:
@@ -34,6 +47,33 @@ class BaseExchangeImporter(metaclass=ABCMeta):
         else:
             return True, ''
 
+    @contextmanager
+    def _open_csv(self, filepath: Path) -> Iterator[TextIO]:
+        """Opens the csv file to import. Importers should read it through this so that
+        the read part of the file can be reported as the progress of the import."""
+        with open(filepath, encoding='utf-8-sig') as csvfile:
+            self._csvfile = csvfile
+            self._csvfile_size = os.fstat(csvfile.fileno()).st_size
+            try:
+                yield csvfile
+            finally:
+                self._csvfile = None
+
+    def _notify_progress(self) -> None:
+        if self._csvfile is not None:  # the text wrapper can't tell while iterated
+            processed_bytes = min(self._csvfile.buffer.tell(), self._csvfile_size)
+        else:
+            processed_bytes = self._csvfile_size
+        self.db.msg_aggregator.add_message(
+            message_type=WSMessageType.CSV_IMPORT_STATUS,
+            data={
+                'source': self.name,
+                'imported_entries': self.imported_entries,
+                'processed_bytes': processed_bytes,
+                'total_bytes': self._csvfile_size,
+            },
+        )
+
     @abstractmethod
     def _import_csv(self, cursor: DBCursor, filepath: Path, **kwargs: Any) -> None:
         """The method that processes csv. Should be implemented by subclasses.
@@ -62,14 +102,17 @@ class BaseExchangeImporter(metaclass=ABCMeta):
             self._flush_all(cursor)
 
     def _flush_all(self, cursor: DBCursor) -> None:
+        """Writes the pending entries to the DB, each type with a single executemany"""
         self.db.add_trades(cursor, trades=self._trades)
         self.db.add_asset_movements(cursor, asset_movements=self._asset_movements)
         self.db_ledger.add_ledger_actions(cursor, actions=self._ledger_actions)
         self.history_db.add_history_events(cursor, history=self._history_events)
+        self.imported_entries += len(self._trades) + len(self._asset_movements) + len(self._ledger_actions) + len(self._history_events)  # noqa: E501
         self._trades = []
         self._asset_movements = []
         self._ledger_actions = []
         self._history_events = []
+        self._notify_progress()
 
 
 class UnsupportedCSVEntry(Exception):
@@ -1,3 +1,5 @@
+from rotkehlchen.constants.timing import DAY_IN_SECONDS, WEEK_IN_SECONDS
+
 KRAKEN_ACCOUNT_TYPE_KEY = 'kraken_account_type'
 BINANCE_MARKETS_KEY = 'binance_selected_trade_pairs'
 USER_CREDENTIAL_MAPPING_KEYS = (KRAKEN_ACCOUNT_TYPE_KEY, BINANCE_MARKETS_KEY)
@@ -10,3 +12,11 @@ HISTORY_MAPPING_STATE_CUSTOMIZED = 1
 
 EVM_ACCOUNTS_DETAILS_LAST_QUERIED_TS = 'last_queried_timestamp'
 EVM_ACCOUNTS_DETAILS_TOKENS = 'tokens'
+EVM_ACCOUNTS_DETAILS_LAST_FULL_DETECTION_TS = 'last_full_detection_timestamp'
+EVM_ACCOUNTS_DETAILS_LAST_CHECKED_TOKEN = 'last_checked_token'
+
+# -- balances rollups --
+# Bucket lengths in seconds of the downsampled balance snapshots, from finest to coarsest
+BALANCES_ROLLUP_RESOLUTIONS = (DAY_IN_SECONDS, WEEK_IN_SECONDS)
+# The balance graphs use the finest resolution with at most this many points in the range
+MAX_GRAPH_POINTS = 1000
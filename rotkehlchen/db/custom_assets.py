@@ -5,6 +5,7 @@ from rotkehlchen.assets.types import AssetType
 from rotkehlchen.db.filtering import CustomAssetsFilterQuery
 from rotkehlchen.errors.misc import InputError
 from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.globaldb.utils import update_asset_search_trigrams
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
@@ -64,6 +65,7 @@ class DBCustomAssets:
                 'INSERT INTO custom_assets(identifier, type, notes) VALUES(?, ?, ?)',
                 custom_asset.serialize_for_db(),
             )
+            update_asset_search_trigrams(global_db_write_cursor, [custom_asset.identifier])
             with self.db.user_write() as db_write_cursor:
                 self.db.add_asset_identifiers(db_write_cursor, [custom_asset.identifier])
         return custom_asset.identifier
@@ -93,6 +95,8 @@ class DBCustomAssets:
                     f'{custom_asset.name} but it was not found',
                 )
 
+            update_asset_search_trigrams(write_cursor, [custom_asset.identifier])
+
     @staticmethod
     def _raise_if_custom_asset_exists(custom_asset: CustomAsset) -> None:
         """
@@ -47,12 +47,17 @@ from rotkehlchen.constants.limits import (
     FREE_USER_NOTES_LIMIT,
 )
 from rotkehlchen.constants.misc import NFT_DIRECTIVE, ONE, ZERO
+from rotkehlchen.constants.resolver import EVM_CHAIN_DIRECTIVE
 from rotkehlchen.constants.timing import HOUR_IN_SECONDS
 from rotkehlchen.db.constants import (
+    BALANCES_ROLLUP_RESOLUTIONS,
     BINANCE_MARKETS_KEY,
+    EVM_ACCOUNTS_DETAILS_LAST_CHECKED_TOKEN,
+    EVM_ACCOUNTS_DETAILS_LAST_FULL_DETECTION_TS,
     EVM_ACCOUNTS_DETAILS_LAST_QUERIED_TS,
     EVM_ACCOUNTS_DETAILS_TOKENS,
     KRAKEN_ACCOUNT_TYPE_KEY,
+    MAX_GRAPH_POINTS,
     USER_CREDENTIAL_MAPPING_KEYS,
 )
 from rotkehlchen.db.drivers.gevent import DBConnection, DBConnectionType, DBCursor
@@ -130,7 +135,7 @@ from rotkehlchen.types import (
 )
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.hashing import file_md5
-from rotkehlchen.utils.misc import ts_now
+from rotkehlchen.utils.misc import get_chunks, ts_now
 from rotkehlchen.utils.serialization import rlk_jsondumps
 
 logger = logging.getLogger(__name__)
@@ -140,6 +145,8 @@ KDF_ITER = 64000
 DBINFO_FILENAME = 'dbinfo.json'
 MAIN_DB_NAME = 'rotkehlchen.db'
 TRANSIENT_DB_NAME = 'rotkehlchen_transient.db'
+# Max number of values bound to a single IN (...) filter. Below sqlite's variables limit
+MAX_IN_FILTER_VALUES = 500
 
 
 # Tuples that contain first the name of a table and then the columns that
@@ -158,6 +165,14 @@ TABLES_WITH_ASSETS = (
 )
 
 
+def _rollup_buckets(timestamps: Iterable[Timestamp]) -> set[tuple[int, Timestamp]]:
+    """Returns the (resolution, bucket start) of the rollup buckets containing the timestamps"""
+    return {
+        (resolution, Timestamp(timestamp - timestamp % resolution))
+        for timestamp in timestamps for resolution in BALANCES_ROLLUP_RESOLUTIONS
+    }
+
+
 DB_BACKUP_RE = re.compile(r'(\d+)_rotkehlchen_db_v(\d+).backup')
 
 
@@ -180,9 +195,13 @@ class DBHandler:
             msg_aggregator: MessagesAggregator,
             initial_settings: Optional[ModifiableDBSettings],
             sql_vm_instructions_cb: int,
+            read_connections: int = 0,
     ):
         """Database constructor
 
+        If read_connections is not zero the user DB runs in WAL mode and reads are
+        served by that many read-only connections. Check DBConnection.enable_read_pool.
+
         May raise:
         - DBUpgradeError if the rotki DB version is newer than the software or
         there is a DB upgrade and there is an error or if the version is older
@@ -194,6 +213,7 @@ class DBHandler:
         self.msg_aggregator = msg_aggregator
         self.user_data_dir = user_data_dir
         self.sql_vm_instructions_cb = sql_vm_instructions_cb
+        self.read_connections = read_connections
         self.sqlcipher_version = detect_sqlcipher_version()
         self.setting_to_default_type = {
             'version': (int, ROTKEHLCHEN_DB_VERSION),
@@ -319,6 +339,22 @@ class DBHandler:
             self.conn_transient.commit()
 
         self.conn.schema_sanity_check()
+        # enabled only now since the upgrades backup the DB by copying its file
+        self._enable_read_pool()
+
+    def _key_script(self) -> str:
+        password_for_sqlcipher = _protect_password_sqlcipher(self.password)
+        script = f'PRAGMA key="{password_for_sqlcipher}";'
+        if self.sqlcipher_version == 3:
+            script += f'PRAGMA kdf_iter={KDF_ITER};'
+        return script
+
+    def _enable_read_pool(self) -> None:
+        if self.read_connections != 0:
+            self.conn.enable_read_pool(
+                pool_size=self.read_connections,
+                connect_script=self._key_script(),
+            )
 
     def get_md5hash(self, transient: bool = False) -> str:
         """Get the md5hash of the DB
@@ -416,12 +452,8 @@ class DBHandler:
                 f'Could not open database file: {fullpath}. Permission errors?',
             ) from e
 
-        password_for_sqlcipher = _protect_password_sqlcipher(self.password)
-        script = f'PRAGMA key="{password_for_sqlcipher}";'
-        if self.sqlcipher_version == 3:
-            script += f'PRAGMA kdf_iter={KDF_ITER};'
         try:
-            conn.executescript(script)
+            conn.executescript(self._key_script())
             conn.execute('PRAGMA foreign_keys=ON')
             # Optimizations for the combined trades view
             # the following will fail with DatabaseError in case of wrong password.
@@ -463,12 +495,14 @@ class DBHandler:
 
     def change_password(self, new_password: str) -> bool:
         """Changes the password for the currently logged in user"""
+        self.conn.disable_read_pool()  # the readers are keyed with the old password
         result = (
             self._change_password(new_password, 'conn') and
             self._change_password(new_password, 'conn_transient')
         )
         if result is True:
             self.password = new_password
+        self._enable_read_pool()
         return result
 
     def disconnect(self, conn_attribute: Literal['conn', 'conn_transient'] = 'conn') -> None:
@@ -730,6 +764,24 @@ class DBHandler:
                 'or an entry for the given timestamp already exists',
             ) from e
 
+        self.update_timed_balances_rollups(write_cursor, {balance.time for balance in balances})
+
+    def update_timed_balances_rollups(self, write_cursor: 'DBCursor', timestamps: Iterable[Timestamp]) -> None:  # noqa: E501
+        """Recomputes the balances rollups of the buckets that contain the given timestamps.
+        Each bucket keeps the balances of the last snapshot taken within it."""
+        for resolution, bucket in _rollup_buckets(timestamps):
+            write_cursor.execute(
+                'DELETE FROM timed_balances_rollups WHERE resolution=? AND bucket=?',
+                (resolution, bucket),
+            )
+            write_cursor.execute(
+                'INSERT INTO timed_balances_rollups(resolution, bucket, timestamp, category, '
+                'currency, amount, usd_value) SELECT ?, ?, timestamp, category, currency, amount, '
+                'usd_value FROM timed_balances WHERE timestamp=(SELECT MAX(timestamp) FROM '
+                'timed_balances WHERE timestamp BETWEEN ? AND ?)',
+                (resolution, bucket, bucket, bucket + resolution - 1),
+            )
+
     def add_aave_events(self, write_cursor: 'DBCursor', address: ChecksumEvmAddress, events: Sequence[AaveEvent]) -> None:  # noqa: E501
         for e in events:
             event_tuple = e.to_db_tuple(address)
@@ -996,6 +1048,10 @@ class DBHandler:
 
     def purge_exchange_data(self, write_cursor: 'DBCursor', location: Location) -> None:
         self.delete_used_query_range_for_exchange(write_cursor=write_cursor, location=location)
+        write_cursor.execute(
+            'DELETE FROM binance_trades_cursors WHERE location = ?;',
+            (location.serialize_for_db(),),
+        )
         write_cursor.execute(
             'DELETE FROM trades WHERE location = ?;',
             (location.serialize_for_db(),),
@@ -1053,6 +1109,27 @@ class DBHandler:
                     f' already existing timestamp {entry.time}.',
                 ) from e
 
+        self.update_timed_location_data_rollups(write_cursor, {entry.time for entry in location_data})  # noqa: E501
+
+    def update_timed_location_data_rollups(self, write_cursor: 'DBCursor', timestamps: Iterable[Timestamp]) -> None:  # noqa: E501
+        """Recomputes the location data rollups of the buckets that contain the given
+        timestamps. Each bucket keeps the location data of the last snapshot taken within it
+        and the number of snapshots taken within it."""
+        for resolution, bucket in _rollup_buckets(timestamps):
+            write_cursor.execute(
+                'DELETE FROM timed_location_data_rollups WHERE resolution=? AND bucket=?',
+                (resolution, bucket),
+            )
+            bucket_end = bucket + resolution - 1
+            write_cursor.execute(
+                'INSERT INTO timed_location_data_rollups(resolution, bucket, timestamp, location, '
+                'usd_value, snapshots) SELECT ?, ?, timestamp, location, usd_value, (SELECT '
+                'COUNT(DISTINCT timestamp) FROM timed_location_data WHERE timestamp BETWEEN ? AND '
+                '?) FROM timed_location_data WHERE timestamp=(SELECT MAX(timestamp) FROM '
+                'timed_location_data WHERE timestamp BETWEEN ? AND ?)',
+                (resolution, bucket, bucket, bucket_end, bucket, bucket_end),
+            )
+
     def add_blockchain_accounts(
             self,
             write_cursor: 'DBCursor',
@@ -1206,17 +1283,69 @@ class DBHandler:
 
         return returned_list, last_queried_ts
 
+    def get_token_detection_marks(
+            self,
+            cursor: 'DBCursor',
+            address: ChecksumEvmAddress,
+            blockchain: SupportedBlockchain,
+    ) -> tuple[Optional[Timestamp], Optional[int]]:
+        """Returns the time of the last full token detection of the address and the rowid
+        of the last global DB token that was checked for it. None for what is not saved."""
+        marks: dict[str, int] = dict(cursor.execute(
+            'SELECT key, value FROM evm_accounts_details WHERE account=? AND chain_id=? AND '
+            'key IN (?, ?)',
+            (
+                address,
+                blockchain.to_chain_id().serialize_for_db(),
+                EVM_ACCOUNTS_DETAILS_LAST_FULL_DETECTION_TS,
+                EVM_ACCOUNTS_DETAILS_LAST_CHECKED_TOKEN,
+            ),
+        ))
+        last_full_detection_ts = marks.get(EVM_ACCOUNTS_DETAILS_LAST_FULL_DETECTION_TS)
+        last_checked_token = marks.get(EVM_ACCOUNTS_DETAILS_LAST_CHECKED_TOKEN)
+        return (
+            Timestamp(int(last_full_detection_ts)) if last_full_detection_ts is not None else None,  # noqa: E501
+            int(last_checked_token) if last_checked_token is not None else None,
+        )
+
+    def get_transferred_tokens(
+            self,
+            cursor: 'DBCursor',
+            addresses: Sequence[ChecksumEvmAddress],
+            chain_id: ChainID,
+    ) -> dict[ChecksumEvmAddress, set[str]]:
+        """Returns the identifiers of the tokens of the chain that appear in the history
+        events of each of the given addresses"""
+        transferred_tokens: dict[ChecksumEvmAddress, set[str]] = {x: set() for x in addresses}
+        for chunk in get_chunks(list(transferred_tokens), n=MAX_IN_FILTER_VALUES):
+            cursor.execute(
+                f'SELECT DISTINCT location_label, asset FROM history_events WHERE '
+                f'location_label IN ({",".join("?" * len(chunk))}) AND asset LIKE ?',
+                (*chunk, f'{EVM_CHAIN_DIRECTIVE}:{chain_id.value}/%'),
+            )
+            for address, asset in cursor:
+                transferred_tokens[address].add(asset)
+
+        return transferred_tokens
+
     def save_tokens_for_address(
             self,
             write_cursor: 'DBCursor',
             address: ChecksumEvmAddress,
             blockchain: SupportedBlockchain,
             tokens: list[EvmToken],
+            full_detection: bool = False,
+            last_checked_token: Optional[int] = None,
     ) -> None:
-        """Saves detected tokens for an address"""
+        """Saves detected tokens for an address
+
+        If full_detection is True all the tokens of the chain were checked and this is
+        saved as the time of the last full detection. If last_checked_token is given it's
+        saved as the rowid of the last global DB token that was checked.
+        """
         now = ts_now()
         chain_id = blockchain.to_chain_id().serialize_for_db()
-        insert_rows: list[tuple[ChecksumEvmAddress, int, str, Union[str, Timestamp]]] = [
+        insert_rows: list[tuple[ChecksumEvmAddress, int, str, Union[str, int]]] = [
             (
                 address,
                 chain_id,
@@ -1234,10 +1363,19 @@ class DBHandler:
                 now,
             ),
         )
+        keys = [EVM_ACCOUNTS_DETAILS_TOKENS, EVM_ACCOUNTS_DETAILS_LAST_QUERIED_TS]
+        for key, value in (
+                (EVM_ACCOUNTS_DETAILS_LAST_FULL_DETECTION_TS, now if full_detection else None),
+                (EVM_ACCOUNTS_DETAILS_LAST_CHECKED_TOKEN, last_checked_token),
+        ):
+            if value is not None:
+                keys.append(key)
+                insert_rows.append((address, chain_id, key, value))
         # Delete previous entries for tokens
         write_cursor.execute(
-            'DELETE FROM evm_accounts_details WHERE account=? AND chain_id=? AND KEY IN(?, ?)',
-            (address, chain_id, EVM_ACCOUNTS_DETAILS_TOKENS, EVM_ACCOUNTS_DETAILS_LAST_QUERIED_TS),
+            f'DELETE FROM evm_accounts_details WHERE account=? AND chain_id=? AND '
+            f'KEY IN({",".join("?" * len(keys))})',
+            (address, chain_id, *keys),
         )
         # Insert new values
         write_cursor.executemany(
@@ -1595,12 +1733,20 @@ class DBHandler:
                 'UPDATE history_events SET location_label=? WHERE location=? AND location_label=?',  # noqa: E501
                 (new_name, location.serialize_for_db(), name),
             )
+            write_cursor.execute(
+                'UPDATE binance_trades_cursors SET name=? WHERE location=? AND name=?',
+                (new_name, location.serialize_for_db(), name),
+            )
 
     def remove_exchange(self, write_cursor: 'DBCursor', name: str, location: Location) -> None:
         write_cursor.execute(
             'DELETE FROM user_credentials WHERE name=? AND location=?',
             (name, location.serialize_for_db()),
         )
+        write_cursor.execute(
+            'DELETE FROM binance_trades_cursors WHERE name=? AND location=?',
+            (name, location.serialize_for_db()),
+        )
 
     def get_exchange_credentials(
             self,
@@ -1700,6 +1846,39 @@ class DBHandler:
                 return json.loads(data[0])
             return []
 
+    def get_binance_trades_cursors(
+            self,
+            cursor: 'DBCursor',
+            name: str,
+            location: Location,
+    ) -> dict[str, tuple[int, Timestamp]]:
+        """Gets the id to continue from and until when trades were queried for each market
+        of a specific binance exchange"""
+        cursor.execute(
+            'SELECT symbol, next_id, end_ts FROM binance_trades_cursors '
+            'WHERE name=? AND location=?',
+            (name, location.serialize_for_db()),
+        )
+        return {symbol: (next_id, Timestamp(end_ts)) for symbol, next_id, end_ts in cursor}
+
+    def set_binance_trades_cursors(
+            self,
+            write_cursor: 'DBCursor',
+            name: str,
+            location: Location,
+            cursors: dict[str, tuple[int, Timestamp]],
+    ) -> None:
+        """Sets the id to continue from and until when trades were queried for the given
+        markets of a specific binance exchange"""
+        write_cursor.executemany(
+            'INSERT OR REPLACE INTO binance_trades_cursors(name, location, symbol, next_id, end_ts) '  # noqa: E501
+            'VALUES (?, ?, ?, ?, ?)',
+            [
+                (name, location.serialize_for_db(), symbol, next_id, end_ts)
+                for symbol, (next_id, end_ts) in cursors.items()
+            ],
+        )
+
     def write_tuples(
             self,
             write_cursor: 'DBCursor',
@@ -1820,13 +1999,25 @@ class DBHandler:
 
         The returned list is ordered from oldest to newest
         """
+        return list(self.iterate_margin_positions(cursor, from_ts=from_ts, to_ts=to_ts, location=location))  # noqa: E501
+
+    def iterate_margin_positions(
+            self,
+            cursor: 'DBCursor',
+            from_ts: Optional[Timestamp] = None,
+            to_ts: Optional[Timestamp] = None,
+            location: Optional[Location] = None,
+    ) -> Iterator[MarginPosition]:
+        """Same as get_margin_positions but deserializes the margin positions lazily
+        while the given cursor is consumed"""
         query = 'SELECT * FROM margin_positions '
         if location is not None:
             query += f'WHERE location="{location.serialize_for_db()}" '
         query, bindings = form_query_to_filter_timestamps(query, 'close_time', from_ts, to_ts)
+        # positions closed at the same time come in a stable order
+        query = query.removesuffix(';') + ', location ASC, id ASC;'
         results = cursor.execute(query, bindings)
 
-        margin_positions = []
         for result in results:
             try:
                 margin = MarginPosition.deserialize_from_db(result)
@@ -1842,9 +2033,7 @@ class DBHandler:
                     f'Unknown asset {e.identifier} found',
                 )
                 continue
-            margin_positions.append(margin)
-
-        return margin_positions
+            yield margin
 
     def add_asset_movements(self, write_cursor: 'DBCursor', asset_movements: list[AssetMovement]) -> None:  # noqa: E501
         movement_tuples: list[tuple[Any, ...]] = []
@@ -1907,6 +2096,16 @@ class DBHandler:
 
         Returned list is ordered according to the passed filter query
         """
+        return list(self.iterate_asset_movements(cursor, filter_query=filter_query, has_premium=has_premium))  # noqa: E501
+
+    def iterate_asset_movements(
+            self,
+            cursor: 'DBCursor',
+            filter_query: AssetMovementsFilterQuery,
+            has_premium: bool,
+    ) -> Iterator[AssetMovement]:
+        """Same as get_asset_movements but deserializes the asset movements lazily
+        while the given cursor is consumed"""
         query, bindings = filter_query.prepare()
         if has_premium:
             query = 'SELECT * from asset_movements ' + query
@@ -1915,7 +2114,6 @@ class DBHandler:
             query = 'SELECT * FROM (SELECT * from asset_movements ORDER BY timestamp DESC LIMIT ?) ' + query  # noqa: E501
             results = cursor.execute(query, [FREE_ASSET_MOVEMENTS_LIMIT] + bindings)
 
-        asset_movements = []
         for result in results:
             try:
                 movement = AssetMovement.deserialize_from_db(result)
@@ -1931,9 +2129,7 @@ class DBHandler:
                     f'Unknown asset {e.identifier} found',
                 )
                 continue
-            asset_movements.append(movement)
-
-        return asset_movements
+            yield movement
 
     def get_entries_count(
             self,
@@ -2097,6 +2293,16 @@ class DBHandler:
         """Returns a list of trades optionally filtered by various filters.
 
         The returned list is ordered according to the passed filter query"""
+        return list(self.iterate_trades(cursor, filter_query=filter_query, has_premium=has_premium))  # noqa: E501
+
+    def iterate_trades(
+            self,
+            cursor: 'DBCursor',
+            filter_query: TradesFilterQuery,
+            has_premium: bool,
+    ) -> Iterator[Trade]:
+        """Same as get_trades but deserializes the trades lazily while the given
+        cursor is consumed"""
         query, bindings = filter_query.prepare()
         if has_premium:
             query = 'SELECT * from trades ' + query
@@ -2105,7 +2311,6 @@ class DBHandler:
             query = 'SELECT * FROM (SELECT * from trades ORDER BY timestamp DESC LIMIT ?) ' + query  # noqa: E501
             results = cursor.execute(query, [FREE_TRADES_LIMIT] + bindings)
 
-        trades = []
         for result in results:
             try:
                 trade = Trade.deserialize_from_db(result)
@@ -2120,9 +2325,7 @@ class DBHandler:
                     f'Unknown asset {e.identifier} found',
                 )
                 continue
-            trades.append(trade)
-
-        return trades
+            yield trade
 
     def delete_trades(self, write_cursor: 'DBCursor', trades_ids: list[str]) -> None:
         """Removes trades from the database using their `trade_id`.
@@ -2184,25 +2387,56 @@ class DBHandler:
 
         return credentials
 
+    def _get_graph_resolution(self, cursor: 'DBCursor', from_ts: Timestamp, to_ts: Timestamp) -> Optional[int]:  # noqa: E501
+        """Picks the resolution of the balance graphs for the given range. That is the finest
+        of the raw snapshots and the rollups with at most MAX_GRAPH_POINTS points in the range.
+
+        Returns None for the raw snapshots or the bucket length of the rollups to use."""
+        cursor.execute(
+            'SELECT resolution, COUNT(*), SUM(snapshots) FROM timed_location_data_rollups '
+            'WHERE location=? AND timestamp BETWEEN ? AND ? GROUP BY resolution',
+            (Location.TOTAL.serialize_for_db(), from_ts, to_ts),  # pylint: disable=no-member
+        )
+        points, snapshots = {}, 0
+        for resolution, count, resolution_snapshots in cursor:
+            points[resolution] = count
+            if resolution == BALANCES_ROLLUP_RESOLUTIONS[0]:
+                snapshots = resolution_snapshots
+        if snapshots <= MAX_GRAPH_POINTS:
+            return None
+
+        for resolution in BALANCES_ROLLUP_RESOLUTIONS:
+            if points.get(resolution, 0) <= MAX_GRAPH_POINTS:
+                return resolution
+        return BALANCES_ROLLUP_RESOLUTIONS[-1]
+
     def get_netvalue_data(
             self,
             from_ts: Timestamp,
             include_nfts: bool = True,
     ) -> tuple[list[str], list[str]]:
-        """Get all entries of net value data from the DB"""
+        """Get the net value data from the DB, downsampled to the graph's resolution"""
         with self.conn.read_ctx() as cursor:
+            resolution = self._get_graph_resolution(cursor, from_ts, ts_now())
+            bindings: list[int] = [from_ts]
+            if resolution is None:
+                table, condition = 'timed_location_data', ''
+            else:
+                table, condition = 'timed_location_data_rollups', 'resolution=? AND '
+                bindings.insert(0, resolution)
             # Get the total location ("H") entries in ascending time
             cursor.execute(
-                'SELECT timestamp, usd_value FROM timed_location_data '
-                'WHERE location="H" AND timestamp >= ? ORDER BY timestamp ASC;',
-                (from_ts,),
+                f'SELECT timestamp, usd_value FROM {table} '
+                f'WHERE {condition}location="H" AND timestamp >= ? ORDER BY timestamp ASC;',
+                bindings,
             )
             if not include_nfts:
                 with self.conn.read_ctx() as nft_cursor:
                     nft_cursor.execute(
-                        'SELECT timestamp, SUM(usd_value) FROM timed_balances WHERE '
-                        'timestamp >= ? AND currency LIKE ? GROUP BY timestamp',
-                        (from_ts, f'{NFT_DIRECTIVE}%'),
+                        'SELECT timestamp, SUM(usd_value) FROM timed_balances WHERE timestamp IN '
+                        f'(SELECT timestamp FROM {table} WHERE {condition}location="H" AND '
+                        'timestamp >= ?) AND currency LIKE ? GROUP BY timestamp',
+                        (*bindings, f'{NFT_DIRECTIVE}%'),
                     )
                     nft_values = dict(nft_cursor)
 
@@ -2225,7 +2459,8 @@ class DBHandler:
             from_ts: Optional[Timestamp] = None,
             to_ts: Optional[Timestamp] = None,
     ) -> list[SingleDBAssetBalance]:
-        """Query all balance entries for an asset and balance type within a range of timestamps
+        """Query all balance entries for an asset and balance type within a range of timestamps.
+        Long ranges are queried from the daily or weekly rollups of the snapshots.
         """
         if from_ts is None:
             from_ts = Timestamp(0)
@@ -2233,12 +2468,21 @@ class DBHandler:
             to_ts = ts_now()
 
         settings = self.get_settings(cursor)
-        querystr = (
-            'SELECT timestamp, amount, usd_value, category FROM timed_balances '
-            'WHERE timestamp BETWEEN ? AND ? AND currency=?'
-        )
-        bindings = [from_ts, to_ts, asset.identifier]
+        resolution = self._get_graph_resolution(cursor, from_ts, to_ts)
+        if resolution is None:
+            querystr = 'SELECT timestamp, amount, usd_value, category FROM timed_balances WHERE '
+            bindings: list[Union[int, str]] = []
+            interval = settings.balance_save_frequency * HOUR_IN_SECONDS
+        else:
+            querystr = (
+                'SELECT timestamp, amount, usd_value, category FROM timed_balances_rollups '
+                'WHERE resolution=? AND '
+            )
+            bindings = [resolution]
+            interval = resolution
 
+        querystr += 'timestamp BETWEEN ? AND ? AND currency=?'
+        bindings.extend((from_ts, to_ts, asset.identifier))
         if settings.treat_eth2_as_eth and asset.identifier == 'ETH':
             querystr = querystr.replace('currency=?', 'currency IN (?,?)')
             bindings.append('ETH2')
@@ -2251,6 +2495,7 @@ class DBHandler:
         results = cursor.fetchall()
         balances = []
         results_length = len(results)
+        max_diff = interval * settings.ssf_graph_multiplier
         for idx, result in enumerate(results):
             entry_time = result[0]
             category = BalanceType.deserialize_from_db(result[3])
@@ -2266,9 +2511,8 @@ class DBHandler:
                 continue
 
             next_result_time = results[idx + 1][0]
-            max_diff = settings.balance_save_frequency * HOUR_IN_SECONDS * settings.ssf_graph_multiplier  # noqa: E501
             while next_result_time - entry_time > max_diff:
-                entry_time = entry_time + settings.balance_save_frequency * HOUR_IN_SECONDS
+                entry_time = entry_time + interval
                 if entry_time >= next_result_time:
                     break
 
@@ -2912,6 +3156,42 @@ class DBHandler:
                 # mapping already exists
                 continue
 
+    def get_xpub_derived_addresses(
+            self,
+            cursor: 'DBCursor',
+            xpub_data: XpubData,
+    ) -> dict[tuple[int, int], BTCAddress]:
+        """Get all the cached addresses derived from the xpub, keyed by the
+        (account_index, derived_index) they were derived at"""
+        cursor.execute(
+            'SELECT account_index, derived_index, address FROM xpub_derived_addresses '
+            'WHERE xpub=? AND derivation_path=? AND blockchain=?',
+            (
+                xpub_data.xpub.xpub,
+                xpub_data.serialize_derivation_path_for_db(),
+                xpub_data.blockchain.value,
+            ),
+        )
+        return {(x[0], x[1]): x[2] for x in cursor}
+
+    def add_xpub_derived_addresses(
+            self,
+            write_cursor: 'DBCursor',
+            xpub_data: XpubData,
+            derived_addresses: list[tuple[int, int, BTCAddress]],
+    ) -> None:
+        """Cache the given (account_index, derived_index, address) entries derived from the xpub"""
+        write_cursor.executemany(
+            'INSERT OR IGNORE INTO xpub_derived_addresses(xpub, derivation_path, blockchain, '
+            'account_index, derived_index, address) VALUES (?, ?, ?, ?, ?, ?)',
+            [(
+                xpub_data.xpub.xpub,
+                xpub_data.serialize_derivation_path_for_db(),
+                xpub_data.blockchain.value,
+                *entry,
+            ) for entry in derived_addresses],
+        )
+
     def _ensure_data_integrity(
             self,
             cursor: 'DBCursor',
@@ -2996,6 +3276,7 @@ class DBHandler:
             version = self.get_setting(cursor, 'version')
         new_db_filename = f'{ts_now()}_rotkehlchen_db_v{version}.backup'
         new_db_path = self.user_data_dir / new_db_filename
+        self.conn.checkpoint()
         shutil.copyfile(
             self.user_data_dir / 'rotkehlchen.db',
             new_db_path,
@@ -14,6 +14,7 @@ from typing import TYPE_CHECKING, Any, Literal, Optional, Union
 from uuid import uuid4
 
 import gevent
+from gevent.queue import Empty, Queue
 from pysqlcipher3 import dbapi2 as sqlcipher
 
 from rotkehlchen.db.minimized_schema import MINIMIZED_USER_DB_SCHEMA
@@ -34,6 +35,7 @@ DEFAULT_SANITY_CHECK_MESSAGE = (
 )
 
 CONTEXT_SWITCH_WAIT = 1  # seconds to wait for a status change in a DB context switch
+READ_POOL_DISABLE_TIMEOUT = 30  # seconds to wait for the readers in use when disabling the pool
 import logging
 
 logger: 'RotkehlchenLogger' = logging.getLogger(__name__)  # type: ignore
@@ -228,6 +230,31 @@ CALLBACK_MAP = {
 }
 
 
+def read_pool_callback() -> int:
+    """Progress callback of the read-only connections of a read pool. Each of them is
+    used by a single greenlet at a time so there is nothing to guard against here"""
+    gevent.sleep(0)
+    return 0
+
+
+def _open_connection(
+        path: Union[str, Path],
+        connection_type: DBConnectionType,
+) -> UnderlyingConnection:
+    if connection_type == DBConnectionType.GLOBAL:
+        return sqlite3.connect(
+            database=path,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+
+    return sqlcipher.connect(  # pylint: disable=no-member
+        database=path,
+        check_same_thread=False,
+        isolation_level=None,
+    )
+
+
 class DBConnection:
 
     def _set_progress_handler(self) -> None:
@@ -253,18 +280,16 @@ class DBConnection:
         # https://www.gevent.org/api/gevent.greenlet.html#gevent.Greenlet.minimal_ident
         self.savepoint_greenlet_id: Optional[str] = None
         self.write_greenlet_id: Optional[str] = None
-        if connection_type == DBConnectionType.GLOBAL:
-            self._conn = sqlite3.connect(
-                database=path,
-                check_same_thread=False,
-                isolation_level=None,
-            )
-        else:
-            self._conn = sqlcipher.connect(  # pylint: disable=no-member
-                database=path,
-                check_same_thread=False,
-                isolation_level=None,
-            )
+        self.path = path
+        # Read-only connections used by read_ctx when the read pool is enabled
+        self._read_pool: Optional[Queue] = None
+        self._read_pool_size = 0
+        # The pool being disabled, which still takes back the readers that are returned
+        self._closing_read_pool: Optional[Queue] = None
+        # Readers checked out by greenlets, keyed by the greenlet's id. A greenlet keeps
+        # its reader, and with it its snapshot, until its outermost read context exits.
+        self._held_readers: dict[int, UnderlyingConnection] = {}
+        self._conn = _open_connection(path=path, connection_type=connection_type)
         self._set_progress_handler()
         self.minimized_schema = None
         if connection_type == DBConnectionType.USER:
@@ -323,16 +348,158 @@ class DBConnection:
         return DBCursor(connection=self, cursor=self._conn.cursor())
 
     def close(self) -> None:
+        self.disable_read_pool()
         self._conn.close()
         CONNECTION_MAP.pop(self.connection_type, None)
 
+    @property
+    def read_pool_enabled(self) -> bool:
+        return self._read_pool is not None
+
+    def enable_read_pool(self, pool_size: int, connect_script: Optional[str] = None) -> None:
+        """Switches the database to WAL journal mode and opens `pool_size` read-only
+        connections that serve read_ctx from then on. This connection stays the only writer.
+
+        In WAL mode readers don't block the writer and the writer doesn't block readers,
+        so reads don't have to queue behind long write transactions.
+
+        `connect_script` is run on each new connection before it is used, which is
+        where the key of an encrypted database should be given.
+        """
+        if self._read_pool is not None or pool_size == 0:
+            return
+
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        read_pool: Queue = Queue()
+        for _ in range(pool_size):
+            reader = _open_connection(path=self.path, connection_type=self.connection_type)
+            if connect_script is not None:
+                reader.executescript(connect_script)
+            reader.execute('PRAGMA query_only=ON')
+            reader.set_progress_handler(read_pool_callback, self.sql_vm_instructions_cb)
+            read_pool.put(reader)
+
+        self._read_pool_size = pool_size
+        self._read_pool = read_pool
+
+    def disable_read_pool(self) -> None:
+        """Closes the read-only connections and switches the database back to the
+        default journal mode, leaving all the data in the database file.
+
+        Waits up to READ_POOL_DISABLE_TIMEOUT seconds for the readers that are checked out
+        to be returned. If they are not returned in time the database is left in WAL mode
+        and those readers are closed as soon as they are returned.
+
+        May raise:
+        - ContextError if called from inside a read context, whose reader can't be returned
+        """
+        if self._read_pool is None:
+            return
+
+        if id(gevent.getcurrent()) in self._held_readers:
+            raise ContextError('Tried to disable the read pool from inside a read context')
+
+        read_pool, self._read_pool = self._read_pool, None  # new reads go to the writer
+        self._closing_read_pool = read_pool
+        try:
+            for _ in range(self._read_pool_size):
+                read_pool.get(timeout=READ_POOL_DISABLE_TIMEOUT).close()
+        except Empty:
+            logger.error(
+                f'Timed out after {READ_POOL_DISABLE_TIMEOUT} seconds waiting for the readers '
+                f'of the {self.connection_type.name} database to be returned. Leaving it '
+                f'in WAL mode',
+            )
+            return
+        finally:
+            self._closing_read_pool = None
+            self._read_pool_size = 0
+
+        with self.critical_section_and_transaction_lock():
+            self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            self._conn.execute('PRAGMA journal_mode=DELETE')
+
+    def checkpoint(self) -> None:
+        """Moves all the committed transactions from the WAL into the database file so
+        that the file can be copied on its own. Does nothing if the read pool is disabled.
+
+        The copy should follow right after this, without any context switch in between.
+        """
+        if self._read_pool is None:
+            return
+
+        with self.critical_section_and_transaction_lock():
+            while True:
+                # PASSIVE never blocks on readers but can't move frames newer than the
+                # snapshot of an open reader. So retry until all frames are moved.
+                _, log_frames, checkpointed_frames = self._conn.execute(
+                    'PRAGMA wal_checkpoint(PASSIVE)',
+                ).fetchone()
+                if log_frames == checkpointed_frames:
+                    break
+                gevent.sleep(CONTEXT_SWITCH_WAIT)
+
+    def _in_write_greenlet(self) -> bool:
+        """True if the current greenlet has a write transaction or savepoint open"""
+        current_id = get_greenlet_name(gevent.getcurrent())
+        return current_id in (self.write_greenlet_id, self.savepoint_greenlet_id)
+
     @contextmanager
-    def read_ctx(self) -> Generator['DBCursor', None, None]:
-        cursor = self.cursor()
+    def _checkout_reader(self, read_pool: Queue) -> Generator[UnderlyingConnection, None, None]:
+        greenlet_id = id(gevent.getcurrent())
+        if (reader := self._held_readers.get(greenlet_id)) is not None:
+            yield reader  # nested read context in the same greenlet
+            return
+
+        reader = read_pool.get()
+        self._held_readers[greenlet_id] = reader
         try:
-            yield cursor
+            reader.execute('BEGIN')  # keep one snapshot for the whole context
+            yield reader
         finally:
-            cursor.close()
+            del self._held_readers[greenlet_id]
+            if reader.in_transaction:
+                reader.execute('COMMIT')
+            if read_pool is self._read_pool or read_pool is self._closing_read_pool:
+                read_pool.put(reader)
+            else:  # the pool was disabled without waiting for this reader
+                reader.close()
+
+    def _refresh_read_snapshot(self) -> None:
+        """Called after a commit so that if the committing greenlet is also inside a read
+        context, the rest of that context sees what the greenlet just wrote"""
+        if (reader := self._held_readers.get(id(gevent.getcurrent()))) is None:
+            return
+
+        if reader.in_transaction:
+            reader.execute('COMMIT')
+        reader.execute('BEGIN')
+
+    @contextmanager
+    def read_ctx(self, use_writer: bool = False) -> Generator['DBCursor', None, None]:
+        """Yields a cursor for reading from the database.
+
+        If the read pool is enabled the cursor belongs to one of the read-only connections
+        and all the queries of the context see the same snapshot of the database. Greenlets
+        with an open write transaction or savepoint read from the writer so that they can
+        see their own uncommitted changes. `use_writer` forces reading from the writer,
+        which is needed for statements that modify the connection itself, like ATTACH.
+        """
+        read_pool = self._read_pool
+        if read_pool is None or use_writer is True or self._in_write_greenlet():
+            cursor = self.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+            return
+
+        with self._checkout_reader(read_pool) as reader:
+            cursor = DBCursor(connection=self, cursor=reader.cursor())
+            try:
+                yield cursor
+            finally:
+                cursor.close()
 
     @contextmanager
     def write_ctx(self, commit_ts: bool = False) -> Generator['DBCursor', None, None]:
@@ -371,6 +538,7 @@ class DBConnection:
                         ('last_write_ts', str(ts_now())),
                     )
                 self._conn.commit()
+                self._refresh_read_snapshot()
             finally:
                 cursor.close()
                 self.write_greenlet_id = None
@@ -456,6 +624,8 @@ class DBConnection:
             self.savepoints = dict.fromkeys(list_savepoints[:list_savepoints.index(savepoint_name)])  # noqa: E501
             if len(self.savepoints) == 0:  # mark if we are out of all savepoints
                 self.savepoint_greenlet_id = None
+                if self._conn.in_transaction is False:  # the savepoints got committed
+                    self._refresh_read_snapshot()
 
     def rollback_savepoint(self, savepoint_name: Optional[str] = None) -> None:
         """
@@ -327,25 +327,17 @@ class DBEvmTx():
             cursor.execute(querystr, bindings)
             return cursor.fetchone()[0]
 
-    def add_receipt_data(
-            self,
-            write_cursor: 'DBCursor',
+    @staticmethod
+    def _serialize_receipt_data(
             chain_id: ChainID,
             data: dict[str, Any],
-    ) -> None:
-        """Add tx receipt data as they are returned by the chain to the DB
-
-        Also need to provide the chain id.
-
-        This assumes the transaction is already in the DB.
+    ) -> tuple[tuple[Any, ...], list[tuple[Any, ...]], list[tuple[Any, ...]]]:
+        """Turns tx receipt data as returned by the chain into the rows of the receipt,
+        its logs and their topics.
 
         May raise:
         - Key Error if any of the expected fields are missing
         - DeserializationError if there is a problem deserializing a value
-        - pysqlcipher3.dbapi2.IntegrityError if the transaction hash is not in the DB:
-        pysqlcipher3.dbapi2.IntegrityError: FOREIGN KEY constraint failed
-        If the receipt already exists in the DB:
-        pysqlcipher3.dbapi2.IntegrityError: UNIQUE constraint failed: evmtx_receipts.tx_hash
         """
         tx_hash_b = hexstring_to_bytes(data['transactionHash'])
         # some nodes miss the type field for older non EIP1559 transactions. So assume legacy (0)
@@ -355,14 +347,10 @@ class DBEvmTx():
         if status is None:
             status = 1
         contract_address = deserialize_evm_address(data['contractAddress']) if data['contractAddress'] else None  # noqa: E501
-        write_cursor.execute(
-            'INSERT INTO evmtx_receipts (tx_hash, chain_id, contract_address, status, type) '
-            'VALUES(?, ?, ?, ?, ?) ',
-            (tx_hash_b, serialized_chain_id, contract_address, status, tx_type),
-        )
+        receipt_tuple = (tx_hash_b, serialized_chain_id, contract_address, status, tx_type)
 
-        log_tuples = []
-        topic_tuples = []
+        log_tuples: list[tuple[Any, ...]] = []
+        topic_tuples: list[tuple[Any, ...]] = []
         for log_entry in data['logs']:
             log_index = log_entry['logIndex']
             log_tuples.append((
@@ -383,6 +371,20 @@ class DBEvmTx():
                     idx,
                 ))
 
+        return receipt_tuple, log_tuples, topic_tuples
+
+    @staticmethod
+    def _insert_receipts_rows(
+            write_cursor: 'DBCursor',
+            receipt_tuples: list[tuple[Any, ...]],
+            log_tuples: list[tuple[Any, ...]],
+            topic_tuples: list[tuple[Any, ...]],
+    ) -> None:
+        write_cursor.executemany(
+            'INSERT INTO evmtx_receipts (tx_hash, chain_id, contract_address, status, type) '
+            'VALUES(?, ?, ?, ?, ?) ',
+            receipt_tuples,
+        )
         if len(log_tuples) != 0:
             write_cursor.executemany(
                 'INSERT INTO evmtx_receipt_logs (tx_hash, chain_id, log_index, data, address, removed) '  # noqa: E501
@@ -397,6 +399,77 @@ class DBEvmTx():
                     topic_tuples,
                 )
 
+    def add_receipt_data(
+            self,
+            write_cursor: 'DBCursor',
+            chain_id: ChainID,
+            data: dict[str, Any],
+    ) -> None:
+        """Add tx receipt data as they are returned by the chain to the DB
+
+        Also need to provide the chain id.
+
+        This assumes the transaction is already in the DB.
+
+        May raise:
+        - Key Error if any of the expected fields are missing
+        - DeserializationError if there is a problem deserializing a value
+        - pysqlcipher3.dbapi2.IntegrityError if the transaction hash is not in the DB:
+        pysqlcipher3.dbapi2.IntegrityError: FOREIGN KEY constraint failed
+        If the receipt already exists in the DB:
+        pysqlcipher3.dbapi2.IntegrityError: UNIQUE constraint failed: evmtx_receipts.tx_hash
+        """
+        receipt_tuple, log_tuples, topic_tuples = self._serialize_receipt_data(chain_id, data)
+        self._insert_receipts_rows(write_cursor, [receipt_tuple], log_tuples, topic_tuples)
+
+    def add_receipts_data(
+            self,
+            write_cursor: 'DBCursor',
+            chain_id: ChainID,
+            data: list[dict[str, Any]],
+    ) -> int:
+        """Add the data of multiple tx receipts as they are returned by the chain to the DB
+        with a single insert per table.
+
+        The receipts that are already in the DB or whose transaction is not in the DB,
+        such as if it got deleted while the receipts were queried, are skipped.
+
+        Returns the number of added receipts.
+
+        May raise:
+        - Key Error if any of the expected fields are missing
+        - DeserializationError if there is a problem deserializing a value
+        """
+        serialized = [self._serialize_receipt_data(chain_id, entry) for entry in data]
+        if len(serialized) == 0:
+            return 0
+
+        tx_hashes = [entry[0][0] for entry in serialized]
+        placeholders = ','.join('?' * len(tx_hashes))
+        bindings = (chain_id.serialize_for_db(), *tx_hashes)
+        missing_receipt = {x[0] for x in write_cursor.execute(
+            f'SELECT tx_hash FROM evm_transactions WHERE chain_id=? AND tx_hash IN ({placeholders})',  # noqa: E501
+            bindings,
+        )} - {x[0] for x in write_cursor.execute(
+            f'SELECT tx_hash FROM evmtx_receipts WHERE chain_id=? AND tx_hash IN ({placeholders})',
+            bindings,
+        )}
+        receipt_tuples: list[tuple[Any, ...]] = []
+        log_tuples: list[tuple[Any, ...]] = []
+        topic_tuples: list[tuple[Any, ...]] = []
+        for receipt_tuple, receipt_log_tuples, receipt_topic_tuples in serialized:
+            if receipt_tuple[0] not in missing_receipt:
+                continue
+
+            missing_receipt.remove(receipt_tuple[0])  # in case of duplicates in the data
+            receipt_tuples.append(receipt_tuple)
+            log_tuples.extend(receipt_log_tuples)
+            topic_tuples.extend(receipt_topic_tuples)
+
+        if len(receipt_tuples) != 0:
+            self._insert_receipts_rows(write_cursor, receipt_tuples, log_tuples, topic_tuples)
+        return len(receipt_tuples)
+
     def get_receipt(
             self,
             cursor: 'DBCursor',
@@ -445,6 +518,63 @@ class DBEvmTx():
 
         return tx_receipt
 
+    def get_receipts(
+            self,
+            cursor: 'DBCursor',
+            tx_hashes: list[EVMTxHash],
+            chain_id: ChainID,
+    ) -> dict[EVMTxHash, EvmTxReceipt]:
+        """Get the evm receipts for the given tx_hashes and chain id in bulk.
+
+        Hashes whose receipt is not in the DB are missing from the returned mapping.
+        The hashes should be few enough to fit in the bindings of a single query.
+        """
+        hashes_by_bytes = {bytes(tx_hash): tx_hash for tx_hash in tx_hashes}
+        placeholders = ','.join(['?'] * len(hashes_by_bytes))
+        bindings = [chain_id.serialize_for_db(), *hashes_by_bytes]
+        receipts: dict[EVMTxHash, EvmTxReceipt] = {}
+        cursor.execute(
+            f'SELECT tx_hash, contract_address, status, type from evmtx_receipts '
+            f'WHERE chain_id=? AND tx_hash IN ({placeholders})',
+            bindings,
+        )
+        for result in cursor:
+            tx_hash = hashes_by_bytes[result[0]]
+            receipts[tx_hash] = EvmTxReceipt(
+                tx_hash=tx_hash,
+                chain_id=chain_id,
+                contract_address=result[1],
+                status=bool(result[2]),  # works since value is either 0 or 1
+                type=result[3],
+            )
+
+        logs: dict[tuple[bytes, int], EvmTxReceiptLog] = {}
+        cursor.execute(
+            f'SELECT tx_hash, log_index, data, address, removed from evmtx_receipt_logs '
+            f'WHERE chain_id=? AND tx_hash IN ({placeholders}) ORDER BY tx_hash, log_index',
+            bindings,
+        )
+        for result in cursor:
+            tx_receipt_log = EvmTxReceiptLog(
+                log_index=result[1],
+                data=result[2],
+                address=result[3],
+                removed=bool(result[4]),  # works since value is either 0 or 1
+            )
+            receipts[hashes_by_bytes[result[0]]].logs.append(tx_receipt_log)
+            logs[(result[0], result[1])] = tx_receipt_log
+
+        cursor.execute(
+            f'SELECT tx_hash, log_index, topic from evmtx_receipt_log_topics '
+            f'WHERE chain_id=? AND tx_hash IN ({placeholders}) '
+            f'ORDER BY tx_hash, log_index, topic_index',
+            bindings,
+        )
+        for result in cursor:
+            logs[(result[0], result[1])].topics.append(result[2])
+
+        return receipts
+
     def delete_transactions(
             self,
             write_cursor: 'DBCursor',
@@ -278,6 +278,31 @@ class DBSubStringFilter(DBFilter):
         return [f'{self.field} LIKE ?'], [f'%{self.search_string}%']
 
 
+@dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
+class DBAssetSearchTrigramsFilter(DBFilter):
+    """Keeps only the assets whose name and symbol have all the trigrams of the search string.
+
+    Finds them through the trigram index so that the substring filters only need to check
+    these candidates. Since the substring filters use LIKE, `%` and `_` in the search string
+    are wildcards and the trigrams that contain them are skipped. Search strings without a
+    trigram free of wildcards don't filter anything."""
+    search_string: str
+
+    def prepare(self) -> tuple[list[str], list[Any]]:
+        trigrams = sorted({
+            trigram for trigram in (
+                self.search_string[i:i + 3] for i in range(len(self.search_string) - 2)
+            ) if '%' not in trigram and '_' not in trigram
+        })
+        if len(trigrams) == 0:
+            return [], []
+
+        subqueries = ' INTERSECT '.join(
+            ['SELECT asset_rowid FROM asset_search_trigrams WHERE trigram=lower(?)'] * len(trigrams),  # noqa: E501
+        )
+        return [f'assets.rowid IN ({subqueries})'], trigrams
+
+
 @dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
 class DBFilterQuery():
     and_op: bool
@@ -445,6 +470,7 @@ class EvmTransactionsFilterQuery(DBFilterQuery, FilterWithTimestamp):
             from_ts: Optional[Timestamp] = None,
             to_ts: Optional[Timestamp] = None,
             tx_hash: Optional[EVMTxHash] = None,
+            tx_hashes: Optional[list[EVMTxHash]] = None,
             chain_id: Optional[SUPPORTED_CHAIN_IDS] = None,
     ) -> 'EvmTransactionsFilterQuery':
         if order_by_rules is None:
@@ -469,6 +495,19 @@ class EvmTransactionsFilterQuery(DBFilterQuery, FilterWithTimestamp):
             if chain_id is not None:  # keep it as last (see chain_id property of this filter)
                 filters.append(DBEvmChainIDFilter(and_op=True, chain_id=chain_id))
 
+        elif tx_hashes is not None:
+            filters.append(DBMultiBytesFilter(
+                and_op=True,
+                column='evm_transactions.tx_hash',
+                values=tx_hashes,  # type: ignore[arg-type]  # EVMTxHash is bytes
+            ))
+            if chain_id is not None:  # keep it as last (see chain_id property of this filter)
+                filters.append(DBEvmChainIDFilter(
+                    and_op=True,
+                    table_name='evm_transactions',
+                    chain_id=chain_id,
+                ))
+
         else:
             if accounts is not None:
                 filter_query.join_clause = DBEvmTransactionJoinsFilter(
@@ -883,6 +922,20 @@ T_HistoryFilterQuery = TypeVar('T_HistoryFilterQuery', bound='HistoryBaseEntryFi
 
 class HistoryBaseEntryFilterQuery(DBFilterQuery, FilterWithTimestamp, FilterWithLocation, metaclass=ABCMeta):  # noqa: E501
 
+    entry_type_filter: Optional[DBMultiIntegerFilter] = None
+
+    @property
+    def entry_types(self) -> set[HistoryBaseEntryType]:
+        """The entry types of the events that can match the filter"""
+        if self.entry_type_filter is None or self.and_op is False:
+            return set(HistoryBaseEntryType)
+
+        values = {HistoryBaseEntryType(x) for x in self.entry_type_filter.values}
+        if self.entry_type_filter.operator == 'IN':
+            return values
+        # else
+        return set(HistoryBaseEntryType) - values
+
     @classmethod
     def make(
             cls: type[T_HistoryFilterQuery],
@@ -928,12 +981,13 @@ class HistoryBaseEntryFilterQuery(DBFilterQuery, FilterWithTimestamp, FilterWith
                     ),
                 )
         if entry_types is not None:
-            filters.append(DBMultiIntegerFilter(
+            filter_query.entry_type_filter = DBMultiIntegerFilter(
                 and_op=True,
                 column='entry_type',
                 values=[x.value for x in entry_types.values],
                 operator=entry_types.operator,
-            ))
+            )
+            filters.append(filter_query.entry_type_filter)
         if event_types is not None:
             filters.append(DBMultiStringFilter(
                 and_op=True,
@@ -1601,6 +1655,10 @@ class LevenshteinFilterQuery(MultiTableFilterQuery):
             ],
         )
         filters.append((assets_substring_filter, 'assets'))
+        filters.append((
+            DBAssetSearchTrigramsFilter(and_op=True, search_string=substring_search),
+            'assets',
+        ))
         nfts_substring_filter = DBNestedFilter(
             and_op=False,
             filters=[
@@ -1,7 +1,7 @@
 import copy
 import logging
-from collections.abc import Sequence
-from typing import TYPE_CHECKING, Any, Literal, Optional, Union, overload
+from collections.abc import Callable, Iterator, Sequence
+from typing import TYPE_CHECKING, Any, Literal, Optional, TypeVar, Union, overload
 
 from pysqlcipher3 import dbapi2 as sqlcipher
 
@@ -17,6 +17,7 @@ from rotkehlchen.accounting.structures.eth2 import (
     EthWithdrawalEvent,
 )
 from rotkehlchen.accounting.structures.evm_event import EvmEvent
+from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.limits import FREE_HISTORY_EVENTS_LIMIT
@@ -28,6 +29,7 @@ from rotkehlchen.db.filtering import (
     DBIgnoredAssetsFilter,
     DBIgnoreValuesFilter,
     EthDepositEventFilterQuery,
+    EthStakingEventFilterQuery,
     EvmEventFilterQuery,
     HistoryBaseEntryFilterQuery,
     HistoryEventFilterQuery,
@@ -53,6 +55,13 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+HISTORY_EVENT_INSERT_QUERY = (
+    'INSERT OR IGNORE INTO history_events(entry_type, event_identifier, sequence_index,'
+    'timestamp, location, location_label, asset, amount, usd_value, notes,'
+    'type, subtype) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+
+T = TypeVar('T')
 
 HISTORY_BASE_ENTRY_FIELDS = 'entry_type, history_events.identifier, event_identifier, sequence_index, timestamp, location, location_label, asset, amount, usd_value, notes, type, subtype '  # noqa: E501
 HISTORY_BASE_ENTRY_LENGTH = 12
@@ -63,6 +72,135 @@ EVM_FIELD_LENGTH = 5
 ETH_STAKING_EVENT_FIELDS = 'validator_index, is_exit_or_blocknumber'
 ETH_STAKING_FIELD_LENGTH = 2
 
+# Entry types that also have data in the evm_events_info and eth_staking_events_info tables
+EVM_INFO_ENTRY_TYPES = {HistoryBaseEntryType.EVM_EVENT, HistoryBaseEntryType.ETH_DEPOSIT_EVENT}
+ETH_STAKING_INFO_ENTRY_TYPES = {
+    HistoryBaseEntryType.ETH_WITHDRAWAL_EVENT,
+    HistoryBaseEntryType.ETH_BLOCK_EVENT,
+    HistoryBaseEntryType.ETH_DEPOSIT_EVENT,
+}
+
+
+def _events_data_query(filter_query: HistoryBaseEntryFilterQuery) -> str:
+    """Returns the columns and the tables from which the events matching the filter are read
+
+    Only the tables with the data of the entry types that the filter can match are
+    joined. NULL is selected in place of the columns of the other tables so that all
+    rows have the same layout. The evm and eth staking event filters can filter by
+    the columns of their table so it is always joined for them.
+    """
+    entry_types = filter_query.entry_types
+    columns, join = HISTORY_BASE_ENTRY_FIELDS, 'FROM history_events '
+    if isinstance(filter_query, EvmEventFilterQuery) or len(entry_types & EVM_INFO_ENTRY_TYPES) != 0:  # noqa: E501
+        columns += f', {EVM_EVENT_FIELDS}'
+        join += 'LEFT JOIN evm_events_info ON history_events.identifier=evm_events_info.identifier '  # noqa: E501
+    else:
+        columns += ', NULL' * EVM_FIELD_LENGTH
+
+    if isinstance(filter_query, EthStakingEventFilterQuery) or len(entry_types & ETH_STAKING_INFO_ENTRY_TYPES) != 0:  # noqa: E501
+        columns += f', {ETH_STAKING_EVENT_FIELDS}'
+        join += 'LEFT JOIN eth_staking_events_info ON history_events.identifier=eth_staking_events_info.identifier '  # noqa: E501
+    else:
+        columns += ', NULL' * ETH_STAKING_FIELD_LENGTH
+
+    return f'{columns} {join}'
+
+
+def _deserialize_event_row(row: tuple) -> HistoryBaseEntry:
+    """Deserializes an event read from the DB with the base, evm and eth staking columns
+    depending on its entry type
+
+    May raise:
+    - DeserializationError
+    - UnknownAsset
+    """
+    entry_type = HistoryBaseEntryType(row[0])
+    if entry_type == HistoryBaseEntryType.EVM_EVENT:
+        return EvmEvent.deserialize_from_db(row[1:HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH + 1])  # noqa: E501
+
+    if entry_type in (
+            HistoryBaseEntryType.ETH_WITHDRAWAL_EVENT,
+            HistoryBaseEntryType.ETH_BLOCK_EVENT,
+    ):
+        data = (
+            row[1:2] +
+            row[4:5] +
+            row[6:7] +
+            row[8:10] +
+            row[12:13] +
+            row[HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH + 1:HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH + ETH_STAKING_FIELD_LENGTH + 2]  # noqa: E501
+        )
+        if entry_type == HistoryBaseEntryType.ETH_WITHDRAWAL_EVENT:
+            return EthWithdrawalEvent.deserialize_from_db(data)
+        # else
+        return EthBlockEvent.deserialize_from_db(data)
+
+    if entry_type == HistoryBaseEntryType.ETH_DEPOSIT_EVENT:
+        return EthDepositEvent.deserialize_from_db(
+            row[1:5] +
+            row[6:7] +
+            row[8:10] +
+            row[HISTORY_BASE_ENTRY_LENGTH + 1:HISTORY_BASE_ENTRY_LENGTH + 2] +
+            row[HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH + 1:HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH + 2],  # noqa: E501
+        )
+
+    return HistoryEvent.deserialize_from_db(row[1:])
+
+
+class HistoryEventRow:
+    """A history event read from the DB that is only deserialized when it is needed
+
+    The columns that are cheap to read are available directly. Accessing any other
+    attribute of the event, such as its balance, its asset or its evm data, deserializes
+    the full event the first time. That saves checking the assets and parsing the
+    amounts of events that are only counted, paged or filtered by the cheap columns.
+    """
+    __slots__ = (
+        '_event',
+        '_row',
+        'entry_type',
+        'event_identifier',
+        'event_subtype',
+        'event_type',
+        'identifier',
+        'location',
+        'location_label',
+        'sequence_index',
+        'timestamp',
+    )
+
+    def __init__(self, row: tuple) -> None:
+        """May raise DeserializationError if the cheap columns can't be deserialized"""
+        self._row = row
+        self._event: Optional[HistoryBaseEntry] = None
+        self.entry_type = HistoryBaseEntryType(row[0])
+        self.identifier: int = row[1]
+        self.event_identifier: str = row[2]
+        self.sequence_index: int = row[3]
+        self.timestamp = TimestampMS(row[4])
+        self.location = Location.deserialize_from_db(row[5])
+        self.location_label: Optional[str] = row[6]
+        self.event_type = HistoryEventType.deserialize(row[11])
+        self.event_subtype = HistoryEventSubType.deserialize(row[12])
+
+    @property
+    def event(self) -> HistoryBaseEntry:
+        """The deserialized event. May raise:
+        - DeserializationError
+        - UnknownAsset
+        """
+        if self._event is None:
+            self._event = _deserialize_event_row(self._row)
+        return self._event
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):  # unset slots, don't deserialize for them
+            raise AttributeError(name)
+        return getattr(self.event, name)
+
+    def __repr__(self) -> str:
+        return f'HistoryEventRow({self.entry_type!s}, {self.identifier}, {self.event_identifier})'  # noqa: E501
+
 
 class DBHistoryEvents():
 
@@ -88,12 +226,7 @@ class DBHistoryEvents():
         the DB. Can only happen if an event with an unresolved asset is passed.
         """
         db_tuples = event.serialize_for_db()
-        write_cursor.execute(
-            'INSERT OR IGNORE INTO history_events(entry_type, event_identifier, sequence_index,'
-            'timestamp, location, location_label, asset, amount, usd_value, notes,'
-            'type, subtype) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
-            db_tuples[0],
-        )
+        write_cursor.execute(HISTORY_EVENT_INSERT_QUERY, db_tuples[0])
         if write_cursor.rowcount == 0:
             return None  # already exists
 
@@ -128,13 +261,22 @@ class DBHistoryEvents():
     ) -> None:
         """Insert a list of history events in the database.
 
+        The consecutive events that have no data in other tables are written with
+        one executemany. The events are written in the given order.
+
         Check add_history_event() to see possible Exceptions
         """
+        base_tuples = []
         for event in history:
-            self.add_history_event(
-                write_cursor=write_cursor,
-                event=event,
-            )
+            if len(db_tuples := event.serialize_for_db()) == 1:
+                base_tuples.append(db_tuples[0])
+                continue
+
+            write_cursor.executemany(HISTORY_EVENT_INSERT_QUERY, base_tuples)
+            base_tuples = []
+            self.add_history_event(write_cursor=write_cursor, event=event)
+
+        write_cursor.executemany(HISTORY_EVENT_INSERT_QUERY, base_tuples)
 
     def edit_history_event(self, event: HistoryBaseEntry) -> tuple[bool, str]:
         """
@@ -367,11 +509,60 @@ class DBHistoryEvents():
         list[tuple[int, EvmEvent]], list[EvmEvent],
         list[tuple[int, EthDepositEvent]], list[EthDepositEvent],
     ]:
-        """Get all events from the DB, deserialized depending on the event type
+        """Get all events from the DB, deserialized depending on the event type"""
+        return list(self._iterate_history_events(  # type: ignore[return-value]  # overloads match
+            cursor=cursor,
+            filter_query=filter_query,
+            has_premium=has_premium,
+            group_by_event_ids=group_by_event_ids,
+            deserialize=_deserialize_event_row,
+        ))
 
-        TODO: To not query all columns with all joins for all cases, we perhaps can
-        peek on the entry type of the filter and adjust the SELECT fields accordingly?
+    def iterate_history_events(
+            self,
+            cursor: 'DBCursor',
+            filter_query: HistoryEventFilterQuery,
+    ) -> Iterator[HistoryBaseEntry]:
+        """Same as get_history_events without limits and grouping but deserializes
+        the events lazily while the given cursor is consumed"""
+        yield from self._iterate_history_events(  # type: ignore[misc]  # not grouped so no tuples
+            cursor=cursor,
+            filter_query=filter_query,
+            has_premium=True,
+            group_by_event_ids=False,
+            deserialize=_deserialize_event_row,
+        )
+
+    def iterate_history_event_rows(
+            self,
+            cursor: 'DBCursor',
+            filter_query: HistoryBaseEntryFilterQuery,
+            has_premium: bool = True,
+    ) -> Iterator[HistoryEventRow]:
+        """Same as iterate_history_events but yields rows that only deserialize the full
+        event when an attribute other than the cheap columns is accessed.
+
+        Unlike the other methods, events whose asset is unknown or whose data can't be
+        deserialized are not skipped here but raise when their full event is accessed.
         """
+        yield from self._iterate_history_events(  # type: ignore[misc]  # not grouped so no tuples
+            cursor=cursor,
+            filter_query=filter_query,
+            has_premium=has_premium,
+            group_by_event_ids=False,
+            deserialize=HistoryEventRow,
+        )
+
+    def _iterate_history_events(
+            self,
+            cursor: 'DBCursor',
+            filter_query: HistoryBaseEntryFilterQuery,
+            has_premium: bool,
+            group_by_event_ids: bool,
+            deserialize: Callable[[tuple], T],
+    ) -> Iterator[Union[T, tuple[int, T]]]:
+        """Queries the events matching the filter and yields them as created by
+        `deserialize` from each row. Rows that can't be deserialized are skipped."""
         free_query_group_by = ''
         free_query_count = ''
         base_prefix = 'SELECT '
@@ -397,66 +588,25 @@ class DBHistoryEvents():
             special_free_query=special_free_query,
         )
 
+        events_data_query = _events_data_query(filter_query)
         if has_premium is True:
-            base_query = f'{base_prefix} {HISTORY_BASE_ENTRY_FIELDS}, {EVM_EVENT_FIELDS}, {ETH_STAKING_EVENT_FIELDS} {ALL_EVENTS_DATA_JOIN}'  # noqa: E501
+            base_query = f'{base_prefix} {events_data_query}'
         else:
-            base_query = f'{base_prefix} * FROM (SELECT {free_query_count} {HISTORY_BASE_ENTRY_FIELDS}, {EVM_EVENT_FIELDS}, {ETH_STAKING_EVENT_FIELDS} {ALL_EVENTS_DATA_JOIN} {free_query_group_by} ORDER BY timestamp DESC, sequence_index ASC LIMIT ?) '  # noqa: E501
+            base_query = f'{base_prefix} * FROM (SELECT {free_query_count} {events_data_query} {free_query_group_by} ORDER BY timestamp DESC, sequence_index ASC LIMIT ?) '  # noqa: E501
             bindings.insert(0, FREE_HISTORY_EVENTS_LIMIT)
 
         cursor.execute(base_query + prepared_query, bindings)
-        output: Union[list[HistoryBaseEntry], list[tuple[int, HistoryBaseEntry]]] = []  # type: ignore  # noqa: E501
-        data_start_idx = type_idx + 1
         for entry in cursor:
-            entry_type = HistoryBaseEntryType(entry[type_idx])
             try:
-                deserialized_event: Union[HistoryEvent, EvmEvent, EthWithdrawalEvent, EthBlockEvent]  # noqa: E501
-                # Deserialize event depending on its type
-                if entry_type == HistoryBaseEntryType.EVM_EVENT:
-                    data = (
-                        entry[data_start_idx:data_start_idx + HISTORY_BASE_ENTRY_LENGTH + 1] +
-                        entry[data_start_idx + HISTORY_BASE_ENTRY_LENGTH + 1:data_start_idx + HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH + 1]    # noqa: E501
-                    )
-                    deserialized_event = EvmEvent.deserialize_from_db(data)
-                elif entry_type in (
-                        HistoryBaseEntryType.ETH_WITHDRAWAL_EVENT,
-                        HistoryBaseEntryType.ETH_BLOCK_EVENT,
-                ):
-                    data = (
-                        entry[data_start_idx:data_start_idx + 1] +
-                        entry[data_start_idx + 3:data_start_idx + 4] +
-                        entry[data_start_idx + 5:data_start_idx + 6] +
-                        entry[data_start_idx + 7:data_start_idx + 9] +
-                        entry[data_start_idx + 11:data_start_idx + 12] +
-                        entry[data_start_idx + HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH:data_start_idx + HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH + ETH_STAKING_FIELD_LENGTH + 1]  # noqa: E501
-                    )
-                    if entry_type == HistoryBaseEntryType.ETH_WITHDRAWAL_EVENT:
-                        deserialized_event = EthWithdrawalEvent.deserialize_from_db(data)
-                    else:
-                        deserialized_event = EthBlockEvent.deserialize_from_db(data)
-
-                elif entry_type == HistoryBaseEntryType.ETH_DEPOSIT_EVENT:
-                    data = (
-                        entry[data_start_idx:data_start_idx + 4] +
-                        entry[data_start_idx + 5:data_start_idx + 6] +
-                        entry[data_start_idx + 7:data_start_idx + 9] +
-                        entry[data_start_idx + HISTORY_BASE_ENTRY_LENGTH:data_start_idx + HISTORY_BASE_ENTRY_LENGTH + 1] +  # noqa: E501
-                        entry[data_start_idx + HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH:data_start_idx + HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH + 1]  # noqa: E501
-                    )
-                    deserialized_event = EthDepositEvent.deserialize_from_db(data)
-
-                else:
-                    data = entry[data_start_idx:HISTORY_BASE_ENTRY_LENGTH + 1]
-                    deserialized_event = HistoryEvent.deserialize_from_db(entry[data_start_idx:])
+                deserialized_event = deserialize(entry[type_idx:])
             except (DeserializationError, UnknownAsset) as e:
                 log.debug(f'Failed to deserialize history event {entry} due to {e!s}')
                 continue
 
             if group_by_event_ids is True:
-                output.append((entry[0], deserialized_event))  # type: ignore
+                yield (entry[0], deserialized_event)
             else:
-                output.append(deserialized_event)  # type: ignore
-
-        return output
+                yield deserialized_event
 
     @overload
     def get_history_events_and_limit_info(
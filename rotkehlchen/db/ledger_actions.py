@@ -1,4 +1,5 @@
 import logging
+from collections.abc import Iterator
 from typing import TYPE_CHECKING, Optional
 
 from pysqlcipher3 import dbapi2 as sqlcipher
@@ -15,6 +16,12 @@ from rotkehlchen.user_messages import MessagesAggregator
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+LEDGER_ACTION_INSERT_QUERY = """
+INSERT INTO ledger_actions(
+    timestamp, type, location, amount, asset, rate, rate_asset, link, notes
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);"""
+
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
     from rotkehlchen.db.drivers.gevent import DBCursor
@@ -52,6 +59,16 @@ class DBLedgerActions():
 
         Returned list is ordered according to the passed filter query
         """
+        return list(self.iterate_ledger_actions(cursor, filter_query=filter_query, has_premium=has_premium))  # noqa: E501
+
+    def iterate_ledger_actions(
+            self,
+            cursor: 'DBCursor',
+            filter_query: LedgerActionsFilterQuery,
+            has_premium: bool,
+    ) -> Iterator[LedgerAction]:
+        """Same as get_ledger_actions but deserializes the ledger actions lazily
+        while the given cursor is consumed"""
         query_filter, bindings = filter_query.prepare()
         if has_premium:
             query = 'SELECT * from ledger_actions ' + query_filter
@@ -60,7 +77,6 @@ class DBLedgerActions():
             query = 'SELECT * FROM (SELECT * from ledger_actions ORDER BY timestamp DESC LIMIT ?) ' + query_filter  # noqa: E501
             results = cursor.execute(query, [FREE_LEDGER_ACTIONS_LIMIT] + bindings)
 
-        actions = []
         for result in results:
             try:
                 action = LedgerAction.deserialize_from_db(result)
@@ -77,9 +93,7 @@ class DBLedgerActions():
                 )
                 continue
 
-            actions.append(action)
-
-        return actions
+            yield action
 
     def add_ledger_action(self, write_cursor: 'DBCursor', action: LedgerAction) -> int:  # noqa: E501
         """Adds a new ledger action to the DB and returns its identifier for success
@@ -88,22 +102,40 @@ class DBLedgerActions():
         - sqlcipher.IntegrityError if there is a conflict at addition in  _add_gitcoin_extra_data.
          If this error is raised connection needs to be rolled back by the caller.
         """
-        query = """
-        INSERT INTO ledger_actions(
-            timestamp, type, location, amount, asset, rate, rate_asset, link, notes
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);"""
-        write_cursor.execute(query, action.serialize_for_db())
+        write_cursor.execute(LEDGER_ACTION_INSERT_QUERY, action.serialize_for_db())
         identifier = write_cursor.lastrowid
         action.identifier = identifier
         return identifier
 
     def add_ledger_actions(self, write_cursor: 'DBCursor', actions: list[LedgerAction]) -> None:
-        """Adds multiple ledger action to the DB
+        """Adds multiple ledger action to the DB and sets their identifiers
 
-        Is slow due to not using executemany since the ledger actions table
-        utilized an auto generated primary key.
+        They are all written with one executemany in a savepoint of the write cursor's
+        transaction. The auto generated identifiers of rows inserted together are
+        consecutive, so they are set from the last one. If any of them can't be added,
+        the savepoint is rolled back and they are added one by one so that only those
+        that fail are skipped.
         """
+        if len(actions) == 0:
+            return
+
+        write_cursor.execute('SAVEPOINT add_ledger_actions')
+        try:
+            write_cursor.executemany(
+                LEDGER_ACTION_INSERT_QUERY,
+                [action.serialize_for_db() for action in actions],
+            )
+        except sqlcipher.IntegrityError:  # pylint: disable=no-member
+            write_cursor.execute('ROLLBACK TO SAVEPOINT add_ledger_actions')
+            write_cursor.execute('RELEASE SAVEPOINT add_ledger_actions')
+        else:
+            write_cursor.execute('RELEASE SAVEPOINT add_ledger_actions')
+            last_identifier = write_cursor.execute('SELECT last_insert_rowid()').fetchone()[0]
+            first_identifier = last_identifier - len(actions) + 1
+            for identifier, action in enumerate(actions, start=first_identifier):
+                action.identifier = identifier
+            return
+
         for action in actions:
             try:
                 self.add_ledger_action(write_cursor, action)
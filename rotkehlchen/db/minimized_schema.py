@@ -8,6 +8,8 @@ MINIMIZED_USER_DB_SCHEMA = {
     'assets': 'identifierTEXTNOTNULLPRIMARYKEY',
     'timed_balances': 'categoryCHAR(1)NOTNULLDEFAULT("A")REFERENCESbalance_category(category),timestampINTEGER,currencyTEXT,amountTEXT,usd_valueTEXT,FOREIGNKEY(currency)REFERENCESassets(identifier)ONUPDATECASCADE,PRIMARYKEY(timestamp,currency,category)',
     'timed_location_data': 'timestampINTEGER,locationCHAR(1)NOTNULLDEFAULT("A")REFERENCESlocation(location),usd_valueTEXT,PRIMARYKEY(timestamp,location)',
+    'timed_balances_rollups': 'resolutionINTEGERNOTNULL,bucketINTEGERNOTNULL,timestampINTEGERNOTNULL,categoryCHAR(1)NOTNULLDEFAULT("A")REFERENCESbalance_category(category),currencyTEXTNOTNULL,amountTEXT,usd_valueTEXT,FOREIGNKEY(currency)REFERENCESassets(identifier)ONUPDATECASCADE,PRIMARYKEY(resolution,bucket,currency,category)',
+    'timed_location_data_rollups': 'resolutionINTEGERNOTNULL,bucketINTEGERNOTNULL,timestampINTEGERNOTNULL,locationCHAR(1)NOTNULLDEFAULT("A")REFERENCESlocation(location),usd_valueTEXT,snapshotsINTEGERNOTNULL,PRIMARYKEY(resolution,bucket,location)',
     'user_credentials': 'nameTEXTNOTNULL,locationCHAR(1)NOTNULLDEFAULT("A")REFERENCESlocation(location),api_keyTEXT,api_secretTEXT,passphraseTEXT,PRIMARYKEY(name,location)',
     'user_credentials_mappings': 'credential_nameTEXTNOTNULL,credential_locationCHAR(1)NOTNULLDEFAULT("A")REFERENCESlocation(location),setting_nameTEXTNOTNULL,setting_valueTEXTNOTNULL,FOREIGNKEY(credential_name,credential_location)REFERENCESuser_credentials(name,location)ONDELETECASCADEONUPDATECASCADE,PRIMARYKEY(credential_name,credential_location,setting_name)',
     'external_service_credentials': 'nameVARCHAR[30]NOTNULLPRIMARYKEY,api_keyTEXT',
@@ -25,6 +27,7 @@ MINIMIZED_USER_DB_SCHEMA = {
     'margin_positions': 'idTEXTPRIMARYKEY,locationCHAR(1)NOTNULLDEFAULT("A")REFERENCESlocation(location),open_timeINTEGER,close_timeINTEGER,profit_lossTEXT,pl_currencyTEXTNOTNULL,feeTEXT,fee_currencyTEXT,linkTEXT,notesTEXT,FOREIGNKEY(pl_currency)REFERENCESassets(identifier)ONUPDATECASCADE,FOREIGNKEY(fee_currency)REFERENCESassets(identifier)ONUPDATECASCADE',
     'asset_movements': 'idTEXTPRIMARYKEY,locationCHAR(1)NOTNULLDEFAULT("A")REFERENCESlocation(location),categoryCHAR(1)NOTNULLDEFAULT("A")REFERENCESasset_movement_category(category),addressTEXT,transaction_idTEXT,timestampINTEGER,assetTEXTNOTNULL,amountTEXT,fee_assetTEXT,feeTEXT,linkTEXT,FOREIGNKEY(asset)REFERENCESassets(identifier)ONUPDATECASCADE,FOREIGNKEY(fee_asset)REFERENCESassets(identifier)ONUPDATECASCADE',
     'used_query_ranges': 'nameVARCHAR[24]NOTNULLPRIMARYKEY,start_tsINTEGER,end_tsINTEGER',
+    'binance_trades_cursors': 'nameTEXTNOTNULL,locationCHAR(1)NOTNULLDEFAULT("E")REFERENCESlocation(location),symbolTEXTNOTNULL,next_idINTEGERNOTNULL,end_tsINTEGERNOTNULL,PRIMARYKEY(name,location,symbol)',
     'evm_tx_mappings': 'tx_hashBLOBNOTNULL,chain_idINTEGERNOTNULL,valueINTEGERNOTNULL,FOREIGNKEY(tx_hash,chain_id)referencesevm_transactions(tx_hash,chain_id)ONUPDATECASCADEONDELETECASCADE,PRIMARYKEY(tx_hash,chain_id,value)',
     'settings': 'nameVARCHAR[24]NOTNULLPRIMARYKEY,valueTEXT',
     'tags': 'nameTEXTNOTNULLPRIMARYKEYCOLLATENOCASE,descriptionTEXT,background_colorTEXT,foreground_colorTEXT',
@@ -33,6 +36,7 @@ MINIMIZED_USER_DB_SCHEMA = {
     'yearn_vaults_events': 'addressVARCHAR[42]NOTNULL,event_typeVARCHAR[10]NOTNULL,from_assetTEXTNOTNULL,from_amountTEXTNOTNULL,from_usd_valueTEXTNOTNULL,to_assetTEXTNOTNULL,to_amountTEXTNOTNULL,to_usd_valueTEXTNOTNULL,pnl_amountTEXT,pnl_usd_valueTEXT,block_numberINTEGERNOTNULL,timestampINTEGERNOTNULL,tx_hashBLOBNOTNULL,log_indexINTEGERNOTNULL,versionINTEGERNOTNULLDEFAULT1,FOREIGNKEY(from_asset)REFERENCESassets(identifier)ONUPDATECASCADE,FOREIGNKEY(to_asset)REFERENCESassets(identifier)ONUPDATECASCADE,PRIMARYKEY(event_type,tx_hash,log_index)',
     'xpubs': 'xpubTEXTNOTNULL,derivation_pathTEXTNOTNULL,labelTEXT,blockchainTEXTNOTNULL,PRIMARYKEY(xpub,derivation_path,blockchain)',
     'xpub_mappings': 'addressTEXTNOTNULL,xpubTEXTNOTNULL,derivation_pathTEXTNOTNULL,account_indexINTEGER,derived_indexINTEGER,blockchainTEXTNOTNULL,FOREIGNKEY(blockchain,address)REFERENCESblockchain_accounts(blockchain,account)ONDELETECASCADEFOREIGNKEY(xpub,derivation_path,blockchain)REFERENCESxpubs(xpub,derivation_path,blockchain)ONDELETECASCADEPRIMARYKEY(address,xpub,derivation_path,blockchain)',
+    'xpub_derived_addresses': 'xpubTEXTNOTNULL,derivation_pathTEXTNOTNULL,blockchainTEXTNOTNULL,account_indexINTEGERNOTNULL,derived_indexINTEGERNOTNULL,addressTEXTNOTNULL,FOREIGNKEY(xpub,derivation_path,blockchain)REFERENCESxpubs(xpub,derivation_path,blockchain)ONDELETECASCADEPRIMARYKEY(xpub,derivation_path,blockchain,account_index,derived_index)',
     'amm_events': 'tx_hashBLOBNOTNULL,log_indexINTEGERNOTNULL,addressVARCHAR[42]NOTNULL,timestampINTEGERNOTNULL,typeTEXTNOTNULL,pool_addressVARCHAR[42]NOTNULL,token0_identifierTEXTNOTNULL,token1_identifierTEXTNOTNULL,amount0TEXT,amount1TEXT,usd_priceTEXT,lp_amountTEXT,FOREIGNKEY(token0_identifier)REFERENCESassets(identifier)ONUPDATECASCADE,FOREIGNKEY(token1_identifier)REFERENCESassets(identifier)ONUPDATECASCADE,PRIMARYKEY(tx_hash,log_index)',
     'eth2_validators': 'validator_indexINTEGERNOTNULLPRIMARYKEY,public_keyTEXTNOTNULLUNIQUE,ownership_proportionTEXTNOTNULL',
     'eth2_daily_staking_details': 'validator_indexINTEGERNOTNULL,timestampINTEGERNOTNULL,pnlTEXTNOTNULL,FOREIGNKEY(validator_index)REFERENCESeth2_validators(validator_index)ONUPDATECASCADEONDELETECASCADE,PRIMARYKEY(validator_index,timestamp)',
@@ -1,9 +1,11 @@
 import logging
 from copy import deepcopy
+from json import JSONDecodeError
 from typing import TYPE_CHECKING, Any, Callable, Literal, Optional, Union, overload
 
 from pysqlcipher3 import dbapi2 as sqlcipher
 
+from rotkehlchen.accounting.checkpoints import PNL_CHECKPOINTS_LIMIT, PnlCheckpoint
 from rotkehlchen.accounting.constants import FREE_PNL_EVENTS_LIMIT, FREE_REPORTS_LOOKUP_LIMIT
 from rotkehlchen.accounting.pnl import PnlTotals
 from rotkehlchen.accounting.structures.processed_event import ProcessedAccountingEvent
@@ -13,6 +15,7 @@ from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import Timestamp
 from rotkehlchen.utils.misc import ts_now
+from rotkehlchen.utils.serialization import jsonloads_dict, rlk_jsondumps
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -317,3 +320,54 @@ class DBAccountingReports():
             entries=records,
             with_limit=with_limit,
         )
+
+    def add_checkpoint(self, checkpoint: PnlCheckpoint, data: dict[str, Any]) -> None:
+        """Saves a checkpoint of the accounting state. Only the latest PNL_CHECKPOINTS_LIMIT
+        checkpoints of the same settings are kept."""
+        with self.db.transient_write() as cursor:
+            cursor.execute(
+                'INSERT OR IGNORE INTO pnl_checkpoints(settings_hash, events_hash, '
+                'processed_events, timestamp, data) VALUES(?, ?, ?, ?, ?)',
+                (*checkpoint, rlk_jsondumps(data)),
+            )
+            cursor.execute(
+                'DELETE FROM pnl_checkpoints WHERE settings_hash=? AND identifier NOT IN '
+                '(SELECT identifier FROM pnl_checkpoints WHERE settings_hash=? '
+                'ORDER BY identifier DESC LIMIT ?)',
+                (checkpoint.settings_hash, checkpoint.settings_hash, PNL_CHECKPOINTS_LIMIT),
+            )
+
+    def get_checkpoints(self, settings_hash: str, before_ts: Timestamp) -> list[PnlCheckpoint]:
+        """Returns the checkpoints of the given settings that only cover events before
+        the given timestamp, starting from the one that covers the most events"""
+        with self.db.conn_transient.read_ctx() as cursor:
+            cursor.execute(
+                'SELECT settings_hash, events_hash, processed_events, timestamp '
+                'FROM pnl_checkpoints WHERE settings_hash=? AND timestamp < ? '
+                'ORDER BY processed_events DESC',
+                (settings_hash, before_ts),
+            )
+            return [PnlCheckpoint(*entry) for entry in cursor]
+
+    def get_checkpoint_data(self, checkpoint: PnlCheckpoint) -> Optional[dict[str, Any]]:
+        """Returns the saved accounting state of the checkpoint or None if it can't be read"""
+        with self.db.conn_transient.read_ctx() as cursor:
+            result = cursor.execute(
+                'SELECT data FROM pnl_checkpoints WHERE settings_hash=? AND events_hash=? '
+                'AND processed_events=?',
+                (checkpoint.settings_hash, checkpoint.events_hash, checkpoint.processed_events),
+            ).fetchone()
+
+        if result is None:
+            return None
+
+        try:
+            return jsonloads_dict(result[0])
+        except JSONDecodeError as e:
+            log.error(f'Could not read PnL checkpoint data due to {e!s}')
+            return None
+
+    def purge_checkpoints(self) -> None:
+        """Deletes all saved accounting checkpoints"""
+        with self.db.transient_write() as cursor:
+            cursor.execute('DELETE FROM pnl_checkpoints')
@@ -199,6 +199,35 @@ CREATE TABLE IF NOT EXISTS timed_location_data (
 );
 """
 
+# Downsampled copies of the balance snapshots for the graphs of long time ranges. For each
+# resolution (the bucket length in seconds) a bucket keeps the entries of the last snapshot
+# taken within it. The location rollups also count the snapshots taken within the bucket.
+DB_CREATE_TIMED_BALANCES_ROLLUPS = """
+CREATE TABLE IF NOT EXISTS timed_balances_rollups (
+    resolution INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    category CHAR(1) NOT NULL DEFAULT('A') REFERENCES balance_category(category),
+    currency TEXT NOT NULL,
+    amount TEXT,
+    usd_value TEXT,
+    FOREIGN KEY(currency) REFERENCES assets(identifier) ON UPDATE CASCADE,
+    PRIMARY KEY (resolution, bucket, currency, category)
+);
+"""
+
+DB_CREATE_TIMED_LOCATION_DATA_ROLLUPS = """
+CREATE TABLE IF NOT EXISTS timed_location_data_rollups (
+    resolution INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    location CHAR(1) NOT NULL DEFAULT('A') REFERENCES location(location),
+    usd_value TEXT,
+    snapshots INTEGER NOT NULL,
+    PRIMARY KEY (resolution, bucket, location)
+);
+"""
+
 DB_CREATE_USER_CREDENTIALS = """
 CREATE TABLE IF NOT EXISTS user_credentials (
     name TEXT NOT NULL,
@@ -319,6 +348,24 @@ CREATE TABLE IF NOT EXISTS xpub_mappings (
 );
 """
 
+# Cache of all the addresses derived from each xpub so rescans don't derive them again
+DB_CREATE_XPUB_DERIVED_ADDRESSES = """
+CREATE TABLE IF NOT EXISTS xpub_derived_addresses (
+    xpub TEXT NOT NULL,
+    derivation_path TEXT NOT NULL,
+    blockchain TEXT NOT NULL,
+    account_index INTEGER NOT NULL,
+    derived_index INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    FOREIGN KEY(xpub, derivation_path, blockchain) REFERENCES xpubs(
+        xpub,
+        derivation_path,
+        blockchain
+    ) ON DELETE CASCADE
+    PRIMARY KEY (xpub, derivation_path, blockchain, account_index, derived_index)
+);
+"""
+
 
 # Store information about the tokens queried for each combination of account and blockchain.
 # The table is designed to have a key-value structure where we use the key `token` to
@@ -534,6 +581,19 @@ CREATE TABLE IF NOT EXISTS used_query_ranges (
 );
 """
 
+# The id of the trade to continue from when querying each market of a binance account.
+# Valid only for queries starting after end_ts, until which all the earlier trades are.
+DB_CREATE_BINANCE_TRADES_CURSORS = """
+CREATE TABLE IF NOT EXISTS binance_trades_cursors (
+    name TEXT NOT NULL,
+    location CHAR(1) NOT NULL DEFAULT('E') REFERENCES location(location),
+    symbol TEXT NOT NULL,
+    next_id INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL,
+    PRIMARY KEY(name, location, symbol)
+);
+"""
+
 # Currently this table is used only to store a flag that shows whether a transaction is decoded.
 DB_CREATE_EVM_TX_MAPPINGS = """
 CREATE TABLE IF NOT EXISTS evm_tx_mappings (
@@ -731,6 +791,28 @@ CREATE TABLE IF NOT EXISTS user_notes(
 );
 """
 
+# Indexes for the columns that the history, transactions and balances queries filter
+# and order by. The tables' primary keys already cover the lookups by identifier.
+DB_CREATE_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_history_events_timestamp ON history_events(timestamp, sequence_index);
+CREATE INDEX IF NOT EXISTS idx_history_events_location ON history_events(location, timestamp);
+CREATE INDEX IF NOT EXISTS idx_history_events_asset ON history_events(asset, timestamp);
+CREATE INDEX IF NOT EXISTS idx_history_events_location_label ON history_events(location_label, asset);
+CREATE INDEX IF NOT EXISTS idx_evm_events_info_tx_hash ON evm_events_info(tx_hash);
+CREATE INDEX IF NOT EXISTS idx_evm_transactions_timestamp ON evm_transactions(timestamp);
+CREATE INDEX IF NOT EXISTS idx_evm_transactions_chain_id ON evm_transactions(chain_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_evm_tx_mappings_value ON evm_tx_mappings(chain_id, value);
+CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades(timestamp);
+CREATE INDEX IF NOT EXISTS idx_trades_location ON trades(location, timestamp);
+CREATE INDEX IF NOT EXISTS idx_asset_movements_timestamp ON asset_movements(timestamp);
+CREATE INDEX IF NOT EXISTS idx_asset_movements_location ON asset_movements(location, timestamp);
+CREATE INDEX IF NOT EXISTS idx_ledger_actions_timestamp ON ledger_actions(timestamp);
+CREATE INDEX IF NOT EXISTS idx_ledger_actions_location ON ledger_actions(location, timestamp);
+CREATE INDEX IF NOT EXISTS idx_eth2_daily_staking_details_timestamp ON eth2_daily_staking_details(timestamp);
+CREATE INDEX IF NOT EXISTS idx_timed_balances_currency ON timed_balances(currency, category, timestamp);
+CREATE INDEX IF NOT EXISTS idx_timed_balances_rollups_currency ON timed_balances_rollups(resolution, currency, category, timestamp);
+"""  # noqa: E501
+
 DB_SCRIPT_CREATE_TABLES = f"""
 PRAGMA foreign_keys=off;
 BEGIN TRANSACTION;
@@ -741,6 +823,8 @@ BEGIN TRANSACTION;
 {DB_CREATE_ASSETS}
 {DB_CREATE_TIMED_BALANCES}
 {DB_CREATE_TIMED_LOCATION_DATA}
+{DB_CREATE_TIMED_BALANCES_ROLLUPS}
+{DB_CREATE_TIMED_LOCATION_DATA_ROLLUPS}
 {DB_CREATE_USER_CREDENTIALS}
 {DB_CREATE_USER_CREDENTIALS_MAPPINGS}
 {DB_CREATE_EXTERNAL_SERVICE_CREDENTIALS}
@@ -758,6 +842,7 @@ BEGIN TRANSACTION;
 {DB_CREATE_MARGIN}
 {DB_CREATE_ASSET_MOVEMENTS}
 {DB_CREATE_USED_QUERY_RANGES}
+{DB_CREATE_BINANCE_TRADES_CURSORS}
 {DB_CREATE_EVM_TX_MAPPINGS}
 {DB_CREATE_SETTINGS}
 {DB_CREATE_TAGS_TABLE}
@@ -766,6 +851,7 @@ BEGIN TRANSACTION;
 {DB_CREATE_YEARN_VAULT_EVENTS}
 {DB_CREATE_XPUBS}
 {DB_CREATE_XPUB_MAPPINGS}
+{DB_CREATE_XPUB_DERIVED_ADDRESSES}
 {DB_CREATE_AMM_EVENTS}
 {DB_CREATE_ETH2_VALIDATORS}
 {DB_CREATE_ETH2_DAILY_STAKING_DETAILS}
@@ -783,6 +869,7 @@ BEGIN TRANSACTION;
 {DB_CREATE_ADDRESS_BOOK}
 {DB_CREATE_RPC_NODES}
 {DB_CREATE_USER_NOTES}
+{DB_CREATE_INDEXES}
 COMMIT;
 PRAGMA foreign_keys=on;
 """
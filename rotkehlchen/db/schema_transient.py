@@ -47,6 +47,19 @@ CREATE TABLE IF NOT EXISTS pnl_events (
 );
 """
 
+# Snapshots of the accounting state used to resume PnL report processing
+DB_CREATE_PNL_CHECKPOINTS = """
+CREATE TABLE IF NOT EXISTS pnl_checkpoints (
+    identifier INTEGER NOT NULL PRIMARY KEY,
+    settings_hash TEXT NOT NULL,
+    events_hash TEXT NOT NULL,
+    processed_events INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    UNIQUE(settings_hash, events_hash, processed_events)
+);
+"""
+
 DB_CREATE_SETTINGS = """
 CREATE TABLE IF NOT EXISTS settings (
     name VARCHAR[24] NOT NULL PRIMARY KEY,
@@ -61,6 +74,7 @@ BEGIN TRANSACTION;
 {DB_CREATE_REPORT_SETTINGS}
 {DB_CREATE_REPORT_TOTALS}
 {DB_CREATE_PNL_EVENTS}
+{DB_CREATE_PNL_CHECKPOINTS}
 {DB_CREATE_SETTINGS}
 COMMIT;
 PRAGMA foreign_keys=on;
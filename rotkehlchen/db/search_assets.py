@@ -1,3 +1,4 @@
+import heapq
 from typing import TYPE_CHECKING, Any, Optional
 
 from polyleven import levenshtein
@@ -43,19 +44,53 @@ def _search_only_nfts_levenstein(
     return search_result
 
 
+def _keep_closest(closest_distances: list[int], distance: int, limit: Optional[int]) -> None:
+    """Adds the distance to the max heap of the `limit` smallest distances"""
+    if limit is None:
+        return
+
+    if len(closest_distances) < limit:
+        heapq.heappush(closest_distances, -distance)
+    elif distance < -closest_distances[0]:
+        heapq.heapreplace(closest_distances, -distance)
+
+
 def _search_only_assets_levenstein(
         cursor: 'DBCursor',
         db: 'DBHandler',
         filter_query: 'LevenshteinFilterQuery',
+        limit: Optional[int],
 ) -> list[tuple[int, dict[str, Any]]]:
+    """Returns the assets whose name or symbol contain the searched substring along with
+    their Levenshtein distance from it. If a limit is given at least the `limit` closest
+    ones are returned.
+
+    The matching assets are found through the trigrams of their names and symbols
+    and are read ordered by a lower bound of their distance, which is how much longer
+    than the searched substring the closest of their name and symbol is. So reading can
+    stop once the bound is larger than the distance of `limit` already found assets.
+    """
     search_result: list[tuple[int, dict[str, Any]]] = []
+    closest_distances: list[int] = []  # max heap of the distances of the `limit` closest
     resolved_eth = A_ETH.resolve_to_crypto_asset()
+    substring_length = len(filter_query.substring_search)
     with GlobalDBHandler().conn.read_ctx() as globaldb_cursor:
         query, bindings = filter_query.prepare('assets')
-        globaldb_cursor.execute(ALL_ASSETS_TABLES_QUERY + query, bindings)
+        globaldb_cursor.execute(
+            ALL_ASSETS_TABLES_QUERY + query +
+            ' ORDER BY min(coalesce(max(length(assets.name) - ?, 0), 100), '
+            'coalesce(max(length(common_asset_details.symbol) - ?, 0), 100), 100)',
+            [*bindings, substring_length, substring_length],
+        )
         treat_eth2_as_eth = db.get_settings(cursor).treat_eth2_as_eth
         found_eth = False
         for entry in globaldb_cursor:
+            if limit is not None and len(closest_distances) == limit and min(
+                100,  # same as the ordering and the maximum distance
+                *(max(len(x) - substring_length, 0) for x in entry[1:3] if x is not None),
+            ) > -closest_distances[0]:
+                break  # the remaining assets can't be closer than the ones already found
+
             lev_dist_min = 100
             if entry[1] is not None:
                 lev_dist_min = min(
@@ -67,6 +102,7 @@ def _search_only_assets_levenstein(
                     lev_dist_min,
                     levenshtein(filter_query.substring_search, entry[2].casefold()),
                 )
+
             if treat_eth2_as_eth is True and entry[0] in (A_ETH.identifier, A_ETH2.identifier):  # noqa: E501
                 if found_eth is False:
                     search_result.append((lev_dist_min, {
@@ -76,6 +112,7 @@ def _search_only_assets_levenstein(
                         'asset_type': AssetType.OWN_CHAIN.serialize(),
                     }))
                     found_eth = True
+                    _keep_closest(closest_distances, lev_dist_min, limit)
                 continue
 
             entry_info = {
@@ -90,6 +127,7 @@ def _search_only_assets_levenstein(
                 entry_info['custom_asset_type'] = entry[5]
 
             search_result.append((lev_dist_min, entry_info))
+            _keep_closest(closest_distances, lev_dist_min, limit)
 
     return search_result
 
@@ -107,6 +145,7 @@ def search_assets_levenshtein(
             cursor=cursor,
             db=db,
             filter_query=filter_query,
+            limit=limit,
         )
         if search_nfts is True:
             search_result += _search_only_nfts_levenstein(cursor=cursor, filter_query=filter_query)
@@ -273,6 +273,9 @@ class DBSnapshot:
         if write_cursor.rowcount == 0:
             raise InputError('No snapshot found for the specified timestamp')
 
+        self.db.update_timed_balances_rollups(write_cursor, [timestamp])
+        self.db.update_timed_location_data_rollups(write_cursor, [timestamp])
+
     def add_nft_asset_ids(self, write_cursor: 'DBCursor', entries: list[str]) -> None:
         """Add NFT identifiers to the DB to prevent unknown asset error."""
         nft_ids = []
@@ -0,0 +1,160 @@
+import logging
+from typing import TYPE_CHECKING
+
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.dbhandler import DBHandler
+    from rotkehlchen.db.drivers.gevent import DBCursor
+    from rotkehlchen.db.upgrade_manager import DBUpgradeProgressHandler
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+
+def _create_history_indexes(write_cursor: 'DBCursor') -> None:
+    """Create the indexes used when filtering and ordering the history"""
+    log.debug('Enter _create_history_indexes')
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_events_timestamp ON history_events(timestamp, sequence_index);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_events_location ON history_events(location, timestamp);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_events_asset ON history_events(asset, timestamp);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_events_location_label ON history_events(location_label, asset);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_evm_events_info_tx_hash ON evm_events_info(tx_hash);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades(timestamp);')
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_trades_location ON trades(location, timestamp);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_asset_movements_timestamp ON asset_movements(timestamp);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_asset_movements_location ON asset_movements(location, timestamp);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_ledger_actions_timestamp ON ledger_actions(timestamp);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_ledger_actions_location ON ledger_actions(location, timestamp);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_eth2_daily_staking_details_timestamp ON eth2_daily_staking_details(timestamp);')  # noqa: E501
+    log.debug('Exit _create_history_indexes')
+
+
+def _create_evm_transactions_indexes(write_cursor: 'DBCursor') -> None:
+    """Create the indexes used when querying transactions by chain and time and when
+    looking for the transactions that need decoding"""
+    log.debug('Enter _create_evm_transactions_indexes')
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_evm_transactions_timestamp ON evm_transactions(timestamp);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_evm_transactions_chain_id ON evm_transactions(chain_id, timestamp);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_evm_tx_mappings_value ON evm_tx_mappings(chain_id, value);')  # noqa: E501
+    log.debug('Exit _create_evm_transactions_indexes')
+
+
+def _create_balances_indexes(write_cursor: 'DBCursor') -> None:
+    """Create the index used when querying the balances of an asset over time"""
+    log.debug('Enter _create_balances_indexes')
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_timed_balances_currency ON timed_balances(currency, category, timestamp);')  # noqa: E501
+    log.debug('Exit _create_balances_indexes')
+
+
+def _create_binance_trades_cursors(write_cursor: 'DBCursor') -> None:
+    """Create the table of the ids to continue each binance market's trades query from"""
+    log.debug('Enter _create_binance_trades_cursors')
+    write_cursor.execute("""
+    CREATE TABLE IF NOT EXISTS binance_trades_cursors (
+        name TEXT NOT NULL,
+        location CHAR(1) NOT NULL DEFAULT('E') REFERENCES location(location),
+        symbol TEXT NOT NULL,
+        next_id INTEGER NOT NULL,
+        end_ts INTEGER NOT NULL,
+        PRIMARY KEY(name, location, symbol)
+    );""")
+    log.debug('Exit _create_binance_trades_cursors')
+
+
+def _create_balances_rollups(write_cursor: 'DBCursor') -> None:
+    """Create the daily and weekly rollups of the balance snapshots and fill them with the
+    last snapshot of each bucket"""
+    log.debug('Enter _create_balances_rollups')
+    write_cursor.execute("""
+    CREATE TABLE IF NOT EXISTS timed_balances_rollups (
+        resolution INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        timestamp INTEGER NOT NULL,
+        category CHAR(1) NOT NULL DEFAULT('A') REFERENCES balance_category(category),
+        currency TEXT NOT NULL,
+        amount TEXT,
+        usd_value TEXT,
+        FOREIGN KEY(currency) REFERENCES assets(identifier) ON UPDATE CASCADE,
+        PRIMARY KEY (resolution, bucket, currency, category)
+    );""")
+    write_cursor.execute("""
+    CREATE TABLE IF NOT EXISTS timed_location_data_rollups (
+        resolution INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        timestamp INTEGER NOT NULL,
+        location CHAR(1) NOT NULL DEFAULT('A') REFERENCES location(location),
+        usd_value TEXT,
+        snapshots INTEGER NOT NULL,
+        PRIMARY KEY (resolution, bucket, location)
+    );""")
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_timed_balances_rollups_currency ON timed_balances_rollups(resolution, currency, category, timestamp);')  # noqa: E501
+    for resolution in (86400, 604800):  # daily and weekly
+        write_cursor.execute(
+            'INSERT OR IGNORE INTO timed_balances_rollups(resolution, bucket, timestamp, '
+            'category, currency, amount, usd_value) SELECT ?, buckets.bucket, tb.timestamp, '
+            'tb.category, tb.currency, tb.amount, tb.usd_value FROM timed_balances tb INNER JOIN '
+            '(SELECT timestamp - timestamp % ? AS bucket, MAX(timestamp) AS last_timestamp '
+            'FROM timed_balances GROUP BY bucket) buckets '
+            'ON tb.timestamp = buckets.last_timestamp',
+            (resolution, resolution),
+        )
+        write_cursor.execute(
+            'INSERT OR IGNORE INTO timed_location_data_rollups(resolution, bucket, timestamp, '
+            'location, usd_value, snapshots) SELECT ?, buckets.bucket, tl.timestamp, '
+            'tl.location, tl.usd_value, buckets.snapshots FROM timed_location_data tl INNER JOIN '
+            '(SELECT timestamp - timestamp % ? AS bucket, MAX(timestamp) AS last_timestamp, '
+            'COUNT(DISTINCT timestamp) AS snapshots FROM timed_location_data GROUP BY bucket) '
+            'buckets ON tl.timestamp = buckets.last_timestamp',
+            (resolution, resolution),
+        )
+    log.debug('Exit _create_balances_rollups')
+
+
+def _create_xpub_derived_addresses(write_cursor: 'DBCursor') -> None:
+    """Create the table caching the addresses derived from each xpub"""
+    log.debug('Enter _create_xpub_derived_addresses')
+    write_cursor.execute("""
+    CREATE TABLE IF NOT EXISTS xpub_derived_addresses (
+        xpub TEXT NOT NULL,
+        derivation_path TEXT NOT NULL,
+        blockchain TEXT NOT NULL,
+        account_index INTEGER NOT NULL,
+        derived_index INTEGER NOT NULL,
+        address TEXT NOT NULL,
+        FOREIGN KEY(xpub, derivation_path, blockchain) REFERENCES xpubs(
+            xpub,
+            derivation_path,
+            blockchain
+        ) ON DELETE CASCADE
+        PRIMARY KEY (xpub, derivation_path, blockchain, account_index, derived_index)
+    );""")
+    log.debug('Exit _create_xpub_derived_addresses')
+
+
+def upgrade_v37_to_v38(db: 'DBHandler', progress_handler: 'DBUpgradeProgressHandler') -> None:
+    """Upgrades the DB from v37 to v38. This was in v1.29.0 release.
+
+        - Add indexes for the columns the history, transactions and balances
+        queries filter and order by
+        - Add the table of the binance trades cursors
+        - Add the daily and weekly rollups of the balance snapshots
+        - Add the cache of the addresses derived from the xpubs
+    """
+    log.debug('Entered userdb v37->v38 upgrade')
+    progress_handler.set_total_steps(6)
+    with db.user_write() as write_cursor:
+        _create_history_indexes(write_cursor)
+        progress_handler.new_step()
+        _create_evm_transactions_indexes(write_cursor)
+        progress_handler.new_step()
+        _create_balances_indexes(write_cursor)
+        progress_handler.new_step()
+        _create_binance_trades_cursors(write_cursor)
+        progress_handler.new_step()
+        _create_balances_rollups(write_cursor)
+        progress_handler.new_step()
+        _create_xpub_derived_addresses(write_cursor)
+        progress_handler.new_step()
+
+    log.debug('Finished userdb v37->v38 upgrade')
@@ -2,7 +2,9 @@ import hashlib
 import hmac
 import json
 import logging
+import time
 from collections import defaultdict
+from collections.abc import Mapping
 from contextlib import suppress
 from json.decoder import JSONDecodeError
 from typing import TYPE_CHECKING, Any, Literal, Optional, Union
@@ -11,6 +13,8 @@ from uuid import uuid4
 
 import gevent
 import requests
+from gevent.lock import Semaphore
+from gevent.pool import Pool
 
 from rotkehlchen.accounting.ledger_actions import LedgerAction
 from rotkehlchen.accounting.structures.balance import Balance
@@ -110,6 +114,15 @@ BINANCE_API_TYPE = Literal['api', 'sapi', 'dapi', 'fapi']
 BINANCE_BASE_URL = 'binance.com/'
 BINANCEUS_BASE_URL = 'binance.us/'
 
+# Request weight per minute allowed by the spot api of each exchange. Kept a bit lower than
+# the real limits so that requests of other applications of the user don't get us banned.
+# https://binance-docs.github.io/apidocs/spot/en/#limits
+API_WEIGHT_LIMITS = {BINANCE_BASE_URL: 5400, BINANCEUS_BASE_URL: 1000}
+# Weight of the spot api methods that are not 1. Only these are queried many times in a row
+API_METHOD_WEIGHTS = {'myTrades': 20, 'account': 20, 'exchangeInfo': 20}
+# Number of markets whose trades are queried at the same time
+TRADES_QUERY_CONCURRENCY = 8
+
 
 class BinancePermissionError(RemoteError):
     """Exception raised when a binance permission problem is detected
@@ -117,6 +130,50 @@ class BinancePermissionError(RemoteError):
     Example is when there is no margin account to query or insufficient api key permissions."""
 
 
+class BinanceWeightLimiter:
+    """Keeps the request weight used in each minute under the limit of the spot api
+
+    Binance counts the weight of the requests per minute and reports the weight used in
+    the current minute in the X-MBX-USED-WEIGHT-1M header of each response. The weight of
+    the requests that are still waiting for their response is added to the reported one
+    so that concurrent requests don't go over the limit.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.minute = 0
+        self.used_weight = 0  # reported by binance for the current minute
+        self.pending_weight = 0  # of the requests waiting for their response
+        self.lock = Semaphore()
+
+    def _maybe_reset(self) -> None:
+        if (minute := int(time.time()) // 60) != self.minute:
+            self.minute = minute
+            self.used_weight = 0
+
+    def acquire(self, weight: int) -> None:
+        """Waits until a request of the given weight can be sent"""
+        with self.lock:
+            self._maybe_reset()
+            while self.used_weight + self.pending_weight + weight > self.limit:
+                seconds = 60 - time.time() % 60
+                log.debug(f'Binance request weight limit reached. Waiting for {seconds:.1f} seconds')  # noqa: E501
+                gevent.sleep(seconds)
+                self._maybe_reset()
+
+            self.pending_weight += weight
+
+    def release(self, weight: int, headers: Optional[Mapping[str, str]]) -> None:
+        """Called when the request of the given weight got its response, if any"""
+        self.pending_weight -= weight
+        if headers is None or (used_weight := headers.get('x-mbx-used-weight-1m')) is None:
+            return
+
+        with suppress(ValueError):
+            self._maybe_reset()
+            self.used_weight = max(self.used_weight, int(used_weight))
+
+
 def trade_from_binance(
         binance_trade: dict,
         binance_symbols_to_pair: dict[str, BinancePair],
@@ -228,6 +285,7 @@ class Binance(ExchangeInterface, ExchangeWithExtras):
         self.msg_aggregator = msg_aggregator
         self.offset_ms = 0
         self.selected_pairs = binance_selected_trade_pairs
+        self.weight_limiter = BinanceWeightLimiter(limit=API_WEIGHT_LIMITS.get(uri, 1000))
 
     def first_connection(self) -> None:
         if self.first_connection_made:
@@ -342,13 +400,19 @@ class Binance(ExchangeInterface, ExchangeWithExtras):
             )
             request_url += urlencode(call_options)
             log.debug(f'{self.name} API request', request_url=request_url)
+            # the weight of the requests to the other apis is limited separately
+            weight = API_METHOD_WEIGHTS.get(method, 1) if api_type == 'api' else 0
+            self.weight_limiter.acquire(weight)
             try:
                 response = self.session.get(request_url, timeout=DEFAULT_TIMEOUT_TUPLE)
             except requests.exceptions.RequestException as e:
+                self.weight_limiter.release(weight, headers=None)
                 raise RemoteError(
                     f'{self.name} API request failed due to {e!s}',
                 ) from e
 
+            self.weight_limiter.release(weight, headers=response.headers if weight != 0 else None)  # noqa: E501
+
             if response.status_code not in (200, 418, 429):
                 code = 'no code found'
                 msg = 'no message found'
@@ -983,7 +1047,8 @@ class Binance(ExchangeInterface, ExchangeWithExtras):
             start_ts: Timestamp,
             end_ts: Timestamp,
     ) -> tuple[list[Trade], tuple[Timestamp, Timestamp]]:
-        """
+        """Queries the trades of the markets concurrently. The trades of each market are
+        queried from where the last query that ended before start_ts stopped.
 
         May raise due to api query and unexpected id:
         - RemoteError
@@ -995,40 +1060,40 @@ class Binance(ExchangeInterface, ExchangeWithExtras):
         else:
             iter_markets = list(self._symbols_to_pair.keys())
 
+        with self.db.conn.read_ctx() as cursor:
+            saved_cursors = self.db.get_binance_trades_cursors(
+                cursor=cursor,
+                name=self.name,
+                location=self.location,
+            )
+
+        def query_market(symbol: str) -> tuple[str, list[dict[str, Any]], int]:
+            # The trades before a saved cursor are all until its end_ts. If the query
+            # starts after that they have already been queried and can be skipped.
+            from_id = 0
+            if (saved_cursor := saved_cursors.get(symbol)) is not None and start_ts > saved_cursor[1]:  # noqa: E501
+                from_id = saved_cursor[0]
+            return symbol, *self._query_market_trades(symbol, from_id=from_id, end_ts=end_ts)
+
         raw_data = []
-        # Limit of results to return. 1000 is max limit according to docs
-        limit = 1000
-        for symbol in iter_markets:
-            last_trade_id = 0
-            len_result = limit
-            while len_result == limit:
-                # We know that myTrades returns a list from the api docs
-                result = self.api_query_list(
-                    'api',
-                    'myTrades',
-                    options={
-                        'symbol': symbol,
-                        'fromId': last_trade_id,
-                        'limit': limit,
-                        # Not specifying them since binance does not seem to
-                        # respect them and always return all trades
-                    })
-                if result:
-                    try:
-                        last_trade_id = int(result[-1]['id']) + 1
-                    except (ValueError, KeyError, IndexError) as e:
-                        raise RemoteError(
-                            f'Could not parse id from Binance myTrades api query result: {result}',
-                        ) from e
-
-                len_result = len(result)
-                log.debug(f'{self.name} myTrades query result', results_num=len_result)
-                for r in result:
-                    r['symbol'] = symbol
+        new_cursors = {}
+        pool = Pool(TRADES_QUERY_CONCURRENCY)
+        try:
+            for symbol, result, next_id in pool.imap_unordered(query_market, iter_markets):
                 raw_data.extend(result)
+                new_cursors[symbol] = (next_id, end_ts)
+        finally:  # stop querying the other markets if one of them failed
+            pool.kill()
+
+        with self.db.user_write() as write_cursor:
+            self.db.set_binance_trades_cursors(
+                write_cursor=write_cursor,
+                name=self.name,
+                location=self.location,
+                cursors=new_cursors,
+            )
 
-            raw_data.sort(key=lambda x: x['time'])
-
+        raw_data.sort(key=lambda x: x['time'])
         trades = []
         for raw_trade in raw_data:
             try:
@@ -1080,6 +1145,66 @@ class Binance(ExchangeInterface, ExchangeWithExtras):
 
         return trades, (start_ts, end_ts)
 
+    def _query_market_trades(
+            self,
+            symbol: str,
+            from_id: int,
+            end_ts: Timestamp,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Queries the trades of a market starting from the trade with the given id
+
+        Returns the trades along with the id to continue from in a query starting after
+        end_ts. That is the id that follows the last trade until end_ts.
+
+        May raise:
+        - RemoteError
+        - BinancePermissionError
+        """
+        raw_data: list[dict[str, Any]] = []
+        next_id, advance_cursor = from_id, True
+        # Limit of results to return. 1000 is max limit according to docs
+        limit = 1000
+        len_result = limit
+        while len_result == limit:
+            # We know that myTrades returns a list from the api docs
+            result = self.api_query_list(
+                'api',
+                'myTrades',
+                options={
+                    'symbol': symbol,
+                    'fromId': from_id,
+                    'limit': limit,
+                    # Not specifying them since binance does not seem to
+                    # respect them and always return all trades
+                })
+            if result:
+                try:
+                    from_id = int(result[-1]['id']) + 1
+                except (ValueError, KeyError, IndexError) as e:
+                    raise RemoteError(
+                        f'Could not parse id from Binance myTrades api query result: {result}',
+                    ) from e
+
+            len_result = len(result)
+            log.debug(f'{self.name} myTrades query result', symbol=symbol, results_num=len_result)  # noqa: E501
+            for raw_trade in result:
+                raw_trade['symbol'] = symbol
+                if advance_cursor is False:
+                    continue
+
+                try:
+                    if int(raw_trade['time']) > end_ts * 1000:
+                        advance_cursor = False
+                        len_result = 0  # the rest of the trades are also after the range
+                        continue
+                    next_id = int(raw_trade['id']) + 1
+                except (ValueError, KeyError, TypeError):
+                    advance_cursor = False  # don't skip this trade in later queries
+
+            raw_data.extend(result)
+
+        return raw_data, next_id
+
     def _query_online_fiat_payments(self, start_ts: Timestamp, end_ts: Timestamp) -> list[Trade]:
         if self.location == Location.BINANCEUS:
             return []  # dont exist for Binance US: https://github.com/rotki/rotki/issues/3664
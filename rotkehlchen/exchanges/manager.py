@@ -1,12 +1,15 @@
 import logging
 from collections import defaultdict
-from collections.abc import Iterator
+from collections.abc import Callable, Iterator
 from importlib import import_module
 from types import ModuleType
 from typing import TYPE_CHECKING, Any, Optional
 
+from gevent.pool import Pool
+
+from rotkehlchen.constants.misc import DEFAULT_EXCHANGES_QUERY_CONCURRENCY
 from rotkehlchen.db.constants import BINANCE_MARKETS_KEY, KRAKEN_ACCOUNT_TYPE_KEY
-from rotkehlchen.errors.misc import InputError
+from rotkehlchen.errors.misc import InputError, RemoteError
 from rotkehlchen.exchanges.binance import BINANCE_BASE_URL, BINANCEUS_BASE_URL
 from rotkehlchen.exchanges.exchange import ExchangeInterface, ExchangeWithExtras
 from rotkehlchen.logging import RotkehlchenLogsAdapter
@@ -32,9 +35,14 @@ log = RotkehlchenLogsAdapter(logger)
 
 class ExchangeManager:
 
-    def __init__(self, msg_aggregator: MessagesAggregator) -> None:
+    def __init__(
+            self,
+            msg_aggregator: MessagesAggregator,
+            query_concurrency: int = DEFAULT_EXCHANGES_QUERY_CONCURRENCY,
+    ) -> None:
         self.connected_exchanges: dict[Location, list[ExchangeInterface]] = defaultdict(list)
         self.msg_aggregator = msg_aggregator
+        self.query_concurrency = query_concurrency
 
     @staticmethod
     def _get_exchange_module_name(location: Location) -> str:
@@ -305,14 +313,49 @@ class ExchangeManager:
             return self.database.get_binance_pairs(name, location)
         return []
 
+    def query_exchanges(
+            self,
+            query: Callable[[ExchangeInterface], Any],
+            exchanges: Optional[list[ExchangeInterface]] = None,
+    ) -> list[tuple[ExchangeInterface, Exception]]:
+        """Runs the query for each of the given exchanges, by default all the connected and
+        syncing ones. The exchanges are independent of each other so up to
+        `query_concurrency` of them are queried at the same time, each writing its entries
+        to the DB as it gets them. The history read from the DB is ordered by timestamp,
+        location and id so it does not depend on the order in which they were written.
+
+        An exchange whose query fails does not stop the queries of the others.
+        Returns the exchanges whose query raised an exception along with it, in the
+        order of the exchanges.
+        """
+        to_query = list(self.iterate_exchanges()) if exchanges is None else exchanges
+        failures: dict[int, tuple[ExchangeInterface, Exception]] = {}
+
+        def query_exchange(idx: int) -> None:
+            exchange = to_query[idx]
+            try:
+                query(exchange)
+            except Exception as e:  # pylint: disable=broad-except
+                log.error(f'Query of {exchange.location!s} exchange {exchange.name} failed due to {e!s}')  # noqa: E501
+                failures[idx] = (exchange, e)
+
+        Pool(max(self.query_concurrency, 1)).map(query_exchange, range(len(to_query)))
+        return [failures[idx] for idx in sorted(failures)]
+
     def query_history_events(self) -> None:
         """Queries all history events for exchanges that need it
 
         May raise:
-        - RemoteError if any exchange's remote query fails
+        - RemoteError if any exchange's remote query fails. Raised after the
+        queries of all the other exchanges finish.
         """
-        for exchange in self.iterate_exchanges():
-            exchange.query_history_events()
+        failures = self.query_exchanges(lambda exchange: exchange.query_history_events())
+        for _, e in failures:
+            if not isinstance(e, RemoteError):
+                raise e
+
+        if len(failures) != 0:
+            raise RemoteError('\n'.join(str(e) for _, e in failures))
 
     def get_exchange_mappings(self) -> LocationEventMappingType:
         """Collect event mappings from each exchange"""
@@ -1,4 +1,5 @@
 from decimal import Decimal, InvalidOperation
+from functools import lru_cache
 from typing import Any, Union
 
 from rotkehlchen.errors.serialization import ConversionError
@@ -23,19 +24,23 @@ class FVal():
     def __init__(self, data: AcceptableFValInitInput = 0):
 
         try:
-            if isinstance(data, float):
-                self.num = Decimal(str(data))
-            elif isinstance(data, bytes):
-                # assume it's an ascii string and try to decode the bytes to one
-                self.num = Decimal(data.decode())
+            # Most common input types are checked first. They are all disjoint apart from
+            # bool being an int so the order does not change which branch is taken.
+            if isinstance(data, (Decimal, str)):
+                self.num = Decimal(data)
+            elif isinstance(data, FVal):
+                self.num = data.num
             elif isinstance(data, bool):
                 # This elif has to come before the isinstance(int) check due to
                 # https://stackoverflow.com/questions/37888620/comparing-boolean-and-int-using-isinstance
                 raise ValueError('Invalid type bool for data given to FVal constructor')
-            elif isinstance(data, (Decimal, int, str)):
+            elif isinstance(data, int):
                 self.num = Decimal(data)
-            elif isinstance(data, FVal):
-                self.num = data.num
+            elif isinstance(data, float):
+                self.num = Decimal(str(data))
+            elif isinstance(data, bytes):
+                # assume it's an ascii string and try to decode the bytes to one
+                self.num = Decimal(data.decode())
             else:
                 raise ValueError(f'Invalid type {type(data)} of data given to FVal constructor')
 
@@ -45,6 +50,14 @@ class FVal():
                 'Found {}.'.format(type(data)),
             ) from e
 
+    @classmethod
+    def _from_decimal(cls, num: Decimal) -> 'FVal':
+        """Wraps the result of an operation without going through the input checks
+        of the constructor since it is already a Decimal"""
+        result = object.__new__(cls)
+        result.num = num
+        return result
+
     def __str__(self) -> str:
         return f'{self.num:f}'
 
@@ -54,21 +67,20 @@ class FVal():
     def __hash__(self) -> int:
         return hash(self.num)
 
+    # Comparisons use the Decimal operators which, like compare_signal, raise
+    # InvalidOperation if a NaN is involved, but don't allocate a Decimal for the result
+
     def __gt__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = _evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) == Decimal('1')
+        return self.num > (other.num if isinstance(other, FVal) else _evaluate_input(other))
 
     def __lt__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = _evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) == Decimal('-1')
+        return self.num < (other.num if isinstance(other, FVal) else _evaluate_input(other))
 
     def __le__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = _evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) in (Decimal('-1'), Decimal('0'))
+        return self.num <= (other.num if isinstance(other, FVal) else _evaluate_input(other))
 
     def __ge__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = _evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) in (Decimal('1'), Decimal('0'))
+        return self.num >= (other.num if isinstance(other, FVal) else _evaluate_input(other))
 
     def __eq__(self, other: object) -> bool:
         evaluated_other: Union[Decimal, int]
@@ -79,59 +91,63 @@ class FVal():
         else:
             evaluated_other = other
 
-        return self.num.compare_signal(evaluated_other) == Decimal('0')
+        if self.num == evaluated_other:
+            return True
+        if self.num.is_nan() or evaluated_other != evaluated_other:  # only NaN is not equal to itself  # noqa: E501
+            self.num.compare_signal(evaluated_other)  # raises InvalidOperation as it used to
+        return False
 
     def __add__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__add__(evaluated_other))
+        evaluated_other = other.num if isinstance(other, FVal) else _evaluate_input(other)
+        return FVal._from_decimal(self.num + evaluated_other)
 
     def __sub__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__sub__(evaluated_other))
+        evaluated_other = other.num if isinstance(other, FVal) else _evaluate_input(other)
+        return FVal._from_decimal(self.num - evaluated_other)
 
     def __mul__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__mul__(evaluated_other))
+        evaluated_other = other.num if isinstance(other, FVal) else _evaluate_input(other)
+        return FVal._from_decimal(self.num * evaluated_other)
 
     def __truediv__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__truediv__(evaluated_other))
+        evaluated_other = other.num if isinstance(other, FVal) else _evaluate_input(other)
+        return FVal._from_decimal(self.num / evaluated_other)
 
     def __floordiv__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__floordiv__(evaluated_other))
+        return FVal._from_decimal(self.num.__floordiv__(evaluated_other))
 
     def __pow__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__pow__(evaluated_other))
+        return FVal._from_decimal(self.num.__pow__(evaluated_other))
 
     def __radd__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__radd__(evaluated_other))
+        return FVal._from_decimal(self.num.__radd__(evaluated_other))
 
     def __rsub__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__rsub__(evaluated_other))
+        return FVal._from_decimal(self.num.__rsub__(evaluated_other))
 
     def __rmul__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__rmul__(evaluated_other))
+        return FVal._from_decimal(self.num.__rmul__(evaluated_other))
 
     def __rtruediv__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__rtruediv__(evaluated_other))
+        return FVal._from_decimal(self.num.__rtruediv__(evaluated_other))
 
     def __rfloordiv__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__rfloordiv__(evaluated_other))
+        return FVal._from_decimal(self.num.__rfloordiv__(evaluated_other))
 
     def __mod__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__mod__(evaluated_other))
+        return FVal._from_decimal(self.num.__mod__(evaluated_other))
 
     def __rmod__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__rmod__(evaluated_other))
+        return FVal._from_decimal(self.num.__rmod__(evaluated_other))
 
     def __float__(self) -> float:
         return float(self.num)
@@ -139,10 +155,10 @@ class FVal():
     # --- Unary operands
 
     def __neg__(self) -> 'FVal':
-        return FVal(self.num.__neg__())
+        return FVal._from_decimal(self.num.__neg__())
 
     def __abs__(self) -> 'FVal':
-        return FVal(self.num.copy_abs())
+        return FVal._from_decimal(self.num.copy_abs())
 
     # --- Other operations
 
@@ -153,7 +169,7 @@ class FVal():
         """
         evaluated_other = _evaluate_input(other)
         evaluated_third = _evaluate_input(third)
-        return FVal(self.num.fma(evaluated_other, evaluated_third))
+        return FVal._from_decimal(self.num.fma(evaluated_other, evaluated_third))
 
     def to_percentage(self, precision: int = 4, with_perc_sign: bool = True) -> str:
         return f'{self.num*100:.{precision}f}{"%" if with_perc_sign else ""}'
@@ -171,13 +187,19 @@ class FVal():
         return int(self.num)
 
     def is_close(self, other: AcceptableFValInitInput, max_diff: str = '1e-6') -> bool:
-        evaluated_max_diff = FVal(max_diff)
+        evaluated_max_diff = _max_diff_to_decimal(max_diff)
 
         if not isinstance(other, FVal):
             other = FVal(other)
 
         diff_num = abs(self.num - other.num)
-        return diff_num <= evaluated_max_diff.num
+        return diff_num <= evaluated_max_diff
+
+
+@lru_cache(maxsize=16)
+def _max_diff_to_decimal(max_diff: str) -> Decimal:
+    """Parses the max_diff of is_close. Cached since only a few different values are used"""
+    return FVal(max_diff).num
 
 
 def _evaluate_input(other: Any) -> Union[Decimal, int]:
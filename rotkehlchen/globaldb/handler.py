@@ -35,9 +35,15 @@ from rotkehlchen.utils.serialization import (
 )
 
 from .migrations.manager import LAST_DATA_MIGRATION, maybe_apply_globaldb_migrations
+from .price_history_index import PriceHistoryIndex
 from .schema import DB_SCRIPT_CREATE_TABLES
 from .upgrades.manager import maybe_upgrade_globaldb
-from .utils import GLOBAL_DB_FILENAME, GLOBAL_DB_VERSION, globaldb_get_setting_value
+from .utils import (
+    GLOBAL_DB_FILENAME,
+    GLOBAL_DB_VERSION,
+    globaldb_get_setting_value,
+    update_asset_search_trigrams,
+)
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
@@ -112,6 +118,7 @@ def _initialize_and_check_unfinished_upgrades(
         )
 
     backup_to_use = sorted(found_backups)[-1]  # Use latest backup
+    connection.close()  # so that a leftover WAL file is not applied to the backup
     shutil.copyfile(
         global_dir / backup_to_use,
         global_dir / db_filename,
@@ -189,6 +196,10 @@ class GlobalDBHandler():
     __instance: Optional['GlobalDBHandler'] = None
     _data_directory: Optional[Path] = None
     _packaged_db_conn: Optional[DBConnection] = None
+    _price_history_index: Optional[PriceHistoryIndex] = None
+    # incremented whenever evm tokens get added, edited or deleted so that caches of
+    # evm token lookups, such as the one used during decoding, know to drop their entries
+    evm_tokens_modifications: int = 0
     conn: DBConnection
     used_backup: bool  # specifies if the global DB was restored from a backup
     packaged_db_lock: Semaphore
@@ -197,12 +208,14 @@ class GlobalDBHandler():
             cls,
             data_dir: Optional[Path] = None,
             sql_vm_instructions_cb: Optional[int] = None,
+            read_connections: int = 0,
     ) -> 'GlobalDBHandler':
         """
         Initializes the GlobalDB.
 
         If the data dir is given it uses the already existing global DB in that directory,
-        of if there is none copies the built-in one there.
+        of if there is none copies the built-in one there. If read_connections is not zero
+        the DB runs in WAL mode and reads are served by that many read-only connections.
         May raise:
         - DBSchemaError if GlobalDB's schema is malformed
         """
@@ -213,6 +226,7 @@ class GlobalDBHandler():
         GlobalDBHandler.__instance = object.__new__(cls)
         GlobalDBHandler.__instance._data_directory = data_dir
         GlobalDBHandler.__instance.conn, GlobalDBHandler.__instance.used_backup = _initialize_global_db_directory(data_dir, sql_vm_instructions_cb)  # noqa: E501
+        GlobalDBHandler.__instance.conn.enable_read_pool(pool_size=read_connections)
         GlobalDBHandler.__instance.packaged_db_lock = Semaphore()
         return GlobalDBHandler.__instance
 
@@ -232,6 +246,44 @@ class GlobalDBHandler():
         GlobalDBHandler()._packaged_db_conn = packaged_db_conn
         return packaged_db_conn
 
+    @staticmethod
+    def enable_price_history_index() -> None:
+        """Start serving historical price lookups from an in-memory index of price_history.
+
+        Worth it when many lookups are going to hit the same pairs, e.g. in PnL reports.
+        """
+        if GlobalDBHandler()._price_history_index is None:
+            GlobalDBHandler()._price_history_index = PriceHistoryIndex(GlobalDBHandler().conn)
+
+    @staticmethod
+    def disable_price_history_index() -> None:
+        """Stop using the in-memory price_history index and free its memory"""
+        GlobalDBHandler()._price_history_index = None
+
+    @staticmethod
+    def invalidate_price_history_index(
+            pairs: Optional[list[tuple[Asset, Asset]]] = None,
+            asset_identifiers: Optional[list[str]] = None,
+    ) -> None:
+        """Invalidate the given pairs and the pairs of the given assets in the price_history
+        index or all of it if neither is given. To be called after price_history is
+        modified in a way the index can't follow, such as by cascading deletions of assets."""
+        if (index := GlobalDBHandler()._price_history_index) is None:
+            return
+
+        if pairs is None and asset_identifiers is None:
+            index.clear()
+            return
+
+        if pairs is not None:
+            index.invalidate_pairs(pairs)
+        if asset_identifiers is not None:
+            index.invalidate_assets(asset_identifiers)
+
+    @staticmethod
+    def mark_evm_tokens_modified() -> None:
+        GlobalDBHandler.evm_tokens_modifications += 1
+
     @staticmethod
     def get_schema_version() -> int:
         """Get the version of the DB Schema"""
@@ -314,6 +366,7 @@ class GlobalDBHandler():
                         swapped_for,
                     ),
                 )
+                update_asset_search_trigrams(write_cursor, [asset_id])
         except sqlite3.IntegrityError as e:
             raise InputError(
                 f'Failed to add asset {asset_id} into the assets table due to {e!s}',
@@ -820,12 +873,15 @@ class GlobalDBHandler():
             chain_id: ChainID,
             exceptions: Optional[list[ChecksumEvmAddress]] = None,
             protocol: Optional[str] = None,
+            added_after: Optional[int] = None,
     ) -> list[EvmToken]:
         """Gets all ethereum tokens from the DB
 
         Can also accept filtering parameters.
         - List of addresses to ignore via exceptions
         - Protocol for which to return tokens
+        - added_after to return only the tokens added after the token with the given
+        rowid. See get_last_evm_token_rowid
         """
         querystr = (
             'SELECT A.identifier, B.address,  B.chain, B.token_kind, B.decimals, A.name, '
@@ -835,7 +891,7 @@ class GlobalDBHandler():
             'C.identifier = B.identifier WHERE B.chain = ? '
         )
         bindings_list: list[Union[str, int, ChecksumEvmAddress]] = [chain_id.serialize_for_db()]  # noqa: E501
-        if exceptions is not None or protocol is not None:
+        if exceptions is not None or protocol is not None or added_after is not None:
             querystr_additions = []
             if exceptions is not None:
                 questionmarks = '?' * len(exceptions)
@@ -844,6 +900,9 @@ class GlobalDBHandler():
             if protocol is not None:
                 querystr_additions.append('B.protocol=? ')
                 bindings_list.append(protocol)
+            if added_after is not None:
+                querystr_additions.append('B.rowid > ? ')
+                bindings_list.append(added_after)
 
             querystr += 'AND ' + 'AND '.join(querystr_additions) + ';'
         else:
@@ -868,6 +927,16 @@ class GlobalDBHandler():
 
         return tokens
 
+    @staticmethod
+    def get_last_evm_token_rowid() -> int:
+        """Returns the rowid of the last token added to the evm_tokens table. Used to know
+        which tokens were added after a point in time.
+
+        Rowids may get reassigned if the table is recreated, so this can only be a hint
+        """
+        with GlobalDBHandler().conn.read_ctx() as cursor:
+            return cursor.execute('SELECT IFNULL(MAX(rowid), 0) FROM evm_tokens').fetchone()[0]
+
     @staticmethod
     def get_tokens_mappings(addresses: list[ChecksumEvmAddress]) -> dict[ChecksumEvmAddress, str]:  # noqa: E501
         """Gets mappings: address -> name for tokens whose address is in the provided list"""
@@ -916,6 +985,7 @@ class GlobalDBHandler():
                 msg = f'Ethereum token with identifier {entry.identifier} already exists in the DB'  # noqa: E501
             raise InputError(msg) from e
 
+        GlobalDBHandler.mark_evm_tokens_modified()
         if entry.underlying_tokens is not None:
             GlobalDBHandler()._add_underlying_tokens(
                 write_cursor=write_cursor,
@@ -955,6 +1025,7 @@ class GlobalDBHandler():
                         entry.identifier,
                     ),
                 )
+                update_asset_search_trigrams(write_cursor, [entry.identifier])
                 write_cursor.execute(
                     'UPDATE evm_tokens SET token_kind=?, chain=?, address=?, decimals=?, '
                     'protocol=? WHERE identifier=?',
@@ -999,6 +1070,7 @@ class GlobalDBHandler():
                 f'due to a constraint being hit. Make sure the new values are valid ',
             ) from e
 
+        GlobalDBHandler.mark_evm_tokens_modified()
         return rotki_id
 
     @staticmethod
@@ -1084,6 +1156,8 @@ class GlobalDBHandler():
                     f'due to a constraint being hit. Make sure the new values are valid.',
                 ) from e
 
+            update_asset_search_trigrams(write_cursor, [identifier])
+
     @staticmethod
     def add_user_owned_assets(assets: list['Asset']) -> None:
         """Make sure all assets in the list are included in the user owned assets
@@ -1109,6 +1183,11 @@ class GlobalDBHandler():
          May raise:
          - InputError if no asset with the provided identifier was found"""
         with GlobalDBHandler().conn.write_ctx() as write_cursor:
+            write_cursor.execute(
+                'DELETE FROM asset_search_trigrams WHERE asset_rowid IN '
+                '(SELECT rowid FROM assets WHERE identifier=?);',
+                (identifier,),
+            )
             write_cursor.execute('DELETE FROM assets WHERE identifier=?;', (identifier,))
             if write_cursor.rowcount != 1:
                 raise InputError(
@@ -1116,6 +1195,10 @@ class GlobalDBHandler():
                     f'but it was not found in the DB',
                 )
 
+        # the asset's prices got deleted via cascade
+        GlobalDBHandler.invalidate_price_history_index(asset_identifiers=[identifier])
+        GlobalDBHandler.mark_evm_tokens_modified()
+
     @staticmethod
     def get_assets_with_symbol(
             symbol: str,
@@ -1188,6 +1271,15 @@ class GlobalDBHandler():
 
         If no price can be found returns None
         """
+        if (index := GlobalDBHandler()._price_history_index) is not None:
+            return index.get_historical_price(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                timestamp=timestamp,
+                max_seconds_distance=max_seconds_distance,
+                source=source,
+            )
+
         querystr = (
             'SELECT from_asset, to_asset, source_type, timestamp, price FROM price_history '
             'WHERE from_asset=? AND to_asset=? AND ABS(timestamp - ?) <= ? '
@@ -1208,6 +1300,36 @@ class GlobalDBHandler():
 
         return HistoricalPrice.deserialize_from_db(result)
 
+    @staticmethod
+    def get_historical_prices_in_range(
+            from_asset: 'Asset',
+            to_asset: 'Asset',
+            from_ts: Timestamp,
+            to_ts: Timestamp,
+    ) -> list[tuple[HistoricalPriceOracle, Timestamp, Price]]:
+        """Gets all cached prices of a pair, from all sources, between the given timestamps.
+
+        The result is sorted by timestamp. Entries that can't be deserialized are skipped.
+        """
+        result = []
+        with GlobalDBHandler().conn.read_ctx() as cursor:
+            cursor.execute(
+                'SELECT source_type, timestamp, price FROM price_history WHERE from_asset=? '
+                'AND to_asset=? AND timestamp >= ? AND timestamp <= ? ORDER BY timestamp ASC',
+                (from_asset.identifier, to_asset.identifier, from_ts, to_ts),
+            )
+            for entry in cursor:
+                try:
+                    result.append((
+                        HistoricalPriceOracle.deserialize_from_db(entry[0]),
+                        Timestamp(entry[1]),
+                        deserialize_price(entry[2]),
+                    ))
+                except DeserializationError as e:
+                    log.error(f'Failed to read price history entry {entry} due to {e!s}')
+
+        return result
+
     @staticmethod
     def add_historical_prices(entries: list['HistoricalPrice']) -> None:
         """Adds the given historical price entries in the DB
@@ -1222,6 +1344,8 @@ class GlobalDBHandler():
                     ) VALUES (?, ?, ?, ?, ?)
                     """, [x.serialize_for_db() for x in entries],
                 )
+            if (index := GlobalDBHandler()._price_history_index) is not None:
+                index.add_prices(entries, replace=False)
         except sqlite3.IntegrityError as e:
             # roll back any of the executemany that may have gone in
             log.error(
@@ -1229,6 +1353,7 @@ class GlobalDBHandler():
                 f'Will attempt to input them one by one',
             )
 
+            added_entries = []
             with GlobalDBHandler().conn.write_ctx() as write_cursor:
                 for entry in entries:
                     try:
@@ -1242,6 +1367,11 @@ class GlobalDBHandler():
                         log.error(
                             f'Failed to add {entry!s} due to {entry_error!s}. Skipping entry addition',  # noqa: E501
                         )
+                    else:
+                        added_entries.append(entry)
+
+            if (index := GlobalDBHandler()._price_history_index) is not None:
+                index.add_prices(added_entries, replace=False)
 
     @staticmethod
     def add_single_historical_price(entry: HistoricalPrice) -> bool:
@@ -1267,6 +1397,9 @@ class GlobalDBHandler():
             )
             return False
 
+        if (index := GlobalDBHandler()._price_history_index) is not None:
+            index.add_prices([entry], replace=True)
+
         return True
 
     @staticmethod
@@ -1333,6 +1466,7 @@ class GlobalDBHandler():
             for entry in write_cursor:
                 pairs_to_invalidate.append((Asset(entry[0]), Asset(entry[1])))
 
+        GlobalDBHandler.invalidate_price_history_index(pairs=pairs_to_invalidate)
         return pairs_to_invalidate
 
     @staticmethod
@@ -1394,7 +1528,8 @@ class GlobalDBHandler():
                     f'Not found manual current price to delete for asset {asset!s}',
                 )
 
-            return pairs_to_invalidate
+        GlobalDBHandler.invalidate_price_history_index(pairs=pairs_to_invalidate)
+        return pairs_to_invalidate
 
     @staticmethod
     def get_manual_prices(
@@ -1454,6 +1589,7 @@ class GlobalDBHandler():
             )
             return False
 
+        GlobalDBHandler.invalidate_price_history_index(pairs=[(entry.from_asset, entry.to_asset)])  # noqa: E501
         return True
 
     @staticmethod
@@ -1485,6 +1621,7 @@ class GlobalDBHandler():
                 )
                 return False
 
+        GlobalDBHandler.invalidate_price_history_index(pairs=[(from_asset, to_asset)])
         return True
 
     @staticmethod
@@ -1507,6 +1644,10 @@ class GlobalDBHandler():
                 f'Failed to delete historical prices from {from_asset} to {to_asset} '
                 f'and source: {source!s} due to {e!s}',
             )
+            return
+
+        if (index := GlobalDBHandler()._price_history_index) is not None:
+            index.remove_prices(from_asset=from_asset, to_asset=to_asset, source=source)
 
     @staticmethod
     def get_historical_price_range(
@@ -1560,7 +1701,8 @@ class GlobalDBHandler():
         with user_db.conn.read_ctx() as cursor:
             user_db.update_owned_assets_in_globaldb(cursor)
 
-        with self.conn.read_ctx() as read_cursor:
+        # the attached DB has to be visible to the writer so read from it as well
+        with self.conn.read_ctx(use_writer=True) as read_cursor:
             # First check that the operation can be made. If the difference is not the
             # empty set the operation is dangerous and the user should be notified.
             with user_db.user_write() as user_db_cursor:
@@ -1601,6 +1743,7 @@ class GlobalDBHandler():
                         write_cursor.execute('INSERT INTO multiasset_mappings SELECT * FROM clean_db.multiasset_mappings')  # noqa: E501
                         # Don't copy custom_assets since there are no custom assets in clean_db
                         write_cursor.switch_foreign_keys('ON')
+                        update_asset_search_trigrams(write_cursor)
 
                         with user_db.user_write() as user_db_cursor:
                             user_db_cursor.switch_foreign_keys('OFF')
@@ -1623,6 +1766,8 @@ class GlobalDBHandler():
                     with self.conn.critical_section_and_transaction_lock():
                         read_cursor.execute('DETACH DATABASE "clean_db";')
 
+        self.invalidate_price_history_index()  # prices of deleted assets got deleted via cascade
+        self.mark_evm_tokens_modified()
         return True, ''
 
     def soft_reset_assets_list(self) -> tuple[bool, str]:
@@ -1635,7 +1780,7 @@ class GlobalDBHandler():
 
         with self.packaged_db_lock:
             try:
-                with self.conn.read_ctx() as read_cursor:
+                with self.conn.read_ctx(use_writer=True) as read_cursor:
                     read_cursor.execute(f'ATTACH DATABASE "{builtin_database}" AS clean_db;')
                     # Check that versions match
                     query = read_cursor.execute('SELECT value from clean_db.settings WHERE name="version";')  # noqa: E501
@@ -1673,13 +1818,15 @@ class GlobalDBHandler():
                     write_cursor.execute('INSERT INTO multiasset_mappings SELECT * FROM clean_db.multiasset_mappings')  # noqa: E501
                     # TODO: think about how to implement multiassets insertion
                     write_cursor.switch_foreign_keys('ON')
+                    update_asset_search_trigrams(write_cursor)
             except sqlite3.Error as e:
                 log.error(f'Failed to restore assets in globaldb due to {e!s}')
                 return False, 'Failed to restore assets. Read logs to get more information.'
             finally:  # on the way out always detach the DB. Make sure no transaction is active
-                with self.conn.transaction_lock, self.conn.read_ctx() as read_cursor:
+                with self.conn.transaction_lock, self.conn.read_ctx(use_writer=True) as read_cursor:  # noqa: E501
                     read_cursor.execute('DETACH DATABASE "clean_db";')
 
+        self.mark_evm_tokens_modified()
         return True, ''
 
     @staticmethod
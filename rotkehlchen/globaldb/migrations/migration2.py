@@ -0,0 +1,15 @@
+from typing import TYPE_CHECKING
+
+from rotkehlchen.globaldb.utils import update_asset_search_trigrams
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.drivers.gevent import DBConnection
+
+
+def globaldb_data_migration_2(conn: 'DBConnection') -> None:
+    """Introduced at 1.29.0
+    - Adds the trigrams of the assets' names and symbols so that searching the assets by
+    substring doesn't need to go through all of them. The table is added by the v5->v6 upgrade.
+    """
+    with conn.write_ctx() as write_cursor:
+        update_asset_search_trigrams(write_cursor)
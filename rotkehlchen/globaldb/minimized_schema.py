@@ -9,6 +9,7 @@ MINIMIZED_GLOBAL_DB_SCHEMA = {
     'evm_tokens': 'identifierTEXTPRIMARYKEYNOTNULLCOLLATENOCASE,token_kindCHAR(1)NOTNULLDEFAULT("A")REFERENCEStoken_kinds(token_kind),chainINTEGERNOTNULL,addressVARCHAR[42]NOTNULL,decimalsINTEGER,protocolTEXT,FOREIGNKEY(identifier)REFERENCESassets(identifier)ONUPDATECASCADEONDELETECASCADE',
     'multiasset_mappings': 'collection_idINTEGERNOTNULL,assetTEXTNOTNULL,FOREIGNKEY(collection_id)REFERENCESasset_collections(id)ONUPDATECASCADEONDELETECASCADE,FOREIGNKEY(asset)REFERENCESassets(identifier)ONUPDATECASCADEONDELETECASCADE',
     'common_asset_details': 'identifierTEXTPRIMARYKEYNOTNULLCOLLATENOCASE,symbolTEXT,coingeckoTEXT,cryptocompareTEXT,forkedTEXT,startedINTEGER,swapped_forTEXT,FOREIGNKEY(forked)REFERENCESassets(identifier)ONUPDATECASCADEONDELETESETNULL,FOREIGNKEY(identifier)REFERENCESassets(identifier)ONUPDATECASCADEONDELETECASCADE,FOREIGNKEY(swapped_for)REFERENCESassets(identifier)ONUPDATECASCADEONDELETESETNULL',
+    'asset_search_trigrams': 'trigramTEXTNOTNULL,asset_rowidINTEGERNOTNULL,PRIMARYKEY(trigram,asset_rowid)',
     'user_owned_assets': 'asset_idVARCHAR[24]NOTNULLPRIMARYKEY,FOREIGNKEY(asset_id)REFERENCESassets(identifier)ONUPDATECASCADEONDELETECASCADE',
     'price_history_source_types': 'typeCHAR(1)PRIMARYKEYNOTNULL,seqINTEGERUNIQUE',
     'price_history': 'from_assetTEXTNOTNULLCOLLATENOCASE,to_assetTEXTNOTNULLCOLLATENOCASE,source_typeCHAR(1)NOTNULLDEFAULT("A")REFERENCESprice_history_source_types(type),timestampINTEGERNOTNULL,priceTEXTNOTNULL,FOREIGNKEY(from_asset)REFERENCESassets(identifier)ONUPDATECASCADEONDELETECASCADE,FOREIGNKEY(to_asset)REFERENCESassets(identifier)ONUPDATECASCADEONDELETECASCADE,PRIMARYKEY(from_asset,to_asset,source_type,timestamp)',
@@ -0,0 +1,232 @@
+"""An in-memory index of the price_history table of the global DB
+
+Looking up the price closest to a timestamp with SQL requires the ABS(timestamp - ?)
+condition which can't use an index, so every lookup scans all the rows of a pair.
+This index loads all the rows of a pair once into sorted compact arrays and answers
+the nearest timestamp queries via binary search. Prices added while the index is
+enabled are inserted in the loaded series without reloading their pair.
+"""
+import logging
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Optional
+
+from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.history.deserialization import deserialize_price
+from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.types import Timestamp
+
+if TYPE_CHECKING:
+    from rotkehlchen.assets.asset import Asset
+    from rotkehlchen.db.drivers.gevent import DBConnection
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+PairKey = tuple[str, str]
+
+
+def _pair_key(from_identifier: str, to_identifier: str) -> PairKey:
+    # identifiers in price_history are compared with NOCASE collation
+    return from_identifier.lower(), to_identifier.lower()
+
+
+class PriceSeries:
+    """The prices of a single pair from a single source sorted by timestamp.
+
+    Timestamps are kept in an int64 array and prices are packed as their string
+    representation in a single bytearray along with arrays of their start and end
+    offsets in it. New prices are appended to the bytearray so that adding an entry
+    only inserts into the arrays instead of rebuilding the series.
+    """
+    __slots__ = ('timestamps', 'starts', 'ends', 'packed_prices')
+
+    def __init__(self, entries: list[tuple[Timestamp, str]]) -> None:
+        """entries should be sorted by timestamp and have unique timestamps"""
+        self.timestamps = array('q', [x[0] for x in entries])
+        self.starts, self.ends = array('I'), array('I')
+        self.packed_prices = bytearray()
+        for _, price in entries:
+            self.starts.append(len(self.packed_prices))
+            self.packed_prices += price.encode()
+            self.ends.append(len(self.packed_prices))
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def price_at(self, idx: int) -> str:
+        return self.packed_prices[self.starts[idx]:self.ends[idx]].decode()
+
+    def nearest(self, timestamp: Timestamp, max_seconds_distance: int) -> Optional[int]:
+        """Returns the index of the entry closest to the timestamp within the given
+        distance or None if there is no such entry. Older entries win on ties."""
+        idx = bisect_left(self.timestamps, timestamp)
+        best_idx: Optional[int] = None
+        for candidate_idx in (idx - 1, idx):
+            if not 0 <= candidate_idx < len(self.timestamps):
+                continue
+            distance = abs(self.timestamps[candidate_idx] - timestamp)
+            if distance > max_seconds_distance:
+                continue
+            if best_idx is None or distance < abs(self.timestamps[best_idx] - timestamp):
+                best_idx = candidate_idx
+
+        return best_idx
+
+    def add_entries(
+            self,
+            new_entries: Iterable[tuple[Timestamp, str]],
+            replace: bool,
+    ) -> None:
+        """Adds the given entries in place. If replace is False entries at already
+        existing timestamps are ignored, as with INSERT OR IGNORE. The bytes of
+        replaced prices are left unused in the packed prices until the pair is reloaded."""
+        for timestamp, price in new_entries:
+            idx = bisect_left(self.timestamps, timestamp)
+            exists = idx < len(self.timestamps) and self.timestamps[idx] == timestamp
+            if exists and replace is False:
+                continue
+
+            start = len(self.packed_prices)
+            self.packed_prices += price.encode()
+            if exists:
+                self.starts[idx], self.ends[idx] = start, len(self.packed_prices)
+            else:
+                self.timestamps.insert(idx, timestamp)
+                self.starts.insert(idx, start)
+                self.ends.insert(idx, len(self.packed_prices))
+
+
+class PriceHistoryIndex:
+    """Keeps the price_history rows of the pairs queried so far in memory.
+
+    Pairs are loaded lazily on their first lookup. All writes to price_history done
+    through the GlobalDBHandler should be reflected here either by updating the loaded
+    pairs or by invalidating them so that they are loaded again on their next lookup.
+    """
+
+    def __init__(self, conn: 'DBConnection') -> None:
+        self.conn = conn
+        self.pairs: dict[PairKey, dict[HistoricalPriceOracle, PriceSeries]] = {}
+        # incremented on every modification to detect changes that happen while loading
+        self.modifications = 0
+
+    def _load_pair(self, key: PairKey) -> dict[HistoricalPriceOracle, PriceSeries]:
+        modifications_before = self.modifications
+        source_entries: dict[HistoricalPriceOracle, list[tuple[Timestamp, str]]] = {}
+        with self.conn.read_ctx() as cursor:
+            cursor.execute(
+                'SELECT source_type, timestamp, price FROM price_history WHERE from_asset=? '
+                'AND to_asset=? ORDER BY timestamp ASC',
+                key,
+            )
+            for source_type, timestamp, price in cursor:
+                try:
+                    source = HistoricalPriceOracle.deserialize_from_db(source_type)
+                except DeserializationError as e:
+                    log.error(f'Skipping price history entry while loading index due to {e!s}')
+                    continue
+                source_entries.setdefault(source, []).append((timestamp, price))
+
+        series = {source: PriceSeries(entries) for source, entries in source_entries.items()}
+        # reading from the DB may context switch. If the table was modified in the
+        # meantime the loaded data is still fine for this query but should not be kept
+        if modifications_before == self.modifications:
+            self.pairs[key] = series
+        return series
+
+    def get_historical_price(
+            self,
+            from_asset: 'Asset',
+            to_asset: 'Asset',
+            timestamp: Timestamp,
+            max_seconds_distance: int,
+            source: Optional[HistoricalPriceOracle] = None,
+    ) -> Optional[HistoricalPrice]:
+        """Same semantics as GlobalDBHandler.get_historical_price but using the index"""
+        key = _pair_key(from_asset.identifier, to_asset.identifier)
+        pair_series = self.pairs.get(key)
+        if pair_series is None:
+            pair_series = self._load_pair(key)
+
+        if source is not None:
+            candidates = [(source, pair_series[source])] if source in pair_series else []
+        else:
+            candidates = list(pair_series.items())
+
+        best: Optional[tuple[int, Timestamp, HistoricalPriceOracle, PriceSeries, int]] = None
+        for candidate_source, series in candidates:
+            idx = series.nearest(timestamp=timestamp, max_seconds_distance=max_seconds_distance)
+            if idx is None:
+                continue
+            entry_ts = Timestamp(series.timestamps[idx])
+            distance = abs(entry_ts - timestamp)
+            if best is None or (distance, entry_ts) < (best[0], best[1]):
+                best = (distance, entry_ts, candidate_source, series, idx)
+
+        if best is None:
+            return None
+
+        _, entry_ts, entry_source, series, idx = best
+        try:
+            price = deserialize_price(series.price_at(idx))
+        except DeserializationError as e:
+            log.error(f'Failed to read price of {from_asset} -> {to_asset} at {entry_ts}: {e!s}')
+            return None
+
+        return HistoricalPrice(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            source=entry_source,
+            timestamp=entry_ts,
+            price=price,
+        )
+
+    def add_prices(self, entries: list[HistoricalPrice], replace: bool) -> None:
+        """Reflect added prices in the loaded pairs. Pairs not loaded are not affected"""
+        self.modifications += 1
+        grouped: dict[tuple[PairKey, HistoricalPriceOracle], list[tuple[Timestamp, str]]] = {}
+        for entry in entries:
+            key = _pair_key(entry.from_asset.identifier, entry.to_asset.identifier)
+            if key in self.pairs:
+                grouped.setdefault((key, entry.source), []).append(
+                    (entry.timestamp, str(entry.price)),
+                )
+
+        for (key, source), new_entries in grouped.items():
+            self.pairs[key].setdefault(source, PriceSeries([])).add_entries(
+                new_entries=new_entries,
+                replace=replace,
+            )
+
+    def remove_prices(
+            self,
+            from_asset: 'Asset',
+            to_asset: 'Asset',
+            source: Optional[HistoricalPriceOracle] = None,
+    ) -> None:
+        """Reflect deletion of the prices of a pair, optionally only for one source"""
+        self.modifications += 1
+        key = _pair_key(from_asset.identifier, to_asset.identifier)
+        if source is None:
+            self.pairs[key] = {}  # the pair is known to have no prices now
+        elif key in self.pairs:
+            self.pairs[key].pop(source, None)
+
+    def invalidate_pairs(self, pairs: Iterable[tuple['Asset', 'Asset']]) -> None:
+        self.modifications += 1
+        for from_asset, to_asset in pairs:
+            self.pairs.pop(_pair_key(from_asset.identifier, to_asset.identifier), None)
+
+    def invalidate_assets(self, identifiers: Iterable[str]) -> None:
+        """Invalidate all the loaded pairs that any of the given assets is part of"""
+        self.modifications += 1
+        lowered_identifiers = {x.lower() for x in identifiers}
+        for key in [x for x in self.pairs if lowered_identifiers.intersection(x)]:
+            del self.pairs[key]
+
+    def clear(self) -> None:
+        self.modifications += 1
+        self.pairs = {}
@@ -222,6 +222,19 @@ CREATE TABLE IF NOT EXISTS price_history (
     FOREIGN KEY(to_asset) REFERENCES assets(identifier) ON UPDATE CASCADE ON DELETE CASCADE,
     PRIMARY KEY(from_asset, to_asset, source_type, timestamp)
 );
+CREATE INDEX IF NOT EXISTS idx_price_history_pair_timestamp ON price_history(from_asset, to_asset, timestamp);
+"""  # noqa: E501
+
+# Trigrams of the lowercased names and symbols of the assets used to search them by
+# substring without going through all of them. Kept in sync by update_asset_search_trigrams.
+# Refers to the assets by rowid to keep it small.
+DB_CREATE_ASSET_SEARCH_TRIGRAMS = """
+CREATE TABLE IF NOT EXISTS asset_search_trigrams (
+    trigram TEXT NOT NULL,
+    asset_rowid INTEGER NOT NULL,
+    PRIMARY KEY(trigram, asset_rowid)
+);
+CREATE INDEX IF NOT EXISTS idx_asset_search_trigrams_asset ON asset_search_trigrams(asset_rowid);
 """
 
 DB_CREATE_BINANCE_PAIRS = """
@@ -303,6 +316,7 @@ BEGIN TRANSACTION;
 {DB_CREATE_EVM_TOKENS}
 {DB_CREATE_MULTIASSET_MAPPINGS}
 {DB_CREATE_COMMON_ASSET_DETAILS}
+{DB_CREATE_ASSET_SEARCH_TRIGRAMS}
 {DB_CREATE_USER_OWNED_ASSETS}
 {DB_CREATE_PRICE_HISTORY_SOURCE_TYPES}
 {DB_CREATE_PRICE_HISTORY}
@@ -25,6 +25,7 @@ from rotkehlchen.types import ChainID, ChecksumEvmAddress, EvmTokenKind, Timesta
 from rotkehlchen.utils.network import query_file
 
 from .handler import GlobalDBHandler, initialize_globaldb
+from .utils import ASSET_SEARCH_TRIGRAMS_QUERY
 
 if TYPE_CHECKING:
     from rotkehlchen.db.drivers.gevent import DBConnection
@@ -61,23 +62,49 @@ def executeall(cursor: DBCursor, statements: str) -> None:
 def _replace_assets_from_db(
         connection: 'DBConnection',
         sourcedb_path: Path,
+        update_search_trigrams: bool = False,
 ) -> None:
+    """Replaces the assets with the ones of the DB at `sourcedb_path`, keeping their rowids.
+
+    If `update_search_trigrams` is True the search trigrams of only the assets whose
+    rowid, name or symbol changed are recomputed."""
+    search_trigrams_before, search_trigrams_after = '', ''
+    if update_search_trigrams is True:
+        search_trigrams_before = """
+        CREATE TEMP TABLE unchanged_search_assets AS SELECT assets.rowid AS asset_rowid
+        FROM assets INNER JOIN other_db.assets AS other_assets
+        ON assets.identifier=other_assets.identifier AND assets.rowid=other_assets.rowid AND
+        assets.name IS other_assets.name
+        LEFT JOIN common_asset_details ON assets.identifier=common_asset_details.identifier
+        LEFT JOIN other_db.common_asset_details AS other_details
+        ON other_assets.identifier=other_details.identifier
+        WHERE common_asset_details.symbol IS other_details.symbol;
+        DELETE FROM asset_search_trigrams WHERE asset_rowid NOT IN
+        (SELECT asset_rowid FROM temp.unchanged_search_assets);
+        """
+        search_trigrams_after = ASSET_SEARCH_TRIGRAMS_QUERY.format(
+            condition='AND assets.rowid NOT IN (SELECT asset_rowid FROM temp.unchanged_search_assets)',  # noqa: E501
+        ) + ';\nDROP TABLE temp.unchanged_search_assets;'
+
     with connection.write_ctx() as cursor:
         cursor.executescript(f"""
         ATTACH DATABASE "{sourcedb_path}" AS other_db;
         PRAGMA foreign_keys = OFF;
+        {search_trigrams_before}
         DELETE FROM assets;
         DELETE FROM evm_tokens;
         DELETE FROM underlying_tokens_list;
         DELETE FROM common_asset_details;
         DELETE FROM asset_collections;
         DELETE FROM multiasset_mappings;
-        INSERT INTO assets SELECT * FROM other_db.assets;
+        INSERT INTO assets(rowid, identifier, name, type)
+        SELECT rowid, identifier, name, type FROM other_db.assets;
         INSERT INTO evm_tokens SELECT * FROM other_db.evm_tokens;
         INSERT INTO underlying_tokens_list SELECT * FROM other_db.underlying_tokens_list;
         INSERT INTO common_asset_details SELECT * FROM other_db.common_asset_details;
         INSERT INTO asset_collections SELECT * FROM other_db.asset_collections;
         INSERT INTO multiasset_mappings SELECT * FROM other_db.multiasset_mappings;
+        {search_trigrams_after}
         INSERT OR REPLACE INTO settings(name, value) VALUES("{ASSETS_VERSION_KEY}",
         (SELECT value FROM other_db.settings WHERE name="{ASSETS_VERSION_KEY}")
         );
@@ -98,6 +125,8 @@ def _force_remote_asset(cursor: DBCursor, local_asset: Asset, full_insert: str)
     # Insert new entry. Since identifiers are the same, no foreign key constrains should break
     executeall(cursor, full_insert)
     AssetResolver().clean_memory_cache(local_asset.identifier.lower())
+    # its prices got deleted via cascade
+    GlobalDBHandler().invalidate_price_history_index(asset_identifiers=[local_asset.identifier])
 
 
 class ParsedAssetData(NamedTuple):
@@ -622,7 +651,12 @@ class AssetsUpdater:
                 # otherwise we are sure the DB will work without conflicts so let's
                 # now move the data to the actual global DB
                 log.info('Finishing assets update. Replacing users globaldb with the updated information')  # noqa: E501
-                _replace_assets_from_db(GlobalDBHandler().conn, tmpdir / temp_db_name)
+                _replace_assets_from_db(
+                    connection=GlobalDBHandler().conn,
+                    sourcedb_path=tmpdir / temp_db_name,
+                    update_search_trigrams=True,
+                )
+                GlobalDBHandler.mark_evm_tokens_modified()
 
         return None
 
@@ -13,6 +13,7 @@ from ..utils import GLOBAL_DB_VERSION, MIN_SUPPORTED_GLOBAL_DB_VERSION, globaldb
 from .v2_v3 import migrate_to_v3
 from .v3_v4 import migrate_to_v4
 from .v4_v5 import migrate_to_v5
+from .v5_v6 import migrate_to_v6
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -34,6 +35,10 @@ UPGRADES_LIST = [
         from_version=4,
         function=migrate_to_v5,
     ),
+    UpgradeRecord(
+        from_version=5,
+        function=migrate_to_v6,
+    ),
 ]
 
 
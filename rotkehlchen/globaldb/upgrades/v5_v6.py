@@ -0,0 +1,57 @@
+import logging
+from typing import TYPE_CHECKING
+
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.drivers.gevent import DBConnection, DBCursor
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+
+def _create_new_tables(cursor: 'DBCursor') -> None:
+    log.debug('Enter _create_new_tables')
+
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS asset_search_trigrams (
+            trigram TEXT NOT NULL,
+            asset_rowid INTEGER NOT NULL,
+            PRIMARY KEY(trigram, asset_rowid)
+        );
+        """,
+    )
+
+    log.debug('Exit _create_new_tables')
+
+
+def _create_new_indexes(cursor: 'DBCursor') -> None:
+    log.debug('Enter _create_new_indexes')
+
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_price_history_pair_timestamp '
+        'ON price_history(from_asset, to_asset, timestamp);',
+    )
+
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_asset_search_trigrams_asset '
+        'ON asset_search_trigrams(asset_rowid);',
+    )
+
+    log.debug('Exit _create_new_indexes')
+
+
+def migrate_to_v6(connection: 'DBConnection') -> None:
+    """This globalDB upgrade is introduced at 1.29.0 and does the following:
+    - Adds an index of the price history by pair and timestamp so that the range queries
+    of a pair's prices don't need to go through all of the pair's sources.
+    - Adds the `asset_search_trigrams` table. Its rows are added by data migration 2.
+    """
+    log.debug('Entered globaldb v5->v6 upgrade')
+
+    with connection.write_ctx() as cursor:
+        _create_new_tables(cursor)
+        _create_new_indexes(cursor)
+
+    log.debug('Finished globaldb v5->v6 upgrade')
@@ -1,4 +1,5 @@
-from typing import TYPE_CHECKING
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from rotkehlchen.db.drivers.gevent import DBCursor
@@ -7,8 +8,8 @@ if TYPE_CHECKING:
 # Whenever you upgrade the global DB make sure to:
 # 1. Go to assets repo and tweak the min/max schema of the updates
 # 2. Tweak ASSETS_FILE_IMPORT_ACCEPTED_GLOBALDB_VERSIONS
-GLOBAL_DB_VERSION = 5
-ASSETS_FILE_IMPORT_ACCEPTED_GLOBALDB_VERSIONS = (3, GLOBAL_DB_VERSION)
+GLOBAL_DB_VERSION = 6
+ASSETS_FILE_IMPORT_ACCEPTED_GLOBALDB_VERSIONS = (3, 5, GLOBAL_DB_VERSION)
 MIN_SUPPORTED_GLOBAL_DB_VERSION = 2
 GLOBAL_DB_FILENAME = 'global.db'
 
@@ -31,3 +32,47 @@ def globaldb_get_setting_value(cursor: 'DBCursor', name: str, default_value: int
         return default_value
 
     return int(result[0][0])
+
+
+# Trigrams of the lowercased names and symbols of the assets. Only ASCII characters are
+# lowercased, the same as LIKE does when checking the matches of the searched substring.
+ASSET_SEARCH_TRIGRAMS_QUERY = """
+WITH RECURSIVE asset_texts(asset_rowid, text) AS (
+    SELECT assets.rowid, lower(name) FROM assets WHERE name IS NOT NULL {condition}
+    UNION ALL
+    SELECT assets.rowid, lower(symbol) FROM common_asset_details INNER JOIN assets
+    ON assets.identifier=common_asset_details.identifier WHERE symbol IS NOT NULL {condition}
+), asset_trigrams(asset_rowid, text, position) AS (
+    SELECT asset_rowid, text, 1 FROM asset_texts WHERE length(text) >= 3
+    UNION ALL
+    SELECT asset_rowid, text, position + 1 FROM asset_trigrams WHERE position + 3 <= length(text)
+) INSERT OR IGNORE INTO asset_search_trigrams(trigram, asset_rowid)
+SELECT substr(text, position, 3), asset_rowid FROM asset_trigrams
+"""
+
+
+def update_asset_search_trigrams(
+        write_cursor: 'DBCursor',
+        identifiers: Optional[Sequence[str]] = None,
+) -> None:
+    """Recomputes the search trigrams of the assets with the given identifiers or of all the
+    assets if no identifiers are given. Should be called after their names or symbols change
+    and after the assets are copied from another DB without their rowids.
+
+    Trigrams left behind by deleted assets only add candidates that the substring filters
+    of the search drop, so deleting an asset does not need to remove them."""
+    if identifiers is None:
+        write_cursor.execute('DELETE FROM asset_search_trigrams')
+        write_cursor.execute(ASSET_SEARCH_TRIGRAMS_QUERY.format(condition=''))
+        return
+
+    placeholders = ','.join(['?'] * len(identifiers))
+    write_cursor.execute(
+        f'DELETE FROM asset_search_trigrams WHERE asset_rowid IN '
+        f'(SELECT rowid FROM assets WHERE identifier IN ({placeholders}))',
+        identifiers,
+    )
+    write_cursor.execute(
+        ASSET_SEARCH_TRIGRAMS_QUERY.format(condition=f'AND assets.identifier IN ({placeholders})'),
+        [*identifiers, *identifiers],
+    )
@@ -1,7 +1,11 @@
+import heapq
 import logging
+from collections.abc import Generator, Iterable, Iterator
 from pathlib import Path
 from typing import TYPE_CHECKING, Literal, Optional
 
+import gevent
+
 from rotkehlchen.accounting.structures.base import HistoryBaseEntry, HistoryEvent
 from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.db.filtering import (
@@ -14,12 +18,17 @@ from rotkehlchen.db.filtering import (
 from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.db.ledger_actions import DBLedgerActions
 from rotkehlchen.errors.misc import RemoteError
-from rotkehlchen.exchanges.data_structures import AssetMovement, Trade
+from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition, Trade
 from rotkehlchen.exchanges.manager import SUPPORTED_EXCHANGES, ExchangeManager
 from rotkehlchen.fval import FVal
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.tasks.manager import TaskManager
-from rotkehlchen.types import EVM_CHAINS_WITH_TRANSACTIONS, Location, Timestamp
+from rotkehlchen.types import (
+    EVM_CHAINS_WITH_TRANSACTIONS,
+    EVM_CHAINS_WITH_TRANSACTIONS_TYPE,
+    Location,
+    Timestamp,
+)
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.misc import timestamp_to_date
 
@@ -27,8 +36,10 @@ if TYPE_CHECKING:
     from rotkehlchen.accounting.ledger_actions import LedgerAction
     from rotkehlchen.accounting.mixins.event import AccountingEventMixin
     from rotkehlchen.chain.aggregator import ChainsAggregator
+    from rotkehlchen.chain.ethereum.modules.eth2.structures import ValidatorDailyStats
     from rotkehlchen.db.dbhandler import DBHandler
     from rotkehlchen.db.drivers.gevent import DBCursor
+    from rotkehlchen.exchanges.exchange import ExchangeInterface
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -39,14 +50,136 @@ log = RotkehlchenLogsAdapter(logger)
 #    chain.receipts
 #    chain.tx decoding
 #
-# reading from the db trades, asset movements, margin positions
-# ledger actions
 # eth2
-# base history entries
 #
 # Please, update this number each time a history query step is either added or removed
-NUM_HISTORY_QUERY_STEPS_EXCL_EXCHANGES = 4 + 3 * len(EVM_CHAINS_WITH_TRANSACTIONS)
+NUM_HISTORY_QUERY_STEPS_EXCL_EXCHANGES = 1 + 3 * len(EVM_CHAINS_WITH_TRANSACTIONS)
 STEPS_PER_CEX = 5
+# Entries of the same time are ordered by location and id so that the order does not
+# depend on the order in which the exchanges queried concurrently wrote them
+EXCHANGE_ENTRIES_ORDER_RULES = [('timestamp', True), ('location', True), ('id', True)]
+
+
+def accounting_order_key(event: 'AccountingEventMixin') -> tuple[int, int]:
+    """The order in which accounting processes events. By timestamp and for history
+    base entries with the same timestamp by their sequence index"""
+    return (
+        event.get_timestamp(),
+        event.sequence_index if isinstance(event, HistoryBaseEntry) else 1,
+    )
+
+
+def _order_within_seconds(events: Iterable[HistoryBaseEntry]) -> Iterator[HistoryBaseEntry]:
+    """Takes history events ordered by their millisecond timestamp and sequence index and
+    yields them in accounting order. That uses the timestamp in seconds, so only the
+    events of the same second need to be reordered, which are the only ones buffered."""
+    same_second: list[HistoryBaseEntry] = []
+    for event in events:
+        if len(same_second) != 0 and same_second[0].get_timestamp() != event.get_timestamp():
+            yield from sorted(same_second, key=accounting_order_key)
+            same_second = []
+        same_second.append(event)
+    yield from sorted(same_second, key=accounting_order_key)
+
+
+class HistoryEventsStream:
+    """The history of a PnL report in the order in which accounting processes it
+
+    Each source of events stored in the DB is read through its own cursor, which is
+    already ordered by timestamp and then by location and id, and the sources are
+    merged lazily as the stream is consumed. So the history never has to be kept in
+    memory at once. Every iteration reads the DB again so the stream can be iterated
+    multiple times, but iterations may differ if the history changes in between. The
+    cursors of an iteration are open only until it is exhausted or closed.
+
+    For events with the same ordering key the order of the sources decides, which is
+    trades, asset movements, margin positions, ledger actions, eth2 events and then
+    base history entries.
+    """
+
+    def __init__(
+            self,
+            db: 'DBHandler',
+            msg_aggregator: MessagesAggregator,
+            end_ts: Timestamp,
+            has_premium: bool,
+            eth2_events: list['ValidatorDailyStats'],
+    ) -> None:
+        self.db = db
+        self.msg_aggregator = msg_aggregator
+        self.end_ts = end_ts
+        self.has_premium = has_premium
+        self.eth2_events = sorted(eth2_events, key=accounting_order_key)
+
+    def _trades(self) -> Iterator[Trade]:
+        with self.db.conn.read_ctx() as cursor:
+            yield from self.db.iterate_trades(
+                cursor,
+                filter_query=TradesFilterQuery.make(
+                    order_by_rules=EXCHANGE_ENTRIES_ORDER_RULES,
+                    to_ts=self.end_ts,
+                ),
+                has_premium=True,  # we need all trades for accounting -- limit happens later
+            )
+
+    def _asset_movements(self) -> Iterator[AssetMovement]:
+        with self.db.conn.read_ctx() as cursor:
+            yield from self.db.iterate_asset_movements(
+                cursor,
+                filter_query=AssetMovementsFilterQuery.make(
+                    order_by_rules=EXCHANGE_ENTRIES_ORDER_RULES,
+                    to_ts=self.end_ts,
+                ),
+                has_premium=True,  # we need all trades for accounting -- limit happens later
+            )
+
+    def _margin_positions(self) -> Iterator[MarginPosition]:
+        with self.db.conn.read_ctx() as cursor:
+            yield from self.db.iterate_margin_positions(cursor, to_ts=self.end_ts)
+
+    def _ledger_actions(self) -> Iterator['LedgerAction']:
+        with self.db.conn.read_ctx() as cursor:
+            yield from DBLedgerActions(self.db, self.msg_aggregator).iterate_ledger_actions(
+                cursor,
+                filter_query=LedgerActionsFilterQuery.make(
+                    order_by_rules=[('timestamp', True), ('location', True), ('identifier', True)],
+                    to_ts=self.end_ts,
+                ),
+                has_premium=self.has_premium,
+            )
+
+    def _base_entries(self) -> Iterator[HistoryBaseEntry]:
+        with self.db.conn.read_ctx() as cursor:
+            yield from _order_within_seconds(DBHistoryEvents(self.db).iterate_history_events(
+                cursor=cursor,
+                filter_query=HistoryEventFilterQuery.make(
+                    order_by_rules=[
+                        ('timestamp', True),
+                        ('sequence_index', True),
+                        ('location', True),
+                        ('event_identifier', True),
+                    ],
+                    # We need to have history since before the range
+                    from_ts=Timestamp(0),
+                    to_ts=self.end_ts,
+                ),
+            ))
+
+    def __iter__(self) -> Iterator['AccountingEventMixin']:
+        sources: list[Iterator['AccountingEventMixin']] = [
+            self._trades(),
+            self._asset_movements(),
+            self._margin_positions(),
+            self._ledger_actions(),
+            iter(self.eth2_events),
+            self._base_entries(),
+        ]
+        try:
+            yield from heapq.merge(*sources, key=accounting_order_key)
+        finally:  # release the cursors also if the stream is not consumed until the end
+            for source in sources:
+                if isinstance(source, Generator):
+                    source.close()
 
 
 class EventsHistorian:
@@ -103,13 +236,19 @@ class EventsHistorian:
         from_ts = filter_query.from_ts
         to_ts = filter_query.to_ts
         if only_cache is False:  # query services
-            for exchange in self.exchange_manager.iterate_exchanges():
-                if location is None or exchange.location == location:
-                    exchange.query_income_loss_expense(
-                        start_ts=from_ts,
-                        end_ts=to_ts,
-                        only_cache=False,
-                    )
+            failures = self.exchange_manager.query_exchanges(
+                query=lambda exchange: exchange.query_income_loss_expense(
+                    start_ts=from_ts,
+                    end_ts=to_ts,
+                    only_cache=False,
+                ),
+                exchanges=[
+                    exchange for exchange in self.exchange_manager.iterate_exchanges()
+                    if location is None or exchange.location == location
+                ],
+            )
+            if len(failures) != 0:
+                raise failures[0][1]
 
         db = DBLedgerActions(self.db, self.msg_aggregator)
         has_premium = self.chains_aggregator.premium is not None
@@ -135,12 +274,30 @@ class EventsHistorian:
             return
 
         # else query all CEXes
-        for exchange in self.exchange_manager.iterate_exchanges():
-            exchange.query_trade_history(
+        self._query_exchanges_trades(exchanges=None, from_ts=from_ts, to_ts=to_ts)
+
+    def _query_exchanges_trades(
+            self,
+            exchanges: Optional[list['ExchangeInterface']],
+            from_ts: Timestamp,
+            to_ts: Timestamp,
+    ) -> None:
+        """Queries the given exchanges, or all of them if None, for their trades
+        concurrently and writes them to the DB.
+
+        May raise:
+        - RemoteError if the query of any exchange failed, after all of them finish
+        """
+        failures = self.exchange_manager.query_exchanges(
+            query=lambda exchange: exchange.query_trade_history(
                 start_ts=from_ts,
                 end_ts=to_ts,
                 only_cache=False,
-            )
+            ),
+            exchanges=exchanges,
+        )
+        if len(failures) != 0:
+            raise failures[0][1]
 
     def query_trades(
             self,
@@ -192,12 +349,7 @@ class EventsHistorian:
         if exchanges_list is None:
             return
 
-        for exchange in exchanges_list:
-            exchange.query_trade_history(
-                start_ts=from_ts,
-                end_ts=to_ts,
-                only_cache=False,
-            )
+        self._query_exchanges_trades(exchanges=exchanges_list, from_ts=from_ts, to_ts=to_ts)
 
     def _query_services_for_asset_movements(self, filter_query: AssetMovementsFilterQuery) -> None:
         """Queries all services requested for asset movements and writes them to the DB"""
@@ -205,30 +357,26 @@ class EventsHistorian:
         from_ts = filter_query.from_ts
         to_ts = filter_query.to_ts
 
-        if location is None:
-            # query all CEXes
-            for exchange in self.exchange_manager.iterate_exchanges():
-                exchange.query_deposits_withdrawals(
-                    start_ts=from_ts,
-                    end_ts=to_ts,
-                    only_cache=False,
-                )
-            return
-
-        if location not in SUPPORTED_EXCHANGES:
-            return  # nothing to do
+        exchanges_list = None  # query all CEXes
+        if location is not None:
+            if location not in SUPPORTED_EXCHANGES:
+                return  # nothing to do
 
-        # otherwise it's a single connected exchange and we need to query it
-        exchanges_list = self.exchange_manager.connected_exchanges.get(location)
-        if exchanges_list is None:
-            return
+            # otherwise it's a single connected exchange and we need to query it
+            exchanges_list = self.exchange_manager.connected_exchanges.get(location)
+            if exchanges_list is None:
+                return
 
-        for exchange in exchanges_list:
-            exchange.query_deposits_withdrawals(
+        failures = self.exchange_manager.query_exchanges(
+            query=lambda exchange: exchange.query_deposits_withdrawals(
                 start_ts=from_ts,
                 end_ts=to_ts,
                 only_cache=False,
-            )
+            ),
+            exchanges=exchanges_list,
+        )
+        if len(failures) != 0:
+            raise failures[0][1]
 
     def query_asset_movements(
             self,
@@ -314,10 +462,10 @@ class EventsHistorian:
             start_ts: Timestamp,
             end_ts: Timestamp,
             has_premium: bool,
-    ) -> tuple[str, list['AccountingEventMixin']]:
+    ) -> tuple[str, 'HistoryEventsStream']:
         """
-        Creates all events history from start_ts to end_ts. Returns it
-        sorted by ascending timestamp.
+        Queries all events history up to end_ts from the connected services and saves it
+        in the DB. Returns a stream over it sorted in the order accounting processes it.
         """
         self._reset_variables()
         step = 0
@@ -330,8 +478,6 @@ class EventsHistorian:
             start_ts=start_ts,
             end_ts=end_ts,
         )
-        # start creating the all trades history list
-        history: list['AccountingEventMixin'] = []
         empty_or_error = ''
 
         def fail_history_cb(error_msg: str) -> None:
@@ -339,14 +485,15 @@ class EventsHistorian:
             nonlocal empty_or_error
             empty_or_error += '\n' + error_msg
 
-        def new_step_cb(state_name: str) -> None:
-            """This callback will run for each new step in exchange history query"""
+        def new_step_cb(state_name: str) -> None:  # pylint: disable=unused-argument
+            """This callback will run for each new step in exchange history query.
+            The exchanges are queried concurrently so the state name is not the one of
+            a single exchange step."""
             nonlocal step
             step = self._increase_progress(step, total_steps)
-            self.processing_state_name = state_name
 
-        for exchange in self.exchange_manager.iterate_exchanges():
-            self.processing_state_name = f'Querying {exchange.name} exchange history'
+        def query_exchange_history(exchange: 'ExchangeInterface') -> None:
+            nonlocal step
             exchange.query_history_with_callbacks(
                 # We need to have history of exchanges since before the range
                 start_ts=Timestamp(0),
@@ -357,35 +504,16 @@ class EventsHistorian:
             # each exchange instance executes STEPS_PER_CEX steps out of the total_steps
             step = self._increase_progress(step, total_steps, step_by=STEPS_PER_CEX)
 
-        # Query all trades, asset movements and margin positions from the DB for all
-        # possible locations.
-        self.processing_state_name = 'Reading trades, asset movements and margin positions from the DB'  # noqa: E501
-        with self.db.conn.read_ctx() as cursor:
-            # Include all trades
-            trades = self.db.get_trades(
-                cursor,
-                filter_query=TradesFilterQuery.make(to_ts=end_ts),
-                has_premium=True,  # we need all trades for accounting -- limit happens later
-            )
-            history.extend(trades)
-
-            # Include all asset movements
-            asset_movements = self.db.get_asset_movements(
-                cursor,
-                filter_query=AssetMovementsFilterQuery.make(to_ts=end_ts),
-                has_premium=True,  # we need all trades for accounting -- limit happens later
-            )
-            history.extend(asset_movements)
+        # The exchanges are queried concurrently. A failure of one of them is reported
+        # and the history of the rest is still used.
+        self.processing_state_name = 'Querying exchanges history'
+        for exchange, e in self.exchange_manager.query_exchanges(query_exchange_history):
+            fail_history_cb(f'{exchange.name} exchange history query failed due to {e!s}')
 
-            # Include all margin positions
-            margin_positions = self.db.get_margin_positions(cursor, to_ts=end_ts)
-            history.extend(margin_positions)
-
-        step = self._increase_progress(step, total_steps)
-
-        for blockchain in EVM_CHAINS_WITH_TRANSACTIONS:
+        def query_evm_chain_history(blockchain: EVM_CHAINS_WITH_TRANSACTIONS_TYPE) -> None:
+            """Query transactions, receipts and decode them for one evm chain"""
+            nonlocal step, empty_or_error
             str_blockchain = str(blockchain)
-            self.processing_state_name = f'Querying {str_blockchain} transactions history'
             evm_manager = self.chains_aggregator.get_chain_manager(blockchain)
             tx_filter_query = EvmTransactionsFilterQuery.make(
                 limit=None,
@@ -406,24 +534,29 @@ class EventsHistorian:
                 empty_or_error += '\n' + msg
 
             step = self._increase_progress(step, total_steps)
-            self.processing_state_name = f'Querying {str_blockchain} transaction receipts'
             evm_manager.transactions.get_receipts_for_transactions_missing_them()
             step = self._increase_progress(step, total_steps)
-
-            self.processing_state_name = f'Decoding {str_blockchain} raw transactions'
             evm_manager.transactions_decoder.get_and_decode_undecoded_transactions(limit=None)
             step = self._increase_progress(step, total_steps)
 
-        # include all ledger actions
-        self.processing_state_name = 'Querying ledger actions history'
-        ledger_actions, _ = self.query_ledger_actions(
-            filter_query=LedgerActionsFilterQuery.make(to_ts=end_ts),
-            only_cache=True,
-        )
-        history.extend(ledger_actions)
-        step = self._increase_progress(step, total_steps)
-
-        # include eth2 staking events
+        # Each chain is handled in its own greenlet so that the network queries of the
+        # chains overlap and while one chain waits for the network, the transactions of
+        # another can be decoded. Decoding itself still runs in this one process
+        self.processing_state_name = 'Querying and decoding EVM transactions history'
+        greenlets = [
+            gevent.spawn(query_evm_chain_history, blockchain)
+            for blockchain in EVM_CHAINS_WITH_TRANSACTIONS
+        ]
+        try:
+            gevent.joinall(greenlets)
+            for greenlet in greenlets:
+                if greenlet.exception is not None:
+                    raise greenlet.exception
+        finally:  # don't leave the chains querying if this greenlet is killed
+            gevent.killall(greenlets)
+
+        # include eth2 staking events. They are queried here since this can hit the network
+        eth2_events: list['ValidatorDailyStats'] = []
         eth2 = self.chains_aggregator.get_module('eth2')
         if eth2 is not None and has_premium:
             self.processing_state_name = 'Querying ETH2 staking history'
@@ -432,34 +565,18 @@ class EventsHistorian:
                     from_timestamp=Timestamp(0),
                     to_timestamp=end_ts,
                 )
-                history.extend(eth2_events)
             except RemoteError as e:
                 self.msg_aggregator.add_error(
                     f'Eth2 events are not included in the PnL report due to {e!s}',
                 )
 
-        step = self._increase_progress(step, total_steps)
-        self.processing_state_name = 'Querying base history events'
-        # Include all base history entries
-        history_events_db = DBHistoryEvents(self.db)
-        with self.db.conn.read_ctx() as cursor:
-            base_entries = history_events_db.get_history_events(
-                cursor=cursor,
-                filter_query=HistoryEventFilterQuery.make(
-                    # We need to have history since before the range
-                    from_ts=Timestamp(0),
-                    to_ts=end_ts,
-                ),
-                has_premium=True,  # ignore limits here. Limit applied at processing
-                group_by_event_ids=False,
-            )
-        history.extend(base_entries)
         self._increase_progress(step, total_steps)
-
-        history.sort(  # sort events first by timestamp and if history base by sequence index
-            key=lambda x: (
-                x.get_timestamp(),
-                x.sequence_index if isinstance(x, HistoryBaseEntry) else 1,
-            ),
+        # Trades, asset movements, margin positions, ledger actions and base history
+        # entries of all possible locations are read from the DB by the returned stream
+        return empty_or_error, HistoryEventsStream(
+            db=self.db,
+            msg_aggregator=self.msg_aggregator,
+            end_ts=end_ts,
+            has_premium=self.chains_aggregator.premium is not None,
+            eth2_events=eth2_events,
         )
-        return empty_or_error, history
@@ -1,4 +1,7 @@
 import logging
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Iterable
 from contextlib import suppress
 from http import HTTPStatus
 from pathlib import Path
@@ -7,10 +10,12 @@ from typing import TYPE_CHECKING, Optional
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants.assets import A_KFEE, A_USD
 from rotkehlchen.constants.misc import ONE, ZERO_PRICE
+from rotkehlchen.constants.timing import DAY_IN_SECONDS, HOUR_IN_SECONDS
 from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.errors.price import NoPriceForGivenTimestamp, PriceQueryUnsupportedAsset
 from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.globaldb.manual_price_oracles import ManualPriceOracle
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
@@ -19,6 +24,16 @@ from rotkehlchen.user_messages import MessagesAggregator
 
 from .types import HistoricalPriceOracle, HistoricalPriceOracleInstance
 
+# Max distance in seconds that each oracle accepts when looking for a
+# cached price in the price_history table. Must mirror the oracles' own logic.
+ORACLE_CACHE_MAX_SECONDS_DISTANCE = {
+    HistoricalPriceOracle.MANUAL: HOUR_IN_SECONDS,
+    HistoricalPriceOracle.CRYPTOCOMPARE: HOUR_IN_SECONDS,
+    HistoricalPriceOracle.COINGECKO: DAY_IN_SECONDS,
+    HistoricalPriceOracle.DEFILLAMA: DAY_IN_SECONDS,
+}
+MAX_ORACLE_CACHE_DISTANCE = max(ORACLE_CACHE_MAX_SECONDS_DISTANCE.values())
+
 if TYPE_CHECKING:
     from rotkehlchen.externalapis.coingecko import Coingecko
     from rotkehlchen.externalapis.cryptocompare import Cryptocompare
@@ -80,6 +95,8 @@ class PriceHistorian():
     _manual: ManualPriceOracle  # This is used when iterating through all oracles
     _oracles: Optional[list[HistoricalPriceOracle]] = None
     _oracle_instances: Optional[list[HistoricalPriceOracleInstance]] = None
+    # Prices resolved in bulk from the DB cache. Keyed by (from_asset, to_asset, timestamp)
+    _prefetched_prices: dict[tuple[str, str, Timestamp], Price] = {}
 
     def __new__(
             cls,
@@ -151,6 +168,80 @@ class PriceHistorian():
             return Price(usd_price * price_mapping)
         return None
 
+    @staticmethod
+    def _is_prefetchable_pair(from_asset: Asset, to_asset: Asset) -> bool:
+        """Pairs that don't go through the oracles' DB cache can't be prefetched"""
+        if from_asset in (to_asset, A_KFEE):
+            return False
+
+        try:  # fiat to fiat prices are handled by the Inquirer
+            from_asset.resolve_to_fiat_asset()
+            to_asset.resolve_to_fiat_asset()
+        except (UnknownAsset, WrongAssetType):
+            return True
+
+        return False
+
+    @staticmethod
+    def prefetch_historical_prices(
+            queries: Iterable[tuple[Asset, Asset, Timestamp]],
+    ) -> int:
+        """Resolve in bulk the given (from_asset, to_asset, timestamp) price queries
+        using the prices cached in the global DB and keep the results in memory so that
+        `query_historical_price` does not need to hit the DB for each of them.
+
+        Queries are grouped by pair and for each pair the cached prices are read once
+        for the entire time range needed. Each query is then resolved by walking the
+        oracles in the configured order, the same way `query_historical_price` does.
+        Oracles that can't be queried for a timestamp according to their
+        `can_query_history` are skipped as they are in `query_historical_price`.
+        If an oracle has no cached price for the query it is left unresolved, so that
+        it's sent to the oracles when it is queried normally.
+
+        Returns the number of queries that got resolved.
+        """
+        instance = PriceHistorian()
+        oracles = instance._oracles
+        oracle_instances = instance._oracle_instances
+        assert isinstance(oracles, list) and isinstance(oracle_instances, list), (
+            'PriceHistorian should never be called before setting the oracles'
+        )
+        pair_timestamps: defaultdict[tuple[Asset, Asset], set[Timestamp]] = defaultdict(set)
+        for from_asset, to_asset, timestamp in queries:
+            if PriceHistorian._is_prefetchable_pair(from_asset, to_asset):
+                pair_timestamps[(from_asset, to_asset)].add(timestamp)
+
+        resolved = 0
+        for (from_asset, to_asset), timestamps in pair_timestamps.items():
+            source_data: defaultdict[HistoricalPriceOracle, tuple[list[Timestamp], list[Price]]] = defaultdict(lambda: ([], []))  # noqa: E501
+            for source, timestamp, price in GlobalDBHandler().get_historical_prices_in_range(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                from_ts=Timestamp(min(timestamps) - MAX_ORACLE_CACHE_DISTANCE),
+                to_ts=Timestamp(max(timestamps) + MAX_ORACLE_CACHE_DISTANCE),
+            ):  # entries come sorted by timestamp
+                source_data[source][0].append(timestamp)
+                source_data[source][1].append(price)
+
+            for timestamp in sorted(timestamps):
+                cached_price = _find_cached_price(
+                    oracles=list(zip(oracles, oracle_instances)),
+                    source_data=source_data,
+                    from_asset=from_asset,
+                    to_asset=to_asset,
+                    timestamp=timestamp,
+                )
+                if cached_price is not None:
+                    PriceHistorian._prefetched_prices[(from_asset.identifier, to_asset.identifier, timestamp)] = cached_price  # noqa: E501
+                    resolved += 1
+
+        log.debug(f'Prefetched {resolved} historical prices for {len(pair_timestamps)} pairs')
+        return resolved
+
+    @staticmethod
+    def clear_prefetched_prices() -> None:
+        PriceHistorian._prefetched_prices = {}
+
     @staticmethod
     def query_historical_price(
             from_asset: Asset,
@@ -181,6 +272,12 @@ class PriceHistorian():
         if from_asset == to_asset:
             return Price(ONE)
 
+        prefetched_price = PriceHistorian._prefetched_prices.get(
+            (from_asset.identifier, to_asset.identifier, timestamp),
+        )
+        if prefetched_price is not None:
+            return prefetched_price
+
         special_asset_price = PriceHistorian().get_price_for_special_asset(
             from_asset=from_asset,
             to_asset=to_asset,
@@ -255,3 +352,54 @@ class PriceHistorian():
             time=timestamp,
             rate_limited=rate_limited,
         )
+
+
+def _find_cached_price(
+        oracles: list[tuple[HistoricalPriceOracle, HistoricalPriceOracleInstance]],
+        source_data: dict[HistoricalPriceOracle, tuple[list[Timestamp], list[Price]]],
+        from_asset: Asset,
+        to_asset: Asset,
+        timestamp: Timestamp,
+) -> Optional[Price]:
+    """Find the price an oracle would return from its DB cache for the given timestamp.
+
+    Oracles are checked in order, skipping those that can't be queried for the
+    timestamp. If the first oracle has no cached price then None is returned since the
+    oracle would query its remote service before falling to the next.
+    """
+    for oracle, oracle_instance in oracles:
+        can_query_history = oracle_instance.can_query_history(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            timestamp=timestamp,
+        )
+        if can_query_history is False:
+            continue
+
+        max_distance = ORACLE_CACHE_MAX_SECONDS_DISTANCE.get(oracle)
+        if max_distance is None:
+            return None
+
+        timestamps, prices = source_data.get(oracle, ([], []))
+        idx = bisect_left(timestamps, timestamp)
+        best_idx: Optional[int] = None
+        # check the neighbours around the insertion point. Prefer older entries on ties
+        for candidate_idx in (idx - 1, idx):
+            if not 0 <= candidate_idx < len(timestamps):
+                continue
+            distance = abs(timestamps[candidate_idx] - timestamp)
+            if distance <= max_distance and (best_idx is None or distance < abs(timestamps[best_idx] - timestamp)):  # noqa: E501
+                best_idx = candidate_idx
+
+        if best_idx is None:
+            if oracle == HistoricalPriceOracle.MANUAL:
+                continue  # manual oracle does not query any remote service
+            return None
+
+        price = prices[best_idx]
+        if oracle == HistoricalPriceOracle.CRYPTOCOMPARE and price == ZERO_PRICE:
+            return None  # cryptocompare ignores zero price cache entries
+
+        return price
+
+    return None
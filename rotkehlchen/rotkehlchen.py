@@ -145,11 +145,15 @@ class Rotkehlchen():
         self.greenlet_manager = GreenletManager(msg_aggregator=self.msg_aggregator)
         self.rotki_notifier = RotkiNotifier()
         self.msg_aggregator.rotki_notifier = self.rotki_notifier
-        self.exchange_manager = ExchangeManager(msg_aggregator=self.msg_aggregator)
+        self.exchange_manager = ExchangeManager(
+            msg_aggregator=self.msg_aggregator,
+            query_concurrency=self.args.exchanges_query_concurrency,
+        )
         # Initialize the GlobalDBHandler singleton. Has to be initialized BEFORE asset resolver
         globaldb = GlobalDBHandler(
             data_dir=self.data_dir,
             sql_vm_instructions_cb=self.args.sqlite_instructions,
+            read_connections=self.args.sqlite_read_connections,
         )
         if globaldb.used_backup is True:
             self.msg_aggregator.add_warning(
@@ -160,6 +164,7 @@ class Rotkehlchen():
             self.data_dir,
             self.msg_aggregator,
             sql_vm_instructions_cb=args.sqlite_instructions,
+            read_connections=args.sqlite_read_connections,
         )
         self.cryptocompare = Cryptocompare(data_directory=self.data_dir, database=None)
         self.coingecko = Coingecko()
@@ -77,7 +77,7 @@ XPUB_DERIVATION_FREQUENCY = 3600  # every hour
 EVM_TX_QUERY_FREQUENCY = 3600  # every hour
 EXCHANGE_QUERY_FREQUENCY = 3600  # every hour
 PREMIUM_STATUS_CHECK = 3600  # every hour
-TX_RECEIPTS_QUERY_LIMIT = 500
+TX_RECEIPTS_QUERY_LIMIT = 5000  # queried in concurrent batch requests
 TX_DECODING_LIMIT = 500
 PREMIUM_CHECK_RETRY_LIMIT = 3
 
@@ -351,7 +351,7 @@ class TaskManager():
                 limit=TX_RECEIPTS_QUERY_LIMIT,
             )
             if len(hash_results) == 0:
-                return None
+                continue
 
             evm_inquirer = self.chains_aggregator.get_chain_manager(blockchain)
             task_name = f'Query {len(hash_results)} {blockchain!s} transactions receipts'
@@ -3,7 +3,9 @@ import shutil
 from http import HTTPStatus
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
+import gevent
 import pytest
 import requests
 
@@ -13,6 +15,7 @@ from rotkehlchen.db.filtering import (
     TradesFilterQuery,
 )
 from rotkehlchen.db.ledger_actions import DBLedgerActions
+from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.api import (
     api_url_for,
     assert_error_response,
@@ -95,6 +98,47 @@ def test_data_import_cryptocom(rotkehlchen_api_server):
     assert_cryptocom_import_results(rotki)
 
 
+@pytest.mark.parametrize('number_of_eth_accounts', [0])
+@pytest.mark.parametrize('legacy_messages_via_websockets', [True])
+def test_data_import_progress_messages(rotkehlchen_api_server, websocket_connection):
+    """Test that the import writes the entries in chunks and reports the progress
+    of the import after each written chunk"""
+    rotki = rotkehlchen_api_server.rest_api.rotkehlchen
+    filepath = Path(__file__).resolve().parent.parent / 'data' / 'cryptocom_trades_list.csv'
+    with patch('rotkehlchen.data_import.utils.ITEMS_PER_DB_WRITE', 5):
+        response = requests.put(
+            api_url_for(
+                rotkehlchen_api_server,
+                'dataimportresource',
+            ), json={'source': 'cryptocom', 'file': str(filepath)},
+        )
+    assert assert_proper_response_with_result(response) is True
+    assert_cryptocom_import_results(rotki)
+
+    gevent.sleep(1)  # let the websocket reader receive all the messages
+    messages = []
+    while websocket_connection.messages_num() != 0:
+        msg = websocket_connection.pop_message()
+        if msg['type'] == 'csv_import_status':
+            messages.append(msg['data'])
+
+    assert len(messages) > 1
+    total_bytes = filepath.stat().st_size
+    for previous, current in zip(messages, messages[1:]):
+        assert previous['imported_entries'] <= current['imported_entries']
+        assert previous['processed_bytes'] <= current['processed_bytes']
+    for data in messages[:-1]:
+        assert data['source'] == 'cryptocom'
+        assert data['total_bytes'] == total_bytes
+        assert data['imported_entries'] >= 5
+    assert messages[-1] == {
+        'source': 'cryptocom',
+        'imported_entries': messages[-1]['imported_entries'],
+        'processed_bytes': total_bytes,
+        'total_bytes': total_bytes,
+    }
+
+
 @pytest.mark.parametrize('number_of_eth_accounts', [0])
 def test_data_import_cryptocom_special_types(rotkehlchen_api_server):
     """Test that the data import endpoint works successfully for cryptocom"""
@@ -458,6 +502,36 @@ def test_data_import_binance_history(rotkehlchen_api_server):
     assert_binance_import_results(rotki)
 
 
+def test_data_import_binance_history_interleaved_rows(rotkehlchen_api_server, tmp_path):
+    """Test that the rows of a binance entry are grouped also when they are not
+    consecutive in the file"""
+    rotki = rotkehlchen_api_server.rest_api.rotkehlchen
+    filepath = tmp_path / 'binance_history.csv'
+    filepath.write_text(
+        'User_ID,UTC_Time,Account,Operation,Coin,Change,Remark\n'
+        '1,2021-01-01 10:00:00,Spot,Buy,BTC,0.5,\n'
+        '1,2021-01-01 10:00:05,Spot,Deposit,EUR,100,\n'
+        '1,2021-01-01 10:00:00,Spot,Buy,EUR,-10000,\n'
+        '1,2021-01-01 12:00:00,Spot,Deposit,EUR,200,\n',
+    )
+    response = requests.put(
+        api_url_for(
+            rotkehlchen_api_server,
+            'dataimportresource',
+        ), json={'source': 'binance', 'file': str(filepath)},
+    )
+    assert assert_proper_response_with_result(response) is True
+    assert rotki.msg_aggregator.consume_warnings() == []
+    with rotki.data.db.conn.read_ctx() as cursor:
+        trades = rotki.data.db.get_trades(cursor, filter_query=TradesFilterQuery.make(), has_premium=True)  # noqa: E501
+        asset_movements = rotki.data.db.get_asset_movements(cursor, filter_query=AssetMovementsFilterQuery.make(), has_premium=True)  # noqa: E501
+    assert [(x.timestamp, x.amount) for x in trades] == [(1609495200, FVal('0.5'))]
+    assert [(x.timestamp, x.amount) for x in asset_movements] == [
+        (1609495205, FVal(100)),
+        (1609502400, FVal(200)),
+    ]
+
+
 def test_data_import_rotki_generic_trades(rotkehlchen_api_server):
     """Test that data import works for rotki generic trades import csv file."""
     rotki = rotkehlchen_api_server.rest_api.rotkehlchen
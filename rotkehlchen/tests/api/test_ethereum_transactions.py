@@ -216,17 +216,16 @@ def assert_force_redecode_txns_works(api_server: 'APIServer', hashes: Optional[l
         'get_evm_transactions',
         wraps=rotki.chains_aggregator.ethereum.transactions_decoder.dbevmtx.get_evm_transactions,  # noqa: E501
     )
-    get_or_decode_txn_events_patch = patch.object(
+    decode_txn_events_patch = patch.object(
         rotki.chains_aggregator.ethereum.transactions_decoder,
-        '_get_or_decode_transaction_events',
-        wraps=rotki.chains_aggregator.ethereum.transactions_decoder._get_or_decode_transaction_events,  # noqa: E501
+        '_decode_transaction_events',
+        wraps=rotki.chains_aggregator.ethereum.transactions_decoder._decode_transaction_events,  # noqa: E501
     )
     get_or_query_txn_receipt_patch = patch('rotkehlchen.chain.ethereum.transactions.EthereumTransactions.get_or_query_transaction_receipt')  # noqa: 501
     with ExitStack() as stack:
-        function_call_counters = []
-        function_call_counters.append(stack.enter_context(get_or_decode_txn_events_patch))
-        function_call_counters.append(stack.enter_context(get_eth_txns_patch))
-        function_call_counters.append(stack.enter_context(get_or_query_txn_receipt_patch))
+        decode_txn_events = stack.enter_context(decode_txn_events_patch)
+        get_eth_txns = stack.enter_context(get_eth_txns_patch)
+        get_or_query_txn_receipt = stack.enter_context(get_or_query_txn_receipt_patch)
 
         response = requests.put(
             api_url_for(
@@ -242,13 +241,10 @@ def assert_force_redecode_txns_works(api_server: 'APIServer', hashes: Optional[l
             },
         )
         assert_proper_response(response)
-        if hashes is None:
-            for fn in function_call_counters:
-                assert fn.call_count == 14
-        else:
-            txn_hashes_len = len(hashes)
-            for fn in function_call_counters:
-                assert fn.call_count == txn_hashes_len
+        # all transactions are redecoded but read from the DB in bulk with their receipts
+        assert decode_txn_events.call_count == (14 if hashes is None else len(hashes))
+        assert get_eth_txns.call_count == 1
+        assert get_or_query_txn_receipt.call_count == 0
 
 
 def _write_transactions_to_db(
@@ -16,6 +16,7 @@ from rotkehlchen.chain.accounts import BlockchainAccountData, BlockchainAccounts
 from rotkehlchen.constants import ONE, YEAR_IN_SECONDS
 from rotkehlchen.constants.assets import A_1INCH, A_BTC, A_DAI, A_ETH, A_ETH2, A_USD
 from rotkehlchen.constants.misc import ZERO
+from rotkehlchen.constants.timing import DAY_IN_SECONDS, HOUR_IN_SECONDS, WEEK_IN_SECONDS
 from rotkehlchen.data_handler import DataHandler
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.db.filtering import AssetMovementsFilterQuery, TradesFilterQuery
@@ -48,6 +49,7 @@ from rotkehlchen.db.settings import (
     DBSettings,
     ModifiableDBSettings,
 )
+from rotkehlchen.db.snapshots import DBSnapshot
 from rotkehlchen.db.utils import DBAssetBalance, LocationData, SingleDBAssetBalance
 from rotkehlchen.errors.api import AuthenticationError
 from rotkehlchen.errors.misc import DBSchemaError, InputError
@@ -92,6 +94,8 @@ TABLES_AT_INIT = [
     'yearn_vaults_events',
     'timed_balances',
     'timed_location_data',
+    'timed_balances_rollups',
+    'timed_location_data_rollups',
     'asset_movement_category',
     'balance_category',
     'external_service_credentials',
@@ -113,12 +117,14 @@ TABLES_AT_INIT = [
     'location',
     'settings',
     'used_query_ranges',
+    'binance_trades_cursors',
     'margin_positions',
     'asset_movements',
     'tag_mappings',
     'tags',
     'xpubs',
     'xpub_mappings',
+    'xpub_derived_addresses',
     'amm_events',
     'eth2_daily_staking_details',
     'eth2_validators',
@@ -1232,6 +1238,72 @@ def test_timed_balances_treat_eth2_as_eth(database):
     assert balances == expected_balances
 
 
+def test_balances_rollups(database):
+    """Test that the balance snapshots are rolled up per day and per week and that the
+    graphs of ranges with too many snapshots are queried from the rollups"""
+    start_ts = 1672531200  # the start of a day
+    snapshot_times = [start_ts + day * DAY_IN_SECONDS + hour * HOUR_IN_SECONDS for day in range(10) for hour in (0, 8, 16)]  # noqa: E501
+    with database.user_write() as write_cursor:
+        for idx, timestamp in enumerate(snapshot_times):
+            database.add_multiple_balances(write_cursor, [DBAssetBalance(
+                category=BalanceType.ASSET,
+                time=timestamp,
+                asset=A_ETH,
+                amount=str(idx),
+                usd_value=str(idx * 10),
+            )])
+            database.add_multiple_location_data(write_cursor, [
+                LocationData(time=timestamp, location='H', usd_value=str(idx * 10)),
+                LocationData(time=timestamp, location='A', usd_value=str(idx * 10)),
+            ])
+
+    last_of_each_day = snapshot_times[2::3]
+    with database.conn.read_ctx() as cursor:
+        assert cursor.execute(
+            'SELECT timestamp, snapshots FROM timed_location_data_rollups WHERE '
+            'resolution=? AND location="H" ORDER BY timestamp',
+            (DAY_IN_SECONDS,),
+        ).fetchall() == [(x, 3) for x in last_of_each_day]
+        # few enough snapshots in the range to show all of them
+        balances = database.query_timed_balances(cursor, asset=A_ETH, balance_type=BalanceType.ASSET)  # noqa: E501
+        assert [x.time for x in balances] == snapshot_times
+        with patch('rotkehlchen.db.dbhandler.MAX_GRAPH_POINTS', 20):
+            balances = database.query_timed_balances(cursor, asset=A_ETH, balance_type=BalanceType.ASSET)  # noqa: E501
+            assert [x.time for x in balances] == last_of_each_day
+            assert [x.amount for x in balances] == [FVal(x) for x in range(2, 30, 3)]
+            # a short range is still shown with all of its snapshots
+            balances = database.query_timed_balances(
+                cursor=cursor,
+                asset=A_ETH,
+                balance_type=BalanceType.ASSET,
+                from_ts=Timestamp(start_ts),
+                to_ts=Timestamp(start_ts + DAY_IN_SECONDS),
+            )
+            assert [x.time for x in balances] == snapshot_times[:4]
+        with patch('rotkehlchen.db.dbhandler.MAX_GRAPH_POINTS', 5):
+            balances = database.query_timed_balances(cursor, asset=A_ETH, balance_type=BalanceType.ASSET)  # noqa: E501
+            last_of_each_week = sorted({
+                max(x for x in snapshot_times if x - x % WEEK_IN_SECONDS == week)
+                for week in {x - x % WEEK_IN_SECONDS for x in snapshot_times}
+            })
+            assert [x.time for x in balances] == last_of_each_week
+            times, values = database.get_netvalue_data(Timestamp(0))
+            assert times == last_of_each_week
+            assert values == [str(snapshot_times.index(x) * 10) for x in last_of_each_week]
+
+    # deleting a snapshot updates the rollups of its buckets
+    with database.user_write() as write_cursor:
+        DBSnapshot(database, database.msg_aggregator).delete(write_cursor, Timestamp(snapshot_times[-1]))  # noqa: E501
+    with database.conn.read_ctx() as cursor, patch('rotkehlchen.db.dbhandler.MAX_GRAPH_POINTS', 20):  # noqa: E501
+        times, values = database.get_netvalue_data(Timestamp(0))
+        assert times == [*last_of_each_day[:-1], snapshot_times[-2]]
+        assert values[-1] == '280'
+        assert cursor.execute(
+            'SELECT snapshots FROM timed_location_data_rollups WHERE resolution=? AND bucket=?',
+            (DAY_IN_SECONDS, snapshot_times[-1] - snapshot_times[-1] % DAY_IN_SECONDS),
+        ).fetchall() == [(2,), (2,)]
+
+
 def test_multiple_location_data_and_balances_same_timestamp(user_data_dir, sql_vm_instructions_cb):
     """
     Test that adding location and balance data with same timestamp raises an error
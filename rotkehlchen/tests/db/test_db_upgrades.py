@@ -1500,6 +1500,75 @@ def test_upgrade_db_36_to_37(user_data_dir):  # pylint: disable=unused-argument
     ).fetchone()[0] == '42'
 
 
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+def test_upgrade_db_37_to_38(user_data_dir):  # pylint: disable=unused-argument
+    """Test upgrading the DB from version 37 to version 38"""
+    msg_aggregator = MessagesAggregator()
+    _use_prepared_db(user_data_dir, 'v36_rotkehlchen.db')
+    db_v37 = _init_db_with_target_version(
+        target_version=37,
+        user_data_dir=user_data_dir,
+        msg_aggregator=msg_aggregator,
+    )
+    index_query = 'SELECT name FROM sqlite_master WHERE type="index" AND name LIKE "idx_%"'
+    with db_v37.conn.read_ctx() as cursor:
+        assert cursor.execute(index_query).fetchall() == []
+        assert table_exists(cursor, 'binance_trades_cursors') is False
+        assert table_exists(cursor, 'timed_balances_rollups') is False
+        assert table_exists(cursor, 'timed_location_data_rollups') is False
+        assert table_exists(cursor, 'xpub_derived_addresses') is False
+        events_count = cursor.execute('SELECT COUNT(*) FROM history_events').fetchone()[0]
+
+    db_v37.logout()
+    # Execute upgrade
+    db = _init_db_with_target_version(
+        target_version=38,
+        user_data_dir=user_data_dir,
+        msg_aggregator=msg_aggregator,
+    )
+    with db.conn.read_ctx() as cursor:
+        indexes_after_upgrade = {x[0] for x in cursor.execute(index_query)}
+        assert cursor.execute('SELECT COUNT(*) FROM history_events').fetchone()[0] == events_count  # noqa: E501
+        assert table_exists(cursor, 'binance_trades_cursors') is True
+        assert table_exists(cursor, 'xpub_derived_addresses') is True
+        # the rollups are filled with the last snapshot of each day and week
+        for resolution in (86400, 604800):
+            last_snapshots = cursor.execute(
+                'SELECT MAX(timestamp), COUNT(DISTINCT timestamp) FROM timed_location_data '
+                'GROUP BY timestamp - timestamp % ?',
+                (resolution,),
+            ).fetchall()
+            assert len(last_snapshots) != 0
+            assert set(cursor.execute(
+                'SELECT timestamp, snapshots FROM timed_location_data_rollups '
+                'WHERE resolution=? AND location="H"',
+                (resolution,),
+            )) == set(last_snapshots)
+            assert cursor.execute(
+                'SELECT COUNT(*) FROM timed_balances_rollups WHERE resolution=?',
+                (resolution,),
+            ).fetchone()[0] == cursor.execute(
+                'SELECT COUNT(*) FROM timed_balances WHERE timestamp IN '
+                '(SELECT MAX(timestamp) FROM timed_balances GROUP BY timestamp - timestamp % ?)',
+                (resolution,),
+            ).fetchone()[0]
+
+    assert {
+        'idx_history_events_timestamp',
+        'idx_history_events_location',
+        'idx_history_events_asset',
+        'idx_history_events_location_label',
+        'idx_evm_transactions_chain_id',
+        'idx_evm_tx_mappings_value',
+        'idx_timed_balances_currency',
+        'idx_timed_balances_rollups_currency',
+    } <= indexes_after_upgrade
+    # the tables creation script of new DBs should not have any index that the upgrade misses
+    db.conn.executescript(DB_SCRIPT_CREATE_TABLES)
+    with db.conn.read_ctx() as cursor:
+        assert {x[0] for x in cursor.execute(index_query)} == indexes_after_upgrade
+
+
 def test_latest_upgrade_adds_remove_tables(user_data_dir):
     """
     This is a test that we can only do for the last upgrade.
@@ -1,4 +1,5 @@
 from rotkehlchen.chain.accounts import BlockchainAccountData
+from rotkehlchen.chain.evm.structures import EvmTxReceipt, EvmTxReceiptLog
 from rotkehlchen.chain.evm.types import EvmAccount
 from rotkehlchen.data_handler import DataHandler
 from rotkehlchen.db.evmtx import DBEvmTx
@@ -10,7 +11,8 @@ from rotkehlchen.tests.utils.constants import (
     ETH_ADDRESS3,
     MOCK_INPUT_DATA,
 )
-from rotkehlchen.tests.utils.factories import make_evm_address
+from rotkehlchen.tests.utils.ethereum import txreceipt_to_data
+from rotkehlchen.tests.utils.factories import make_evm_address, make_evm_tx_hash
 from rotkehlchen.types import (
     ChainID,
     EvmInternalTransaction,
@@ -314,3 +316,52 @@ def test_query_also_internal_evm_transactions(data_dir, username, sql_vm_instruc
             has_premium=True,
         )
         assert result == [tx1, tx3, tx4]
+
+
+def test_add_receipts_data(database):
+    """Test that adding multiple receipts at once skips the receipts that are already in
+    the DB and the ones whose transaction is not in the DB"""
+    dbevmtx = DBEvmTx(database)
+    transactions = [EvmTransaction(
+        tx_hash=make_evm_tx_hash(),
+        chain_id=ChainID.ETHEREUM,
+        timestamp=Timestamp(1451606400 + idx),
+        block_number=idx,
+        from_address=ETH_ADDRESS1,
+        to_address=ETH_ADDRESS2,
+        value=FVal('1'),
+        gas=FVal('21000'),
+        gas_price=FVal('2000000000'),
+        gas_used=FVal('21000'),
+        input_data=b'',
+        nonce=idx,
+    ) for idx in range(3)]
+    receipts = [EvmTxReceipt(
+        tx_hash=tx.tx_hash,
+        chain_id=ChainID.ETHEREUM,
+        contract_address=None,
+        status=True,
+        type=0,
+        logs=[EvmTxReceiptLog(
+            log_index=idx,
+            data=b'\x01',
+            address=ETH_ADDRESS3,
+            removed=False,
+            topics=[b'\x02' * 32, b'\x03' * 32],
+        )],
+    ) for idx, tx in enumerate(transactions)]
+    with database.user_write() as write_cursor:
+        database.add_blockchain_accounts(
+            write_cursor=write_cursor,
+            account_data=[BlockchainAccountData(chain=SupportedBlockchain.ETHEREUM, address=ETH_ADDRESS1)],  # noqa: E501
+        )
+        dbevmtx.add_evm_transactions(write_cursor, transactions[:2], relevant_address=ETH_ADDRESS1)  # noqa: E501
+        dbevmtx.add_receipt_data(write_cursor, ChainID.ETHEREUM, txreceipt_to_data(receipts[0]))
+        assert dbevmtx.add_receipts_data(
+            write_cursor=write_cursor,
+            chain_id=ChainID.ETHEREUM,
+            data=[txreceipt_to_data(x) for x in (*receipts, receipts[1])],
+        ) == 1
+        for receipt in receipts[:2]:
+            assert dbevmtx.get_receipt(write_cursor, receipt.tx_hash, ChainID.ETHEREUM) == receipt  # noqa: E501
+        assert dbevmtx.get_receipt(write_cursor, receipts[2].tx_hash, ChainID.ETHEREUM) is None
@@ -1,14 +1,21 @@
+import pytest
+
 from rotkehlchen.accounting.structures.balance import Balance
 from rotkehlchen.accounting.structures.base import HistoryBaseEntryType, HistoryEvent
-from rotkehlchen.accounting.structures.eth2 import EthWithdrawalEvent
+from rotkehlchen.accounting.structures.eth2 import EthDepositEvent, EthWithdrawalEvent
 from rotkehlchen.accounting.structures.evm_event import EvmEvent, EvmProduct
 from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
 from rotkehlchen.api.v1.types import IncludeExcludeFilterData
 from rotkehlchen.constants.assets import A_ETH
 from rotkehlchen.constants.misc import ONE
 from rotkehlchen.db.constants import HISTORY_MAPPING_KEY_STATE, HISTORY_MAPPING_STATE_CUSTOMIZED
-from rotkehlchen.db.filtering import EvmEventFilterQuery, HistoryEventFilterQuery
-from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.db.filtering import (
+    EthDepositEventFilterQuery,
+    EvmEventFilterQuery,
+    HistoryEventFilterQuery,
+)
+from rotkehlchen.db.history_events import DBHistoryEvents, _events_data_query
+from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.tests.utils.factories import (
     make_ethereum_event,
     make_evm_address,
@@ -212,3 +219,95 @@ def test_delete_last_event(database):
     assert 'was the last event of a transaction' in msg
     with db.db.conn.read_ctx() as cursor:
         assert len(db.get_history_events(cursor, HistoryEventFilterQuery.make(), True)) == 1, 'EVM event should be left'  # noqa: E501
+
+
+def test_query_only_joins_needed_tables(database):
+    """Test that the events are read with only the joins their entry types need and
+    that the same events as with all the joins are returned"""
+    db = DBHistoryEvents(database)
+    events = [
+        HistoryEvent(
+            identifier=1,
+            event_identifier='TEST1',
+            sequence_index=1,
+            timestamp=TimestampMS(1),
+            location=Location.KRAKEN,
+            event_type=HistoryEventType.TRADE,
+            event_subtype=HistoryEventSubType.NONE,
+            asset=A_ETH,
+            balance=Balance(ONE),
+        ),
+        make_ethereum_event(index=2, timestamp=TimestampMS(2)),
+        EthWithdrawalEvent(
+            validator_index=1000,
+            timestamp=TimestampMS(3),
+            balance=Balance(amount=ONE),
+            withdrawal_address=make_evm_address(),
+            is_exit=True,
+            identifier=3,
+        ),
+        EthDepositEvent(
+            tx_hash=make_evm_tx_hash(),
+            validator_index=1001,
+            sequence_index=1,
+            timestamp=TimestampMS(4),
+            balance=Balance(amount=ONE),
+            depositor=make_evm_address(),
+            identifier=4,
+        ),
+    ]
+    with db.db.user_write() as write_cursor:
+        db.add_history_events(write_cursor=write_cursor, history=events)
+
+    with db.db.conn.read_ctx() as cursor:
+        for filter_query, expected_events, expected_joins in (
+            (HistoryEventFilterQuery.make(), events, ('evm_events_info', 'eth_staking_events_info')),  # noqa: E501
+            (HistoryEventFilterQuery.make(entry_types=IncludeExcludeFilterData(values=[HistoryBaseEntryType.HISTORY_EVENT])), events[:1], ()),  # noqa: E501
+            (HistoryEventFilterQuery.make(entry_types=IncludeExcludeFilterData(values=[HistoryBaseEntryType.HISTORY_EVENT, HistoryBaseEntryType.EVM_EVENT])), events[:2], ('evm_events_info',)),  # noqa: E501
+            (HistoryEventFilterQuery.make(entry_types=IncludeExcludeFilterData(values=[HistoryBaseEntryType.EVM_EVENT, HistoryBaseEntryType.ETH_DEPOSIT_EVENT], operator='NOT IN')), [events[0], events[2]], ('eth_staking_events_info',)),  # noqa: E501
+            (EvmEventFilterQuery.make(), events[1:2], ('evm_events_info',)),
+            (EthDepositEventFilterQuery.make(), events[3:], ('evm_events_info', 'eth_staking_events_info')),  # noqa: E501
+        ):
+            query = _events_data_query(filter_query)
+            for table in ('evm_events_info', 'eth_staking_events_info'):
+                assert (f'JOIN {table} ' in query) is (table in expected_joins)
+            queried_events = db.get_history_events(cursor, filter_query, has_premium=True)
+            assert queried_events == expected_events
+
+        # the events of the free users are also read with only the needed joins
+        assert db.get_history_events(
+            cursor=cursor,
+            filter_query=HistoryEventFilterQuery.make(entry_types=IncludeExcludeFilterData(values=[HistoryBaseEntryType.HISTORY_EVENT])),  # noqa: E501
+            has_premium=False,
+            group_by_event_ids=True,
+        ) == [(1, events[0])]
+
+
+def test_iterate_history_event_rows(database):
+    """Test that the rows of the events only deserialize the full event when needed"""
+    db = DBHistoryEvents(database)
+    events = [make_ethereum_event(index=idx, timestamp=TimestampMS(idx)) for idx in range(1, 4)]
+    with db.db.user_write() as write_cursor:
+        db.add_history_events(write_cursor=write_cursor, history=events)
+        # an event with a bad amount is only skipped when it's fully deserialized
+        write_cursor.execute('UPDATE history_events SET amount=? WHERE identifier=?', ('foo', 3))
+
+    with db.db.conn.read_ctx() as cursor:
+        rows = list(db.iterate_history_event_rows(cursor, EvmEventFilterQuery.make()))
+        assert db.get_history_events(cursor, EvmEventFilterQuery.make(), has_premium=True) == events[:2]  # noqa: E501
+
+    assert len(rows) == 3
+    for row, event in zip(rows, events):
+        assert row.entry_type == HistoryBaseEntryType.EVM_EVENT
+        assert (row.identifier, row.event_identifier, row.sequence_index) == (event.identifier, event.event_identifier, event.sequence_index)  # noqa: E501
+        assert (row.timestamp, row.location, row.location_label) == (event.timestamp, event.location, event.location_label)  # noqa: E501
+        assert (row.event_type, row.event_subtype) == (event.event_type, event.event_subtype)
+        assert row._event is None
+
+    for row, event in zip(rows[:2], events):
+        assert row.tx_hash == event.tx_hash  # accessing the event data deserializes it
+        assert row._event == event
+        assert row.event is row._event
+
+    with pytest.raises(DeserializationError):
+        _ = rows[2].balance
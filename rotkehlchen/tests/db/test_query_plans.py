@@ -0,0 +1,177 @@
+"""Checks that the queries built by the DB filters are served by indexes
+
+Each case builds a query the same way the DB code that uses the filter does and
+runs EXPLAIN QUERY PLAN over it. A plain scan of a table that is not helped by any
+index means that the query reads the whole table, which gets slow as the user's
+history grows. The filters of the assets, nfts and notes do substring searches or
+act on small tables, so they are not checked here."""
+import re
+from typing import Any
+
+import pytest
+
+from rotkehlchen.accounting.structures.types import HistoryEventType
+from rotkehlchen.chain.evm.types import EvmAccount
+from rotkehlchen.constants.assets import A_ETH
+from rotkehlchen.db.drivers.gevent import DBCursor
+from rotkehlchen.db.filtering import (
+    AssetMovementsFilterQuery,
+    DBFilterQuery,
+    Eth2DailyStatsFilterQuery,
+    EthStakingEventFilterQuery,
+    EvmEventFilterQuery,
+    EvmTransactionsFilterQuery,
+    HistoryBaseEntryFilterQuery,
+    HistoryEventFilterQuery,
+    LedgerActionsFilterQuery,
+    TradesFilterQuery,
+)
+from rotkehlchen.tests.utils.factories import make_evm_address, make_evm_tx_hash
+from rotkehlchen.types import ChainID, Location, Timestamp
+
+FROM_TS, TO_TS = Timestamp(1600000000), Timestamp(1700000000)
+SCAN_RE = re.compile(r'SCAN (?:TABLE )?(\w+)(.*)')
+SUBQUERY_RE = re.compile(r'(?:CO-ROUTINE|MATERIALIZE) (\w+)')
+
+
+def _full_scans(cursor: DBCursor, query: str, bindings: list[Any]) -> list[str]:
+    """Returns the query plan steps that read a whole table without using any index.
+
+    Scans of the results of subqueries, such as the limited ones of the free users'
+    queries, are not counted as the subqueries themselves are checked."""
+    full_scans, subqueries = [], {'SUBQUERY'}
+    for _, _, _, detail in cursor.execute(f'EXPLAIN QUERY PLAN {query}', bindings):
+        if (match := SUBQUERY_RE.match(detail)) is not None:
+            subqueries.add(match.group(1))
+        elif (match := SCAN_RE.match(detail)) is not None and match.group(1) not in subqueries and 'USING' not in match.group(2):  # noqa: E501
+            full_scans.append(detail)
+    return full_scans
+
+
+def _table_queries(table: str, filter_query: DBFilterQuery) -> list[tuple[str, list[Any]]]:
+    """The queries of the trades, asset movements and ledger actions DB methods"""
+    query, bindings = filter_query.prepare()
+    count_query, count_bindings = filter_query.prepare(with_pagination=False)
+    return [
+        (f'SELECT * from {table} ' + query, bindings),
+        (f'SELECT * FROM (SELECT * from {table} ORDER BY timestamp DESC LIMIT ?) ' + query, [100, *bindings]),  # noqa: E501
+        (f'SELECT COUNT(*) from {table} ' + count_query, count_bindings),
+    ]
+
+
+def _history_queries(filter_query: HistoryBaseEntryFilterQuery) -> list[tuple[str, list[Any]]]:
+    """The queries of the history events DB methods"""
+    query, bindings = filter_query.prepare()
+    grouped_query, grouped_bindings = filter_query.prepare(with_group_by=True)
+    count_query, count_bindings = filter_query.prepare(with_pagination=False)
+    return [
+        (f'SELECT * {filter_query.get_join_query()}' + query, bindings),
+        (f'SELECT COUNT(*), * {filter_query.get_join_query()}' + grouped_query, grouped_bindings),  # noqa: E501
+        (filter_query.get_count_query() + count_query, count_bindings),
+    ]
+
+
+def _evm_transactions_queries(filter_query: EvmTransactionsFilterQuery) -> list[tuple[str, list[Any]]]:  # noqa: E501
+    """The queries of DBEvmTx.get_evm_transactions and its count"""
+    query, bindings = filter_query.prepare()
+    count_query, count_bindings = filter_query.prepare(with_pagination=False)
+    return [
+        ('SELECT DISTINCT evm_transactions.tx_hash, evm_transactions.chain_id, timestamp FROM evm_transactions ' + query, bindings),  # noqa: E501
+        ('SELECT DISTINCT evm_transactions.tx_hash, evm_transactions.chain_id, timestamp FROM (SELECT * from evm_transactions ORDER BY timestamp DESC LIMIT ?) evm_transactions ' + query, [100, *bindings]),  # noqa: E501
+        ('SELECT COUNT(DISTINCT evm_transactions.tx_hash) FROM evm_transactions ' + count_query, count_bindings),  # noqa: E501
+    ]
+
+
+@pytest.mark.parametrize('filter_query', [
+    TradesFilterQuery.make(from_ts=FROM_TS, to_ts=TO_TS),
+    TradesFilterQuery.make(location=Location.KRAKEN, limit=10, offset=0),
+    TradesFilterQuery.make(base_assets=(A_ETH,), from_ts=FROM_TS),
+])
+def test_trades_query_plans(database, filter_query):
+    with database.conn.read_ctx() as cursor:
+        for query, bindings in _table_queries('trades', filter_query):
+            assert _full_scans(cursor, query, bindings) == [], query
+
+
+@pytest.mark.parametrize('filter_query', [
+    AssetMovementsFilterQuery.make(from_ts=FROM_TS, to_ts=TO_TS),
+    AssetMovementsFilterQuery.make(location=Location.KRAKEN, assets=(A_ETH,)),
+])
+def test_asset_movements_query_plans(database, filter_query):
+    with database.conn.read_ctx() as cursor:
+        for query, bindings in _table_queries('asset_movements', filter_query):
+            assert _full_scans(cursor, query, bindings) == [], query
+
+
+@pytest.mark.parametrize('filter_query', [
+    LedgerActionsFilterQuery.make(from_ts=FROM_TS, to_ts=TO_TS),
+    LedgerActionsFilterQuery.make(location=Location.KRAKEN, assets=(A_ETH,)),
+])
+def test_ledger_actions_query_plans(database, filter_query):
+    with database.conn.read_ctx() as cursor:
+        for query, bindings in _table_queries('ledger_actions', filter_query):
+            assert _full_scans(cursor, query, bindings) == [], query
+
+
+@pytest.mark.parametrize('filter_query', [
+    HistoryEventFilterQuery.make(from_ts=FROM_TS, to_ts=TO_TS, limit=10, offset=0),
+    HistoryEventFilterQuery.make(location=Location.KRAKEN),
+    HistoryEventFilterQuery.make(assets=(A_ETH,), event_types=[HistoryEventType.TRADE]),
+    HistoryEventFilterQuery.make(event_identifiers=['id1', 'id2'], exclude_ignored_assets=True),
+    EvmEventFilterQuery.make(tx_hashes=[make_evm_tx_hash()]),
+    EvmEventFilterQuery.make(location=Location.ETHEREUM, counterparties=['uniswap-v2']),
+    EthStakingEventFilterQuery.make(validator_indices=[1, 2], from_ts=FROM_TS),
+])
+def test_history_events_query_plans(database, filter_query):
+    with database.conn.read_ctx() as cursor:
+        for query, bindings in _history_queries(filter_query):
+            assert _full_scans(cursor, query, bindings) == [], query
+
+
+@pytest.mark.parametrize('filter_query', [
+    EvmTransactionsFilterQuery.make(from_ts=FROM_TS, to_ts=TO_TS),
+    EvmTransactionsFilterQuery.make(chain_id=ChainID.OPTIMISM, limit=10, offset=0),
+    EvmTransactionsFilterQuery.make(accounts=[EvmAccount(make_evm_address(), ChainID.ETHEREUM)]),  # noqa: E501
+    EvmTransactionsFilterQuery.make(tx_hash=make_evm_tx_hash(), chain_id=ChainID.ETHEREUM),
+])
+def test_evm_transactions_query_plans(database, filter_query):
+    with database.conn.read_ctx() as cursor:
+        for query, bindings in _evm_transactions_queries(filter_query):
+            assert _full_scans(cursor, query, bindings) == [], query
+
+
+@pytest.mark.parametrize('filter_query', [
+    Eth2DailyStatsFilterQuery.make(from_ts=FROM_TS, to_ts=TO_TS),
+    Eth2DailyStatsFilterQuery.make(validators=[1, 2]),
+])
+def test_eth2_daily_stats_query_plans(database, filter_query):
+    query, bindings = filter_query.prepare()
+    with database.conn.read_ctx() as cursor:
+        assert _full_scans(cursor, 'SELECT * from eth2_daily_staking_details ' + query, bindings) == []  # noqa: E501
+
+
+def test_balances_query_plans(database):
+    """The queries of the balances of an asset over time and of the decoding state"""
+    with database.conn.read_ctx() as cursor:
+        assert _full_scans(
+            cursor,
+            'SELECT timestamp, amount, usd_value, category FROM timed_balances '
+            'WHERE timestamp BETWEEN ? AND ? AND currency=? AND category=? ORDER BY timestamp ASC',
+            [FROM_TS, TO_TS, 'ETH', 'A'],
+        ) == []
+        assert _full_scans(
+            cursor,
+            'SELECT tx_hash FROM evm_tx_mappings WHERE chain_id=? AND value=?',
+            [1, 0],
+        ) == []
+
+
+def test_transferred_tokens_query_plan(database):
+    """The query of the tokens in the history events of some addresses"""
+    with database.conn.read_ctx() as cursor:
+        assert _full_scans(
+            cursor,
+            'SELECT DISTINCT location_label, asset FROM history_events WHERE '
+            'location_label IN (?,?) AND asset LIKE ?',
+            [make_evm_address(), make_evm_address(), 'eip155:1/%'],
+        ) == []
@@ -0,0 +1,127 @@
+import sqlite3
+from unittest.mock import patch
+
+import gevent
+import pytest
+
+from rotkehlchen.db.drivers.gevent import ContextError, DBConnection, DBConnectionType
+
+
+def _create_pooled_connection(path, pool_size=2):
+    conn = DBConnection(
+        path=path,
+        connection_type=DBConnectionType.GLOBAL,
+        sql_vm_instructions_cb=0,
+    )
+    conn.execute('CREATE TABLE a(b INTEGER PRIMARY KEY)')
+    conn.execute('INSERT INTO a VALUES (1)')
+    conn.enable_read_pool(pool_size=pool_size)
+    return conn
+
+
+def test_reads_do_not_wait_for_writer(tmp_path):
+    """Test that with the read pool reads are served while a write transaction is open
+    in another greenlet and that they see a consistent snapshot of the DB"""
+    conn = _create_pooled_connection(tmp_path / 'test.db')
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+    def write(event):
+        with conn.write_ctx() as write_cursor:
+            write_cursor.execute('INSERT INTO a VALUES (2)')
+            event.wait()  # keep the transaction open until told otherwise
+
+    event = gevent.event.Event()
+    writer = gevent.spawn(write, event)
+    gevent.sleep(.1)  # let the writer open its transaction
+    assert conn.transaction_lock.locked() is True
+    with conn.read_ctx() as cursor:  # does not wait for the write transaction
+        assert cursor.execute('SELECT b FROM a').fetchall() == [(1,)]
+        event.set()
+        writer.join()
+        # the snapshot taken at the start of the context is kept until it exits
+        assert cursor.execute('SELECT b FROM a').fetchall() == [(1,)]
+
+    with conn.read_ctx() as cursor:
+        assert cursor.execute('SELECT b FROM a').fetchall() == [(1,), (2,)]
+
+    conn.close()
+
+
+def test_read_pool_sees_own_writes(tmp_path):
+    """Test that a greenlet reads its own writes, both inside the write transaction and
+    after committing it from within a read context"""
+    conn = _create_pooled_connection(tmp_path / 'test.db', pool_size=1)
+    with conn.read_ctx() as cursor:
+        assert cursor.execute('SELECT b FROM a').fetchall() == [(1,)]
+        with conn.write_ctx() as write_cursor:
+            write_cursor.execute('INSERT INTO a VALUES (2)')
+            with conn.read_ctx() as inner_cursor:  # uncommitted changes are visible
+                assert inner_cursor.execute('SELECT b FROM a').fetchall() == [(1,), (2,)]
+
+        with conn.read_ctx() as inner_cursor:  # nesting does not need another reader
+            assert inner_cursor.execute('SELECT b FROM a').fetchall() == [(1,), (2,)]
+        assert cursor.execute('SELECT b FROM a').fetchall() == [(1,), (2,)]
+
+    with conn.savepoint_ctx() as savepoint_cursor:
+        savepoint_cursor.execute('INSERT INTO a VALUES (3)')
+    with conn.read_ctx() as cursor:
+        assert cursor.execute('SELECT b FROM a').fetchall() == [(1,), (2,), (3,)]
+
+    conn.close()
+
+
+def test_disable_read_pool(tmp_path):
+    """Test that disabling the read pool leaves all data in the database file"""
+    path = tmp_path / 'test.db'
+    conn = _create_pooled_connection(path)
+    with conn.write_ctx() as write_cursor:
+        write_cursor.execute('INSERT INTO a VALUES (2)')
+    conn.checkpoint()
+    conn.close()
+    assert not (tmp_path / 'test.db-wal').exists()
+
+    conn = DBConnection(
+        path=path,
+        connection_type=DBConnectionType.GLOBAL,
+        sql_vm_instructions_cb=0,
+    )
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'delete'
+    assert conn.execute('SELECT b FROM a').fetchall() == [(1,), (2,)]
+    conn.close()
+
+
+def test_disable_read_pool_with_reader_in_use(tmp_path):
+    """Test that disabling the read pool waits for the readers in use up to a timeout and
+    that it can't be done from inside a read context"""
+    conn = _create_pooled_connection(tmp_path / 'test.db')
+    with conn.read_ctx(), pytest.raises(ContextError):
+        conn.disable_read_pool()
+
+    def read(event):
+        with conn.read_ctx() as cursor:
+            cursor.execute('SELECT b FROM a')
+            event.wait()
+
+    event = gevent.event.Event()
+    reader = gevent.spawn(read, event)
+    gevent.sleep(0)
+    gevent.spawn_later(0.1, event.set)
+    conn.disable_read_pool()  # waits for the reader to be returned
+    assert reader.dead is True
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'delete'
+
+    conn.enable_read_pool(pool_size=2)
+    event.clear()
+    reader = gevent.spawn(read, event)
+    gevent.sleep(0)
+    with patch('rotkehlchen.db.drivers.gevent.READ_POOL_DISABLE_TIMEOUT', 0.1):
+        conn.disable_read_pool()
+    assert reader.dead is False
+    assert conn.read_pool_enabled is False
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    held_reader = next(iter(conn._held_readers.values()))
+    event.set()
+    reader.join()
+    with pytest.raises(sqlite3.ProgrammingError):  # closed once it was returned
+        held_reader.execute('SELECT 1')
+    conn.close()
@@ -77,6 +77,36 @@ def test_delete_bitcoin_xpub(setup_db_for_xpub_tests):
         assert len(cursor.fetchall()) == 0
 
 
+def test_xpub_derived_addresses(setup_db_for_xpub_tests):
+    """Test that the derived addresses cache is per xpub and goes away with the xpub"""
+    db, xpub1, xpub2, _, all_addresses = setup_db_for_xpub_tests
+    with db.user_write() as cursor:
+        assert db.get_xpub_derived_addresses(cursor, xpub1) == {}
+        db.add_xpub_derived_addresses(
+            write_cursor=cursor,
+            xpub_data=xpub1,
+            derived_addresses=[(0, 0, all_addresses[0]), (0, 1, all_addresses[1])],
+        )
+        db.add_xpub_derived_addresses(  # adding an already cached index is ignored
+            write_cursor=cursor,
+            xpub_data=xpub1,
+            derived_addresses=[(0, 1, all_addresses[2]), (1, 0, all_addresses[3])],
+        )
+        db.add_xpub_derived_addresses(
+            write_cursor=cursor,
+            xpub_data=xpub2,
+            derived_addresses=[(0, 0, all_addresses[5])],
+        )
+        assert db.get_xpub_derived_addresses(cursor, xpub1) == {
+            (0, 0): all_addresses[0],
+            (0, 1): all_addresses[1],
+            (1, 0): all_addresses[3],
+        }
+        db.delete_bitcoin_xpub(cursor, xpub1)
+        assert db.get_xpub_derived_addresses(cursor, xpub1) == {}
+        assert db.get_xpub_derived_addresses(cursor, xpub2) == {(0, 0): all_addresses[5]}
+
+
 def test_get_bitcoin_xpub_data(setup_db_for_xpub_tests):
     """Test that retrieving bitcoin xpub data also returns all properly mapped tags"""
     db, xpub1, xpub2, xpub3, _ = setup_db_for_xpub_tests
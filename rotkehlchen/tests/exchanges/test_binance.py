@@ -24,6 +24,7 @@ from rotkehlchen.exchanges.binance import (
     BINANCE_LAUNCH_TS,
     RETRY_AFTER_LIMIT,
     Binance,
+    BinanceWeightLimiter,
     trade_from_binance,
 )
 from rotkehlchen.exchanges.data_structures import Location, Trade, TradeType
@@ -896,3 +897,73 @@ def test_binance_query_trade_history_custom_markets(function_scope_binance):
         binance.query_trade_history(start_ts=0, end_ts=1564301134, only_cache=False)
 
     assert count == len(markets)
+
+
+def test_binance_query_trade_history_cursors(function_scope_binance):
+    """Test that after a trades query only the new trades of each market are queried
+    while a query of an earlier range queries all of them again"""
+    binance = function_scope_binance
+    binance.edit_exchange_extras({BINANCE_MARKETS_KEY: ['BNBBTC', 'ETHBTC']})
+    p = re.compile(r'symbol=([A-Z]*)&fromId=([0-9]*)')
+    queried = {}
+
+    def mock_my_trades(url, timeout):  # pylint: disable=unused-argument
+        if '/fiat/payments' in url:
+            return MockResponse(200, '[]')
+
+        symbol, from_id = p.search(url).groups()
+        queried[symbol] = int(from_id)
+        text = BINANCE_MYTRADES_RESPONSE if symbol == 'BNBBTC' and int(from_id) <= 28457 else '[]'  # noqa: E501
+        return MockResponse(200, text)
+
+    def query_trades(start_ts, end_ts):
+        queried.clear()
+        with patch.object(binance.session, 'get', side_effect=mock_my_trades):
+            trades, _ = binance.query_online_trade_history(
+                start_ts=Timestamp(start_ts),
+                end_ts=Timestamp(end_ts),
+            )
+        return trades
+
+    assert len(query_trades(start_ts=0, end_ts=1564301134)) == 1
+    assert queried == {'BNBBTC': 0, 'ETHBTC': 0}
+    with binance.db.conn.read_ctx() as cursor:
+        assert binance.db.get_binance_trades_cursors(cursor, binance.name, binance.location) == {  # noqa: E501
+            'BNBBTC': (28458, 1564301134),
+            'ETHBTC': (0, 1564301134),
+        }
+
+    # a query continuing the previous one only asks for the trades after the saved ids
+    assert query_trades(start_ts=1564301135, end_ts=1664301134) == []
+    assert queried == {'BNBBTC': 28458, 'ETHBTC': 0}
+    # a query of a range that overlaps an already queried one starts from the beginning
+    assert len(query_trades(start_ts=1499865549, end_ts=1664301134)) == 1
+    assert queried == {'BNBBTC': 0, 'ETHBTC': 0}
+
+
+def test_binance_weight_limiter():
+    """Test that the requests wait for the next minute when the reported weight
+    and the weight of the pending requests reach the limit"""
+    limiter = BinanceWeightLimiter(limit=100)
+    now = 1683000030.0
+    sleeps = []
+
+    def mock_sleep(seconds):
+        nonlocal now
+        sleeps.append(seconds)
+        now += seconds
+
+    with patch('time.time', side_effect=lambda: now), patch('gevent.sleep', side_effect=mock_sleep):  # noqa: E501
+        limiter.acquire(20)
+        limiter.acquire(20)
+        limiter.release(20, headers={'x-mbx-used-weight-1m': '70'})
+        limiter.acquire(10)  # 70 reported + 20 pending + 10
+        assert sleeps == []
+        limiter.acquire(1)
+        assert sleeps == [30.0]
+        # the pending weight still counts in the new minute
+        assert limiter.used_weight == 0 and limiter.pending_weight == 31
+        limiter.release(20, headers={})
+        limiter.release(10, headers=None)
+        limiter.release(1, headers={'x-mbx-used-weight-1m': '95'})
+        assert limiter.used_weight == 95 and limiter.pending_weight == 0
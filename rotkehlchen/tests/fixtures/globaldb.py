@@ -1,3 +1,4 @@
+import sqlite3
 from contextlib import ExitStack
 from pathlib import Path
 from shutil import copyfile
@@ -12,7 +13,7 @@ from rotkehlchen.constants.assets import A_BTC, A_ETH, A_EUR
 from rotkehlchen.fval import FVal
 from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.globaldb.upgrades.manager import UPGRADES_LIST
-from rotkehlchen.globaldb.utils import GLOBAL_DB_VERSION
+from rotkehlchen.globaldb.utils import ASSET_SEARCH_TRIGRAMS_QUERY, GLOBAL_DB_VERSION
 from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.tests.utils.database import mock_db_schema_sanity_check
 from rotkehlchen.tests.utils.globaldb import patch_for_globaldb_upgrade_to
@@ -83,6 +84,7 @@ def create_globaldb(
 
 def _initialize_fixture_globaldb(
         custom_globaldb,
+        packaged_globaldb_path,
         tmpdir_factory,
         sql_vm_instructions_cb: int,
         reload_user_assets,
@@ -95,11 +97,10 @@ def _initialize_fixture_globaldb(
     # clean the previous resolver memory cache, as it
     # may have cached results from a discarded database
     AssetResolver().clean_memory_cache()
-    root_dir = Path(__file__).resolve().parent.parent.parent
     if custom_globaldb is None:  # no specific version -- normal test
-        source_db_path = root_dir / 'data' / 'global.db'
+        source_db_path = packaged_globaldb_path
     else:
-        source_db_path = root_dir / 'tests' / 'data' / custom_globaldb
+        source_db_path = Path(__file__).resolve().parent.parent / 'data' / custom_globaldb
     new_data_dir = Path(tmpdir_factory.mktemp('test_data_dir'))
     new_global_dir = new_data_dir / 'global_data'
     new_global_dir.mkdir(parents=True, exist_ok=True)
@@ -132,13 +133,30 @@ def _initialize_fixture_globaldb(
     return globaldb
 
 
+@pytest.fixture(scope='session', name='packaged_globaldb_path')
+def fixture_packaged_globaldb_path(tmpdir_factory) -> Path:
+    """A copy of the packaged global DB with the asset search trigrams that its data
+    migrations add. Tests don't run the data migrations, so they are added once here
+    instead of at the creation of each test's global DB"""
+    root_dir = Path(__file__).resolve().parent.parent.parent
+    db_path = Path(tmpdir_factory.mktemp('packaged_global_data')) / 'global.db'
+    copyfile(root_dir / 'data' / 'global.db', db_path)
+    connection = sqlite3.connect(db_path)
+    connection.execute(ASSET_SEARCH_TRIGRAMS_QUERY.format(condition=''))
+    connection.commit()
+    connection.close()
+    return db_path
+
+
 @pytest.fixture(scope='session', name='session_globaldb')
 def fixture_session_globaldb(
         tmpdir_factory,
+        packaged_globaldb_path,
         session_sql_vm_instructions_cb,
 ):
     return _initialize_fixture_globaldb(
         custom_globaldb=None,
+        packaged_globaldb_path=packaged_globaldb_path,
         tmpdir_factory=tmpdir_factory,
         sql_vm_instructions_cb=session_sql_vm_instructions_cb,
         reload_user_assets=True,
@@ -153,6 +171,7 @@ def fixture_session_globaldb(
 @pytest.fixture(name='globaldb')
 def fixture_globaldb(
         custom_globaldb,
+        packaged_globaldb_path,
         tmpdir_factory,
         sql_vm_instructions_cb,
         reload_user_assets,
@@ -164,6 +183,7 @@ def fixture_globaldb(
 ):
     return _initialize_fixture_globaldb(
         custom_globaldb=custom_globaldb,
+        packaged_globaldb_path=packaged_globaldb_path,
         tmpdir_factory=tmpdir_factory,
         sql_vm_instructions_cb=sql_vm_instructions_cb,
         reload_user_assets=reload_user_assets,
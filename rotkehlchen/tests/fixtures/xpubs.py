@@ -1,8 +1,18 @@
 import pytest
 
+from rotkehlchen.chain.bitcoin import btc_activity_cache
+from rotkehlchen.chain.bitcoin.bch import bch_activity_cache
 from rotkehlchen.tests.utils.xpubs import setup_db_for_xpub_tests_impl
 
 
 @pytest.fixture(name='setup_db_for_xpub_tests')
 def fixture_setup_db_for_xpub_tests(data_dir, username, sql_vm_instructions_cb):
     return setup_db_for_xpub_tests_impl(data_dir, username, sql_vm_instructions_cb)
+
+
+@pytest.fixture(name='clear_bitcoin_activity_caches', autouse=True)
+def fixture_clear_bitcoin_activity_caches():  # noqa: PT004  # adding _ won't export it
+    """The address activity caches are global so don't let them leak between tests"""
+    yield
+    btc_activity_cache.clear()
+    bch_activity_cache.clear()
@@ -0,0 +1,149 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from rotkehlchen.accounting.cost_basis.base import AssetAcquisitionEvent, CostBasisEvents
+from rotkehlchen.accounting.mixins.event import AccountingEventType
+from rotkehlchen.constants import ONE
+from rotkehlchen.constants.assets import A_ETH, A_EUR
+from rotkehlchen.db.reports import DBAccountingReports
+from rotkehlchen.exchanges.data_structures import Trade
+from rotkehlchen.fval import FVal
+from rotkehlchen.tests.utils.accounting import accounting_history_process
+from rotkehlchen.tests.utils.history import prices
+from rotkehlchen.types import AssetAmount, CostBasisMethod, Location, Price, Timestamp, TradeType
+
+
+def _make_trade(timestamp: int, trade_type: TradeType, amount: str, rate: str) -> Trade:
+    return Trade(
+        timestamp=Timestamp(timestamp),
+        location=Location.KRAKEN,
+        base_asset=A_ETH,
+        quote_asset=A_EUR,
+        trade_type=trade_type,
+        amount=AssetAmount(FVal(amount)),
+        rate=Price(FVal(rate)),
+        fee=None,
+        fee_currency=None,
+        link=None,
+    )
+
+
+@pytest.mark.parametrize('cost_basis_method', list(CostBasisMethod))
+def test_cost_basis_state_roundtrip(cost_basis_method):
+    """Test that the restored acquisitions state continues processing exactly
+    like the state it was serialized from"""
+    original = CostBasisEvents(cost_basis_method).acquisitions_manager
+    for idx, (amount, rate) in enumerate((('1', '10'), ('2', '30'), ('3', '20'))):
+        original.add_acquisition(AssetAcquisitionEvent(
+            amount=AssetAmount(FVal(amount)),
+            timestamp=Timestamp(idx),
+            rate=Price(FVal(rate)),
+            index=idx,
+        ))
+    next(original.processing_iterator())
+    original.consume_result(FVal('0.5'))
+
+    restored = CostBasisEvents(cost_basis_method).acquisitions_manager
+    restored.restore_state(json.loads(json.dumps(original.serialize_state())))
+    for manager in (original, restored):
+        manager.add_acquisition(AssetAcquisitionEvent(
+            amount=ONE,
+            timestamp=Timestamp(4),
+            rate=Price(FVal(15)),
+            index=4,
+        ))
+
+    # restored acquisitions are not part of the report so they lose their index
+    original_state, restored_state = original.serialize_state(), restored.serialize_state()
+    for state in (original_state, restored_state):
+        for _, acquisition in state['acquisitions']:
+            acquisition.pop('index')
+    assert restored_state == original_state
+    consumed = []
+    for manager in (original, restored):
+        order = []
+        for acquisition in manager.processing_iterator():
+            order.append((acquisition.timestamp, acquisition.remaining_amount))
+            manager.consume_result(acquisition.remaining_amount)
+        consumed.append(order)
+    assert consumed[0] == consumed[1]
+
+
+@pytest.mark.parametrize('mocked_price_queries', [prices])
+def test_pnl_report_resumes_from_checkpoint(accountant):
+    """Test that a report whose range starts after the end of a previous report
+    continues from the checkpoint saved by it and gets the same result as a report
+    that processes the entire history"""
+    history = [
+        _make_trade(1609537953, TradeType.BUY, '1', '598.26'),
+        _make_trade(1624395186, TradeType.SELL, '0.5', '1862.06'),
+        _make_trade(1625001464, TradeType.SELL, '0.5', '1837.31'),
+    ]
+    dbpnl = DBAccountingReports(accountant.db)
+    with patch.object(accountant, 'premium', new=MagicMock()):
+        accounting_history_process(accountant, start_ts=Timestamp(1436979735), end_ts=Timestamp(1624395186), history_list=history)  # noqa: E501
+        with accountant.db.conn_transient.read_ctx() as cursor:
+            assert cursor.execute(  # an interval boundary was crossed and the end reached
+                'SELECT processed_events, timestamp FROM pnl_checkpoints',
+            ).fetchall() == [(1, 1609537953), (2, 1624395186)]
+
+        report, _ = accounting_history_process(accountant, start_ts=Timestamp(1624395187), end_ts=Timestamp(1625001466), history_list=history)  # noqa: E501
+        # only the last trade was processed. It used the acquisition of the first one
+        resumed_events = accountant.pots[0].processed_events
+        assert {x.timestamp for x in resumed_events} == {1625001464}
+        spend_event = next(x for x in resumed_events if x.cost_basis is not None)
+        assert spend_event.cost_basis.matched_acquisitions[0].event.index == -1
+        assert report['processed_actions'] == 3
+        resumed_pnl = accountant.pots[0].pnls[AccountingEventType.TRADE]
+        assert resumed_pnl.taxable == FVal('619.525')
+
+        dbpnl.purge_checkpoints()
+        accounting_history_process(accountant, start_ts=Timestamp(1624395187), end_ts=Timestamp(1625001466), history_list=history)  # noqa: E501
+        assert accountant.pots[0].processed_events[0].timestamp == 1609537953
+        assert accountant.pots[0].pnls[AccountingEventType.TRADE] == resumed_pnl
+
+        # a checkpoint is not used if the events it covers changed
+        history[0] = _make_trade(1609537953, TradeType.BUY, '1', '500')
+        accounting_history_process(accountant, start_ts=Timestamp(1624395187), end_ts=Timestamp(1625001466), history_list=history)  # noqa: E501
+        assert accountant.pots[0].processed_events[0].timestamp == 1609537953
+        assert accountant.pots[0].pnls[AccountingEventType.TRADE].taxable == FVal('668.655')
+
+    # without premium checkpoints are neither used nor saved
+    dbpnl.purge_checkpoints()
+    accounting_history_process(accountant, start_ts=Timestamp(1436979735), end_ts=Timestamp(1624395186), history_list=history)  # noqa: E501
+    with accountant.db.conn_transient.read_ctx() as cursor:
+        assert cursor.execute('SELECT COUNT(*) FROM pnl_checkpoints').fetchone()[0] == 0
+
+
+@pytest.mark.parametrize('mocked_price_queries', [prices])
+def test_pnl_report_history_changes_after_picking_checkpoint(accountant):
+    """Test that if the history changes after the checkpoint to resume from was picked
+    the events processed are checked against it and the report processes all of them"""
+    history = [
+        _make_trade(1609537953, TradeType.BUY, '1', '598.26'),
+        _make_trade(1624395186, TradeType.SELL, '0.5', '1862.06'),
+        _make_trade(1625001464, TradeType.SELL, '0.5', '1837.31'),
+    ]
+    changed_history = [_make_trade(1609537953, TradeType.BUY, '1', '500'), *history[1:]]
+
+    class ChangingHistory:
+        """Reads the original history in the passes before processing"""
+        def __init__(self) -> None:
+            self.passes = 0
+
+        def __iter__(self):
+            self.passes += 1  # first event, checkpoint picking and then processing
+            return iter(history if self.passes <= 2 else changed_history)
+
+    with patch.object(accountant, 'premium', new=MagicMock()):
+        accounting_history_process(accountant, start_ts=Timestamp(1436979735), end_ts=Timestamp(1624395186), history_list=history)  # noqa: E501
+        accountant.process_history(
+            start_ts=Timestamp(1624395187),
+            end_ts=Timestamp(1625001466),
+            events=ChangingHistory(),
+        )
+
+    assert accountant.pots[0].processed_events[0].timestamp == 1609537953
+    assert accountant.pots[0].pnls[AccountingEventType.TRADE].taxable == FVal('668.655')
@@ -117,29 +117,30 @@ def test_exchanges_removed_api_keys(rotkehlchen_api_server_with_exchanges):
     rotki.exchange_manager.delete_exchange(name='coinbase', location=Location.COINBASE)
     _, events = accounting_create_and_process_history(rotki=rotki, start_ts=0, end_ts=1611426233)
     assert len(events) == 7
+    # trades of the same time are ordered by location
     event1 = events[0]
     assert event1.type == AccountingEventType.TRADE
-    assert event1.location == Location.COINBASE
-    assert event1.taxable_amount == FVal(1.5)
-    assert event1.asset == A_BTC
+    assert event1.location == Location.EXTERNAL
+    assert event1.taxable_amount == FVal(7)
+    assert event1.asset == A_USDT
 
     event2 = events[1]
     assert event2.type == AccountingEventType.TRADE
-    assert event2.location == Location.COINBASE
-    assert event2.free_amount == ONE
-    assert event2.asset == A_ETH
+    assert event2.location == Location.EXTERNAL
+    assert event2.free_amount == FVal(49)
+    assert event2.asset == A_LINK
 
     event3 = events[2]
     assert event3.type == AccountingEventType.TRADE
-    assert event3.location == Location.EXTERNAL
-    assert event3.taxable_amount == FVal(7)
-    assert event3.asset == A_USDT
+    assert event3.location == Location.COINBASE
+    assert event3.taxable_amount == FVal(1.5)
+    assert event3.asset == A_BTC
 
     event4 = events[3]
     assert event4.type == AccountingEventType.TRADE
-    assert event4.location == Location.EXTERNAL
-    assert event4.free_amount == FVal(49)
-    assert event4.asset == A_LINK
+    assert event4.location == Location.COINBASE
+    assert event4.free_amount == ONE
+    assert event4.asset == A_ETH
 
     event5 = events[4]
     assert event5.type == AccountingEventType.ASSET_MOVEMENT
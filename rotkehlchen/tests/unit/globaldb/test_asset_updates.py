@@ -469,5 +469,30 @@ def test_asset_update(assets_updater: AssetsUpdater):
     # required are correctly queried.
     warnings = assets_updater.msg_aggregator.consume_warnings()
     assert warnings == [
-        'Skipping assets update 998 since it requires a min schema of 4 and max schema of 4 while the local DB schema version is 5. You will have to follow an alternative method to obtain the assets of this update. Easiest would be to reset global DB.',  # noqa: E501
+        'Skipping assets update 998 since it requires a min schema of 5 and max schema of 5 while the local DB schema version is 6. You will have to follow an alternative method to obtain the assets of this update. Easiest would be to reset global DB.',  # noqa: E501
     ]
+
+
+def test_asset_update_search_trigrams(assets_updater: AssetsUpdater):
+    """Check that an assets update keeps the rowids of the assets and only adds
+    the search trigrams of the assets that it added or changed"""
+    def trigrams(cursor, identifier: str) -> set[str]:
+        return {x[0] for x in cursor.execute(
+            'SELECT trigram FROM asset_search_trigrams WHERE asset_rowid IN '
+            '(SELECT rowid FROM assets WHERE identifier=?)',
+            (identifier,),
+        )}
+
+    GlobalDBHandler().add_setting_value(ASSETS_VERSION_KEY, 997)
+    with GlobalDBHandler().conn.write_ctx() as write_cursor:
+        btc_rowid = write_cursor.execute('SELECT rowid FROM assets WHERE identifier=?', (A_BTC.identifier,)).fetchone()[0]  # noqa: E501
+        # an extra trigram that would be dropped if the trigrams of BTC were recomputed
+        write_cursor.execute('INSERT INTO asset_search_trigrams VALUES("zzz", ?)', (btc_rowid,))  # noqa: E501
+
+    with patch('requests.get', wraps=mock_github_assets_response):
+        assets_updater.perform_update(up_to_version=999, conflicts={})
+
+    with GlobalDBHandler().conn.read_ctx() as cursor:
+        assert cursor.execute('SELECT rowid FROM assets WHERE identifier=?', (A_BTC.identifier,)).fetchone()[0] == btc_rowid  # noqa: E501
+        assert trigrams(cursor, A_BTC.identifier) == {'bit', 'itc', 'tco', 'coi', 'oin', 'btc', 'zzz'}  # noqa: E501
+        assert trigrams(cursor, 'MYBONK') == {'bon', 'onk'}
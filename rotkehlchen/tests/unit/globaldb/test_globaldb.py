@@ -2,9 +2,11 @@ import itertools
 import sqlite3
 from pathlib import Path
 from shutil import copyfile
+from typing import Any
 from uuid import uuid4
 
 import pytest
+from polyleven import levenshtein
 
 from rotkehlchen.assets.asset import Asset, CryptoAsset, CustomAsset, EvmToken, UnderlyingToken
 from rotkehlchen.assets.resolver import AssetResolver
@@ -15,7 +17,8 @@ from rotkehlchen.constants.assets import A_BAT, A_CRV, A_DAI, A_ETH, A_LUSD, A_P
 from rotkehlchen.constants.misc import NFT_DIRECTIVE, ONE
 from rotkehlchen.constants.resolver import ethaddress_to_identifier
 from rotkehlchen.db.custom_assets import DBCustomAssets
-from rotkehlchen.db.filtering import CustomAssetsFilterQuery
+from rotkehlchen.db.filtering import CustomAssetsFilterQuery, LevenshteinFilterQuery
+from rotkehlchen.db.search_assets import search_assets_levenshtein
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.misc import InputError
 from rotkehlchen.exchanges.data_structures import Trade
@@ -25,7 +28,11 @@ from rotkehlchen.globaldb.cache import (
     globaldb_get_general_cache_values,
     globaldb_set_general_cache_values,
 )
-from rotkehlchen.globaldb.handler import GLOBAL_DB_VERSION, GlobalDBHandler
+from rotkehlchen.globaldb.handler import (
+    ALL_ASSETS_TABLES_QUERY,
+    GLOBAL_DB_VERSION,
+    GlobalDBHandler,
+)
 from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.serialization.deserialize import deserialize_asset_amount
 from rotkehlchen.tests.fixtures.globaldb import create_globaldb
@@ -1195,3 +1202,74 @@ def test_get_assets_missing_information_by_symbol(globaldb):
     assets = globaldb.get_assets_with_symbol('BPTTT')
     assert len(assets) == 1
     assert assets[0].name == 'Test token'
+
+
+def test_assets_search_trigrams(globaldb):
+    """Test that the trigrams used to search the assets are kept in sync with the assets
+    as they are added, edited and deleted and that the search finds them through them"""
+    def trigrams(identifier: str) -> set[str]:
+        with globaldb.conn.read_ctx() as cursor:
+            return {x[0] for x in cursor.execute(
+                'SELECT trigram FROM asset_search_trigrams WHERE asset_rowid IN '
+                '(SELECT rowid FROM assets WHERE identifier=?)',
+                (identifier,),
+            )}
+
+    def search(substring: str) -> list[str]:
+        query, bindings = LevenshteinFilterQuery.make(substring_search=substring).prepare('assets')  # noqa: E501
+        with globaldb.conn.read_ctx() as cursor:
+            return [x[0] for x in cursor.execute(ALL_ASSETS_TABLES_QUERY + query, bindings)]
+
+    assert trigrams('ETH') == {'eth', 'the', 'her', 'ere', 'reu', 'eum'}
+    asset_id = str(uuid4())
+    globaldb.add_asset(
+        asset_id=asset_id,
+        asset_type=AssetType.OWN_CHAIN,
+        data={'name': 'Quixotic coin', 'symbol': 'QXQZ'},
+    )
+    assert trigrams(asset_id) == {'qui', 'uix', 'ixo', 'xot', 'oti', 'tic', 'ic ', 'c c', ' co', 'coi', 'oin', 'qxq', 'xqz'}  # noqa: E501
+    assert search('quixotic') == search('QXQZ') == [asset_id]
+
+    globaldb.edit_user_asset({
+        'identifier': asset_id,
+        'asset_type': AssetType.OWN_CHAIN,
+        'name': 'Zanzibar',
+        'symbol': 'ZZ',
+    })
+    assert trigrams(asset_id) == {'zan', 'anz', 'nzi', 'zib', 'iba', 'bar'}
+    assert search('quixotic') == search('qxqz') == []
+    assert search('ZANZIBAR') == [asset_id]
+    assert asset_id in search('zz')  # shorter than a trigram so searched without them
+    assert asset_id in search('zan_i%ar')  # LIKE wildcards are not trigram characters
+    assert asset_id in search('z_n%')
+
+    with globaldb.conn.read_ctx() as cursor:
+        asset_rowid = cursor.execute('SELECT rowid FROM assets WHERE identifier=?', (asset_id,)).fetchone()[0]  # noqa: E501
+    globaldb.delete_asset_by_identifier(asset_id)
+    assert search('zanzibar') == []
+    with globaldb.conn.read_ctx() as cursor:
+        assert cursor.execute('SELECT COUNT(*) FROM asset_search_trigrams WHERE asset_rowid=?', (asset_rowid,)).fetchone()[0] == 0  # noqa: E501
+        plan = cursor.execute(
+            'EXPLAIN QUERY PLAN ' + ALL_ASSETS_TABLES_QUERY + LevenshteinFilterQuery.make(substring_search='bitcoin').prepare('assets')[0],  # noqa: E501
+            LevenshteinFilterQuery.make(substring_search='bitcoin').prepare('assets')[1],
+        ).fetchall()
+        assert not any(x[3].startswith('SCAN assets') for x in plan)
+
+
+@pytest.mark.parametrize('substring', ['bitcoin', 'eth', 'usd coin', 'a'])
+def test_search_assets_levenshtein_limit(database, substring):
+    """Test that limiting the assets search, which stops reading the candidates early,
+    finds assets as close to the searched substring as searching all of them does"""
+    filter_query = LevenshteinFilterQuery.make(substring_search=substring)
+    all_assets = search_assets_levenshtein(database, filter_query, limit=None, search_nfts=False)
+    assert len(all_assets) > 10
+
+    def distances(result: list[dict[str, Any]]) -> list[int]:
+        return [min(
+            levenshtein(substring, x[field].casefold()) if x[field] is not None else 100
+            for field in ('name', 'symbol')
+        ) for x in result]
+
+    limited_assets = search_assets_levenshtein(database, filter_query, limit=10, search_nfts=False)
+    assert distances(limited_assets) == distances(all_assets)[:10]
+    assert distances(all_assets) == sorted(distances(all_assets))
@@ -18,7 +18,7 @@ def test_migration1(globaldb):
     """Test for the 1st globalDB data migration"""
     # Check state before migration
     with globaldb.conn.read_ctx() as cursor:
-        assert globaldb.get_setting_value('version', None) == 5
+        assert globaldb.get_setting_value('version', None) == 6
         assert globaldb.get_setting_value('last_data_migration', None) is None
         assert globaldb.get_setting_value('last_assets_json_version', None) == 72
         assert cursor.execute('SELECT COUNT(*) FROM general_cache WHERE key LIKE "MAKERDAO_VAULT_ILK%"').fetchone()[0] == 0  # noqa: E501
@@ -29,7 +29,7 @@ def test_migration1(globaldb):
 
     # assert state is correct after migration
     with globaldb.conn.read_ctx() as cursor:
-        assert globaldb.get_setting_value('version', None) == 5
+        assert globaldb.get_setting_value('version', None) == 6
         assert globaldb.get_setting_value('last_assets_json_version', None) is None
         assert globaldb.get_setting_value('last_data_migration', None) == 1
         assert cursor.execute('SELECT COUNT(*) FROM general_cache WHERE key LIKE "MAKERDAO_VAULT_ILK%"').fetchone()[0] == 25  # noqa: E501
@@ -40,3 +40,31 @@ def test_migration1(globaldb):
                 (f'MAKERDAO_VAULT_ILK{ilk}',),
             )
             assert json.loads(cursor.fetchone()[0]) == list(info)
+
+
+@pytest.mark.parametrize('globaldb_upgrades', [[]])
+@pytest.mark.parametrize('run_globaldb_migrations', [False])
+def test_migration2(globaldb):
+    """Test that the 2nd globalDB data migration adds the trigrams of the names and
+    symbols of all the existing assets"""
+    with globaldb.conn.write_ctx() as write_cursor:  # the test DB already has them
+        write_cursor.execute('DELETE FROM asset_search_trigrams')
+        assert globaldb.get_setting_value('last_data_migration', None) == 1
+
+    with ExitStack() as stack:
+        patch_for_globaldb_migrations(stack, MIGRATIONS_LIST[:2])
+        maybe_apply_globaldb_migrations(globaldb.conn)
+
+    with globaldb.conn.read_ctx() as cursor:
+        assert globaldb.get_setting_value('last_data_migration', None) == 2
+        assert cursor.execute(
+            'SELECT COUNT(DISTINCT asset_rowid) FROM asset_search_trigrams',
+        ).fetchone()[0] == cursor.execute(
+            'SELECT COUNT(*) FROM assets WHERE length(name) >= 3 OR identifier IN '
+            '(SELECT identifier FROM common_asset_details WHERE length(symbol) >= 3)',
+        ).fetchone()[0]
+        assert cursor.execute(
+            'SELECT trigram FROM asset_search_trigrams WHERE asset_rowid IN '
+            '(SELECT rowid FROM assets WHERE identifier=?) ORDER BY trigram',
+            ('BTC',),
+        ).fetchall() == [('bit',), ('btc',), ('coi',), ('itc',), ('oin',), ('tco',)]
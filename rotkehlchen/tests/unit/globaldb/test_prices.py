@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from rotkehlchen.constants.assets import A_BAL, A_BTC, A_ETH, A_USD
 from rotkehlchen.fval import FVal
 from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
@@ -131,3 +133,65 @@ def test_get_historical_price(globaldb, historical_price_test_data):  # pylint:
         max_seconds_distance=3600,
     )
     assert price_entry is None
+
+
+def test_get_historical_price_with_index(globaldb, historical_price_test_data):  # pylint: disable=unused-argument  # noqa: E501
+    """Test that the in-memory price_history index gives the same results as the DB
+    and that it follows additions and deletions of prices"""
+    queries = [
+        (A_ETH, A_EUR, 1511627623, 3600, None),
+        (A_ETH, A_EUR, 1511627623, 3600, HistoricalPriceOracle.CRYPTOCOMPARE),
+        (A_ETH, A_EUR, 1511627623, 3600, HistoricalPriceOracle.MANUAL),
+        (A_ETH, A_EUR, 1511627623, 10, None),
+        (A_ETH, A_EUR, 1618481099, 3600, None),
+        (A_BTC, A_EUR, 1618481099, 86400, None),
+        (A_BAL, A_EUR, 1618481099, 3600, None),
+        (A_ETH, A_USD, 1618481099, 3600, None),
+    ]
+    expected = [globaldb.get_historical_price(*query) for query in queries]
+    globaldb.enable_price_history_index()
+    try:
+        assert [globaldb.get_historical_price(*query) for query in queries] == expected
+
+        new_price = HistoricalPrice(
+            from_asset=A_ETH,
+            to_asset=A_USD,
+            source=HistoricalPriceOracle.COINGECKO,
+            timestamp=Timestamp(1618481000),
+            price=Price(FVal('2500.5')),
+        )
+        globaldb.add_historical_prices([new_price])
+        assert globaldb.get_historical_price(A_ETH, A_USD, 1618481099, 3600) == new_price
+
+        replaced_price = new_price._replace(price=Price(FVal('2600')))
+        assert globaldb.add_single_historical_price(replaced_price) is True
+        assert globaldb.get_historical_price(A_ETH, A_USD, 1618481099, 3600) == replaced_price
+
+        # prices added to a loaded pair are inserted in order without reloading it
+        older_prices = [
+            new_price._replace(timestamp=Timestamp(1618481000 - x * 7200), price=Price(FVal(x)))
+            for x in (2, 1, 3)
+        ]
+        with patch.object(globaldb._price_history_index, '_load_pair') as load_pair:
+            globaldb.add_historical_prices(older_prices)
+            for older_price in older_prices:
+                assert globaldb.get_historical_price(A_ETH, A_USD, older_price.timestamp + 10, 60) == older_price  # noqa: E501
+            assert globaldb.get_historical_price(A_ETH, A_USD, 1618481099, 3600) == replaced_price  # noqa: E501
+        assert load_pair.call_count == 0
+        assert list(globaldb._price_history_index.pairs[('eth', 'usd')][HistoricalPriceOracle.COINGECKO].timestamps) == sorted(  # noqa: E501
+            [1618481000, *(x.timestamp for x in older_prices)],
+        )
+
+        # invalidating an asset only drops the loaded pairs it's part of
+        globaldb.invalidate_price_history_index(asset_identifiers=[A_BTC.identifier])
+        assert ('btc', 'eur') not in globaldb._price_history_index.pairs
+        assert ('eth', 'usd') in globaldb._price_history_index.pairs
+
+        globaldb.delete_historical_prices(A_ETH, A_USD, HistoricalPriceOracle.COINGECKO)
+        assert globaldb.get_historical_price(A_ETH, A_USD, 1618481099, 3600) is None
+        globaldb.delete_historical_prices(A_ETH, A_EUR)
+        assert globaldb.get_historical_price(A_ETH, A_EUR, 1618481099, 3600) is None
+    finally:
+        globaldb.disable_price_history_index()
+
+    assert globaldb.get_historical_price(A_ETH, A_EUR, 1618481099, 3600) is None
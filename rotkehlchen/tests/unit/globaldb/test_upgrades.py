@@ -382,6 +382,39 @@ def test_upgrade_v4_v5(globaldb):
         assert 'name' not in columns, 'The name column should not be in the contract_data table'
 
 
+def test_upgrade_v5_v6(globaldb):
+    """Test the global DB upgrade from v5 to v6 and that the range queries
+    of a pair's prices use the index it adds"""
+    price_range_query = (
+        'EXPLAIN QUERY PLAN SELECT source_type, timestamp, price FROM price_history '
+        'WHERE from_asset=? AND to_asset=? AND timestamp >= ? AND timestamp <= ? '
+        'ORDER BY timestamp ASC'
+    )
+    with globaldb.conn.write_ctx() as write_cursor:  # bring the packaged DB back to v5
+        write_cursor.execute('DROP INDEX idx_price_history_pair_timestamp')
+        write_cursor.execute('DROP TABLE asset_search_trigrams')
+        write_cursor.execute('UPDATE settings SET value=5 WHERE name="version"')
+
+    maybe_upgrade_globaldb(
+        connection=globaldb.conn,
+        global_dir=globaldb._data_directory / 'global_data',
+        db_filename=GLOBAL_DB_FILENAME,
+    )
+
+    assert globaldb.get_setting_value('version', None) == 6
+    with globaldb.conn.read_ctx() as cursor:
+        assert cursor.execute(
+            'SELECT name FROM sqlite_master WHERE tbl_name="asset_search_trigrams"',
+        ).fetchall() == [
+            ('asset_search_trigrams',),
+            ('sqlite_autoindex_asset_search_trigrams_1',),
+            ('idx_asset_search_trigrams_asset',),
+        ]
+        assert cursor.execute('SELECT COUNT(*) FROM asset_search_trigrams').fetchone()[0] == 0
+        plan = cursor.execute(price_range_query, ('ETH', 'USD', 1, 2)).fetchall()
+        assert 'idx_price_history_pair_timestamp' in plan[0][3]
+
+
 @pytest.mark.parametrize('custom_globaldb', ['v2_global.db'])
 @pytest.mark.parametrize('target_globaldb_version', [2])
 @pytest.mark.parametrize('reload_user_assets', [False])
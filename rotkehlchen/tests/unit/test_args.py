@@ -1,7 +1,11 @@
 import pytest
 
 from rotkehlchen.args import app_args
-from rotkehlchen.constants.misc import DEFAULT_SQL_VM_INSTRUCTIONS_CB
+from rotkehlchen.constants.misc import (
+    DEFAULT_EXCHANGES_QUERY_CONCURRENCY,
+    DEFAULT_SQL_READ_CONNECTIONS,
+    DEFAULT_SQL_VM_INSTRUCTIONS_CB,
+)
 
 
 @pytest.fixture(name='argparser')
@@ -28,3 +32,23 @@ def test_arg_sql_vm_instructions_cb(argparser):
     assert args.sqlite_instructions == 200
     args = argparser.parse_args(['--sqlite-instructions', '0'])
     assert args.sqlite_instructions == 0
+
+
+def test_arg_sqlite_read_connections(argparser):
+    with pytest.raises(SystemExit):
+        argparser.parse_args(['--sqlite-read-connections', '-1'])
+
+    args = argparser.parse_args(['--data-dir', 'foo'])
+    assert args.sqlite_read_connections == DEFAULT_SQL_READ_CONNECTIONS
+    args = argparser.parse_args(['--sqlite-read-connections', '4'])
+    assert args.sqlite_read_connections == 4
+
+
+def test_arg_exchanges_query_concurrency(argparser):
+    with pytest.raises(SystemExit):
+        argparser.parse_args(['--exchanges-query-concurrency', '0'])
+
+    args = argparser.parse_args(['--data-dir', 'foo'])
+    assert args.exchanges_query_concurrency == DEFAULT_EXCHANGES_QUERY_CONCURRENCY
+    args = argparser.parse_args(['--exchanges-query-concurrency', '1'])
+    assert args.exchanges_query_concurrency == 1
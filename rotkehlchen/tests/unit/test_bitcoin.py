@@ -4,7 +4,12 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from rotkehlchen.chain.bitcoin import get_bitcoin_addresses_balances
+from rotkehlchen.chain.bitcoin import (
+    ADDRESS_ACTIVITY_CACHE_TTL,
+    btc_activity_cache,
+    get_bitcoin_addresses_balances,
+    have_bitcoin_transactions,
+)
 from rotkehlchen.chain.bitcoin.hdkey import HDKey, XpubType
 from rotkehlchen.chain.bitcoin.utils import (
     WitnessVersion,
@@ -16,8 +21,9 @@ from rotkehlchen.chain.bitcoin.utils import (
     scriptpubkey_to_p2pkh_address,
     scriptpubkey_to_p2sh_address,
 )
-from rotkehlchen.chain.bitcoin.xpub import XpubData
+from rotkehlchen.chain.bitcoin.xpub import XpubData, _derive_addresses_from_xpub_data
 from rotkehlchen.chain.constants import NON_BITCOIN_CHAINS, SupportedBlockchain
+from rotkehlchen.constants import ZERO
 from rotkehlchen.errors.misc import RemoteError, XPUBError
 from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.ens import ENS_BRUNO_BTC_ADDR, ENS_BRUNO_BTC_BYTES
@@ -28,6 +34,7 @@ from rotkehlchen.tests.utils.factories import (
 )
 from rotkehlchen.tests.utils.mock import MockResponse
 from rotkehlchen.types import BTCAddress
+from rotkehlchen.utils.misc import ts_now
 
 
 def test_is_valid_btc_address():
@@ -232,6 +239,125 @@ def test_xpub_to_addresses():
     assert child.address() == 'bc1p3qkhfews2uk44qtvauqyr2ttdsw7svhkl9nkm9s9c3x4ax5h60wqwruhk7'
 
 
+def test_derive_children():
+    """Test that batch derivation gives the same children as deriving them one by one"""
+    xpub = 'zpub6quTRdxqWmerHdiWVKZdLMp9FY641F1F171gfT2RS4D1FyHnutwFSMiab58Nbsdu4fXBaFwpy5xyGnKZ8d6xn2j4r4yNmQ3Yp3yDDxQUo3q'  # noqa: E501
+    receiving = HDKey.from_xpub(xpub=xpub, path='m').derive_child(0)
+    children = receiving.derive_children(start=2, end=5)
+    assert [x.index for x in children] == [2, 3, 4]
+    assert [x.address() for x in children] == [
+        'bc1qup7f8g5k3h5uqzfjed03ztgn8hhe542w69wc0g',
+        'bc1qr4r8vryfzexvhjrx5fh5uj0s2ead8awpqspqra',
+        'bc1qm2cy0wg6qej4taaywtfx9ccw02zep08r5295gj',
+    ]
+    for child in children:
+        assert child == receiving.derive_child(child.index)
+        assert child.path == f'm/0/{child.index}'
+        assert child.depth == receiving.depth + 1
+        assert child.parent_fingerprint == receiving.fingerprint
+        assert child.xpub is None
+
+    assert receiving.derive_children(start=3, end=3) == []
+    with pytest.raises(XPUBError):
+        receiving.derive_children(start=0, end=2**31 + 1)
+    for hardened_index in (2**31, "1'", '2h'):
+        with pytest.raises(XPUBError):
+            receiving.derive_child(hardened_index)
+
+
+def test_derive_addresses_uses_cache():
+    """Test that the already derived addresses are not derived again"""
+    xpub = 'xpub68V4ZQQ62mea7ZUKn2urQu47Bdn2Wr7SxrBxBDDwE3kjytj361YBGSKDT4WoBrE5htrSB8eAMe59NPnKrcAbiv2veN5GQUmfdjRddD1Hxrk'  # noqa: E501
+    xpub_data = XpubData(xpub=HDKey.from_xpub(xpub=xpub, path='m'), blockchain=SupportedBlockchain.BITCOIN)  # noqa: E501
+    used_address = '1K3WM7WNiyZCkH31eMoEDwEcmnGNvQfZVA'  # receiving address at index 0
+
+    def mock_have_transactions(accounts):
+        return {x: (x == used_address, FVal(1 if x == used_address else 0)) for x in accounts}
+
+    derived_addresses: dict = {}
+    with (
+        patch('rotkehlchen.chain.bitcoin.xpub.have_bitcoin_transactions', side_effect=mock_have_transactions) as have_transactions,  # noqa: E501
+        patch.object(HDKey, 'derive_children', autospec=True, side_effect=HDKey.derive_children) as derive_children,  # noqa: E501
+    ):
+        for _ in range(2):
+            result = _derive_addresses_from_xpub_data(
+                xpub_data=xpub_data,
+                start_receiving_index=0,
+                start_change_index=0,
+                gap_limit=3,
+                derived_addresses=derived_addresses,
+            )
+            assert [(x.account_index, x.derived_index, x.address) for x in result] == [
+                (0, 0, used_address),
+            ]
+
+    # the next receiving batch is checked since the first one has transactions, but the
+    # change addresses stop at the first batch. Only the first scan derived them
+    assert set(derived_addresses) == {(0, x) for x in range(6)} | {(1, x) for x in range(3)}
+    assert derived_addresses[(0, 1)] == '1L5ic1V3bTJahEdwjufGJ28PjRcMcHWGka'
+    assert len([x for x in derive_children.call_args_list if x.kwargs['end'] - x.kwargs['start'] == 3]) == 3  # noqa: E501
+    assert have_transactions.call_count == 6  # 3 batches per scan
+
+
+def test_have_bitcoin_transactions_split_between_apis():
+    """Test that bc1 addresses are checked concurrently from blockstream and mempool,
+    that the result is cached and that the addresses of a failing api use the other one"""
+    addresses = [
+        BTCAddress('bc1qc3qcxs025ka9l6qn0q5cyvmnpwrqw2z49qwrx5'),
+        BTCAddress('bc1qnus7355ecckmeyrmvv56mlm42lxvwa4wuq5aev'),
+        BTCAddress('bc1qup7f8g5k3h5uqzfjed03ztgn8hhe542w69wc0g'),
+        BTCAddress('bc1qr4r8vryfzexvhjrx5fh5uj0s2ead8awpqspqra'),
+        BTCAddress('bc1qm2cy0wg6qej4taaywtfx9ccw02zep08r5295gj'),
+    ]
+    queried_urls = []
+    failing_apis, broken_apis = [], []
+
+    def mock_request_get_dict(url, **kwargs):  # pylint: disable=unused-argument
+        queried_urls.append(url)
+        if any(api in url for api in failing_apis):
+            raise RemoteError('Got 429')
+        if any(api in url for api in broken_apis):
+            raise TypeError('unexpected failure')
+        tx_count = 1 if url.endswith(addresses[0]) else 0
+        return {'chain_stats': {'funded_txo_sum': tx_count * 200000000, 'spent_txo_sum': 0, 'tx_count': tx_count}}  # noqa: E501
+
+    expected_transactions = {x: (False, ZERO) for x in addresses[1:]}
+    expected_transactions[addresses[0]] = (True, FVal(2))
+    with patch('rotkehlchen.chain.bitcoin.request_get_dict', side_effect=mock_request_get_dict):
+        assert have_bitcoin_transactions(addresses) == expected_transactions
+        assert len(queried_urls) == 5
+        assert {x.split('/')[2] for x in queried_urls} == {'blockstream.info', 'mempool.space'}
+
+        # within the TTL the checked addresses are not queried again, not even for balances
+        queried_urls.clear()
+        assert have_bitcoin_transactions(addresses) == expected_transactions
+        assert get_bitcoin_addresses_balances(addresses) == {
+            address: balance for address, (_, balance) in expected_transactions.items()
+        }
+        assert queried_urls == []
+
+        failing_apis.append('mempool.space')
+        with patch('rotkehlchen.chain.bitcoin.ts_now', return_value=ts_now() + ADDRESS_ACTIVITY_CACHE_TTL):  # noqa: E501
+            assert have_bitcoin_transactions(addresses) == expected_transactions
+        assert {x.rsplit('/', 1)[1] for x in queried_urls if 'blockstream.info' in x} == set(addresses)  # noqa: E501
+
+        # refreshes that ignore the cache query the balances again
+        queried_urls.clear()
+        failing_apis.clear()
+        assert get_bitcoin_addresses_balances(addresses, ignore_cache=True) == {
+            address: balance for address, (_, balance) in expected_transactions.items()
+        }
+        assert len(queried_urls) == 5
+
+        # the accounts of an api that fails with an unexpected error are not retried
+        queried_urls.clear()
+        btc_activity_cache.clear()
+        broken_apis.append('mempool.space')
+        with pytest.raises(TypeError):
+            have_bitcoin_transactions(addresses)
+        assert {x.rsplit('/', 1)[1] for x in queried_urls if 'blockstream.info' in x} == set(addresses[::2])  # noqa: E501
+
+
 def test_ypub_to_addresses():
     """Test vectors from here: https://iancoleman.io/bip39/"""
     xpub = 'ypub6WkRUvNhspMCJLiLgeP7oL1pzrJ6wA2tpwsKtXnbmpdAGmHHcC6FeZeF4VurGU14dSjGpF2xLavPhgvCQeXd6JxYgSfbaD1wSUi2XmEsx33'  # noqa: E501
@@ -1,6 +1,12 @@
+from unittest.mock import patch
+
 import pytest
 from marshmallow import ValidationError
 
+from rotkehlchen.chain.bitcoin.bch import (
+    get_bitcoin_cash_addresses_balances,
+    have_bch_transactions,
+)
 from rotkehlchen.chain.bitcoin.bch.utils import (
     cash_to_legacy_address,
     force_address_to_legacy_address,
@@ -9,6 +15,8 @@ from rotkehlchen.chain.bitcoin.bch.utils import (
     legacy_to_cash_address,
     validate_bch_address_input,
 )
+from rotkehlchen.fval import FVal
+from rotkehlchen.types import BTCAddress
 
 
 def test_is_valid_bitcoin_cash_address():
@@ -82,3 +90,38 @@ def test_validate_bch_address_input():
     with pytest.raises(ValidationError) as exc_info:
         validate_bch_address_input('ababkjk', empty_set)
     assert 'not a valid bitcoin cash address' in str(exc_info)
+
+
+def test_have_bch_transactions_chunks_and_cache():
+    """Test that the haskoin queries of many addresses are chunked, and that the checked
+    addresses are not queried again for their transactions or balances"""
+    addresses = [BTCAddress(f'address{x}') for x in range(100)]
+    queried_urls = []
+
+    def mock_request_get_dict(url, **kwargs):  # pylint: disable=unused-argument
+        queried_urls.append(url)
+        chunk = url.split('active=')[1].split('|')
+        return {'addresses': [
+            {'address': x, 'n_tx': 1 if x == addresses[0] else 0, 'final_balance': 100000000}
+            for x in chunk
+        ]}
+
+    with patch('rotkehlchen.chain.bitcoin.bch.request_get_dict', side_effect=mock_request_get_dict):  # noqa: E501
+        have_transactions = have_bch_transactions(addresses)
+        assert len(queried_urls) == 2
+        assert len(have_transactions) == 100
+        assert have_transactions[addresses[0]] == (True, FVal(1))
+        assert have_transactions[addresses[1]] == (False, FVal(1))
+
+        queried_urls.clear()
+        assert have_bch_transactions(addresses) == have_transactions
+        with patch('rotkehlchen.chain.bitcoin.bch.request_get') as request_get:
+            balances = get_bitcoin_cash_addresses_balances(addresses)
+        assert request_get.call_count == 0
+        assert queried_urls == []
+        assert balances == {x: FVal(1) for x in addresses}
+
+        # refreshes that ignore the cache query the balances again
+        with patch('rotkehlchen.chain.bitcoin.bch._query_chunks_concurrently', return_value={}) as query_chunks:  # noqa: E501
+            get_bitcoin_cash_addresses_balances(addresses, ignore_cache=True)
+        assert query_chunks.call_args.args[0] == addresses
@@ -1,15 +1,24 @@
-from unittest.mock import patch
+import json
+from unittest.mock import MagicMock, patch
 
+import gevent
 import pytest
+from web3 import HTTPProvider, Web3
+from web3.exceptions import TransactionNotFound
 
 from rotkehlchen.chain.accounts import BlockchainAccountData
 from rotkehlchen.chain.ethereum.constants import ETHEREUM_ETHERSCAN_NODE_NAME
 from rotkehlchen.chain.evm.constants import ZERO_ADDRESS
 from rotkehlchen.chain.evm.decoding.constants import ERC20_OR_ERC721_TRANSFER
+from rotkehlchen.chain.evm.node_inquirer import (
+    MAX_IN_FLIGHT_REQUESTS_PER_NODE,
+    _query_web3_get_logs,
+)
 from rotkehlchen.chain.evm.structures import EvmTxReceipt, EvmTxReceiptLog
-from rotkehlchen.chain.evm.types import string_to_evm_address
+from rotkehlchen.chain.evm.types import NodeName, Web3Node, WeightedNode, string_to_evm_address
+from rotkehlchen.constants import ONE
 from rotkehlchen.db.evmtx import DBEvmTx
-from rotkehlchen.errors.misc import EventNotInABI
+from rotkehlchen.errors.misc import EventNotInABI, RemoteError
 from rotkehlchen.tests.utils.checks import assert_serialized_dicts_equal
 from rotkehlchen.tests.utils.ethereum import (
     ETHEREUM_FULL_TEST_PARAMETERS,
@@ -17,7 +26,8 @@ from rotkehlchen.tests.utils.ethereum import (
     ETHEREUM_TEST_PARAMETERS,
     wait_until_all_nodes_connected,
 )
-from rotkehlchen.tests.utils.factories import make_evm_address
+from rotkehlchen.tests.utils.factories import make_evm_address, make_evm_tx_hash
+from rotkehlchen.tests.utils.mock import MockResponse
 from rotkehlchen.types import ChainID, EvmTransaction, SupportedBlockchain, deserialize_evm_tx_hash
 from rotkehlchen.utils.hexbytes import hexstring_to_bytes
 
@@ -429,3 +439,218 @@ def test_get_contract_deployed_block(ethereum_inquirer):
     """
     assert ethereum_inquirer.get_contract_deployed_block('0x5a464C28D19848f44199D003BeF5ecc87d090F87') == 12251871  # noqa: E501
     assert ethereum_inquirer.get_contract_deployed_block('0x9531C059098e3d194fF87FebB587aB07B30B1306') is None  # noqa: E501
+
+
+def test_get_transaction_receipts_batch(ethereum_inquirer):
+    """Test that the receipts are queried with a single JSON-RPC batch request, that the nodes
+    that don't support batch requests are queried one by one, that busy nodes are skipped and
+    that the receipts a node doesn't know of are queried from the next nodes"""
+    tx_hashes = [make_evm_tx_hash() for _ in range(3)]
+    batch_node, single_node, broken_node = (
+        NodeName(name=name, endpoint=f'http://{name}', owned=False, blockchain=SupportedBlockchain.ETHEREUM)  # noqa: E501
+        for name in ('batch', 'single', 'broken')
+    )
+    for node in (batch_node, single_node, broken_node):
+        ethereum_inquirer.web3_mapping[node] = Web3Node(
+            web3_instance=Web3(HTTPProvider(node.endpoint)),
+            is_pruned=False,
+            is_archive=True,
+        )
+
+    def raw_receipt(tx_hash):
+        return {
+            'transactionHash': tx_hash.hex(),
+            'blockNumber': '0xa56c8a',
+            'cumulativeGasUsed': '0x7a120',
+            'gasUsed': '0x5208',
+            'status': '0x1',
+            'transactionIndex': '0x6e',
+            'contractAddress': None,
+            'type': '0x2',
+            'logs': [{'logIndex': '0xeb', 'removed': False, 'data': '0x', 'topics': []}],
+        }
+
+    posted_requests = []
+
+    def mock_post(endpoint_uri, **kwargs):
+        request = kwargs['json']
+        posted_requests.append((endpoint_uri, request))
+        if endpoint_uri == single_node.endpoint:
+            response = {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32600, 'message': 'batch requests are not supported'}}  # noqa: E501
+        elif endpoint_uri == broken_node.endpoint:
+            response = {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32000, 'message': 'header not found'}}  # noqa: E501
+        else:  # the node knows of all but the last transaction
+            response = [
+                {'jsonrpc': '2.0', 'id': entry['id'], 'result': raw_receipt(tx_hashes[entry['id']]) if entry['id'] != 2 else None}  # noqa: E501
+                for entry in reversed(request)
+            ]
+        return MockResponse(200, json.dumps(response))
+
+    single_queried_hashes = []
+
+    def mock_single_receipt(web3, tx_hash):  # pylint: disable=unused-argument
+        single_queried_hashes.append(tx_hash)
+        if tx_hash == tx_hashes[2]:
+            raise TransactionNotFound('not found')
+        return raw_receipt(tx_hash)
+
+    batch_weighted_node, single_weighted_node, broken_weighted_node = (
+        WeightedNode(node_info=node, active=True, weight=ONE)
+        for node in (batch_node, single_node, broken_node)
+    )
+    with (
+        patch.object(ethereum_inquirer.session, 'post', side_effect=mock_post),
+        patch.object(ethereum_inquirer, '_get_transaction_receipt', side_effect=mock_single_receipt),  # noqa: E501
+    ):
+        receipts = ethereum_inquirer.get_transaction_receipts(tx_hashes, call_order=[batch_weighted_node])  # noqa: E501
+        assert len(posted_requests) == 1
+        assert [x['params'] for x in posted_requests[0][1]] == [[x.hex()] for x in tx_hashes]
+        assert [x['transactionHash'] if x else None for x in receipts] == [tx_hashes[0].hex(), tx_hashes[1].hex(), None]  # noqa: E501
+        assert receipts[0]['blockNumber'] == receipts[0]['logs'][0]['blockNumber'] == 10841226
+        assert receipts[0]['status'] == 1
+        assert receipts[0]['logs'][0]['logIndex'] == 235
+
+        # a node that can't answer batch requests is queried one receipt at a time
+        for _ in range(2):
+            receipts = ethereum_inquirer.get_transaction_receipts(tx_hashes, call_order=[single_weighted_node])  # noqa: E501
+            assert [x['transactionHash'] if x else None for x in receipts] == [tx_hashes[0].hex(), tx_hashes[1].hex(), None]  # noqa: E501
+        assert single_node in ethereum_inquirer.nodes_without_batch_requests
+        assert len(posted_requests) == 2  # only the first query tried a batch request
+
+        # a busy node is skipped for a free one
+        busy_semaphore = ethereum_inquirer.node_request_semaphores[single_node]
+        for _ in range(MAX_IN_FLIGHT_REQUESTS_PER_NODE):
+            busy_semaphore.acquire()
+        receipts = ethereum_inquirer.get_transaction_receipts(tx_hashes[:2], call_order=[single_weighted_node, batch_weighted_node])  # noqa: E501
+        assert [x['transactionHash'] for x in receipts] == [tx_hashes[0].hex(), tx_hashes[1].hex()]  # noqa: E501
+        assert len(posted_requests) == 3
+        assert posted_requests[2][0] == batch_node.endpoint
+        for _ in range(MAX_IN_FLIGHT_REQUESTS_PER_NODE):
+            busy_semaphore.release()
+
+        # a node that replies with any other error fails the query but keeps batch requests
+        receipts = ethereum_inquirer.get_transaction_receipts(tx_hashes[:2], call_order=[broken_weighted_node, batch_weighted_node])  # noqa: E501
+        assert [x['transactionHash'] for x in receipts] == [tx_hashes[0].hex(), tx_hashes[1].hex()]  # noqa: E501
+        assert broken_node not in ethereum_inquirer.nodes_without_batch_requests
+        assert [x[0] for x in posted_requests[3:]] == [broken_node.endpoint, batch_node.endpoint]
+
+        # the receipts a node doesn't know of are queried from the next node
+        single_queried_hashes.clear()
+        receipts = ethereum_inquirer.get_transaction_receipts(tx_hashes, call_order=[batch_weighted_node, single_weighted_node])  # noqa: E501
+        assert [x['transactionHash'] if x else None for x in receipts] == [tx_hashes[0].hex(), tx_hashes[1].hex(), None]  # noqa: E501
+        assert single_queried_hashes == [tx_hashes[2]]
+
+
+def test_query_web3_get_logs_adaptive_block_range():
+    """Test that the block range of the log queries grows while the results are sparse and
+    shrinks when the node can't answer for the range"""
+    queried_ranges = []
+
+    def mock_get_logs(filter_args):
+        from_block, to_block = filter_args['fromBlock'], filter_args['toBlock']
+        queried_ranges.append((from_block, to_block))
+        if to_block - from_block > 300:
+            raise ValueError("{'code': -32005, 'message': 'query returned more than 10000 results'}")  # noqa: E501
+        return []
+
+    web3 = MagicMock()
+    web3.eth.get_logs.side_effect = mock_get_logs
+    events = _query_web3_get_logs(
+        web3=web3,
+        filter_args={},
+        from_block=0,
+        to_block=1500,
+        contract_address=make_evm_address(),
+        event_name='Transfer',
+        argument_filters={},
+        initial_block_range=100,
+    )
+    assert events == []
+    assert queried_ranges == [
+        (0, 100),
+        (101, 301),  # grows after the sparse results
+        (302, 702),  # too many results so it's halved and doesn't grow back
+        (302, 502),
+        (503, 703),
+        (704, 904),
+        (905, 1105),
+        (1106, 1306),
+        (1307, 1500),
+    ]
+
+
+def test_get_logs_splits_block_range_between_nodes(ethereum_inquirer):
+    """Test that the log queries are split in disjoint block ranges, one for each node that
+    can query past data, and that the results are merged in order"""
+    nodes = [
+        NodeName(name=name, endpoint=f'http://{name}', owned=False, blockchain=SupportedBlockchain.ETHEREUM)  # noqa: E501
+        for name in ('first', 'second', 'pruned')
+    ]
+    for node in nodes:
+        ethereum_inquirer.web3_mapping[node] = Web3Node(
+            web3_instance=Web3(HTTPProvider(node.endpoint)),
+            is_pruned=node.name == 'pruned',
+            is_archive=True,
+        )
+    call_order = [WeightedNode(node_info=node, active=True, weight=ONE) for node in nodes]
+    queried_ranges = []
+
+    def mock_get_logs(web3, from_block, to_block, **kwargs):  # pylint: disable=unused-argument
+        queried_ranges.append((web3.manager.provider.endpoint_uri, from_block, to_block))
+        return [{'blockNumber': from_block}, {'blockNumber': to_block}]
+
+    with patch.object(ethereum_inquirer, '_get_logs', side_effect=mock_get_logs) as patched:
+        patched.__name__ = '_get_logs'
+        events = ethereum_inquirer.get_logs(
+            contract_address=make_evm_address(),
+            abi=[],
+            event_name='Transfer',
+            argument_filters={},
+            from_block=1000000,
+            to_block=2000000,
+            call_order=call_order,
+        )
+        assert sorted(queried_ranges) == [
+            ('http://first', 1000000, 1500000),
+            ('http://second', 1500001, 2000000),
+        ]
+        assert [x['blockNumber'] for x in events] == [1000000, 1500000, 1500001, 2000000]
+
+        # ranges too small to be split are queried by the first node
+        queried_ranges.clear()
+        ethereum_inquirer.get_logs(
+            contract_address=make_evm_address(),
+            abi=[],
+            event_name='Transfer',
+            argument_filters={},
+            from_block=1000000,
+            to_block=1100000,
+            call_order=call_order,
+        )
+        assert queried_ranges == [('http://first', 1000000, 1100000)]
+
+        # when a part of the range fails the queries of the other parts are stopped
+        stopped_queries = []
+
+        def mock_failing_get_logs(web3, from_block, to_block, **kwargs):  # pylint: disable=unused-argument  # noqa: E501
+            if from_block == 1000000:
+                raise RemoteError('node is down')
+            try:
+                gevent.sleep(10)
+            except gevent.GreenletExit:
+                stopped_queries.append((web3.manager.provider.endpoint_uri, from_block, to_block))
+                raise
+            return []
+
+        patched.side_effect = mock_failing_get_logs
+        with pytest.raises(RemoteError):
+            ethereum_inquirer.get_logs(
+                contract_address=make_evm_address(),
+                abi=[],
+                event_name='Transfer',
+                argument_filters={},
+                from_block=1000000,
+                to_block=2000000,
+                call_order=call_order,
+            )
+        assert stopped_queries == [('http://second', 1500001, 2000000)]
@@ -1,9 +1,17 @@
 from unittest.mock import patch
+
+import gevent
+
+from rotkehlchen.chain.accounts import BlockchainAccountData
 from rotkehlchen.chain.ethereum.transactions import EthereumTransactions
+from rotkehlchen.chain.evm.structures import EvmTxReceipt
 from rotkehlchen.chain.evm.types import EvmAccount
+from rotkehlchen.db.dbhandler import DBHandler
+from rotkehlchen.db.evmtx import DBEvmTx
 from rotkehlchen.db.filtering import EvmTransactionsFilterQuery
-from rotkehlchen.tests.utils.factories import make_evm_address
-from rotkehlchen.types import ChainID
+from rotkehlchen.tests.utils.ethereum import txreceipt_to_data
+from rotkehlchen.tests.utils.factories import make_evm_address, make_evm_tx_hash
+from rotkehlchen.types import ChainID, EvmTransaction, SupportedBlockchain, Timestamp
 
 ADDR_1, ADDR_2, ADDR_3 = make_evm_address(), make_evm_address(), make_evm_address()
 
@@ -35,3 +43,59 @@ def test_query_transactions_single_chain(eth_transactions: 'EthereumTransactions
         ))
 
     assert queried_addresses == [ADDR_2, ADDR_3]
+
+
+def test_get_receipts_for_transactions_missing_them(
+        database: DBHandler,
+        eth_transactions: EthereumTransactions,
+):
+    """Test that the missing receipts are queried in concurrent batches and written
+    to the DB as each batch arrives"""
+    transactions = [EvmTransaction(
+        tx_hash=make_evm_tx_hash(),
+        chain_id=ChainID.ETHEREUM,
+        timestamp=Timestamp(1451606400 + idx),
+        block_number=idx,
+        from_address=ADDR_1,
+        to_address=ADDR_2,
+        value=1,
+        gas=21000,
+        gas_price=1,
+        gas_used=21000,
+        input_data=b'',
+        nonce=idx,
+    ) for idx in range(5)]
+    dbevmtx = DBEvmTx(database)
+    with database.user_write() as write_cursor:
+        database.add_blockchain_accounts(
+            write_cursor=write_cursor,
+            account_data=[BlockchainAccountData(chain=SupportedBlockchain.ETHEREUM, address=ADDR_1)],  # noqa: E501
+        )
+        dbevmtx.add_evm_transactions(write_cursor, transactions, relevant_address=ADDR_1)
+
+    unknown_tx_hash = transactions[3].tx_hash
+    queried_batches = []
+
+    def mock_get_transaction_receipts(tx_hashes):
+        queried_batches.append(tx_hashes)
+        gevent.sleep(0.1)  # simulate waiting for the node
+        return [None if x == unknown_tx_hash else txreceipt_to_data(EvmTxReceipt(
+            tx_hash=x,
+            chain_id=ChainID.ETHEREUM,
+            contract_address=None,
+            status=True,
+            type=0,
+            logs=[],
+        )) for x in tx_hashes]
+
+    with (
+        patch('rotkehlchen.chain.evm.transactions.RECEIPTS_BATCH_SIZE', 2),
+        patch.object(eth_transactions.evm_inquirer, 'get_transaction_receipts', side_effect=mock_get_transaction_receipts),  # noqa: E501
+    ):
+        eth_transactions.get_receipts_for_transactions_missing_them()
+
+    assert sorted(len(x) for x in queried_batches) == [1, 2, 2]
+    assert dbevmtx.get_transaction_hashes_no_receipt(tx_filter_query=None, limit=None) == [unknown_tx_hash]  # noqa: E501
+    warnings = database.msg_aggregator.consume_warnings()
+    assert len(warnings) == 1
+    assert unknown_tx_hash.hex() in warnings[0]
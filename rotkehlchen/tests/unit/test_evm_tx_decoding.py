@@ -1,5 +1,5 @@
 from typing import TYPE_CHECKING
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -12,13 +12,21 @@ from rotkehlchen.accounting.structures.base import (
 from rotkehlchen.accounting.structures.evm_event import EvmEvent
 from rotkehlchen.chain.ethereum.decoding.decoder import EthereumTransactionDecoder
 from rotkehlchen.chain.evm.constants import GENESIS_HASH
-from rotkehlchen.chain.evm.decoding.constants import CPT_GAS
+from rotkehlchen.chain.evm.decoding.constants import (
+    CPT_GAS,
+    ERC20_APPROVE,
+    ERC20_OR_ERC721_TRANSFER,
+)
+from rotkehlchen.chain.evm.decoding.structures import DEFAULT_DECODING_OUTPUT
+from rotkehlchen.chain.evm.decoding.utils import RULE_TOPICS_ATTRIBUTE
+from rotkehlchen.chain.evm.structures import EvmTxReceiptLog
 from rotkehlchen.chain.evm.types import EvmAccount, string_to_evm_address
 from rotkehlchen.constants.assets import A_ETH, A_SAI
 from rotkehlchen.db.evmtx import DBEvmTx
 from rotkehlchen.db.filtering import EvmEventFilterQuery, EvmTransactionsFilterQuery
 from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.types import (
     ChainID,
     ChecksumEvmAddress,
@@ -169,6 +177,156 @@ def test_tx_decode(ethereum_transaction_decoder, database):
         assert decode_mock.call_count == len(transactions)
 
 
+@pytest.mark.parametrize('use_custom_database', ['ethtxs.db'])
+def test_decode_transaction_hashes_in_chunks(ethereum_transaction_decoder, database):
+    """Test that decoding multiple transaction hashes in chunks gives the same events
+    as decoding them one by one and that decoded transactions are read from the DB"""
+    dbevmtx = DBEvmTx(database)
+    decoder = ethereum_transaction_decoder
+    tx_hashes = [deserialize_evm_tx_hash(x) for x in (
+        '0x5cc0e6e62753551313412492296d5e57bea0a9d1ce507cc96aa4aa076c5bde7a',
+        '0x04584521722c814ff3034cbd3e78dcde2653ba3f6ec3c7f24a28f7004525d9fc',
+        '0x07ac09cc06c7cd74c7312f3a82c9f77d69ba7a89a4a3b7ded33db07e32c3607c',
+        '0x0937f52a752133455a063cd2a2daaff54c647dc5a89a26ecdf9ff8b071bd4340',
+        '0x1eb5fc68f7f39188b731b54fbe1b26b64fd930aebc792372566c43f5e705af4c',
+    )]
+    with database.conn.read_ctx() as cursor:
+        receipts = dbevmtx.get_receipts(cursor, tx_hashes, ChainID.ETHEREUM)
+        for tx_hash in tx_hashes:  # bulk reading gives the same receipts
+            assert receipts[tx_hash] == dbevmtx.get_receipt(cursor, tx_hash, ChainID.ETHEREUM)
+
+    with (
+        patch('rotkehlchen.chain.evm.decoding.decoder.DECODING_CHUNK_SIZE', 2),
+        patch.object(decoder, '_decode_transaction_events', wraps=decoder._decode_transaction_events) as decode_mock,  # noqa: E501
+    ):
+        events = decoder.decode_transaction_hashes(ignore_cache=False, tx_hashes=tx_hashes)
+        assert decode_mock.call_count == len(tx_hashes)
+        # now all are decoded so the events should come from the DB
+        db_events = decoder.decode_transaction_hashes(ignore_cache=False, tx_hashes=tx_hashes)
+        assert decode_mock.call_count == len(tx_hashes)
+        # and redecoding should give the same events again
+        redecoded_events = decoder.decode_transaction_hashes(ignore_cache=True, tx_hashes=tx_hashes)  # noqa: E501
+        assert decode_mock.call_count == 2 * len(tx_hashes)
+        # repeated hashes, in the same or another chunk, are only decoded once
+        repeated_events = decoder.decode_transaction_hashes(
+            ignore_cache=True,
+            tx_hashes=[tx_hashes[0], tx_hashes[0], *tx_hashes, tx_hashes[1]],
+        )
+        assert decode_mock.call_count == 3 * len(tx_hashes)
+        assert len(repeated_events) == len(events)
+
+    assert len(events) == len(db_events) == len(redecoded_events)
+    for event, db_event, redecoded_event in zip(events, db_events, redecoded_events):
+        assert_events_equal(event, db_event)
+        assert_events_equal(event, redecoded_event)
+
+    for tx_hash in tx_hashes:  # and the results are the same as decoding one by one
+        with database.conn.read_ctx() as cursor:
+            transaction = dbevmtx.get_evm_transactions(
+                cursor=cursor,
+                filter_=EvmTransactionsFilterQuery.make(tx_hash=tx_hash, chain_id=ChainID.ETHEREUM),  # noqa: E501
+                has_premium=True,
+            )[0]
+        single_events, _ = decoder._decode_transaction_events(transaction, receipts[tx_hash])
+        tx_events = [x for x in events if x.tx_hash == tx_hash]
+        assert len(single_events) == len(tx_events)
+        for event, single_event in zip(tx_events, sorted(single_events, key=lambda x: x.sequence_index)):  # noqa: E501
+            assert_events_equal(event, single_event)
+
+
+@pytest.mark.parametrize('use_custom_database', ['ethtxs.db'])
+def test_decoding_session_caches_tokens(ethereum_transaction_decoder, database):
+    """Test that during a decoding session the token of each log address is looked up
+    only once, including addresses that are not tokens, and that the cache is dropped
+    when tokens are modified"""
+    decoder = ethereum_transaction_decoder
+    tx_hashes = [deserialize_evm_tx_hash(x) for x in (
+        '0x5cc0e6e62753551313412492296d5e57bea0a9d1ce507cc96aa4aa076c5bde7a',
+        '0x04584521722c814ff3034cbd3e78dcde2653ba3f6ec3c7f24a28f7004525d9fc',
+        '0x07ac09cc06c7cd74c7312f3a82c9f77d69ba7a89a4a3b7ded33db07e32c3607c',
+        '0x0937f52a752133455a063cd2a2daaff54c647dc5a89a26ecdf9ff8b071bd4340',
+        '0x1eb5fc68f7f39188b731b54fbe1b26b64fd930aebc792372566c43f5e705af4c',
+    )]
+    with database.conn.read_ctx() as cursor:
+        receipts = DBEvmTx(database).get_receipts(cursor, tx_hashes, ChainID.ETHEREUM)
+    log_addresses = [tx_log.address for receipt in receipts.values() for tx_log in receipt.logs]  # noqa: E501
+    assert len(log_addresses) > len(set(log_addresses)), 'test needs repeated log addresses'
+
+    with patch.object(GlobalDBHandler, 'get_evm_token', wraps=GlobalDBHandler.get_evm_token) as token_mock:  # noqa: E501
+        decoder.decode_transaction_hashes(ignore_cache=True, tx_hashes=tx_hashes)
+        looked_up = [x.kwargs['address'] for x in token_mock.call_args_list]
+        assert len(looked_up) == len(set(looked_up)) > 0
+        assert decoder.tokens_cache is None, 'the cache only lives during the session'
+
+        # a new session looks the addresses up again
+        token_mock.reset_mock()
+        decoder.decode_transaction_hashes(ignore_cache=True, tx_hashes=tx_hashes[:1])
+        assert token_mock.call_count > 0
+
+        # modifying tokens in the middle of a session drops the cache
+        decoder.tokens_cache = {}
+        token_mock.reset_mock()
+        address = looked_up[0]
+        decoder._get_evm_token(address)
+        decoder._get_evm_token(address)
+        assert token_mock.call_count == 1
+        GlobalDBHandler.mark_evm_tokens_modified()
+        decoder._get_evm_token(address)
+        assert token_mock.call_count == 2
+        decoder.tokens_cache = None
+
+
+def test_event_rules_dispatch_by_topic(ethereum_transaction_decoder):
+    """Test that logs are offered only to the event rules that can decode their topic,
+    in the order in which the rules were registered"""
+    decoder = ethereum_transaction_decoder
+    all_rules = decoder.rules.event_rules
+    assert decoder.event_rules_any_topic == [
+        x for x in all_rules if getattr(x, RULE_TOPICS_ATTRIBUTE, None) is None
+    ]
+    for topic, rules in decoder.event_rules_by_topic.items():
+        assert rules == [
+            x for x in all_rules
+            if topic in getattr(x, RULE_TOPICS_ATTRIBUTE, (topic,))
+        ]
+    transfer_rules = decoder.event_rules_by_topic[ERC20_OR_ERC721_TRANSFER]
+    assert decoder._maybe_decode_erc20_721_transfer in transfer_rules
+    assert decoder._maybe_decode_erc20_approve not in transfer_rules
+
+    # only the rules for the log's topic run
+    approve_rule = MagicMock(return_value=DEFAULT_DECODING_OUTPUT)
+    any_topic_rule = MagicMock(return_value=DEFAULT_DECODING_OUTPUT)
+    transfer_rule = MagicMock(return_value=DEFAULT_DECODING_OUTPUT)
+    with (
+        patch.object(decoder, 'event_rules_any_topic', [any_topic_rule]),
+        patch.object(decoder, 'event_rules_by_topic', {
+            ERC20_APPROVE: [approve_rule, any_topic_rule],
+            ERC20_OR_ERC721_TRANSFER: [transfer_rule, any_topic_rule],
+        }),
+    ):
+        for topics, expected_calls in (
+                ([ERC20_APPROVE], (1, 1, 0)),
+                ([b'\x01' * 32], (1, 2, 0)),  # unknown topics only go to the catch-all rules
+                ([], (1, 3, 0)),  # same for anonymous logs
+        ):
+            tx_log = EvmTxReceiptLog(
+                log_index=0,
+                data=b'',
+                address=string_to_evm_address('0x6B175474E89094C44Da98b954EedeAC495271d0F'),
+                removed=False,
+                topics=topics,
+            )
+            assert decoder.try_all_rules(
+                token=None,
+                tx_log=tx_log,
+                transaction=MagicMock(),
+                decoded_events=[],
+                action_items=[],
+                all_logs=[tx_log],
+            ) is None
+            assert (approve_rule.call_count, any_topic_rule.call_count, transfer_rule.call_count) == expected_calls  # noqa: E501
+
+
 @pytest.mark.parametrize('ethereum_accounts', [['0x9531C059098e3d194fF87FebB587aB07B30B1306', '0xc37b40ABdB939635068d3c5f13E7faF686F03B65']])  # noqa: E501
 @pytest.mark.parametrize('optimism_accounts', [['0x9531C059098e3d194fF87FebB587aB07B30B1306']])
 def test_query_and_decode_transactions_works_with_different_chains(
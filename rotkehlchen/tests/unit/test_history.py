@@ -1,3 +1,6 @@
+from unittest.mock import MagicMock, patch
+
+import gevent
 import pytest
 
 from rotkehlchen.accounting.ledger_actions import LedgerAction, LedgerActionType
@@ -8,15 +11,28 @@ from rotkehlchen.accounting.structures.base import HistoryEvent
 from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
 from rotkehlchen.chain.ethereum.modules.eth2.structures import ValidatorDailyStats
 from rotkehlchen.constants import ONE, ZERO
-from rotkehlchen.constants.assets import A_ETH, A_ETH2, A_USDC
+from rotkehlchen.constants.assets import A_ETH, A_ETH2, A_EUR, A_USDC
+from rotkehlchen.constants.misc import DEFAULT_EXCHANGES_QUERY_CONCURRENCY
 from rotkehlchen.db.filtering import LedgerActionsFilterQuery
+from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.db.ledger_actions import DBLedgerActions
+from rotkehlchen.errors.misc import RemoteError
+from rotkehlchen.exchanges.data_structures import Trade
 from rotkehlchen.fval import FVal
+from rotkehlchen.history.events import HistoryEventsStream, accounting_order_key
 from rotkehlchen.history.types import HistoricalPriceOracle
 from rotkehlchen.tests.utils.accounting import accounting_history_process, check_pnls_and_csv
 from rotkehlchen.tests.utils.history import prices
 from rotkehlchen.tests.utils.messages import no_message_errors
-from rotkehlchen.types import Location
+from rotkehlchen.types import (
+    EVM_CHAINS_WITH_TRANSACTIONS,
+    Location,
+    Price,
+    SupportedBlockchain,
+    Timestamp,
+    TimestampMS,
+    TradeType,
+)
 
 
 def test_query_ledger_actions(events_historian, function_scope_messages_aggregator):
@@ -82,6 +98,215 @@ def test_query_ledger_actions(events_historian, function_scope_messages_aggregat
     assert length == 2
 
 
+def test_evm_chains_history_queried_concurrently(events_historian):
+    """Test that the network queries for the transactions of the evm chains overlap
+    and that errors of one chain don't hide the others"""
+    calls = []
+
+    def make_chain_manager(blockchain):
+        def query_chain(filter_query):  # pylint: disable=unused-argument
+            calls.append(('query', blockchain))
+            gevent.sleep(0.1)  # simulate waiting for the network
+            if blockchain == SupportedBlockchain.OPTIMISM:
+                raise RemoteError('optimism is down')
+
+        manager = MagicMock()
+        manager.transactions.query_chain.side_effect = query_chain
+        manager.transactions_decoder.get_and_decode_undecoded_transactions.side_effect = lambda limit: calls.append(('decode', blockchain))  # noqa: E501
+        return manager
+
+    managers = {x: make_chain_manager(x) for x in EVM_CHAINS_WITH_TRANSACTIONS}
+    with patch.object(events_historian.chains_aggregator, 'get_chain_manager', side_effect=lambda x: managers[x]):  # noqa: E501
+        error_or_empty, _ = events_historian.get_history(
+            start_ts=Timestamp(0),
+            end_ts=Timestamp(1),
+            has_premium=False,
+        )
+
+    # all chains started querying before any of them got to decoding
+    assert [x[0] for x in calls] == ['query'] * len(managers) + ['decode'] * len(managers)
+    assert {x[1] for x in calls} == set(EVM_CHAINS_WITH_TRANSACTIONS)
+    assert 'optimism is down' in error_or_empty
+    assert events_historian.progress > ZERO
+
+
+def test_evm_chains_history_query_killed(events_historian):
+    """Test that killing the history query also stops the queries of the evm chains"""
+    finished = []
+
+    def query_chain(filter_query):  # pylint: disable=unused-argument
+        gevent.sleep(0.2)  # simulate waiting for the network
+        finished.append(True)
+
+    manager = MagicMock()
+    manager.transactions.query_chain.side_effect = query_chain
+    with patch.object(events_historian.chains_aggregator, 'get_chain_manager', return_value=manager):  # noqa: E501
+        greenlet = gevent.spawn(
+            events_historian.get_history,
+            start_ts=Timestamp(0),
+            end_ts=Timestamp(1),
+            has_premium=False,
+        )
+        gevent.sleep(0.05)
+        assert events_historian.processing_state_name == 'Querying and decoding EVM transactions history'  # noqa: E501
+        greenlet.kill()
+        gevent.sleep(0.3)
+
+    assert manager.transactions.query_chain.call_count == len(EVM_CHAINS_WITH_TRANSACTIONS)
+    assert finished == []
+
+
+def test_exchanges_history_queried_concurrently(events_historian):
+    """Test that the connected exchanges are queried concurrently and that the failure
+    of an exchange does not stop the queries of the others"""
+    running, max_running, queried = 0, 0, []
+
+    def make_exchange(name):
+        def query_history(start_ts, end_ts, fail_callback, new_step_data):  # pylint: disable=unused-argument  # noqa: E501
+            nonlocal running, max_running
+            new_step_callback, exchange_name = new_step_data
+            new_step_callback(f'Querying {exchange_name} trades history')
+            running += 1
+            max_running = max(max_running, running)
+            gevent.sleep(0.1)  # simulate waiting for the network
+            running -= 1
+            if name == 'exchange1':
+                raise ValueError('unexpected data')
+            if name == 'exchange2':
+                fail_callback('exchange2 is down')
+            queried.append(name)
+
+        exchange = MagicMock()
+        exchange.name = name
+        exchange.query_history_with_callbacks.side_effect = query_history
+        return exchange
+
+    exchanges = [make_exchange(f'exchange{idx}') for idx in range(6)]
+    with (
+        patch.object(events_historian.exchange_manager, 'iterate_exchanges', side_effect=lambda: iter(exchanges)),  # noqa: E501
+        patch.object(events_historian.chains_aggregator, 'get_chain_manager'),
+    ):
+        error_or_empty, _ = events_historian.get_history(
+            start_ts=Timestamp(0),
+            end_ts=Timestamp(1),
+            has_premium=False,
+        )
+
+    assert max_running == DEFAULT_EXCHANGES_QUERY_CONCURRENCY
+    assert set(queried) == {f'exchange{idx}' for idx in range(6) if idx != 1}
+    assert 'exchange1 exchange history query failed due to unexpected data' in error_or_empty
+    assert 'exchange2 is down' in error_or_empty
+    assert events_historian.progress > ZERO
+
+
+def test_exchanges_write_concurrently(events_historian, function_scope_messages_aggregator):
+    """Test that exchanges queried concurrently write their entries as soon as they get
+    them and that the history read from the DB is in a stable order anyway"""
+    db = events_historian.db
+    written = []
+
+    def query(exchange):
+        gevent.sleep(0.01 * exchange.delay)
+        if exchange.location == Location.BITTREX:
+            raise RemoteError('bittrex is down')
+        with db.user_write() as write_cursor:
+            db.add_trades(write_cursor, [Trade(
+                timestamp=Timestamp(10),
+                location=exchange.location,
+                base_asset=A_ETH,
+                quote_asset=A_EUR,
+                trade_type=TradeType.BUY,
+                amount=FVal(amount),
+                rate=Price(ONE),
+                fee=None,
+                fee_currency=None,
+                link=f'{exchange.location}{amount}',
+            ) for amount in (1, 2)])
+        written.append(exchange.location)
+
+    # the last exchange responds first
+    locations = [Location.KRAKEN, Location.BITTREX, Location.BINANCE, Location.POLONIEX]
+    exchanges = [MagicMock(location=location, delay=len(locations) - idx) for idx, location in enumerate(locations)]  # noqa: E501
+    failures = events_historian.exchange_manager.query_exchanges(query=query, exchanges=exchanges)  # noqa: E501
+
+    assert written == [Location.POLONIEX, Location.BINANCE, Location.KRAKEN]
+    assert [(x[0].location, str(x[1])) for x in failures] == [(Location.BITTREX, 'bittrex is down')]  # noqa: E501
+    stream = HistoryEventsStream(
+        db=db,
+        msg_aggregator=function_scope_messages_aggregator,
+        end_ts=Timestamp(15),
+        has_premium=True,
+        eth2_events=[],
+    )
+    trades = list(stream)
+    assert len(trades) == 6
+    assert trades == sorted(trades, key=lambda x: (x.location.serialize_for_db(), x.identifier))  # noqa: E501
+
+
+def test_history_events_stream(events_historian, function_scope_messages_aggregator):
+    """Test that the stream merges the events of the DB sources in accounting order,
+    reordering history events of the same second by sequence index, and that it can
+    be iterated again"""
+    db = events_historian.db
+    trades = [Trade(
+        timestamp=Timestamp(timestamp),
+        location=Location.KRAKEN,
+        base_asset=A_ETH,
+        quote_asset=A_EUR,
+        trade_type=TradeType.BUY,
+        amount=ONE,
+        rate=Price(ONE),
+        fee=None,
+        fee_currency=None,
+        link=str(timestamp),
+    ) for timestamp in (5, 10)]
+    action = LedgerAction(
+        identifier=0,  # whatever
+        timestamp=Timestamp(10),
+        action_type=LedgerActionType.INCOME,
+        location=Location.EXTERNAL,
+        amount=ONE,
+        asset=A_ETH,
+        rate=None,
+        rate_asset=None,
+        link=None,
+        notes=None,
+    )
+    history_events = [HistoryEvent(
+        event_identifier=f'id{timestamp}',
+        sequence_index=sequence_index,
+        timestamp=TimestampMS(timestamp),
+        location=Location.KRAKEN,
+        asset=A_ETH,
+        balance=Balance(amount=ONE),
+        event_type=HistoryEventType.STAKING,
+        event_subtype=HistoryEventSubType.REWARD,
+    ) for timestamp, sequence_index in ((10500, 2), (10100, 3), (5000, 0), (20000, 0))]
+    with db.user_write() as write_cursor:
+        db.add_trades(write_cursor, trades)
+        DBLedgerActions(db, function_scope_messages_aggregator).add_ledger_action(write_cursor, action)  # noqa: E501
+        DBHistoryEvents(db).add_history_events(write_cursor, history_events)
+
+    stream = HistoryEventsStream(
+        db=db,
+        msg_aggregator=function_scope_messages_aggregator,
+        end_ts=Timestamp(15),
+        has_premium=True,
+        eth2_events=[],
+    )
+    expected = [
+        (HistoryEvent, 5000),
+        (Trade, 5),
+        (Trade, 10),
+        (LedgerAction, 10),
+        (HistoryEvent, 10500),  # same second as the next one but lower sequence index
+        (HistoryEvent, 10100),
+    ]
+    for _ in range(2):
+        assert [(type(x), x.timestamp) for x in stream] == expected
+        assert [accounting_order_key(x) for x in stream] == sorted(accounting_order_key(x) for x in stream)  # noqa: E501
+
+
 @pytest.mark.parametrize(('value', 'result'), [
     ('manual', HistoricalPriceOracle.MANUAL),
     ('coingecko', HistoricalPriceOracle.COINGECKO),
@@ -3,6 +3,7 @@ import pytest
 from rotkehlchen.accounting.ledger_actions import LedgerAction, LedgerActionType
 from rotkehlchen.accounting.mixins.event import AccountingEventType
 from rotkehlchen.accounting.pnl import PNL, PnlTotals
+from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants import ONE, ZERO
 from rotkehlchen.constants.assets import A_BTC, A_ETH, A_EUR, A_USD
 from rotkehlchen.db.filtering import LedgerActionsFilterQuery
@@ -108,6 +109,62 @@ def test_ledger_action_can_be_removed(database, function_scope_messages_aggregat
         )) == 0
 
 
+def test_add_ledger_actions(database, function_scope_messages_aggregator):
+    """Test that ledger actions added in bulk get their identifiers, are written in the
+    given transaction and that only the ones that can't be added are skipped"""
+    db = DBLedgerActions(database, function_scope_messages_aggregator)
+
+    def make_action(timestamp, asset=A_ETH):
+        return LedgerAction(
+            identifier=0,  # whatever
+            timestamp=timestamp,
+            action_type=LedgerActionType.INCOME,
+            location=Location.EXTERNAL,
+            amount=ONE,
+            asset=asset,
+            rate=None,
+            rate_asset=None,
+            link=None,
+            notes=None,
+        )
+
+    actions = [make_action(timestamp) for timestamp in (1, 2, 3)]
+    with database.user_write() as write_cursor:
+        db.add_ledger_action(write_cursor, make_action(0))
+        db.add_ledger_actions(write_cursor, actions)
+        assert db.get_ledger_actions(
+            write_cursor,
+            filter_query=LedgerActionsFilterQuery.make(from_ts=1),
+            has_premium=True,
+        ) == actions
+        assert len({x.identifier for x in actions}) == 3
+
+    def add_and_abort():
+        with database.user_write() as write_cursor:
+            db.add_ledger_actions(write_cursor, [make_action(7)])
+            raise ValueError('abort the transaction')
+
+    # the actions are written in the transaction of the given cursor
+    with pytest.raises(ValueError):
+        add_and_abort()
+
+    with database.user_write() as write_cursor:
+        db.add_ledger_actions(
+            write_cursor,
+            [make_action(4), make_action(5, asset=Asset('NOTEXISTINGASSET')), make_action(6)],
+        )
+
+    with database.conn.read_ctx() as cursor:
+        assert [x.timestamp for x in db.get_ledger_actions(
+            cursor,
+            filter_query=LedgerActionsFilterQuery.make(),
+            has_premium=True,
+        )] == [0, 1, 2, 3, 4, 6]
+    assert function_scope_messages_aggregator.consume_warnings() == [
+        'Did not add ledger action to DB due to it already existing',
+    ]
+
+
 def test_ledger_action_can_be_edited(database, function_scope_messages_aggregator):
     db = DBLedgerActions(database, function_scope_messages_aggregator)
 
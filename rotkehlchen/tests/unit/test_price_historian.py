@@ -212,3 +212,60 @@ def test_manual_oracle_correctly_returns_price(globaldb, fake_price_historian):
             to_asset=A_USD,
             timestamp=Timestamp(1610595466),
         )
+
+
+@pytest.mark.parametrize('historical_price_oracles_order', [[
+    HistoricalPriceOracle.MANUAL,
+    HistoricalPriceOracle.COINGECKO,
+    HistoricalPriceOracle.CRYPTOCOMPARE,
+]])
+def test_prefetch_historical_prices(globaldb, fake_price_historian):
+    """Test that prices cached in the DB are resolved in bulk following the oracles order
+    and that queries not found in the cache of the first remote oracle are left unresolved"""
+    price_historian = fake_price_historian
+    globaldb.add_historical_prices([
+        HistoricalPrice(
+            from_asset=A_BTC,
+            to_asset=A_USD,
+            price=Price(FVal('30000')),
+            timestamp=Timestamp(1611595470),
+            source=HistoricalPriceOracle.MANUAL,
+        ), HistoricalPrice(
+            from_asset=A_BTC,
+            to_asset=A_USD,
+            price=Price(FVal('20000')),
+            timestamp=Timestamp(1600000000),
+            source=HistoricalPriceOracle.COINGECKO,
+        ), HistoricalPrice(
+            from_asset=A_BTC,
+            to_asset=A_USD,
+            price=Price(FVal('10000')),
+            timestamp=Timestamp(1500000000),
+            source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        ),
+    ])
+    resolved = price_historian.prefetch_historical_prices([
+        (A_BTC, A_USD, Timestamp(1611595466)),  # manual price
+        (A_BTC, A_USD, Timestamp(1600050000)),  # coingecko price within a day
+        (A_BTC, A_USD, Timestamp(1500000000)),  # would query coingecko before cryptocompare
+        (A_USD, A_GBP, Timestamp(1500000000)),  # fiat to fiat is not prefetched
+    ])
+    assert resolved == 2
+    assert price_historian.query_historical_price(A_BTC, A_USD, Timestamp(1611595466)) == FVal('30000')  # noqa: E501
+    assert price_historian.query_historical_price(A_BTC, A_USD, Timestamp(1600050000)) == FVal('20000')  # noqa: E501
+    for oracle_instance in price_historian._oracle_instances[1:]:
+        assert oracle_instance.query_historical_price.call_count == 0
+
+    price_historian.clear_prefetched_prices()
+    assert price_historian._prefetched_prices == {}
+
+    # oracles that can't be queried, such as a penalized coingecko, are skipped
+    price_historian._oracle_instances[1].can_query_history.return_value = False
+    resolved = price_historian.prefetch_historical_prices([
+        (A_BTC, A_USD, Timestamp(1600050000)),  # only coingecko has a price
+        (A_BTC, A_USD, Timestamp(1500000000)),  # cryptocompare price after coingecko
+    ])
+    assert resolved == 1
+    assert price_historian._prefetched_prices == {
+        (A_BTC.identifier, A_USD.identifier, Timestamp(1500000000)): FVal('10000'),
+    }
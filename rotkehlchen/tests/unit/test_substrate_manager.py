@@ -1,15 +1,24 @@
 from typing import Any, NamedTuple
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
+import gevent
 import pytest
-
-from rotkehlchen.chain.substrate.manager import SubstrateManager
-from rotkehlchen.chain.substrate.types import BlockNumber, KusamaNodeName, NodeNameAttributes
+from substrateinterface.exceptions import SubstrateRequestException
+
+from rotkehlchen.chain.substrate.manager import SubstrateChainProperties, SubstrateManager
+from rotkehlchen.chain.substrate.types import (
+    BlockNumber,
+    KusamaNodeName,
+    NodeNameAttributes,
+    SubstrateAddress,
+)
 from rotkehlchen.constants.assets import A_KSM
-from rotkehlchen.constants.misc import ZERO
+from rotkehlchen.constants.misc import ONE, ZERO
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.substrate import (
+    KUSAMA_MAIN_ASSET_DECIMALS,
+    KUSAMA_SS58_FORMAT,
     SUBSTRATE_ACC1_KSM_ADDR,
     SUBSTRATE_ACC2_KSM_ADDR,
     attempt_connect_test_nodes,
@@ -55,6 +64,67 @@ def test_get_accounts_balance(kusama_manager):
     assert account_balance[SUBSTRATE_ACC2_KSM_ADDR] >= ZERO
 
 
+class StorageKey(NamedTuple):
+    account: str
+
+    def to_hex(self) -> str:
+        return '0x' + self.account.encode().hex()
+
+
+@pytest.mark.parametrize('kusama_available_node_attributes_map', [{}])
+def test_get_accounts_balance_batches(kusama_manager):
+    """Test that the System.Account storage entries are requested in batches that are
+    split between the nodes, and that the batches of a failing node are requested
+    from the other nodes without using a node for two requests at the same time.
+    """
+    accounts = [SubstrateAddress(f'account{x}') for x in range(5)]
+    in_use = set()
+
+    def make_node_interface(url: str, fails: bool) -> MagicMock:
+        def query_multi(storage_keys):
+            assert url not in in_use, 'node used by two requests at the same time'
+            in_use.add(url)
+            gevent.sleep(0.01)  # simulate waiting for the node
+            in_use.remove(url)
+            if fails:
+                raise SubstrateRequestException('Too many requests')
+            return [  # the last account has no storage entry
+                (x, AccountInfo(value={'data': {'free': accounts.index(x.account) * 10 ** 12, 'reserved': 10 ** 12}}))  # noqa: E501
+                for x in storage_keys if x.account != accounts[-1]
+            ]
+
+        node_interface = MagicMock(url=url)
+        node_interface.create_storage_key.side_effect = lambda pallet, storage_function, params: StorageKey(params[0])  # noqa: E501
+        node_interface.query_multi.side_effect = query_multi
+        return node_interface
+
+    own_node_interface = make_node_interface(url='own', fails=False)
+    parity_node_interface = make_node_interface(url='parity', fails=True)
+    kusama_manager.available_node_attributes_map = {
+        KusamaNodeName.OWN: NodeNameAttributes(node_interface=own_node_interface, weight_block=1000),  # noqa: E501
+        KusamaNodeName.PARITY: NodeNameAttributes(node_interface=parity_node_interface, weight_block=1000),  # noqa: E501
+    }
+    kusama_manager._set_available_nodes_call_order()
+    kusama_manager.chain_properties = SubstrateChainProperties(
+        ss58_format=KUSAMA_SS58_FORMAT,
+        token=A_KSM,
+        token_decimals=KUSAMA_MAIN_ASSET_DECIMALS,
+    )
+    with patch('rotkehlchen.chain.substrate.manager.SUBSTRATE_ACCOUNTS_BATCH_SIZE', 2):
+        balances = kusama_manager.get_accounts_balance(accounts)
+
+    assert balances == {
+        accounts[0]: ONE,
+        accounts[1]: FVal(2),
+        accounts[2]: FVal(3),
+        accounts[3]: FVal(4),
+        accounts[4]: ZERO,
+    }
+    # 3 batches. The second one started from the parity node and fell back to the own node
+    assert [len(x.args[0]) for x in parity_node_interface.query_multi.call_args_list] == [2]
+    assert sorted(len(x.args[0]) for x in own_node_interface.query_multi.call_args_list) == [1, 2, 2]  # noqa: E501
+
+
 def test_get_chain_id(kusama_manager):
     chain_id = kusama_manager.get_chain_id()
     assert chain_id == 'Kusama'
@@ -209,7 +209,7 @@ def test_maybe_schedule_ethereum_txreceipts(
     timeout = 10
     tx_hash_1 = hexstring_to_bytes('0x692f9a6083e905bdeca4f0293f3473d7a287260547f8cbccc38c5cb01591fcda')  # noqa: E501
     tx_hash_2 = hexstring_to_bytes('0x6beab9409a8f3bd11f82081e99e856466a7daf5f04cca173192f79e78ed53a77')  # noqa: E501
-    receipt_get_patch = patch.object(ethereum_manager.node_inquirer, 'get_transaction_receipt', wraps=ethereum_manager.node_inquirer.get_transaction_receipt)  # pylint: disable=protected-member  # noqa: E501
+    receipt_get_patch = patch.object(ethereum_manager.node_inquirer, 'get_transaction_receipts', wraps=ethereum_manager.node_inquirer.get_transaction_receipts)  # pylint: disable=protected-member  # noqa: E501
     queried_receipts = set()
     try:
         with gevent.Timeout(timeout), receipt_get_patch as receipt_task_mock, mock_evm_chains_with_transactions():  # noqa: E501
@@ -224,7 +224,9 @@ def test_maybe_schedule_ethereum_txreceipts(
 
             task_manager.schedule()
             gevent.sleep(.5)
-            assert receipt_task_mock.call_count == 1 if one_receipt_in_db else 2, '2nd schedule should do nothing'  # noqa: E501
+            # the missing receipts are queried in a single batch
+            assert receipt_task_mock.call_count == 1, '2nd schedule should do nothing'
+            assert len(receipt_task_mock.call_args.args[0]) == (1 if one_receipt_in_db else 2)
 
     except gevent.Timeout as e:
         raise AssertionError(f'receipts query was not completed within {timeout} seconds') from e  # noqa: E501
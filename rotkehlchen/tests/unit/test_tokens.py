@@ -4,16 +4,24 @@ from unittest.mock import MagicMock, patch
 import gevent
 import pytest
 
+from rotkehlchen.accounting.structures.balance import Balance
+from rotkehlchen.accounting.structures.evm_event import EvmEvent
+from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
+from rotkehlchen.assets.asset import EvmToken
+from rotkehlchen.assets.types import AssetType
 from rotkehlchen.assets.utils import _query_or_get_given_token_info
 from rotkehlchen.chain.ethereum.tokens import EthereumTokens
 from rotkehlchen.chain.evm.tokens import generate_multicall_chunks
 from rotkehlchen.chain.evm.types import string_to_evm_address
 from rotkehlchen.constants.assets import A_OMG, A_WETH
 from rotkehlchen.constants.misc import ONE
+from rotkehlchen.constants.timing import EVM_FULL_TOKENS_DETECTION_PERIOD
+from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.tests.utils.constants import A_LPT
-from rotkehlchen.tests.utils.factories import make_evm_address
-from rotkehlchen.types import ChainID, EvmTokenKind, SupportedBlockchain
+from rotkehlchen.tests.utils.factories import make_evm_address, make_evm_tx_hash
+from rotkehlchen.types import ChainID, EvmTokenKind, Location, SupportedBlockchain, TimestampMS
 from rotkehlchen.utils.misc import ts_now
 
 ERC20_INFO_RESPONSE = ((True, b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x06'), (True, b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00 \x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x04USDT\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'), (True, b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00 \x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\nTether USD\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'))  # noqa: E501
@@ -61,7 +69,8 @@ def test_detect_tokens_for_addresses(rotkehlchen_api_server, ethereum_accounts):
     tokens.evm_inquirer.multicall = MagicMock(side_effect=tokens.evm_inquirer.multicall)
     detection_result = tokens.detect_tokens(False, [addr1, addr2, addr3])
     assert A_WETH in detection_result[addr3][0], 'WETH is owned by the proxy, but should be returned in the proxy owner address'  # noqa: E501
-    assert tokens.evm_inquirer.multicall.call_count == 0, 'multicall should not be used for tokens detection'  # noqa: E501
+    assert tokens.evm_inquirer.multicall.call_count >= 1, 'multicall should have been used for tokens detection'  # noqa: E501
+    tokens.evm_inquirer.multicall.reset_mock()
     result, token_usd_prices = tokens.query_tokens_for_addresses(
         [addr1, addr2, addr3, addr3_proxy],
     )
@@ -112,6 +121,32 @@ def test_generate_chunks():
     assert generated_chunks == expected_chunks
 
 
+def test_query_token_balances_packs_addresses(tokens):
+    """Checks that the tokens of many addresses are packed in few multicalls that are
+    spread over the nodes"""
+    addresses = [make_evm_address() for _ in range(20)]
+    address_tokens = [A_WETH.resolve_to_evm_token(), A_OMG.resolve_to_evm_token(), A_LPT.resolve_to_evm_token()]  # noqa: E501
+    call_order = [MagicMock(name='node_a'), MagicMock(name='node_b')]
+    queried_chunks = []
+
+    def mock_get_multicall_token_balances(chunk, call_order):
+        queried_chunks.append((chunk, call_order[0]))
+        return {address: {chunk_tokens[0]: ONE} for address, chunk_tokens in chunk}
+
+    with (
+        patch('rotkehlchen.chain.evm.tokens.get_chunk_size_call_order', return_value=(50, call_order)),  # noqa: E501
+        patch.object(tokens, '_get_multicall_token_balances', side_effect=mock_get_multicall_token_balances),  # noqa: E501
+    ):
+        balances = tokens._query_token_balances({x: address_tokens for x in addresses})
+
+    # each address takes 7 arguments for the tokensBalance call and 3 for its tokens
+    assert len(queried_chunks) == 4
+    assert all(len(chunk) == 5 for chunk, _ in queried_chunks)
+    assert sorted(x[1]._extract_mock_name() for x in queried_chunks) == ['node_a', 'node_a', 'node_b', 'node_b']  # noqa: E501
+    assert balances == {x: {A_WETH: ONE} for x in addresses}
+
+
+@pytest.mark.parametrize('mocked_proxies', [{}])
 def test_last_queried_ts(tokens, freezer):
     """
     Checks that after detecting evm tokens last_queried_timestamp is updated and there
@@ -120,7 +155,7 @@ def test_last_queried_ts(tokens, freezer):
     # We don't need to query the chain here, so mock tokens list
     evm_tokens_patch = patch(
         'rotkehlchen.globaldb.handler.GlobalDBHandler.get_evm_tokens',
-        new=lambda _, chain_id=ChainID.ETHEREUM, exceptions=None, protocol=None: [],
+        new=lambda _, chain_id=ChainID.ETHEREUM, exceptions=None, protocol=None, added_after=None: [],  # noqa: E501
     )
     beginning = ts_now()
     address = '0x4bBa290826C253BD854121346c370a9886d1bC26'
@@ -130,12 +165,11 @@ def test_last_queried_ts(tokens, freezer):
             only_cache=False,
             addresses=[address],
         )
-        after_first_query = tokens.db.conn.execute(
+        after_first_query = dict(tokens.db.conn.execute(
             'SELECT key, value FROM evm_accounts_details',
-        ).fetchall()
-        assert len(after_first_query) == 1
-        assert after_first_query[0][0] == 'last_queried_timestamp'
-        assert int(after_first_query[0][1]) >= beginning
+        ).fetchall())
+        assert after_first_query.keys() == {'last_queried_timestamp', 'last_full_detection_timestamp', 'last_checked_token'}  # noqa: E501
+        assert int(after_first_query['last_queried_timestamp']) >= beginning
 
         continuation = beginning + 10
         freezer.move_to(datetime.datetime.fromtimestamp(continuation, tz=datetime.timezone.utc))
@@ -145,12 +179,81 @@ def test_last_queried_ts(tokens, freezer):
             addresses=['0x4bBa290826C253BD854121346c370a9886d1bC26'],
         )
         # Check that last_queried_timestamp was updated and that there are no duplicates
-        after_second_query = tokens.db.conn.execute(
+        after_second_query = dict(tokens.db.conn.execute(
             'SELECT key, value FROM evm_accounts_details',
-        ).fetchall()
-        assert len(after_second_query) == 1
-        assert after_second_query[0][0] == 'last_queried_timestamp'
-        assert int(after_second_query[0][1]) >= continuation
+        ).fetchall())
+        assert after_second_query.keys() == after_first_query.keys()
+        assert int(after_second_query['last_queried_timestamp']) >= continuation
+        # the second detection was incremental so the full detection time stays the same
+        assert after_second_query['last_full_detection_timestamp'] == after_first_query['last_full_detection_timestamp']  # noqa: E501
+
+
+@pytest.mark.parametrize('mocked_proxies', [{}])
+def test_incremental_detection(tokens, freezer):
+    """Checks that only the first detection of an address and the ones after
+    EVM_FULL_TOKENS_DETECTION_PERIOD check all the tokens. The rest only check the tokens
+    the address had, the tokens in its history events and the newly added tokens."""
+    address = make_evm_address()
+    all_tokens = GlobalDBHandler().get_evm_tokens(chain_id=ChainID.ETHEREUM)
+    last_token = GlobalDBHandler().get_last_evm_token_rowid()
+    checked_tokens = []
+
+    def mock_query_token_balances(addresses_to_tokens):
+        if address not in addresses_to_tokens:
+            return {}  # the proxies detection
+        checked_tokens.append(set(addresses_to_tokens[address]))
+        return {address: {A_WETH.resolve_to_evm_token(): ONE}} if A_WETH in checked_tokens[-1] else {}  # noqa: E501
+
+    with patch.object(tokens, '_query_token_balances', side_effect=mock_query_token_balances):
+        tokens.detect_tokens(only_cache=False, addresses=[address])
+        assert len(checked_tokens[-1]) > 1000
+        assert checked_tokens[-1] <= set(all_tokens)
+
+        # second detection only checks the already detected token and the transferred one
+        dbevents = DBHistoryEvents(tokens.db)
+        with tokens.db.user_write() as write_cursor:
+            dbevents.add_history_event(write_cursor, EvmEvent(
+                tx_hash=make_evm_tx_hash(),
+                sequence_index=0,
+                timestamp=TimestampMS(1600000000000),
+                location=Location.ETHEREUM,
+                event_type=HistoryEventType.RECEIVE,
+                event_subtype=HistoryEventSubType.NONE,
+                asset=A_OMG,
+                balance=Balance(amount=ONE),
+                location_label=address,
+            ))
+        tokens.detect_tokens(only_cache=False, addresses=[address])
+        assert checked_tokens[-1] == {A_WETH, A_OMG}
+
+        # a token added to the global DB is checked in the next detection
+        new_token = EvmToken.initialize(
+            address=make_evm_address(),
+            chain_id=ChainID.ETHEREUM,
+            token_kind=EvmTokenKind.ERC20,
+            decimals=18,
+        )
+        GlobalDBHandler().add_asset(
+            asset_id=new_token.identifier,
+            asset_type=AssetType.EVM_TOKEN,
+            data=new_token,
+        )
+        assert GlobalDBHandler().get_last_evm_token_rowid() > last_token
+        tokens.detect_tokens(only_cache=False, addresses=[address])
+        assert checked_tokens[-1] == {A_WETH, A_OMG, new_token}
+        tokens.detect_tokens(only_cache=False, addresses=[address])
+        assert checked_tokens[-1] == {A_WETH, A_OMG}
+
+        # after the full detection period all the tokens are checked again
+        freezer.move_to(datetime.datetime.fromtimestamp(
+            ts_now() + EVM_FULL_TOKENS_DETECTION_PERIOD,
+            tz=datetime.timezone.utc,
+        ))
+        tokens.detect_tokens(only_cache=False, addresses=[address])
+        assert len(checked_tokens[-1]) > 1000
+        assert new_token in checked_tokens[-1]
+
+    assert tokens.detect_tokens(only_cache=True, addresses=[address])[address][0] == [A_WETH]
 
 
 def test_cache_is_per_token_type(ethereum_inquirer):
@@ -1,8 +1,10 @@
 from typing import NamedTuple, Optional
 
 from rotkehlchen.constants.misc import (
+    DEFAULT_EXCHANGES_QUERY_CONCURRENCY,
     DEFAULT_MAX_LOG_BACKUP_FILES,
     DEFAULT_MAX_LOG_SIZE_IN_MB,
+    DEFAULT_SQL_READ_CONNECTIONS,
     DEFAULT_SQL_VM_INSTRUCTIONS_CB,
 )
 
@@ -17,6 +19,8 @@ class ConfigurationArgs(NamedTuple):
     max_size_in_mb_all_logs: int = DEFAULT_MAX_LOG_SIZE_IN_MB
     max_logfiles_num: int = DEFAULT_MAX_LOG_BACKUP_FILES
     sqlite_instructions: int = DEFAULT_SQL_VM_INSTRUCTIONS_CB
+    sqlite_read_connections: int = DEFAULT_SQL_READ_CONNECTIONS
+    exchanges_query_concurrency: int = DEFAULT_EXCHANGES_QUERY_CONCURRENCY
 
 
 def default_args(
@@ -32,6 +36,8 @@ def default_args(
         max_size_in_mb_all_logs=max_size_in_mb_all_logs,
         max_logfiles_num=DEFAULT_MAX_LOG_BACKUP_FILES,
         sqlite_instructions=DEFAULT_SQL_VM_INSTRUCTIONS_CB,
+        sqlite_read_connections=DEFAULT_SQL_READ_CONNECTIONS,
+        exchanges_query_concurrency=DEFAULT_EXCHANGES_QUERY_CONCURRENCY,
         logfile=None,
         logtarget=None,
     )
@@ -524,7 +524,7 @@ def mock_bitcoin_balances_query(
                 if idx < len(addresses) - 1:
                     response += ','
             response += ']}'
-        elif 'blockstream.info' in url:
+        elif 'blockstream.info' in url or 'mempool.space' in url:
             split_result = url.rsplit('/', 1)
             if len(split_result) != 2:
                 raise AssertionError(f'Could not find bitcoin address at url {url}')
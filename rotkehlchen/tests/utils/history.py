@@ -1,4 +1,5 @@
 import json
+from collections.abc import Iterable
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, NamedTuple, Optional, cast
 from unittest.mock import _patch, patch
@@ -258,9 +259,9 @@ prices = {
 def check_result_of_history_creation_for_remote_errors(  # type: ignore[return] # pylint: disable=useless-return  # noqa: E501
         start_ts: Timestamp,  # pylint: disable=unused-argument
         end_ts: Timestamp,  # pylint: disable=unused-argument
-        events: list[AccountingEventMixin],
+        events: Iterable[AccountingEventMixin],
 ) -> Optional[int]:
-    assert len(events) == 0
+    assert len(list(events)) == 0
 
 
 def mock_exchange_responses(rotki: Rotkehlchen, remote_errors: bool):
@@ -739,7 +740,7 @@ def mock_history_processing(
     def check_result_of_history_creation(
             start_ts: Timestamp,
             end_ts: Timestamp,
-            events: list[AccountingEventMixin],
+            events: Iterable[AccountingEventMixin],
     ) -> Optional[int]:
         """This function offers some simple assertions on the result of the
         created history. The entire processing part of the history is mocked
@@ -788,20 +789,20 @@ def mock_history_processing(
             assert asset_movements[3].location == Location.KRAKEN
             assert asset_movements[3].category == AssetMovementCategory.WITHDRAWAL
             assert asset_movements[3].asset == A_ETH
-            assert asset_movements[4].location == Location.POLONIEX
+            assert asset_movements[4].location == Location.KRAKEN
             assert asset_movements[4].category == AssetMovementCategory.DEPOSIT
-            assert asset_movements[4].asset == A_BTC
-            assert asset_movements[5].location == Location.KRAKEN
+            assert asset_movements[4].asset == A_ETH
+            assert asset_movements[5].location == Location.POLONIEX
             assert asset_movements[5].category == AssetMovementCategory.DEPOSIT
-            assert asset_movements[5].asset == A_ETH
+            assert asset_movements[5].asset == A_BTC
             assert asset_movements[6].location == Location.KRAKEN
             assert asset_movements[6].category == AssetMovementCategory.DEPOSIT
             assert asset_movements[6].asset == A_EUR
-            assert asset_movements[7].location == Location.POLONIEX
-            assert asset_movements[7].category == AssetMovementCategory.WITHDRAWAL
+            assert asset_movements[7].location == Location.KRAKEN
+            assert asset_movements[7].category == AssetMovementCategory.DEPOSIT
             assert asset_movements[7].asset == A_BTC
-            assert asset_movements[8].location == Location.KRAKEN
-            assert asset_movements[8].category == AssetMovementCategory.DEPOSIT
+            assert asset_movements[8].location == Location.POLONIEX
+            assert asset_movements[8].category == AssetMovementCategory.WITHDRAWAL
             assert asset_movements[8].asset == A_BTC
             assert asset_movements[9].location == Location.POLONIEX
             assert asset_movements[9].category == AssetMovementCategory.WITHDRAWAL
@@ -855,7 +856,7 @@ def mock_history_processing(
     def check_result_of_history_creation_and_process_it(
             start_ts: Timestamp,
             end_ts: Timestamp,
-            events: list[AccountingEventMixin],
+            events: Iterable[AccountingEventMixin],
     ) -> Optional[int]:
         """Checks results of history creation but also proceeds to normal history processing"""
         check_result_of_history_creation(
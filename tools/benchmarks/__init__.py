@@ -0,0 +1,9 @@
+"""
+Benchmarks of the accounting, decoding and DB query hot paths on synthetic DBs.
+
+Run them on two commits and compare the results to find performance regressions.
+
+    python -m tools.benchmarks run --size medium --label $(git rev-parse HEAD) --output base.json
+    python -m tools.benchmarks run --size medium --output new.json
+    python -m tools.benchmarks compare base.json new.json
+"""
@@ -0,0 +1,139 @@
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any
+
+import gevent
+from gevent import monkey
+
+monkey.patch_all()  # isort:skip
+# the cases use db.filtering, which has a circular import unless dbhandler is imported first
+import rotkehlchen.db.dbhandler  # isort:skip  # noqa: F401  # pylint: disable=unused-import
+from rotkehlchen.logging import TRACE, add_logging_level
+from tools.benchmarks.cases import Case, make_cases
+from tools.benchmarks.synthetic import SIZES, create_environment, size_summary
+
+add_logging_level('TRACE', TRACE)
+
+RESULTS_VERSION = 1
+
+
+def measure(case: Case, repeat: int) -> dict[str, Any]:
+    timings = []
+    case.setup()
+    case.run()  # warm up caches and lazily loaded data
+    for _ in range(repeat):
+        case.setup()
+        start = time.perf_counter()
+        case.run()
+        timings.append(time.perf_counter() - start)
+
+    median = statistics.median(timings)
+    return {
+        'items': case.items,
+        'timings': timings,
+        'min': min(timings),
+        'median': median,
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'median_per_item': median / case.items,
+    }
+
+
+def run(args: argparse.Namespace) -> None:
+    size = SIZES[args.size]._replace(**{
+        name: value for name in ('trades', 'evm_transactions', 'history_events', 'days')
+        if (value := getattr(args, name)) is not None
+    })
+    results: dict[str, Any] = {
+        'version': RESULTS_VERSION,
+        'label': args.label,
+        'python': platform.python_version(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'size': size_summary(size),
+        'results': {},
+    }
+    with tempfile.TemporaryDirectory() as data_dir, ExitStack() as stack:
+        start = time.perf_counter()
+        env = create_environment(stack=stack, data_dir=Path(data_dir), size=size, seed=args.seed)
+        print(f'Created the {args.size} synthetic DBs in {time.perf_counter() - start:.1f}s', file=sys.stderr)  # noqa: E501
+        for case in make_cases(env):
+            if args.only is not None and not any(x in case.name for x in args.only):
+                continue
+            result = results['results'][case.name] = measure(case, args.repeat)
+            print(f'{case.name:<45} {result["median"]:>10.4f}s {result["median_per_item"] * 1e6:>12.1f}us/item', file=sys.stderr)  # noqa: E501
+        env.db.logout()
+
+    output = json.dumps(results, indent=2)
+    if args.output is None:
+        print(output)
+    else:
+        Path(args.output).write_text(output)
+
+
+def compare(args: argparse.Namespace) -> None:
+    """Compares the median times of the cases in both results. Exits with 1 if
+    any case got slower than the threshold"""
+    base = json.loads(Path(args.base).read_text())
+    new = json.loads(Path(args.new).read_text())
+    if base['size'] != new['size']:
+        print('Warning: the results were measured on DBs of different size', file=sys.stderr)
+
+    regressions = []
+    for name, new_result in new['results'].items():
+        if (base_result := base['results'].get(name)) is None:
+            print(f'{name:<45} {"new":>10}')
+            continue
+        ratio = new_result['median'] / base_result['median']
+        print(f'{name:<45} {base_result["median"]:>10.4f}s {new_result["median"]:>10.4f}s {ratio:>8.2f}x')  # noqa: E501
+        if ratio > 1 + args.threshold:
+            regressions.append(name)
+
+    if len(regressions) != 0:
+        print(f'Slower than the threshold: {", ".join(regressions)}', file=sys.stderr)
+        sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the backend hot paths on synthetic DBs')  # noqa: E501
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    run_parser = subparsers.add_parser('run', help='Run the benchmarks and output the results as json')  # noqa: E501
+    run_parser.add_argument('--size', choices=list(SIZES), default='small')
+    run_parser.add_argument('--trades', type=int, help='Overrides the number of trades of the size')  # noqa: E501
+    run_parser.add_argument('--evm-transactions', type=int)
+    run_parser.add_argument('--history-events', type=int)
+    run_parser.add_argument('--days', type=int)
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument(
+        '--only',
+        action='append',
+        help='Run only the cases whose name contains this. Can be given multiple times',
+    )
+    run_parser.add_argument('--label', help='Stored in the results, such as the benchmarked commit')  # noqa: E501
+    run_parser.add_argument('--output', help='File to write the results to. Defaults to stdout')
+    compare_parser = subparsers.add_parser('compare', help='Compare the results of two runs')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.1,
+        help='Relative slowdown of the median over which a case counts as a regression',
+    )
+    args = parser.parse_args()
+    if args.command == 'run':
+        # the backend expects to run in a greenlet
+        gevent.spawn(run, args).get()
+    else:
+        compare(args)
+
+
+if __name__ == '__main__':
+    main()
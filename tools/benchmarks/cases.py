@@ -0,0 +1,147 @@
+"""The benchmarked hot paths. Each case is timed on the environment's synthetic DBs."""
+from collections.abc import Callable
+from typing import NamedTuple
+
+from rotkehlchen.accounting.mixins.event import AccountingEventMixin
+from rotkehlchen.accounting.structures.balance import BalanceType
+from rotkehlchen.accounting.structures.types import HistoryEventType
+from rotkehlchen.db.filtering import (
+    HistoryEventFilterQuery,
+    LevenshteinFilterQuery,
+    TradesFilterQuery,
+)
+from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.db.search_assets import search_assets_levenshtein
+from rotkehlchen.types import Location, Timestamp
+from tools.benchmarks.synthetic import ASSETS, DAY_IN_SECONDS, START_TS, BenchmarkEnvironment
+
+
+def _no_setup() -> None:
+    ...
+
+
+class Case(NamedTuple):
+    name: str
+    run: Callable[[], object]
+    items: int  # number of entries processed by a run. Used to report the time per entry
+    setup: Callable[[], None] = _no_setup  # called before each run and not timed
+
+
+def _accounting_cases(env: BenchmarkEnvironment) -> list[Case]:
+    with env.db.conn.read_ctx() as cursor:
+        events: list[AccountingEventMixin] = [
+            *env.db.get_trades(cursor, filter_query=TradesFilterQuery.make(), has_premium=True),  # noqa: E501
+            *DBHistoryEvents(env.db).get_history_events(
+                cursor=cursor,
+                filter_query=HistoryEventFilterQuery.make(),
+                has_premium=True,
+            ),
+        ]
+    events.sort(key=lambda x: x.get_timestamp())
+
+    # inside the synthetic history so that its start is after the saved checkpoints
+    resumed_start_ts = Timestamp(START_TS + env.size.days * DAY_IN_SECONDS // 2)
+
+    def process_history_from(start_ts: Timestamp) -> int:
+        return env.accountant.process_history(
+            start_ts=start_ts,
+            end_ts=env.end_ts,
+            events=events,
+        )
+
+    def process_history() -> int:
+        return process_history_from(Timestamp(0))
+
+    def process_history_resumed() -> int:
+        report_id = process_history_from(resumed_start_ts)
+        # without resuming the processed events would start from the first event
+        assert env.accountant.pots[0].processed_events[0].timestamp > events[0].get_timestamp(), (  # noqa: E501
+            'the report did not resume from a checkpoint'
+        )
+        return report_id
+
+    def clean_reports() -> None:
+        with env.db.transient_write() as write_cursor:
+            write_cursor.execute('DELETE FROM pnl_reports')
+            write_cursor.execute('DELETE FROM pnl_checkpoints')
+
+    def clean_reports_and_checkpoint() -> None:
+        clean_reports()
+        process_history()  # creates the checkpoints the timed run resumes from
+
+    return [
+        Case('accounting.process_history', process_history, len(events), clean_reports),
+        Case('accounting.process_history_resumed', process_history_resumed, len(events), clean_reports_and_checkpoint),  # noqa: E501
+    ]
+
+
+def _decoding_cases(env: BenchmarkEnvironment) -> list[Case]:
+    def decode() -> object:
+        return env.decoder.decode_transaction_hashes(ignore_cache=True, tx_hashes=env.tx_hashes)
+
+    return [Case('decoding.decode_transaction_hashes', decode, len(env.tx_hashes))]
+
+
+def _history_events_cases(env: BenchmarkEnvironment) -> list[Case]:
+    db_events = DBHistoryEvents(env.db)
+    middle_ts = Timestamp(START_TS + env.size.days * DAY_IN_SECONDS // 2)
+    filters = {
+        'first_page': HistoryEventFilterQuery.make(limit=50, offset=0),
+        'last_page': HistoryEventFilterQuery.make(limit=50, offset=env.size.history_events - 50),  # noqa: E501
+        'asset': HistoryEventFilterQuery.make(assets=(ASSETS[0],)),
+        'month': HistoryEventFilterQuery.make(from_ts=middle_ts, to_ts=Timestamp(middle_ts + 30 * DAY_IN_SECONDS)),  # noqa: E501
+        'event_type': HistoryEventFilterQuery.make(event_types=[HistoryEventType.STAKING]),
+        'location': HistoryEventFilterQuery.make(location=Location.KRAKEN, limit=50, offset=0),  # noqa: E501
+    }
+    cases = []
+    for name, filter_query in filters.items():
+        def get_history_events(filter_query: HistoryEventFilterQuery = filter_query) -> object:
+            with env.db.conn.read_ctx() as cursor:
+                return db_events.get_history_events(
+                    cursor=cursor,
+                    filter_query=filter_query,
+                    has_premium=True,
+                )
+
+        cases.append(Case(f'history_events.{name}', get_history_events, 1))
+    return cases
+
+
+def _balances_cases(env: BenchmarkEnvironment) -> list[Case]:
+    def query_timed_balances() -> None:
+        with env.db.conn.read_ctx() as cursor:
+            for asset in ASSETS:
+                env.db.query_timed_balances(cursor, asset=asset, balance_type=BalanceType.ASSET)
+
+    def get_netvalue_data() -> object:
+        return env.db.get_netvalue_data(from_ts=Timestamp(0))
+
+    return [
+        Case('balances.query_timed_balances', query_timed_balances, len(ASSETS)),
+        Case('balances.get_netvalue_data', get_netvalue_data, 1),
+    ]
+
+
+def _asset_search_cases(env: BenchmarkEnvironment) -> list[Case]:
+    cases = []
+    for substring in ('eth', 'usd', 'uniswap'):
+        def search(substring: str = substring) -> object:
+            return search_assets_levenshtein(
+                db=env.db,
+                filter_query=LevenshteinFilterQuery.make(substring_search=substring),
+                limit=10,
+                search_nfts=False,
+            )
+
+        cases.append(Case(f'assets.search_levenshtein.{substring}', search, 1))
+    return cases
+
+
+def make_cases(env: BenchmarkEnvironment) -> list[Case]:
+    return [
+        *_accounting_cases(env),
+        *_decoding_cases(env),
+        *_history_events_cases(env),
+        *_balances_cases(env),
+        *_asset_search_cases(env),
+    ]
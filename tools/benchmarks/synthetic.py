@@ -0,0 +1,397 @@
+"""
+Creation of the synthetic user and global DBs that the benchmarks run on.
+
+The data is random but reproducible for a given seed, so results of different
+commits are measured on the same DBs. Historical prices are written as manual
+prices and are the only price oracle, so that nothing is queried from the network.
+"""
+import random
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, NamedTuple
+from unittest.mock import patch
+
+from eth_utils import to_checksum_address
+
+from rotkehlchen.accounting.accountant import Accountant
+from rotkehlchen.accounting.structures.balance import Balance, BalanceType
+from rotkehlchen.accounting.structures.base import HistoryEvent
+from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
+from rotkehlchen.assets.asset import Asset
+from rotkehlchen.chain.accounts import BlockchainAccountData
+from rotkehlchen.chain.ethereum.accountant import EthereumAccountingAggregator
+from rotkehlchen.chain.ethereum.decoding.decoder import EthereumTransactionDecoder
+from rotkehlchen.chain.ethereum.node_inquirer import EthereumInquirer
+from rotkehlchen.chain.ethereum.transactions import EthereumTransactions
+from rotkehlchen.chain.evm.accounting.aggregator import EVMAccountingAggregators
+from rotkehlchen.chain.evm.decoding.constants import ERC20_OR_ERC721_TRANSFER
+from rotkehlchen.constants.assets import A_BTC, A_DAI, A_ETH, A_EUR, A_USDC
+from rotkehlchen.constants.misc import DEFAULT_SQL_VM_INSTRUCTIONS_CB
+from rotkehlchen.db.dbhandler import DBHandler
+from rotkehlchen.db.evmtx import DBEvmTx
+from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.db.utils import DBAssetBalance, LocationData
+from rotkehlchen.exchanges.data_structures import Trade
+from rotkehlchen.externalapis.coingecko import Coingecko
+from rotkehlchen.externalapis.cryptocompare import Cryptocompare
+from rotkehlchen.externalapis.defillama import Defillama
+from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.globaldb.manual_price_oracles import ManualCurrentOracle
+from rotkehlchen.greenlets.manager import GreenletManager
+from rotkehlchen.history.price import PriceHistorian
+from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
+from rotkehlchen.inquirer import Inquirer
+from rotkehlchen.premium.premium import Premium, PremiumCredentials, SubscriptionStatus
+from rotkehlchen.types import (
+    AssetAmount,
+    ChainID,
+    ChecksumEvmAddress,
+    EvmTransaction,
+    EVMTxHash,
+    Fee,
+    Location,
+    Price,
+    SupportedBlockchain,
+    Timestamp,
+    TimestampMS,
+    TradeType,
+    deserialize_evm_tx_hash,
+)
+from rotkehlchen.user_messages import MessagesAggregator
+
+START_TS = Timestamp(1577836800)  # 01/01/2020
+DAY_IN_SECONDS = 86400
+ASSETS = (A_ETH, A_BTC, A_USDC, A_DAI)
+INITIAL_PRICES = {A_ETH: FVal(150), A_BTC: FVal(7000), A_USDC: FVal('0.9'), A_DAI: FVal('0.9')}
+EXCHANGES = (Location.KRAKEN, Location.BINANCE, Location.COINBASE, Location.BITSTAMP)
+TRACKED_ADDRESS = to_checksum_address('0x9531c059098e3d194ff87febb587ab07b30b1306')
+
+
+class BenchmarkSize(NamedTuple):
+    """How many entries of each kind the synthetic user DB has"""
+    trades: int
+    evm_transactions: int
+    history_events: int
+    days: int  # the history spans this many days. One balances snapshot is taken each day
+
+    @property
+    def timed_balances(self) -> int:
+        return self.days * len(ASSETS)
+
+    @property
+    def price_history(self) -> int:
+        return self.days * 24 * len(ASSETS)
+
+
+SIZES = {
+    'small': BenchmarkSize(trades=500, evm_transactions=100, history_events=2000, days=365),
+    'medium': BenchmarkSize(trades=5000, evm_transactions=1000, history_events=20000, days=1095),  # noqa: E501
+    'large': BenchmarkSize(trades=25000, evm_transactions=5000, history_events=100000, days=1825),  # noqa: E501
+}
+
+
+class BenchmarkEnvironment(NamedTuple):
+    size: BenchmarkSize
+    db: DBHandler
+    accountant: Accountant
+    decoder: EthereumTransactionDecoder
+    tx_hashes: list[EVMTxHash]
+    end_ts: Timestamp
+
+
+def _random_address(rng: random.Random) -> ChecksumEvmAddress:
+    return to_checksum_address('0x' + bytes(rng.getrandbits(8) for _ in range(20)).hex())
+
+
+def _random_timestamp(rng: random.Random, size: BenchmarkSize) -> Timestamp:
+    return Timestamp(START_TS + rng.randrange(size.days * DAY_IN_SECONDS))
+
+
+def _make_prices(rng: random.Random, size: BenchmarkSize) -> dict[Asset, list[Price]]:
+    """A random walk of the hourly EUR price of each asset"""
+    prices: dict[Asset, list[Price]] = {}
+    for asset in ASSETS:
+        price, prices[asset] = INITIAL_PRICES[asset], []
+        for _ in range(size.days * 24):
+            price *= FVal(rng.randint(985, 1015)) / 1000
+            prices[asset].append(Price(price))
+    return prices
+
+
+def _price_at(prices: dict[Asset, list[Price]], asset: Asset, timestamp: Timestamp) -> Price:
+    return prices[asset][min((timestamp - START_TS) // 3600, len(prices[asset]) - 1)]
+
+
+def _add_trades(
+        db: DBHandler,
+        rng: random.Random,
+        size: BenchmarkSize,
+        prices: dict[Asset, list[Price]],
+) -> None:
+    trades = []
+    for idx in range(size.trades):
+        timestamp = _random_timestamp(rng, size)
+        base_asset, quote_asset = rng.choice((A_ETH, A_BTC)), rng.choice((A_USDC, A_DAI))
+        # buy more than what is sold so that most sells find their acquisitions
+        trade_type = TradeType.SELL if rng.random() < 0.4 else TradeType.BUY
+        rate = _price_at(prices, base_asset, timestamp) / _price_at(prices, quote_asset, timestamp)  # noqa: E501
+        amount = FVal(rng.randint(1, 1000)) / 1000
+        trades.append(Trade(
+            timestamp=timestamp,
+            location=rng.choice(EXCHANGES),
+            base_asset=base_asset,
+            quote_asset=quote_asset,
+            trade_type=trade_type,
+            amount=AssetAmount(amount),
+            rate=Price(rate),
+            fee=Fee(amount * rate / 1000),
+            fee_currency=quote_asset,
+            link=str(idx),
+        ))
+
+    with db.user_write() as write_cursor:
+        db.add_trades(write_cursor, trades=trades)
+
+
+def _add_history_events(
+        db: DBHandler,
+        rng: random.Random,
+        size: BenchmarkSize,
+        prices: dict[Asset, list[Price]],
+) -> None:
+    event_kinds = (
+        (HistoryEventType.RECEIVE, HistoryEventSubType.NONE),
+        (HistoryEventType.RECEIVE, HistoryEventSubType.NONE),
+        (HistoryEventType.SPEND, HistoryEventSubType.NONE),
+        (HistoryEventType.DEPOSIT, HistoryEventSubType.NONE),
+        (HistoryEventType.WITHDRAWAL, HistoryEventSubType.NONE),
+        (HistoryEventType.STAKING, HistoryEventSubType.REWARD),
+    )
+    events = []
+    for idx in range(size.history_events):
+        timestamp = _random_timestamp(rng, size)
+        event_type, event_subtype = rng.choice(event_kinds)
+        asset = rng.choice(ASSETS)
+        amount = FVal(rng.randint(1, 1000)) / 1000
+        location = rng.choice(EXCHANGES)
+        events.append(HistoryEvent(
+            event_identifier=f'{location!s}_{idx // 2}',  # two events per event identifier
+            sequence_index=idx % 2,
+            timestamp=TimestampMS(timestamp * 1000),
+            location=location,
+            event_type=event_type,
+            event_subtype=event_subtype,
+            asset=asset,
+            balance=Balance(amount=amount, usd_value=amount * _price_at(prices, asset, timestamp)),  # noqa: E501
+            location_label=f'{location!s} account',
+            notes=f'{event_type!s} {amount} {asset.identifier}',
+        ))
+
+    with db.user_write() as write_cursor:
+        DBHistoryEvents(db).add_history_events(write_cursor, history=events)
+
+
+def _add_evm_transactions(
+        db: DBHandler,
+        rng: random.Random,
+        size: BenchmarkSize,
+) -> list[EVMTxHash]:
+    """Adds transactions of the tracked address that move ETH and have 1 to 3
+    token transfers of known tokens in their receipt"""
+    transactions, receipts = [], []
+    counterparties = [_random_address(rng) for _ in range(50)]
+    tokens = (A_USDC.resolve_to_evm_token(), A_DAI.resolve_to_evm_token())
+    for nonce in range(size.evm_transactions):
+        tx_hash = deserialize_evm_tx_hash(bytes(rng.getrandbits(8) for _ in range(32)))
+        counterparty = rng.choice(counterparties)
+        transactions.append(EvmTransaction(
+            tx_hash=tx_hash,
+            chain_id=ChainID.ETHEREUM,
+            timestamp=_random_timestamp(rng, size),
+            block_number=10000000 + nonce,
+            from_address=TRACKED_ADDRESS,
+            to_address=counterparty,
+            value=rng.randint(0, 10 ** 18),
+            gas=100000,
+            gas_price=rng.randint(10, 200) * 10 ** 9,
+            gas_used=rng.randint(21000, 100000),
+            input_data=b'',
+            nonce=nonce,
+        ))
+        logs = []
+        for log_index in range(rng.randint(1, 3)):
+            source, target = TRACKED_ADDRESS, counterparty
+            if rng.random() < 0.5:
+                source, target = target, source
+            logs.append({
+                'logIndex': log_index,
+                'data': '0x' + rng.randint(1, 10 ** 21).to_bytes(32, byteorder='big').hex(),
+                'address': rng.choice(tokens).evm_address,
+                'removed': False,
+                'topics': [
+                    '0x' + ERC20_OR_ERC721_TRANSFER.hex(),
+                    '0x' + source[2:].lower().rjust(64, '0'),
+                    '0x' + target[2:].lower().rjust(64, '0'),
+                ],
+            })
+        receipts.append({
+            'transactionHash': tx_hash.hex(),  # pylint: disable=no-member
+            'type': '0x2',
+            'status': 1,
+            'contractAddress': None,
+            'logs': logs,
+        })
+
+    dbevmtx = DBEvmTx(db)
+    with db.user_write() as write_cursor:
+        dbevmtx.add_evm_transactions(write_cursor, evm_transactions=transactions, relevant_address=TRACKED_ADDRESS)  # noqa: E501
+        for receipt in receipts:
+            dbevmtx.add_receipt_data(write_cursor, chain_id=ChainID.ETHEREUM, data=receipt)
+
+    return [x.tx_hash for x in transactions]
+
+
+def _add_balances(
+        db: DBHandler,
+        rng: random.Random,
+        size: BenchmarkSize,
+        prices: dict[Asset, list[Price]],
+) -> None:
+    """Adds one snapshot of the balances of all assets and of their total per day"""
+    balances, location_data = [], []
+    amounts = {asset: FVal(rng.randint(1, 100)) for asset in ASSETS}
+    for day in range(size.days):
+        timestamp, total = Timestamp(START_TS + day * DAY_IN_SECONDS), FVal(0)
+        for asset in ASSETS:
+            amounts[asset] *= FVal(rng.randint(95, 106)) / 100
+            usd_value = amounts[asset] * _price_at(prices, asset, timestamp)
+            total += usd_value
+            balances.append(DBAssetBalance(
+                category=BalanceType.ASSET,
+                time=timestamp,
+                asset=asset,
+                amount=amounts[asset],
+                usd_value=usd_value,
+            ))
+        location_data.append(LocationData(
+            time=timestamp,
+            location=Location.TOTAL.serialize_for_db(),
+            usd_value=str(total),
+        ))
+
+    with db.user_write() as write_cursor:
+        db.add_multiple_balances(write_cursor, balances=balances)
+        db.add_multiple_location_data(write_cursor, location_data=location_data)
+
+
+def _add_prices(prices: dict[Asset, list[Price]]) -> None:
+    GlobalDBHandler().add_historical_prices([
+        HistoricalPrice(
+            from_asset=asset,
+            to_asset=A_EUR,
+            source=HistoricalPriceOracle.MANUAL,
+            timestamp=Timestamp(START_TS + hour * 3600),
+            price=price,
+        ) for asset, asset_prices in prices.items() for hour, price in enumerate(asset_prices)
+    ])
+
+
+def create_environment(
+        stack: ExitStack,
+        data_dir: Path,
+        size: BenchmarkSize,
+        seed: int,
+) -> BenchmarkEnvironment:
+    """Initializes the global DB and the price singletons in `data_dir`, creates a user
+    DB of the given size and the objects that are benchmarked on it.
+
+    The curve pools are read as they are in the packaged global DB instead of
+    being refreshed from the chain when decoding starts.
+    """
+    rng = random.Random(seed)
+    msg_aggregator = MessagesAggregator()
+    GlobalDBHandler(data_dir=data_dir, sql_vm_instructions_cb=DEFAULT_SQL_VM_INSTRUCTIONS_CB)
+    cryptocompare = Cryptocompare(data_directory=data_dir, database=None)
+    coingecko, defillama = Coingecko(), Defillama()
+    Inquirer(
+        data_dir=data_dir,
+        cryptocompare=cryptocompare,
+        coingecko=coingecko,
+        defillama=defillama,
+        manualcurrent=ManualCurrentOracle(),
+        msg_aggregator=msg_aggregator,
+    )
+    PriceHistorian(
+        data_directory=data_dir,
+        cryptocompare=cryptocompare,
+        coingecko=coingecko,
+        defillama=defillama,
+    )
+    PriceHistorian().set_oracles_order([HistoricalPriceOracle.MANUAL])
+
+    user_dir = data_dir / 'benchmark'
+    user_dir.mkdir(parents=True, exist_ok=True)
+    db = DBHandler(
+        user_data_dir=user_dir,
+        password='123',
+        msg_aggregator=msg_aggregator,
+        initial_settings=None,
+        sql_vm_instructions_cb=DEFAULT_SQL_VM_INSTRUCTIONS_CB,
+    )
+    with db.user_write() as write_cursor:
+        db.add_blockchain_accounts(write_cursor, account_data=[
+            BlockchainAccountData(chain=SupportedBlockchain.ETHEREUM, address=TRACKED_ADDRESS),
+        ])
+
+    prices = _make_prices(rng, size)
+    _add_prices(prices)
+    _add_trades(db, rng, size, prices)
+    _add_history_events(db, rng, size, prices)
+    tx_hashes = _add_evm_transactions(db, rng, size)
+    _add_balances(db, rng, size, prices)
+
+    stack.enter_context(patch.object(
+        EthereumInquirer,
+        'assure_curve_protocol_cache_is_queried',
+        return_value=False,
+    ))
+    ethereum_inquirer = EthereumInquirer(
+        greenlet_manager=GreenletManager(msg_aggregator=msg_aggregator),
+        database=db,
+        connect_at_start=(),
+    )
+    decoder = EthereumTransactionDecoder(
+        database=db,
+        ethereum_inquirer=ethereum_inquirer,
+        transactions=EthereumTransactions(ethereum_inquirer=ethereum_inquirer, database=db),
+    )
+    # an active premium so that the accountant processes all events and keeps checkpoints
+    premium = Premium(PremiumCredentials(given_api_key='benchmark', given_api_secret=''))
+    premium.status = SubscriptionStatus.ACTIVE
+    accountant = Accountant(
+        db=db,
+        msg_aggregator=msg_aggregator,
+        evm_accounting_aggregators=EVMAccountingAggregators(aggregators=[
+            EthereumAccountingAggregator(node_inquirer=ethereum_inquirer, msg_aggregator=msg_aggregator),  # noqa: E501
+        ]),
+        premium=premium,
+    )
+    return BenchmarkEnvironment(
+        size=size,
+        db=db,
+        accountant=accountant,
+        decoder=decoder,
+        tx_hashes=tx_hashes,
+        end_ts=Timestamp(START_TS + size.days * DAY_IN_SECONDS),
+    )
+
+
+def size_summary(size: BenchmarkSize) -> dict[str, Any]:
+    return {
+        'trades': size.trades,
+        'evm_transactions': size.evm_transactions,
+        'history_events': size.history_events,
+        'timed_balances': size.timed_balances,
+        'price_history': size.price_history,
+    }
@@ -0,0 +1,97 @@
+"""
+Microbenchmark of FVal and of the arithmetic of the accounting loop that uses it.
+
+Run it before and after a change of rotkehlchen/fval.py to compare them.
+
+    python -m tools.profiling.fval --repeat 5
+"""
+import argparse
+import random
+import timeit
+from collections.abc import Callable
+
+from rotkehlchen.accounting.cost_basis.base import AssetAcquisitionEvent, CostBasisEvents
+from rotkehlchen.accounting.mixins.event import AccountingEventType
+from rotkehlchen.accounting.pnl import PNL, PnlTotals
+from rotkehlchen.accounting.types import MissingAcquisition
+from rotkehlchen.constants.assets import A_ETH
+from rotkehlchen.constants.misc import ZERO
+from rotkehlchen.db.settings import DBSettings
+from rotkehlchen.fval import FVal
+from rotkehlchen.types import CostBasisMethod, Price, Timestamp
+
+
+def accounting_loop(count: int, seed: int = 0) -> Callable[[], None]:
+    """Returns a function that replays `count` acquisitions and spends through the
+    cost basis calculation and the PnL totals, as the accountant does for trades"""
+    rng = random.Random(seed)
+    amounts = [FVal(rng.randint(1, 10000)) / 1000 for _ in range(count)]
+    rates = [Price(FVal(rng.randint(1, 100000)) / 100) for _ in range(count)]
+    settings = DBSettings(taxfree_after_period=365 * 86400)
+
+    def run() -> None:
+        manager = CostBasisEvents(CostBasisMethod.FIFO).acquisitions_manager
+        missing_acquisitions: list[MissingAcquisition] = []
+        totals = PnlTotals()
+        for idx, (amount, rate) in enumerate(zip(amounts, rates)):
+            manager.add_acquisition(AssetAcquisitionEvent(
+                amount=amount,
+                timestamp=Timestamp(idx * 3600),
+                rate=rate,
+                index=idx,
+            ))
+            spent = amount * FVal('0.9')
+            info = manager.calculate_spend_cost_basis(
+                spending_amount=spent,
+                spending_asset=A_ETH,
+                timestamp=Timestamp(idx * 3600 + 1),
+                missing_acquisitions=missing_acquisitions,
+                used_acquisitions=[],
+                settings=settings,
+                timestamp_to_date=str,  # only used for logs
+            )
+            taxable_value = info.taxable_amount * rate
+            free_value = (spent - info.taxable_amount) * rate
+            pnl = PNL(
+                taxable=taxable_value - info.taxable_bought_cost,
+                free=free_value - info.taxfree_bought_cost,
+            )
+            if pnl.taxable != ZERO or pnl.free != ZERO:
+                totals[AccountingEventType.TRADE] += pnl
+
+    return run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark FVal and the accounting loop')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--events', type=int, default=20000)
+    args = parser.parse_args()
+
+    a, b = FVal('1.348938409'), FVal('0.123432434')
+    micro: dict[str, Callable[[], object]] = {
+        'FVal(str)': lambda: FVal('1.348938409'),
+        'a + b': lambda: a + b,
+        'a * b': lambda: a * b,
+        'a / b': lambda: a / b,
+        'a + 1': lambda: a + 1,
+        'a > b': lambda: a > b,
+        'a <= b': lambda: a <= b,
+        'a == b': lambda: a == b,
+        'a == 0': lambda: a == 0,
+        'a > 0': lambda: a > 0,
+        'a * 100': lambda: a * 100,
+        'a.is_close(b)': lambda: a.is_close(b),
+    }
+    number = 200000
+    for name, statement in micro.items():
+        best = min(timeit.repeat(statement, number=number, repeat=args.repeat))
+        print(f'{name:<12} {best / number * 1e9:>10.1f} ns/op')
+
+    loop = accounting_loop(args.events)
+    best = min(timeit.repeat(loop, number=1, repeat=args.repeat))
+    print(f'{"accounting":<12} {best / args.events * 1e6:>10.2f} us/event')
+
+
+if __name__ == '__main__':
+    main()